@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+VRL Function Cost Calibration CLI
+
+Microbenchmarks VRL stdlib functions and writes the versioned cost table
+used by the static cost model and LLM prompts. Re-run whenever the deployed
+Vector version changes.
+
+Usage:
+    python scripts/calibrate_vpi.py                      # pyvrl, writes config/vrl_cost_table.json
+    python scripts/calibrate_vpi.py --engine vector      # measure with the installed Vector CLI
+    python scripts/calibrate_vpi.py --dry-run -n 200     # quick run, print table only
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.vpi_calibration import (
+    VPIMicrobenchmark, build_cost_table, save_cost_table,
+    detect_engine_version, DEFAULT_COST_TABLE_PATH,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calibrate VRL function VPI impact from microbenchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument('--engine', choices=['pyvrl', 'vector'], default='pyvrl',
+                        help='VRL engine to benchmark with (default: pyvrl)')
+
+    parser.add_argument('--iterations', '-n', type=int, default=1000,
+                        help='Events per timing round')
+
+    parser.add_argument('--rounds', '-r', type=int, default=5,
+                        help='Timing rounds per function (fastest kept)')
+
+    parser.add_argument('--output', '-o', default=str(DEFAULT_COST_TABLE_PATH),
+                        help='Cost table path')
+
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the table without writing it')
+
+    args = parser.parse_args()
+
+    benchmark = VPIMicrobenchmark(engine=args.engine, iterations=args.iterations, rounds=args.rounds)
+    table = build_cost_table(benchmark.run(), args.engine, detect_engine_version(args.engine))
+
+    if args.dry_run:
+        print(json.dumps(table, indent=2))
+    else:
+        save_cost_table(table, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
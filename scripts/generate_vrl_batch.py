@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+CLI wrapper for batch VRL generation over a directory or manifest of log sources
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl import DFEVRLBatchGenerator
+from loguru import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate VRL parsers for many log sources in one run")
+    parser.add_argument("source", help="Directory of log files or YAML/JSON manifest of sources")
+    parser.add_argument("--output-dir", default="samples-parsed/batch",
+                        help="Directory for per-source VRL/metadata and batch_summary.json")
+    parser.add_argument("--workers", type=int, help="Concurrent generations (default: batch.max_workers)")
+    parser.add_argument("--no-validate", action="store_true", help="Skip validation")
+    parser.add_argument("--no-fix", action="store_true", help="Don't attempt to fix errors")
+    parser.add_argument("--config", help="Path to config file")
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+
+    args = parser.parse_args()
+
+    # Configure logging
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if args.verbose else "INFO")
+
+    try:
+        batch = DFEVRLBatchGenerator(config_path=args.config, max_workers=args.workers)
+        summary = batch.run(
+            args.source,
+            args.output_dir,
+            validate=not args.no_validate,
+            fix_errors=not args.no_fix
+        )
+
+        print("\n=== Batch Summary ===")
+        print(f"Sources: {len(summary.results)} in {len(summary.families)} families")
+        for status, count in sorted(summary.counts.items()):
+            print(f"  {status}: {count}")
+        print(f"Duration: {summary.duration:.0f}s with {summary.workers} workers")
+        print(f"Results: {Path(args.output_dir).resolve()}")
+
+        return 0 if summary.counts.get("passed", 0) == len(summary.results) else 1
+
+    except Exception as e:
+        logger.error(f"Batch generation failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,8 @@ with detailed metrics and cost analysis.
 
 Usage:
     python scripts/vrl_performance_cli.py data/input/SSH.tar.gz --device-type ssh --optimize-for throughput
-    python scripts/vrl_performance_cli.py data/input/Apache.tar.gz --optimize-for memory --max-iterations 5
+    python scripts/vrl_performance_cli.py data/input/Apache.tar.gz --optimize-for balanced --max-iterations 5
+    python scripts/vrl_performance_cli.py data/input/SSH.tar.gz --resume   # continue an interrupted run
 """
 
 import argparse
@@ -19,7 +20,7 @@ from loguru import logger
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from dfe_ai_parser_vrl.core.performance import DFEVRLIterativeSession
+from dfe_ai_parser_vrl.core.performance import DFEVRLPerformanceOptimizer
 
 
 def main():
@@ -54,6 +55,12 @@ def main():
     parser.add_argument('--config', 
                        help='Custom configuration file path')
     
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue from the last checkpoint for this log file')
+    
+    parser.add_argument('--checkpoint-dir',
+                       help='Checkpoint directory (default: performance.checkpoint.directory)')
+    
     args = parser.parse_args()
     
     # Check environment
@@ -79,28 +86,33 @@ def main():
     logger.info(f"   Max iterations: {args.max_iterations}")
     logger.info(f"   Cost threshold: ${args.cost_threshold}")
     logger.info(f"   Output dir: {args.output_dir}")
+    logger.info(f"   Resume: {'yes' if args.resume else 'no'}")
     
+    session = None
     try:
         # Initialize session with custom config if provided
-        session = DFEVRLIterativeSession(args.config)
+        session = DFEVRLPerformanceOptimizer(args.config)
         
         # Update session settings from CLI args
         session.max_iterations = args.max_iterations
         session.cost_threshold = args.cost_threshold
+        if args.checkpoint_dir:
+            session.checkpoint_dir = args.checkpoint_dir
         
         # Run performance iteration
         logger.info(f"\n🚀 Starting VRL performance iteration...")
-        vrl_code, metrics = session.run_performance_iteration(
+        vrl_code, metrics = session.run_performance_optimization(
             log_file=str(log_path),
             device_type=args.device_type,
-            optimize_for=args.optimize_for
+            optimize_for=args.optimize_for,
+            resume=args.resume
         )
         
         # Print detailed summary
         session.print_session_summary(metrics)
         
         # Save outputs
-        if metrics['successful'] and vrl_code:
+        if metrics.get('successful') and vrl_code:
             # Generate filename from log file
             base_name = log_path.stem.replace('.log', '').replace('.tar', '')
             
@@ -118,14 +130,6 @@ def main():
             logger.success(f"✅ Success! VRL saved to {vrl_file}")
             logger.info(f"📊 Metrics saved to {metrics_file}")
             
-            # Performance recommendations
-            if metrics['free_iteration_ratio'] > 70:
-                logger.success("🎉 Excellent efficiency! Local fixes handled most iterations")
-            elif metrics['free_iteration_ratio'] > 40:
-                logger.info("👍 Good efficiency with local fixes")
-            else:
-                logger.warning("⚠️ Low local fix efficiency - consider enhancing error patterns")
-            
             return 0
         else:
             logger.error("❌ VRL generation failed")
@@ -137,6 +141,8 @@ def main():
     
     except KeyboardInterrupt:
         logger.warning("⚠️ Interrupted by user")
+        if session and session.checkpoint and session.checkpoint.exists():
+            logger.info(f"💾 Progress saved to {session.checkpoint.path} - rerun with --resume to continue")
         return 1
     except Exception as e:
         logger.error(f"❌ Error during VRL generation: {e}")
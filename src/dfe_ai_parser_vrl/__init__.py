@@ -3,7 +3,8 @@ DFE AI Parser VRL - AI-powered Vector Remap Language generator for HyperSec Data
 """
 
 import os
-from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from loguru import logger
 
 __version__ = "0.1.0"
@@ -16,6 +17,7 @@ class DFEThreadingConfig:
     def __init__(self):
         self._max_workers = self._detect_optimal_thread_count()
         self._thread_pool = None
+        self._process_pool = None
         
     def _detect_optimal_thread_count(self) -> int:
         """Detect optimal thread count based on CPU cores and config overrides"""
@@ -72,10 +74,8 @@ class DFEThreadingConfig:
         if count < 1:
             raise ValueError("Thread count must be at least 1")
         self._max_workers = count
-        # Reset thread pool to apply new setting
-        if self._thread_pool:
-            self._thread_pool.shutdown(wait=True)
-            self._thread_pool = None
+        # Reset pools to apply new setting
+        self.shutdown()
         logger.info(f"Thread count set to {count}")
     
     def get_thread_pool(self) -> ThreadPoolExecutor:
@@ -87,11 +87,20 @@ class DFEThreadingConfig:
             )
         return self._thread_pool
     
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        """Get a shared process pool executor for CPU-bound work"""
+        if self._process_pool is None or self._process_pool._shutdown_thread:
+            self._process_pool = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._process_pool
+    
     def shutdown(self):
-        """Shutdown the thread pool"""
+        """Shutdown the thread and process pools"""
         if self._thread_pool:
             self._thread_pool.shutdown(wait=True)
             self._thread_pool = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
 
 # Global threading configuration instance
 _threading_config = DFEThreadingConfig()
@@ -109,16 +118,36 @@ def get_thread_pool() -> ThreadPoolExecutor:
     """Get a shared thread pool executor for async operations"""
     return _threading_config.get_thread_pool()
 
-# Module imports
-from .core.generator import DFEVRLGenerator  # baseline_stage
-from .core.performance import DFEVRLPerformanceOptimizer, VRLPerformanceOptimizer  # performance_stage
-from .llm.client import DFELLMClient
-from .config.loader import DFEConfigLoader
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get a shared process pool executor for CPU-bound preprocessing"""
+    return _threading_config.get_process_pool()
+
+# Module exports - resolved on first access so importing the package does not
+# pull in litellm, dask or the validators until they are used
+from .utils.lazy import lazy_exports
+
+_LAZY_EXPORTS = {
+    "DFEVRLGenerator": ".core.generator",  # baseline_stage
+    "DFEVRLBatchGenerator": ".core.batch",  # baseline_stage for a corpus of sources
+    "DFEVRLPerformanceOptimizer": ".core.performance",  # performance_stage
+    "VRLPerformanceOptimizer": ".core.performance",
+    "DFELLMClient": ".llm.client",
+    "DFEConfigLoader": ".config.loader",
+}
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
+
+if TYPE_CHECKING:
+    from .core.generator import DFEVRLGenerator
+    from .core.batch import DFEVRLBatchGenerator
+    from .core.performance import DFEVRLPerformanceOptimizer, VRLPerformanceOptimizer
+    from .llm.client import DFELLMClient
+    from .config.loader import DFEConfigLoader
 
 __all__ = [
     "DFEVRLGenerator",  # baseline_stage: Establishes working baseline VRL
+    "DFEVRLBatchGenerator",  # baseline_stage over a directory/manifest of sources
     "DFEVRLPerformanceOptimizer",  # performance_stage: Optimizes candidate_baseline 
     "VRLPerformanceOptimizer", 
     "DFELLMClient", "DFEConfigLoader",
-    "get_max_threads", "set_max_threads", "get_thread_pool"
+    "get_max_threads", "set_max_threads", "get_thread_pool", "get_process_pool"
 ]
\ No newline at end of file
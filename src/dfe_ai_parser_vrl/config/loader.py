@@ -98,7 +98,6 @@ class DFEConfigLoader:
             },
             "vrl_generation": {
                 "max_iterations": 10,
-                "iteration_delay": 2,
                 "validation": {
                     "pyvrl_enabled": True,
                     "vector_cli_enabled": True,
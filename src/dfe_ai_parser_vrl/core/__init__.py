@@ -1,7 +1,20 @@
 """Core VRL generation functionality"""
 
-from .generator import DFEVRLGenerator
-from .validator import DFEVRLValidator
-from .error_fixer import DFEVRLErrorFixer
+from typing import TYPE_CHECKING
 
-__all__ = ["DFEVRLGenerator", "DFEVRLValidator", "DFEVRLErrorFixer"]
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "DFEVRLGenerator": ".generator",
+    "DFEVRLBatchGenerator": ".batch",
+    "DFEVRLValidator": ".validator",
+    "DFEVRLErrorFixer": ".error_fixer",
+})
+
+if TYPE_CHECKING:
+    from .generator import DFEVRLGenerator
+    from .batch import DFEVRLBatchGenerator
+    from .validator import DFEVRLValidator
+    from .error_fixer import DFEVRLErrorFixer
+
+__all__ = ["DFEVRLGenerator", "DFEVRLBatchGenerator", "DFEVRLValidator", "DFEVRLErrorFixer"]
\ No newline at end of file
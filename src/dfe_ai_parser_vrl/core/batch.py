@@ -0,0 +1,383 @@
+"""
+Batch corpus mode
+
+Generates parsers for many log sources in one run instead of one CLI process
+per file:
+
+- Sources come from a directory (one source per file) or a YAML/JSON
+  manifest listing paths with optional names and device types
+- Sources are grouped by template family (syslog, json, cef, kv, ...)
+  detected from their sample lines; each family's representative is
+  generated first and its validated VRL is the baseline for the rest of
+  the family
+- Up to max_workers sources are in flight on the pipelined scheduler
+  (separate LLM and validation pools); jobs share one generator and the
+  process-wide caches (VRL AST cache, error-fix knowledge base), and two
+  sources with the same device type never run at once because LLM sessions
+  are keyed by device type
+- Each source gets <name>.vrl and <name>.json in the output directory, and
+  the run writes batch_summary.json
+"""
+
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import yaml
+from loguru import logger
+
+from .. import get_max_threads
+from ..config.loader import DFEConfigLoader
+from ..utils.streaming import stream_file_lines
+from .generator import detect_device_type
+from .pipeline import GenerationPipeline, DEFAULT_LLM_WORKERS
+
+SUMMARY_FILE = "batch_summary.json"
+
+# Files considered log sources when a directory is given
+SOURCE_SUFFIXES = {'.log', '.txt', '.json', '.ndjson', '.jsonl', '.csv', '.syslog', ''}
+
+MANIFEST_SUFFIXES = {'.yaml', '.yml', '.json'}
+
+# Line format classifiers, checked in order
+_FAMILY_PATTERNS = [
+    ('cef', re.compile(r'CEF:\d+\|')),
+    ('leef', re.compile(r'LEEF:\d(\.\d)?\|')),
+    ('syslog5424', re.compile(r'^<\d{1,3}>\d{1,2} \S+ \S+ \S+ \S+ \S+ ')),
+    ('syslog', re.compile(r'^(<\d{1,3}>)?[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d ')),
+    ('clf', re.compile(r'^\S+ \S+ \S+ \[[^\]]+\] "')),
+    ('kv', re.compile(r'(?:^|\s)[\w.-]+=(?:"[^"]*"|\S*)(?:\s+[\w.-]+=(?:"[^"]*"|\S*)){2,}')),
+]
+
+
+def classify_line(line: str) -> str:
+    """
+    Template family of a single log line
+
+    Args:
+        line: Raw log line
+
+    Returns:
+        Family name: json, cef, leef, syslog5424, syslog, clf, kv, csv or text
+    """
+    stripped = line.strip()
+    if stripped.startswith('{'):
+        try:
+            if isinstance(json.loads(stripped), dict):
+                return 'json'
+        except ValueError:
+            pass
+    for family, pattern in _FAMILY_PATTERNS:
+        if pattern.search(stripped):
+            return family
+    if stripped.count(',') >= 3:
+        return 'csv'
+    return 'text'
+
+
+def detect_template_family(lines: List[str]) -> str:
+    """
+    Dominant template family of a source's sample lines
+
+    Args:
+        lines: Sample lines
+
+    Returns:
+        Most common line family ("empty" if there are no non-blank lines)
+    """
+    counts = Counter(classify_line(line) for line in lines if line.strip())
+    if not counts:
+        return 'empty'
+    return counts.most_common(1)[0][0]
+
+
+@dataclass
+class BatchSource:
+    """One log source in a batch run"""
+    name: str
+    path: Path
+    device_type: Optional[str] = None
+    family: Optional[str] = None
+    sample_logs: str = field(default='', repr=False)
+
+
+@dataclass
+class BatchSourceResult:
+    """Outcome of generating one source's parser"""
+    name: str
+    path: str
+    family: str
+    device_type: Optional[str]
+    status: str                             # passed, failed (did not validate) or error
+    duration: float
+    iterations: int = 0
+    baseline_from: Optional[str] = None     # Family representative whose VRL was the baseline
+    vrl_file: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    """Run summary written to batch_summary.json"""
+    started_at: str
+    duration: float
+    workers: int
+    families: Dict[str, List[str]]
+    results: List[BatchSourceResult]
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(result.status for result in self.results))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration": round(self.duration, 2),
+            "workers": self.workers,
+            "sources": len(self.results),
+            "counts": self.counts,
+            "sources_per_hour": round(len(self.results) * 3600 / self.duration, 1) if self.duration else None,
+            "families": self.families,
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+def load_sources(source: Union[str, Path]) -> List[BatchSource]:
+    """
+    Resolve a directory or manifest into batch sources
+
+    Manifest format (YAML or JSON): a list of entries, or {"sources": [...]};
+    each entry is a path or {path, name?, device_type?}. Relative paths are
+    resolved against the manifest's directory.
+
+    Args:
+        source: Directory of log files or manifest file
+
+    Returns:
+        Sources with unique names, in manifest/sorted directory order
+    """
+    source = Path(source)
+    if source.is_dir():
+        entries = [{"path": path} for path in sorted(source.iterdir())
+                   if path.is_file() and not path.name.startswith('.')
+                   and path.suffix.lower() in SOURCE_SUFFIXES]
+        base = source
+    elif source.is_file() and source.suffix.lower() in MANIFEST_SUFFIXES:
+        with open(source) as f:
+            data = json.load(f) if source.suffix.lower() == '.json' else yaml.safe_load(f)
+        if isinstance(data, dict):
+            data = data.get("sources", [])
+        if not isinstance(data, list):
+            raise ValueError(f"Manifest {source} must contain a list of sources")
+        entries = [entry if isinstance(entry, dict) else {"path": entry} for entry in data]
+        base = source.parent
+    else:
+        raise FileNotFoundError(f"Batch source must be a directory or manifest file: {source}")
+
+    sources = []
+    names = Counter()
+    for entry in entries:
+        if "path" not in entry:
+            raise ValueError(f"Manifest entry without path: {entry}")
+        path = Path(entry["path"])
+        if not path.is_absolute():
+            path = base / path
+        name = re.sub(r'[^\w.-]', '_', str(entry.get("name") or path.stem))
+        names[name] += 1
+        if names[name] > 1:
+            name = f"{name}_{names[name]}"
+        sources.append(BatchSource(name=name, path=path, device_type=entry.get("device_type")))
+    return sources
+
+
+class DFEVRLBatchGenerator:
+    """Generates VRL parsers for a corpus of log sources on the pipelined scheduler"""
+
+    def __init__(self,
+                 config_path: str = None,
+                 max_workers: int = None,
+                 generator_factory: Callable[[], Any] = None):
+        """
+        Initialize batch generator
+
+        Args:
+            config_path: Path to config file
+            max_workers: Sources in flight (default: batch.max_workers or module thread count)
+            generator_factory: Creates the generator shared by all jobs
+                (default: DFEVRLGenerator with this config)
+        """
+        self.config = DFEConfigLoader.load(config_path)
+        batch_config = self.config.get("batch", {})
+        self.max_workers = max(1, max_workers or batch_config.get("max_workers") or get_max_threads())
+        self.max_sample_lines = batch_config.get("max_sample_lines", 1000)
+        self.share_family_baseline = batch_config.get("share_family_baseline", True)
+        self.llm_workers = batch_config.get("llm_workers", min(self.max_workers, DEFAULT_LLM_WORKERS))
+        self.validation_workers = batch_config.get("validation_workers") or get_max_threads()
+
+        if generator_factory is None:
+            from .generator import DFEVRLGenerator
+            generator_factory = lambda: DFEVRLGenerator(config_path)
+        self._generator_factory = generator_factory
+
+    def run(self,
+            source: Union[str, Path, List[BatchSource]],
+            output_dir: Union[str, Path],
+            validate: bool = True,
+            fix_errors: bool = True) -> BatchSummary:
+        """
+        Generate parsers for every source and write per-source results plus a summary
+
+        Args:
+            source: Directory, manifest file or list of sources
+            output_dir: Directory for <name>.vrl, <name>.json and batch_summary.json
+            validate: Whether to validate generated VRL
+            fix_errors: Whether to attempt fixing validation errors
+
+        Returns:
+            BatchSummary (also written to output_dir/batch_summary.json)
+        """
+        started_at = datetime.now().isoformat()
+        start = time.time()
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        sources = source if isinstance(source, list) else load_sources(source)
+        results: Dict[str, BatchSourceResult] = {}
+        families = self.group_by_family(sources, results)
+
+        logger.info(f"📦 Batch run: {len(sources)} sources in {len(families)} template families, "
+                    f"{self.max_workers} workers")
+        for family, members in families.items():
+            logger.info(f"   {family}: {len(members)} sources")
+
+        # Representatives (largest family first) are ready now; the rest of a
+        # family is released when its representative finishes
+        ready = [members[0] for members in sorted(families.values(), key=len, reverse=True)]
+        waiting = {members[0].name: members[1:] for members in families.values()}
+        baselines: Dict[str, Tuple[str, str]] = {}   # family -> (representative name, VRL)
+
+        running: Dict[Future, Tuple[BatchSource, Optional[Tuple[str, str]], float]] = {}
+        busy_devices = set()
+        pipeline = GenerationPipeline(self._generator_factory(), self.llm_workers, self.validation_workers)
+        with pipeline:
+            while ready or running:
+                for item in list(ready):
+                    if len(running) >= self.max_workers:
+                        break
+                    if item.device_type in busy_devices:
+                        continue  # LLM sessions are per device type
+                    ready.remove(item)
+                    busy_devices.add(item.device_type)
+                    baseline = baselines.get(item.family) if self.share_family_baseline else None
+                    future = pipeline.submit(item.sample_logs, item.device_type, validate, fix_errors,
+                                             baseline[1] if baseline else None)
+                    running[future] = (item, baseline, time.time())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item, baseline, submitted = running.pop(future)
+                    busy_devices.discard(item.device_type)
+                    result, vrl_code = self._record_source(item, output_dir, baseline, validate,
+                                                           future, time.time() - submitted)
+                    results[item.name] = result
+                    logger.info(f"{'✅' if result.status == 'passed' else '❌'} [{len(results)}/{len(sources)}] "
+                                f"{item.name} ({item.family}): {result.status} in {result.duration:.1f}s")
+
+                    followers = waiting.pop(item.name, None)
+                    if followers is not None:
+                        if result.status == 'passed' and vrl_code:
+                            baselines[item.family] = (item.name, vrl_code)
+                        ready.extend(followers)
+
+        logger.debug(f"Pipeline steps: {pipeline.stage_counts}")
+        summary = BatchSummary(
+            started_at=started_at,
+            duration=time.time() - start,
+            workers=self.max_workers,
+            families={family: [s.name for s in members] for family, members in families.items()},
+            results=[results[s.name] for s in sources],
+        )
+        (output_dir / SUMMARY_FILE).write_text(json.dumps(summary.to_dict(), indent=2))
+        logger.success(f"📦 Batch complete in {summary.duration:.0f}s: {summary.counts}")
+        return summary
+
+    def group_by_family(self, sources: List[BatchSource],
+                        results: Dict[str, BatchSourceResult]) -> Dict[str, List[BatchSource]]:
+        """
+        Read samples and group sources by template family
+
+        Unreadable or empty sources get an error result instead of a family.
+
+        Args:
+            sources: Sources to group (sample_logs/family/device_type filled in)
+            results: Receives error results for sources that cannot be sampled
+
+        Returns:
+            Family name -> sources, largest sample first within a family
+        """
+        families: Dict[str, List[BatchSource]] = defaultdict(list)
+        for source in sources:
+            try:
+                lines = list(islice(stream_file_lines(source.path), self.max_sample_lines))
+            except (OSError, UnicodeDecodeError) as e:
+                results[source.name] = self._error_result(source, f"Cannot read source: {e}")
+                continue
+            source.family = detect_template_family(lines)
+            if source.family == 'empty':
+                results[source.name] = self._error_result(source, "Source has no log lines")
+                continue
+            source.sample_logs = '\n'.join(lines)
+            # Sessions are keyed by device type, so undetected sources use their own name
+            source.device_type = source.device_type or detect_device_type(source.path.name) or source.name
+            families[source.family].append(source)
+
+        for members in families.values():
+            members.sort(key=lambda s: -len(s.sample_logs))
+        return dict(families)
+
+    def _record_source(self, source: BatchSource, output_dir: Path,
+                       baseline: Optional[Tuple[str, str]], validate: bool,
+                       future: Future, duration: float) -> Tuple[BatchSourceResult, Optional[str]]:
+        """Turn a finished job into a result and write <name>.vrl / <name>.json"""
+        try:
+            vrl_code, metadata = future.result()
+
+            vrl_file = output_dir / f"{source.name}.vrl"
+            vrl_file.write_text(vrl_code)
+            passed = metadata.get("validation_passed", not validate)
+            result = BatchSourceResult(
+                name=source.name,
+                path=str(source.path),
+                family=source.family,
+                device_type=source.device_type,
+                status='passed' if passed else 'failed',
+                duration=duration,
+                iterations=metadata.get("iterations", 0),
+                baseline_from=baseline[0] if baseline else None,
+                vrl_file=str(vrl_file),
+            )
+            (output_dir / f"{source.name}.json").write_text(
+                json.dumps({"result": asdict(result), "metadata": metadata}, indent=2, default=str)
+            )
+            return result, vrl_code
+        except Exception as e:
+            logger.error(f"Batch generation failed for {source.name}: {e}")
+            return self._error_result(source, str(e), duration), None
+
+    def _error_result(self, source: BatchSource, error: str, duration: float = 0.0) -> BatchSourceResult:
+        return BatchSourceResult(
+            name=source.name,
+            path=str(source.path),
+            family=source.family or 'unknown',
+            device_type=source.device_type,
+            status='error',
+            duration=duration,
+            error=error,
+        )
@@ -0,0 +1,116 @@
+"""
+Durable checkpoints for long-running optimization sessions
+
+run_performance_optimization spends LLM money on strategies, candidates and
+refinements and minutes of Vector time on benchmarks. Its progress is
+written to one JSON file per log source after every step, always via a
+temp file + os.replace so a crash mid-write leaves the previous checkpoint
+intact. A resumed session picks up the stored baseline, candidates,
+validation attempts, performance history and cost instead of redoing them.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+CHECKPOINT_SCHEMA_VERSION = 1
+
+# Where checkpoints go when performance.checkpoint.directory is not configured
+DEFAULT_CHECKPOINT_DIR = Path(".tmp/checkpoints")
+
+
+def atomic_write_json(path: Path, data: Dict[str, Any]):
+    """
+    Write JSON so readers only ever see the old or the new file
+
+    Args:
+        path: Destination file
+        data: JSON-serializable data
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def source_fingerprint(log_path: Path) -> Dict[str, Any]:
+    """Identity of a log file (path, size, mtime) used to reject stale checkpoints"""
+    stat = log_path.stat()
+    return {"path": str(log_path.resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+class SessionCheckpoint:
+    """Checkpoint file of one optimization session"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Checkpoint JSON file
+        """
+        self.path = Path(path)
+        self.saves = 0
+
+    @classmethod
+    def for_source(cls, log_path: Path, directory: Optional[Path] = None) -> 'SessionCheckpoint':
+        """
+        Checkpoint for a log file (one per resolved path)
+
+        Args:
+            log_path: Log file being optimized
+            directory: Checkpoint directory (default: DEFAULT_CHECKPOINT_DIR)
+        """
+        digest = hashlib.sha1(str(Path(log_path).resolve()).encode()).hexdigest()[:12]
+        name = f"{Path(log_path).name.split('.')[0] or 'source'}_{digest}.json"
+        return cls(Path(directory or DEFAULT_CHECKPOINT_DIR) / name)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the checkpoint
+
+        Returns:
+            Stored session state, or None if missing/unreadable/other schema
+        """
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if data.get("schema_version") != CHECKPOINT_SCHEMA_VERSION:
+            logger.warning(f"Ignoring checkpoint {self.path} with schema {data.get('schema_version')}")
+            return None
+        return data.get("state")
+
+    def save(self, state: Dict[str, Any]):
+        """
+        Atomically replace the checkpoint with state
+
+        Args:
+            state: JSON-serializable session state
+        """
+        data = {
+            "schema_version": CHECKPOINT_SCHEMA_VERSION,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "state": state,
+        }
+        try:
+            atomic_write_json(self.path, data)
+            self.saves += 1
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint {self.path}: {e}")
+
+    def clear(self):
+        """Remove the checkpoint"""
+        self.path.unlink(missing_ok=True)
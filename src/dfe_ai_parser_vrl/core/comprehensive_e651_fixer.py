@@ -9,6 +9,8 @@ import re
 from typing import List, Tuple
 from loguru import logger
 
+from .rewrite_engine import RewriteRule, rewrite_vrl
+
 
 class ComprehensiveE651Fixer:
     """Comprehensive E651 error pattern fixer"""
@@ -66,46 +68,34 @@ class ComprehensiveE651Fixer:
             (r'(\?\?\s*null)\s*;', r'\1'),
         ]
     
+        # Compiled once; every E651 pattern needs a real ?? operator (not one inside a comment or string)
+        self.rules = [self._to_rule(i, pattern, replacement)
+                      for i, (pattern, replacement) in enumerate(self.e651_patterns)]
+    
+    @staticmethod
+    def _to_rule(index: int, pattern: str, replacement) -> RewriteRule:
+        """Wrap an E651 pattern as a rewrite rule"""
+        if isinstance(replacement, str):
+            name, fix = f"E651_pattern_{index}", replacement
+        else:
+            name = f"E651{replacement.__name__.replace('_fix', '', 1)}"
+            fix = lambda line, f=replacement, p=pattern: f(line, p)
+        return RewriteRule(name=name, pattern=pattern, fix=fix,
+                           error_codes=frozenset({'E651'}), operators=frozenset({'??'}))
+    
     def fix_all_e651_patterns(self, vrl_code: str) -> str:
         """Apply comprehensive E651 fixes to eliminate all unnecessary coalescing"""
         
         logger.info("🔧 Applying comprehensive E651 fixes...")
         
-        lines = vrl_code.split('\n')
-        fixed_lines = []
-        fixes_applied = 0
-        
-        for line_num, line in enumerate(lines, 1):
-            original_line = line
-            
-            # Skip comments and empty lines
-            if line.strip().startswith('#') or not line.strip():
-                fixed_lines.append(line)
-                continue
-            
-            # Apply all E651 patterns
-            for pattern, replacement in self.e651_patterns:
-                if isinstance(replacement, str):
-                    # Simple regex replacement
-                    new_line = re.sub(pattern, replacement, line)
-                else:
-                    # Custom function replacement
-                    new_line = replacement(line, pattern)
-                
-                if new_line != line:
-                    logger.debug(f"Line {line_num}: E651 fix applied")
-                    line = new_line
-                    fixes_applied += 1
-                    break  # One fix per line to avoid conflicts
-            
-            fixed_lines.append(line)
+        result = rewrite_vrl(vrl_code, self.rules)
         
-        result = '\n'.join(fixed_lines)
+        for fired in result.fired:
+            logger.debug(f"Line {fired.line}: E651 fix applied ({fired.rule})")
+        if result.changed:
+            logger.info(f"✅ Applied {len(result.fired)} comprehensive E651 fixes")
         
-        if fixes_applied > 0:
-            logger.info(f"✅ Applied {fixes_applied} comprehensive E651 fixes")
-        
-        return result
+        return result.code
     
     def _remove_split_coalescing(self, line: str, pattern: str) -> str:
         """Remove ?? [] from split operations"""
@@ -148,6 +138,10 @@ def apply_comprehensive_e651_fixes(vrl_code: str) -> str:
     """Apply all comprehensive E651 fixes"""
     return _comprehensive_e651_fixer.fix_all_e651_patterns(vrl_code)
 
+def get_e651_rewrite_rules() -> List[RewriteRule]:
+    """Get the compiled E651 rewrite rules"""
+    return _comprehensive_e651_fixer.rules
+
 def test_e651_patterns():
     """Test E651 pattern fixing"""
     
@@ -0,0 +1,546 @@
+"""
+Static VRL Cost Model
+
+Predicts per-event cost (and from it events/CPU%) of a VRL program from its
+parsed AST, without running Vector:
+
+- Function costs come from the VPI impact table (cost = 1 / events per CPU%)
+- Calls inside if/else branches are weighted by the probability of taking
+  the branch, measured by evaluating simple conditions on sample events
+- Closure calls (for_each, map_values, ...) are multiplied by the expected
+  collection size seen in the samples
+- Predictions are calibrated against measured Vector runs with a power-law
+  fit (events/CPU% = scale * cost ^ -exponent) that is persisted between runs
+"""
+
+import json
+import math
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path as FilePath
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .vrl_ast import (
+    VRLProgram, parse_vrl, Node, Program, Block, If, Assign, NamedArg, Closure,
+    Call, Binary, Unary, Path, Variable, FieldAccess, Index, Literal, Array,
+    Object, Abort, Return,
+)
+
+# Cost of one call to a function missing from the VPI table
+DEFAULT_FUNCTION_COST = 1.0 / 200
+
+# Cost of non-call work, relative to the VPI table units
+ASSIGN_COST = 1.0 / 4000
+PATH_COST = 1.0 / 8000
+OPERATOR_COST = 1.0 / 8000
+BRANCH_COST = 1.0 / 8000
+
+# Probability used when a branch condition cannot be evaluated on samples
+DEFAULT_BRANCH_PROBABILITY = 0.5
+
+# Iterations assumed for closures over collections not seen in samples
+DEFAULT_LOOP_ITERATIONS = 8
+
+# Functions whose closure runs once per collection element
+ITERATING_FUNCTIONS = {'for_each', 'map_values', 'map_keys', 'filter', 'map', 'all', 'any'}
+
+# Uncalibrated fit: matches the original analyze_performance heuristic (1000 / cost)
+DEFAULT_SCALE = 1000.0
+DEFAULT_EXPONENT = 1.0
+
+# Events evaluated when measuring branch probabilities
+MAX_SAMPLE_EVENTS = 1000
+
+
+class _Unknown(Exception):
+    """Expression cannot be evaluated statically on a sample event"""
+
+
+_MISSING = object()
+
+
+@dataclass
+class CostEstimate:
+    """Static cost prediction for one VRL program"""
+    cost: float
+    events_per_cpu_percent: float
+    function_costs: Dict[str, float] = field(default_factory=dict)
+    branch_probabilities: Dict[int, float] = field(default_factory=dict)
+    parse_errors: int = 0
+
+    @property
+    def hot_functions(self) -> List[Tuple[str, float]]:
+        """Functions ordered by share of the expected per-event cost"""
+        return sorted(self.function_costs.items(), key=lambda kv: kv[1], reverse=True)
+
+
+@dataclass
+class CostCalibration:
+    """Power-law fit of measured events/CPU% against predicted cost"""
+    scale: float = DEFAULT_SCALE
+    exponent: float = DEFAULT_EXPONENT
+    observations: List[Tuple[float, float]] = field(default_factory=list)
+    max_observations: int = 200
+
+    def predict(self, cost: float) -> float:
+        if cost <= 0:
+            return self.scale
+        return self.scale * cost ** -self.exponent
+
+    def add(self, cost: float, measured_events_per_cpu_percent: float):
+        """Record a (predicted cost, measured events/CPU%) pair and refit"""
+        if cost <= 0 or measured_events_per_cpu_percent <= 0:
+            return
+        self.observations.append((cost, measured_events_per_cpu_percent))
+        self.observations = self.observations[-self.max_observations:]
+        self.fit()
+
+    def fit(self):
+        """Least squares on log(events/CPU%) = log(scale) - exponent * log(cost)"""
+        if not self.observations:
+            return
+
+        xs = [math.log(c) for c, _ in self.observations]
+        ys = [math.log(m) for _, m in self.observations]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+
+        if len(xs) >= 2 and var_x > 1e-9:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+            # A non-negative slope means cost explains nothing yet; keep the prior shape
+            self.exponent = -slope if slope < 0 else DEFAULT_EXPONENT
+        else:
+            self.exponent = DEFAULT_EXPONENT
+
+        self.scale = math.exp(mean_y + self.exponent * mean_x)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'scale': self.scale, 'exponent': self.exponent,
+                'observations': [list(o) for o in self.observations]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CostCalibration':
+        return cls(scale=float(data.get('scale', DEFAULT_SCALE)),
+                   exponent=float(data.get('exponent', DEFAULT_EXPONENT)),
+                   observations=[tuple(o) for o in data.get('observations', [])])
+
+
+def sample_events_from_logs(sample_logs: str, limit: int = MAX_SAMPLE_EVENTS) -> List[Dict[str, Any]]:
+    """
+    Convert sample log text into the events VRL sees
+
+    Args:
+        sample_logs: Newline separated raw or NDJSON lines
+        limit: Maximum events to return
+
+    Returns:
+        JSON object lines as dicts, other lines wrapped as {"message": line}
+    """
+    events = []
+    for line in sample_logs.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        event = None
+        if line.startswith('{'):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                event = None
+        events.append(event if isinstance(event, dict) else {'message': line})
+        if len(events) >= limit:
+            break
+    return events
+
+
+class VRLCostModel:
+    """Estimates per-event VRL cost from the AST and calibrates it against Vector"""
+
+    def __init__(self, function_vpi_impact: Dict[str, float], calibration_file: Optional[str] = None):
+        """
+        Args:
+            function_vpi_impact: Function name -> events per CPU% (as in VRLPerformanceOptimizer)
+            calibration_file: Optional JSON file to load/persist calibration
+        """
+        self.function_costs = {
+            name: (1.0 / vpi if vpi > 0 else 1.0) for name, vpi in function_vpi_impact.items()
+        }
+        self.calibration_file = FilePath(calibration_file) if calibration_file else None
+        self.calibration = self._load_calibration()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ estimate
+
+    def estimate(self,
+                 vrl_code: str,
+                 sample_events: Optional[List[Dict[str, Any]]] = None,
+                 branch_probabilities: Optional[Dict[int, float]] = None) -> CostEstimate:
+        """
+        Predict the expected per-event cost of a VRL program
+
+        Args:
+            vrl_code: VRL source
+            sample_events: Events used to measure branch probabilities and loop sizes
+            branch_probabilities: Known probabilities keyed by If node span start
+                (e.g. from a profiler); override sample-based estimates
+
+        Returns:
+            CostEstimate with calibrated events/CPU% prediction
+        """
+        program = parse_vrl(vrl_code)
+        events = (sample_events or [])[:MAX_SAMPLE_EVENTS]
+
+        probabilities = self.branch_probabilities(program, events)
+        if branch_probabilities:
+            probabilities.update(branch_probabilities)
+
+        walker = _CostWalker(self, probabilities, events)
+        cost = walker.cost(program.root, 1.0)
+
+        with self._lock:
+            predicted = self.calibration.predict(cost)
+
+        return CostEstimate(
+            cost=cost,
+            events_per_cpu_percent=predicted,
+            function_costs=dict(walker.function_costs),
+            branch_probabilities=probabilities,
+            parse_errors=len(program.errors),
+        )
+
+    def function_cost(self, call: Call) -> float:
+        """Per-call cost, preferring the table entry for the form as written"""
+        for key in (call.qualified_name, call.name, f"{call.name}!"):
+            if key in self.function_costs:
+                return self.function_costs[key]
+        return DEFAULT_FUNCTION_COST
+
+    def statement_cost(self, statement: Node, sample_events: Optional[List[Dict[str, Any]]] = None) -> float:
+        """
+        Cost of executing one statement once
+
+        For if statements only the condition is counted; the statements in
+        its branches are costed separately.
+
+        Args:
+            statement: Statement node
+            sample_events: Events used to measure loop sizes
+
+        Returns:
+            Per-execution cost (same units as CostEstimate.cost)
+        """
+        walker = _CostWalker(self, {}, (sample_events or [])[:MAX_SAMPLE_EVENTS])
+        if isinstance(statement, If):
+            return BRANCH_COST + walker.cost(statement.condition, 1.0)
+        return walker.cost(statement, 1.0)
+
+    def branch_probabilities(self, program: VRLProgram, events: List[Dict[str, Any]]) -> Dict[int, float]:
+        """
+        Measure how often each if-condition holds on the sample events
+
+        Conditions referencing local variables or unsupported functions fall
+        back to DEFAULT_BRANCH_PROBABILITY.
+
+        Args:
+            program: Parsed VRL
+            events: Sample events
+
+        Returns:
+            Map of If node span start -> probability of taking the then-branch
+        """
+        probabilities = {}
+        for node in program.find(If):
+            taken = evaluated = 0
+            for event in events:
+                result = evaluate_condition(node.condition, event)
+                if result is None:
+                    continue
+                evaluated += 1
+                taken += result
+            probabilities[node.span.start] = taken / evaluated if evaluated else DEFAULT_BRANCH_PROBABILITY
+        return probabilities
+
+    # --------------------------------------------------------------- calibration
+
+    def record_measurement(self,
+                           vrl_code: str,
+                           measured_events_per_cpu_percent: float,
+                           sample_events: Optional[List[Dict[str, Any]]] = None):
+        """
+        Calibrate predictions with a measured Vector run
+
+        Args:
+            vrl_code: VRL that was measured
+            measured_events_per_cpu_percent: Events/CPU% reported by the benchmark
+            sample_events: Events the benchmark ran on
+        """
+        cost = self.estimate(vrl_code, sample_events).cost
+        with self._lock:
+            self.calibration.add(cost, measured_events_per_cpu_percent)
+            logger.debug(f"📐 Cost model calibrated on {len(self.calibration.observations)} runs "
+                         f"(scale={self.calibration.scale:.3g}, exponent={self.calibration.exponent:.2f})")
+
+    def save_calibration(self):
+        """Persist calibration to calibration_file (if configured)"""
+        if not self.calibration_file:
+            return
+        try:
+            self.calibration_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                data = self.calibration.to_dict()
+            self.calibration_file.write_text(json.dumps(data, indent=2))
+        except OSError as e:
+            logger.warning(f"Could not save cost model calibration: {e}")
+
+    def _load_calibration(self) -> CostCalibration:
+        if self.calibration_file and self.calibration_file.exists():
+            try:
+                calibration = CostCalibration.from_dict(json.loads(self.calibration_file.read_text()))
+                logger.debug(f"📐 Loaded cost model calibration ({len(calibration.observations)} runs)")
+                return calibration
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable cost model calibration: {e}")
+        return CostCalibration()
+
+
+class _CostWalker:
+    """Expected-cost evaluation of one AST with fixed branch probabilities"""
+
+    def __init__(self, model: VRLCostModel, probabilities: Dict[int, float], events: List[Dict[str, Any]]):
+        self.model = model
+        self.probabilities = probabilities
+        self.events = events
+        self.function_costs: Dict[str, float] = {}
+
+    def cost(self, node: Optional[Node], weight: float) -> float:
+        """Cost of node reached with the given probability (weight) per event"""
+        if node is None or weight <= 0:
+            return 0.0
+
+        if isinstance(node, (Program, Block)):
+            total = 0.0
+            for statement in node.body:
+                total += self.cost(statement, weight)
+                if isinstance(statement, (Abort, Return)):
+                    break  # Rest of the block is unreachable
+            return total
+
+        if isinstance(node, If):
+            p = self.probabilities.get(node.span.start, DEFAULT_BRANCH_PROBABILITY)
+            return (weight * BRANCH_COST
+                    + self.cost(node.condition, weight)
+                    + self.cost(node.then, weight * p)
+                    + self.cost(node.orelse, weight * (1 - p)))
+
+        if isinstance(node, Assign):
+            return weight * ASSIGN_COST * len(node.targets) + self.cost(node.value, weight)
+
+        if isinstance(node, Call):
+            per_call = self.model.function_cost(node)
+            name = node.qualified_name
+            self.function_costs[name] = self.function_costs.get(name, 0.0) + weight * per_call
+            total = weight * per_call + sum(self.cost(arg, weight) for arg in node.args)
+            if node.closure is not None:
+                iterations = self._iterations(node) if node.name in ITERATING_FUNCTIONS else 1
+                total += self.cost(node.closure.body, weight * iterations)
+            return total
+
+        if isinstance(node, Binary):
+            right_weight = weight
+            if node.op in ('&&', '||', '??'):
+                # Short-circuit operators skip the right side some of the time
+                right_weight = weight * DEFAULT_BRANCH_PROBABILITY
+            return weight * OPERATOR_COST + self.cost(node.left, weight) + self.cost(node.right, right_weight)
+
+        if isinstance(node, Unary):
+            return weight * OPERATOR_COST + self.cost(node.operand, weight)
+
+        if isinstance(node, (Path, Variable)):
+            return weight * PATH_COST
+
+        if isinstance(node, FieldAccess):
+            return weight * PATH_COST + self.cost(node.target, weight)
+
+        if isinstance(node, Index):
+            return weight * PATH_COST + self.cost(node.target, weight) + self.cost(node.index, weight)
+
+        if isinstance(node, Array):
+            return sum(self.cost(item, weight) for item in node.items)
+
+        if isinstance(node, Object):
+            return sum(self.cost(value, weight) for _, value in node.pairs)
+
+        if isinstance(node, (NamedArg, Abort, Return)):
+            child = node.value if isinstance(node, (NamedArg, Return)) else node.message
+            return self.cost(child, weight)
+
+        if isinstance(node, Closure):
+            return self.cost(node.body, weight)
+
+        return 0.0
+
+    def _iterations(self, call: Call) -> float:
+        """Average size of the collection a closure iterates over"""
+        target = call.args[0] if call.args else None
+        # Look through coercions such as object!(.tags)
+        while isinstance(target, Call) and target.args:
+            target = target.args[0]
+        if isinstance(target, Path) and target.root == '.' and self.events:
+            sizes = []
+            for event in self.events:
+                value = _lookup(event, target)
+                if isinstance(value, (list, dict)):
+                    sizes.append(len(value))
+            if sizes:
+                return sum(sizes) / len(sizes)
+        return DEFAULT_LOOP_ITERATIONS
+
+
+def _lookup(event: Dict[str, Any], path: Path) -> Any:
+    """Resolve an event path, returning _MISSING if any segment is absent"""
+    if path.root != '.':
+        raise _Unknown(path.root)
+    value: Any = event
+    for segment in path.segments:
+        if isinstance(segment, int) and isinstance(value, list):
+            value = value[segment] if -len(value) <= segment < len(value) else _MISSING
+        elif isinstance(segment, str) and isinstance(value, dict):
+            value = value.get(segment, _MISSING)
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def local_bindings(program: VRLProgram) -> Dict[str, Node]:
+    """
+    Locals assigned exactly once, by a top-level statement, to their expression
+
+    Conditions on such locals (e.g. message_str = string!(.message)) can be
+    evaluated by substituting the expression. Event fields written by the
+    program are not tracked, so bindings reading them may be approximate.
+    """
+    definitions: Dict[str, List[Assign]] = {}
+    for assign in program.assignments():
+        for target in assign.targets:
+            if isinstance(target, Variable):
+                definitions.setdefault(target.name, []).append(assign)
+    top_level = {id(statement) for statement in program.root.body}
+    return {
+        name: assigns[0].value for name, assigns in definitions.items()
+        if len(assigns) == 1 and len(assigns[0].targets) == 1 and assigns[0].op == '='
+        and id(assigns[0]) in top_level
+    }
+
+
+def evaluate_condition(condition: Node, event: Dict[str, Any],
+                       bindings: Optional[Dict[str, Node]] = None) -> Optional[bool]:
+    """
+    Evaluate a side-effect free condition on one raw event
+
+    Args:
+        condition: Condition expression (event paths, literals, common predicates)
+        event: Sample event
+        bindings: Local variable -> defining expression (see local_bindings)
+
+    Returns:
+        True/False, or None if the condition cannot be evaluated statically
+    """
+    try:
+        result = _evaluate(condition, event, bindings)
+    except _Unknown:
+        return None
+    return result if isinstance(result, bool) else None
+
+
+def _evaluate(node: Node, event: Dict[str, Any], bindings: Optional[Dict[str, Node]] = None) -> Any:
+    """Evaluate a side-effect free condition on one event (raises _Unknown otherwise)"""
+    if isinstance(node, Literal):
+        if node.kind in ('string', 'integer', 'float', 'boolean', 'null'):
+            return node.value
+        raise _Unknown(node.kind)
+
+    if isinstance(node, Path):
+        value = _lookup(event, node)
+        return None if value is _MISSING else value
+
+    if isinstance(node, Variable) and bindings and node.name in bindings:
+        return _evaluate(bindings[node.name], event, bindings)
+
+    if isinstance(node, Unary) and node.op == '!':
+        value = _evaluate(node.operand, event, bindings)
+        if not isinstance(value, bool):
+            raise _Unknown('!')
+        return not value
+
+    if isinstance(node, Binary):
+        if node.op in ('&&', '||'):
+            left = _evaluate(node.left, event, bindings)
+            if not isinstance(left, bool):
+                raise _Unknown(node.op)
+            if (node.op == '&&' and not left) or (node.op == '||' and left):
+                return left
+            return _evaluate(node.right, event, bindings)
+        left = _evaluate(node.left, event, bindings)
+        right = _evaluate(node.right, event, bindings)
+        if node.op == '==':
+            return left == right
+        if node.op == '!=':
+            return left != right
+        if node.op == '??':
+            return right if left is None else left
+        if node.op in ('<', '<=', '>', '>=') and _both_numbers(left, right):
+            return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[node.op]
+        raise _Unknown(node.op)
+
+    if isinstance(node, Call):
+        return _evaluate_call(node, event, bindings)
+
+    raise _Unknown(type(node).__name__)
+
+
+def _evaluate_call(call: Call, event: Dict[str, Any], bindings: Optional[Dict[str, Node]] = None) -> Any:
+    """Evaluate the common predicate/string functions used in conditions"""
+    positional = [arg for arg in call.args if not isinstance(arg, NamedArg)]
+
+    if call.name == 'exists' and len(positional) == 1 and isinstance(positional[0], Path):
+        return _lookup(event, positional[0]) is not _MISSING
+
+    args = [_evaluate(arg, event, bindings) for arg in positional]
+
+    type_checks = {
+        'is_string': str, 'is_integer': int, 'is_float': float, 'is_boolean': bool,
+        'is_object': dict, 'is_array': list,
+    }
+    if call.name in type_checks and len(args) == 1:
+        if call.name == 'is_integer' and isinstance(args[0], bool):
+            return False
+        return isinstance(args[0], type_checks[call.name])
+    if call.name == 'is_null' and len(args) == 1:
+        return args[0] is None
+
+    if call.name in ('string', 'to_string') and len(args) == 1 and isinstance(args[0], str):
+        return args[0]
+    if call.name in ('downcase', 'upcase') and len(args) == 1 and isinstance(args[0], str):
+        return args[0].lower() if call.name == 'downcase' else args[0].upper()
+    if call.name in ('length', 'is_empty') and len(args) == 1 and isinstance(args[0], (str, list, dict)):
+        return len(args[0]) if call.name == 'length' else not args[0]
+
+    if call.name in ('contains', 'starts_with', 'ends_with') and len(args) == 2:
+        value, needle = args
+        if isinstance(value, str) and isinstance(needle, str):
+            if call.name == 'contains':
+                return needle in value
+            return value.startswith(needle) if call.name == 'starts_with' else value.endswith(needle)
+        if call.name == 'contains' and value is None:
+            return False
+
+    raise _Unknown(call.name)
+
+
+def _both_numbers(*values: Any) -> bool:
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
@@ -0,0 +1,202 @@
+"""
+Structured VRL Diagnostics
+
+Parses PyVRL/Vector compiler output (codespan format) once into structured
+diagnostics - code, span, message, labels and notes - instead of scraping
+error text with regexes in every consumer. Also locates the top-level
+statement block around an error so fixes can target just that block.
+
+Compiler output looks like:
+
+    error[E103]: unhandled fallible assignment
+      ┌─ :2:6
+      │
+    2 │ .x = split(.message, " ")
+      │ ---- ^^^^^^^^^^^^^^^^^^^^
+      │ │    update the expression to be infallible by adding a `!`: ...
+      = see documentation about error handling at https://errors.vrl.dev/#handling
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from .vrl_ast import parse_vrl
+
+_HEADER_RE = re.compile(r'error\[(E\d+)\]:?\s*(.*)')
+_LOCATION_RE = re.compile(r'┌─\s*[^:\n]*:(\d+):(\d+)')
+_SOURCE_RE = re.compile(r'^\s*(\d+)\s*│ ?(.*)$')
+_GUTTER_RE = re.compile(r'^\s*│ ?(.*)$')
+_MARKER_CHARS = '│-^ '
+
+
+@dataclass(frozen=True)
+class VRLDiagnostic:
+    """One compiler diagnostic"""
+    code: str                       # e.g. "E103"
+    message: str                    # Header text, e.g. "unhandled fallible assignment"
+    line: Optional[int] = None      # 1-based primary span start
+    column: Optional[int] = None    # 1-based
+    length: int = 0                 # Width of the primary (^^^) marker
+    source: str = ''                # Offending source line as reported
+    labels: Tuple[str, ...] = field(default_factory=tuple)
+    notes: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def detail(self) -> str:
+        """Rendered diagnostic (header, span, labels and notes)"""
+        return self.render()
+
+    def render(self) -> str:
+        """Compact codespan-style text that parse_diagnostics() reads back"""
+        lines = [f"error[{self.code}]: {self.message}"]
+        if self.line:
+            lines.append(f"  ┌─ :{self.line}:{self.column}")
+            lines.append(f"{self.line} │ {self.source}")
+            if self.length:
+                lines.append(f"  │ {' ' * (self.column - 1)}{'^' * self.length}")
+        lines.extend(f"  │ {label}" for label in self.labels)
+        lines.extend(f"  = {note}" for note in self.notes)
+        return '\n'.join(lines)
+
+
+def _parse_block(code: str, message: str, body: List[str]) -> VRLDiagnostic:
+    line = column = None
+    length = 0
+    source = ''
+    labels, notes = [], []
+
+    for raw in body:
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        location = _LOCATION_RE.search(raw)
+        if location:
+            if line is None:
+                line, column = int(location.group(1)), int(location.group(2))
+            continue
+        source_match = _SOURCE_RE.match(raw)
+        if source_match:
+            if not source:
+                source = source_match.group(2)
+            continue
+        if stripped.startswith('='):
+            note = stripped[1:].strip()
+            if note and 'http' not in note:
+                notes.append(note)
+            continue
+        gutter = _GUTTER_RE.match(raw)
+        if gutter:
+            content = gutter.group(1)
+            carets = re.search(r'\^+', content)
+            if carets and not length:
+                length = len(carets.group(0))
+            label = content.lstrip(_MARKER_CHARS).rstrip()
+            if label:
+                labels.append(label)
+
+    return VRLDiagnostic(code, message.strip(), line, column, length, source, tuple(labels), tuple(notes))
+
+
+@lru_cache(maxsize=256)
+def _parse_cached(output: str) -> Tuple[VRLDiagnostic, ...]:
+    lines = output.split('\n')
+    diagnostics = []
+    header = None
+    body: List[str] = []
+    for raw in lines:
+        match = _HEADER_RE.search(raw)
+        if match:
+            if header:
+                diagnostics.append(_parse_block(header[0], header[1], body))
+            header, body = (match.group(1), match.group(2)), []
+        elif header:
+            body.append(raw)
+    if header:
+        diagnostics.append(_parse_block(header[0], header[1], body))
+    return tuple(diagnostics)
+
+
+def parse_diagnostics(output: Optional[str]) -> List[VRLDiagnostic]:
+    """
+    Parse compiler output into diagnostics
+
+    Args:
+        output: PyVRL/Vector error text (may include a "SYNTAX: " style prefix)
+
+    Returns:
+        Diagnostics in report order (empty for non-compiler errors)
+    """
+    if not output or 'error[E' not in output:
+        return []
+    return list(_parse_cached(output))
+
+
+def format_diagnostics(diagnostics: List[VRLDiagnostic]) -> str:
+    """Render diagnostics compactly (doc links and ASCII art dropped)"""
+    return '\n'.join(d.render() for d in diagnostics)
+
+
+def primary_error_code(output: Optional[str]) -> Optional[str]:
+    """Code of the first diagnostic, e.g. "E103", or None"""
+    diagnostics = parse_diagnostics(output)
+    return diagnostics[0].code if diagnostics else None
+
+
+@dataclass
+class FixBlock:
+    """Contiguous source lines around one or more diagnostics"""
+    start_line: int              # 1-based, inclusive
+    end_line: int                # 1-based, inclusive
+    lines: List[str]
+    before: List[str]            # Read-only context
+    after: List[str]             # Read-only context
+    total_lines: int
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of the program inside the block"""
+        return len(self.lines) / self.total_lines if self.total_lines else 1.0
+
+    def splice(self, vrl_code: str, replacement: str) -> str:
+        """Replace the block's lines in vrl_code"""
+        lines = vrl_code.split('\n')
+        return '\n'.join(lines[:self.start_line - 1] + replacement.split('\n') + lines[self.end_line:])
+
+
+def error_block(vrl_code: str, diagnostics: List[VRLDiagnostic], context_lines: int = 3) -> Optional[FixBlock]:
+    """
+    Smallest run of top-level statements covering every located diagnostic
+
+    Args:
+        vrl_code: VRL source
+        diagnostics: Parsed diagnostics
+        context_lines: Lines of read-only context on each side
+
+    Returns:
+        FixBlock, or None if no diagnostic has a usable location
+    """
+    lines = vrl_code.split('\n')
+    error_lines = [d.line for d in diagnostics if d.line and d.line <= len(lines)]
+    if not error_lines:
+        return None
+
+    start, end = min(error_lines), max(error_lines)
+    for statement in parse_vrl(vrl_code).root.body:
+        span = statement.span
+        if span.line <= end and span.end_line >= start:
+            start, end = min(start, span.line), max(end, span.end_line)
+
+    return FixBlock(
+        start_line=start,
+        end_line=end,
+        lines=lines[start - 1:end],
+        before=lines[max(0, start - 1 - context_lines):start - 1],
+        after=lines[end:end + context_lines],
+        total_lines=len(lines),
+    )
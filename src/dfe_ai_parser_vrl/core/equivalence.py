@@ -0,0 +1,106 @@
+"""
+VRL Equivalence Checking
+
+Runs a baseline VRL program and candidate rewrites over sample events with
+PyVRL and compares the resulting events. Used by source-to-source
+transformations (regex elimination, AST optimizer) to keep only rewrites
+that do not change parser output.
+
+- Any two runtime errors/aborts count as equal outcomes
+- Programs whose output varies between runs (e.g. now()) are compared with
+  timestamps masked; if they still vary, sample comparison is disabled
+"""
+
+import copy
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+def _stable(value: Any) -> Any:
+    """Output with timestamps masked (for programs that call now())"""
+    if isinstance(value, dict):
+        return {k: _stable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_stable(v) for v in value]
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return '<timestamp>'
+    return value
+
+
+def _first_line(error: Exception) -> str:
+    text = str(error).strip()
+    return text.splitlines()[0] if text else type(error).__name__
+
+
+class EquivalenceChecker:
+    """Compares candidate programs with a baseline program on sample events"""
+
+    def __init__(self, vrl_code: str, events: Optional[List[Dict[str, Any]]] = None):
+        """
+        Compile the baseline and record its outputs
+
+        Args:
+            vrl_code: Baseline VRL program
+            events: Sample events (empty/None: compile checks only)
+        """
+        self.events = list(events or [])
+        self.available = False
+        self.reason: Optional[str] = None
+        self._normalize = lambda outputs: outputs
+        self._baseline: List[Tuple[str, Any]] = []
+
+        try:
+            import pyvrl
+        except ImportError:
+            self.reason = "PyVRL not available"
+            return
+        self._pyvrl = pyvrl
+
+        try:
+            transform = pyvrl.Transform(vrl_code + "\n.")
+        except Exception as e:
+            self.reason = f"baseline does not compile: {_first_line(e)}"
+            return
+        self.available = True
+
+        baseline = self._run_all(transform)
+        if baseline != self._run_all(transform):
+            self._normalize = lambda outputs: [(status, _stable(value)) for status, value in outputs]
+            if self._normalize(baseline) != self._normalize(self._run_all(transform)):
+                logger.debug("VRL output is nondeterministic - sample comparison disabled")
+                self.events, baseline = [], []
+        self._baseline = self._normalize(baseline)
+
+    def _run_all(self, transform) -> List[Tuple[str, Any]]:
+        outputs = []
+        for event in self.events:
+            try:
+                outputs.append(('ok', transform.remap(copy.deepcopy(event))))
+            except Exception:
+                outputs.append(('error', None))
+        return outputs
+
+    def check(self, vrl_code: str, require_events: bool = True) -> Optional[str]:
+        """
+        Check a candidate against the baseline
+
+        Args:
+            vrl_code: Candidate VRL program
+            require_events: Reject when there are no sample events to compare on
+
+        Returns:
+            None if equivalent on every sample event, otherwise the rejection reason
+        """
+        if not self.available:
+            return self.reason
+        if require_events and not self.events:
+            return "no sample events to verify against"
+        try:
+            transform = self._pyvrl.Transform(vrl_code + "\n.")
+        except Exception as e:
+            return f"rewrite does not compile: {_first_line(e)}"
+        if self.events and self._normalize(self._run_all(transform)) != self._baseline:
+            return "output differs on sample events"
+        return None
@@ -3,34 +3,79 @@ VRL error fixing using LLM and pattern-based fixes
 """
 
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from loguru import logger
-from .comprehensive_e651_fixer import apply_comprehensive_e651_fixes
-from .error_learning_system import learn_from_error, apply_all_learned_fixes
+from .comprehensive_e651_fixer import get_e651_rewrite_rules
+from .error_learning_system import learn_from_error, get_learned_rewrite_rules
+from .rewrite_engine import RewriteRule, RewriteResult, AST_RULES, rewrite_vrl, parse_error_locations
+from .diagnostics import primary_error_code
+from .fix_knowledge_base import FixKnowledgeBase, get_fix_knowledge_base, line_replacements
+from .regex_transformer import eliminate_regex
+
+# Fallible functions that get a ?? null default in assignments (E103)
+FALLIBLE_ASSIGNMENT_FUNCTIONS = ['parse_timestamp', 'parse_json', 'to_int', 'to_float', 'strip_whitespace']
 
 
 class DFEVRLErrorFixer:
     """Fixes VRL syntax errors"""
     
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, knowledge_base: Optional[FixKnowledgeBase] = None):
         self.llm_client = llm_client
+        self.knowledge_base = knowledge_base if knowledge_base is not None else get_fix_knowledge_base()
         self.error_patterns = self._init_error_patterns()
+        self.rewrite_rules = self._init_rewrite_rules()
+        self.last_rewrite: Optional[RewriteResult] = None
+    
+    def _init_rewrite_rules(self) -> List[RewriteRule]:
+        """Compiled line rules for E103/E110 (first match per line wins)"""
+        no_coalescing = lambda line: '??' not in line
+        split_index = r'\1 = (split(\2) ?? [])[\3] ?? ""'
+        
+        rules = [
+            # E103: variable/field = split(something, delimiter)[index]
+            RewriteRule('E103_split_index', r'(\w+)\s*=\s*split\(([^)]+)\)\s*\[\s*(\d+)\s*\]', split_index,
+                        frozenset({'E103'}), calls=frozenset({'split'})),
+            RewriteRule('E103_field_split_index', r'(\.[\w_]+)\s*=\s*split\(([^)]+)\)\s*\[\s*(\d+)\s*\]', split_index,
+                        frozenset({'E103'}), calls=frozenset({'split'})),
+            # E103: nested split(split(x)[0])[1]
+            RewriteRule('E103_nested_split', r'split\(split\(([^)]+)\)\s*\[\s*(\d+)\s*\]\s*\)\s*\[\s*(\d+)\s*\]',
+                        r'(split((split(\1) ?? [])[\2] ?? "") ?? [])[\3] ?? ""',
+                        frozenset({'E103'}), calls=frozenset({'split'})),
+            # E103: direct array access without null coalescing
+            RewriteRule('E103_array_index', r'(\w+)\s*=\s*(\w+)\[(\d+)\]', r'\1 = \2[\3] ?? ""',
+                        frozenset({'E103'}), guard=no_coalescing),
+            RewriteRule('E103_field_array_index', r'(\.[\w_]+)\s*=\s*(\w+)\[(\d+)\]', r'\1 = \2[\3] ?? ""',
+                        frozenset({'E103'}), guard=no_coalescing),
+            # E103: remaining split operations in assignments
+            RewriteRule('E103_split_assignment', r'=\s*split\(([^)]+)\)', r'= split(\1) ?? []',
+                        frozenset({'E103'}), calls=frozenset({'split'}), guard=no_coalescing),
+        ]
+        
+        # E103: fallible function calls in assignments
+        for func in FALLIBLE_ASSIGNMENT_FUNCTIONS:
+            rules.append(RewriteRule(f'E103_{func}_default', f'{func}\\(([^)]+)\\)', f'{func}(\\1) ?? null',
+                                     frozenset({'E103'}), calls=frozenset({func}),
+                                     guard=lambda line: '=' in line and '??' not in line))
+        
+        rules += [
+            # E110: includes() -> contains()
+            RewriteRule('E110_includes', r'includes\(', 'contains(', frozenset({'E110'})),
+            # E110: fallible operations in if conditions
+            RewriteRule('E110_parse_predicate', r'(parse_\w+\([^)]+\))', r'(\1 ?? false)',
+                        frozenset({'E110'}), guard=lambda line: 'if ' in line),
+            RewriteRule('E110_split_predicate', r'(split\([^)]+\))', r'(\1 ?? [])',
+                        frozenset({'E110'}), calls=frozenset({'split'}),
+                        guard=lambda line: 'if ' in line and '??' not in line),
+        ]
+        return rules
     
     def _init_error_patterns(self) -> Dict[str, Any]:
         """Initialize error patterns and fixes"""
         return {
-            "E103": {  # Unhandled fallible
-                "pattern": r"error\[E103\].*unhandled fallible",
-                "fix": self._fix_unhandled_fallible
-            },
             "E105": {  # Undefined function
                 "pattern": r"error\[E105\].*undefined",
                 "fix": self._fix_undefined_function
             },
-            "E110": {  # Invalid argument type / Fallible predicate
-                "pattern": r"error\[E110\].*(invalid argument type|fallible.*predicate)",
-                "fix": self._fix_fallible_predicate
-            },
             "E203": {  # Syntax error
                 "pattern": r"error\[E203\].*syntax",
                 "fix": self._fix_syntax_error
@@ -39,10 +84,6 @@ class DFEVRLErrorFixer:
                 "pattern": r"error\[E620\].*can't abort.*infallible",
                 "fix": self._fix_infallible_abort
             },
-            "E651": {  # Unnecessary coalescing
-                "pattern": r"error\[E651\].*unnecessary.*coalescing",
-                "fix": self._fix_unnecessary_coalescing
-            },
             "E610": {  # Function compilation error
                 "pattern": r"error\[E610\].*function compilation error.*del\(",
                 "fix": self._fix_del_variable_error
@@ -64,17 +105,25 @@ class DFEVRLErrorFixer:
         logger.info("Using LLM to fix error")
         return self.llm_client.fix_vrl_error(vrl_code, error_message, sample_logs)
     
-    def fix_locally(self, vrl_code: str, error_message: str) -> Optional[str]:
+    def fix_locally(self, vrl_code: str, error_message: str, sample_logs: Optional[str] = None) -> Optional[str]:
         """
         Attempt local pattern-based fixes with error learning (free)
         
         Args:
             vrl_code: VRL code with error
             error_message: Error message from validator
+            sample_logs: Sample logs used to verify regex-to-string rewrites
             
         Returns:
             Fixed VRL code or None if unable to fix locally
         """
+        # Regex rejected by the validator: translate calls to string operations
+        if "regex functions" in error_message:
+            regex_result = eliminate_regex(vrl_code, sample_logs)
+            if regex_result.changed:
+                logger.info(f"🔧 Local regex fix: {len(regex_result.applied)} call(s) rewritten")
+                return regex_result.code
+        
         # Extract error code for learning
         error_code = self._extract_error_code(error_message)
         
@@ -83,13 +132,31 @@ class DFEVRLErrorFixer:
         if learned_new_pattern:
             logger.info(f"🎓 Learned new {error_code} pattern")
         
-        # Apply all learned fixes first (comprehensive)
-        enhanced_fixed = apply_all_learned_fixes(vrl_code)
-        if enhanced_fixed != vrl_code:
-            logger.info(f"🎓 Applied learned fixes for {error_code}")
-            return enhanced_fixed
+        # Replay fixes proven in earlier runs/workers (free, no LLM)
+        if self.knowledge_base:
+            self.knowledge_base.record_error(error_code)
+            known_fixed, applied = self.knowledge_base.apply_known_fixes(vrl_code, error_message)
+            if applied:
+                logger.info(f"📚 Replayed {len(applied)} known {error_code} fix(es) from knowledge base")
+                return known_fixed
+        
+        # One compiled pass: AST edits at the reported error span, then learned,
+        # E651 and E103/E110 line rules filtered by error code
+        if error_code == "UNKNOWN":
+            rules = get_learned_rewrite_rules()
+        else:
+            rules = AST_RULES + get_learned_rewrite_rules() + get_e651_rewrite_rules() + self.rewrite_rules
         
-        # Try traditional pattern-based fixes
+        result = rewrite_vrl(vrl_code, rules, error_message,
+                             error_code=None if error_code == "UNKNOWN" else error_code)
+        self.last_rewrite = result
+        if result.changed:
+            logger.info(f"🔧 Local {error_code} fix: {', '.join(str(f) for f in result.fired)}")
+            self._record_fixes(vrl_code, result.code, error_message, "local",
+                               {f.line: f.rule for f in result.fired}, error_code)
+            return result.code
+        
+        # Remaining pattern-based fixes
         for err_code, pattern_info in self.error_patterns.items():
             if re.search(pattern_info["pattern"], error_message, re.IGNORECASE):
                 logger.info(f"Applying local {err_code} fix")
@@ -99,15 +166,52 @@ class DFEVRLErrorFixer:
         
         return None
     
+    def record_llm_fix(self, vrl_code: str, fixed_vrl: str, error_message: str):
+        """
+        Store the offending-line rewrites of an LLM fix in the knowledge base
+        
+        Args:
+            vrl_code: VRL code with error
+            fixed_vrl: VRL code returned by the LLM
+            error_message: Error message the LLM was asked to fix
+        """
+        if fixed_vrl and fixed_vrl != vrl_code:
+            self._record_fixes(vrl_code, fixed_vrl, error_message, "llm")
+    
+    def record_fix_outcome(self, vrl_code: str, error_message: Optional[str]):
+        """
+        Report re-validation of the last applied fixes
+        
+        Args:
+            vrl_code: VRL code after fixing
+            error_message: New validation error, or None if validation passed
+        """
+        if self.knowledge_base:
+            self.knowledge_base.record_outcome(vrl_code, error_message)
+    
+    def _record_fixes(self, vrl_code: str, fixed_vrl: str, error_message: str, source: str,
+                      rules: Dict[int, str] = None, error_code: str = None):
+        """Record per-line fixes keyed by the reported error lines (or the lines rules fired on)"""
+        if not self.knowledge_base:
+            return
+        
+        codes = {loc.line: loc.code for loc in parse_error_locations(error_message)}
+        if not codes and rules and error_code and error_code != "UNKNOWN":
+            codes = {line: error_code for line in rules}
+        
+        original_lines = vrl_code.split('\n')
+        for line, replacement in line_replacements(vrl_code, fixed_vrl, list(codes)).items():
+            self.knowledge_base.record_fix(codes[line], original_lines[line - 1], replacement, source,
+                                           (rules or {}).get(line))
+    
     def _extract_error_code(self, error_message: str) -> str:
         """Extract error code from error message"""
         if not error_message:
             return "UNKNOWN"
         
-        import re
-        match = re.search(r'error\[E(\d+)\]', error_message)
-        if match:
-            return f"E{match.group(1)}"
+        error_code = primary_error_code(error_message)
+        if error_code:
+            return error_code
         
         if "syntax error" in error_message.lower():
             return "E203"
@@ -177,56 +281,6 @@ Return only the fixed VRL code that breaks the error cycle."""
         
         return vrl_code  # Return original if no fix available
     
-    def _fix_unhandled_fallible(self, vrl_code: str, error_message: str) -> str:
-        """Fix unhandled fallible assignment - comprehensive approach"""
-        import re
-        
-        lines = vrl_code.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Skip comments and empty lines
-            if line.strip().startswith('#') or not line.strip():
-                fixed_lines.append(line)
-                continue
-            
-            # Fix all array access patterns - this is the main E103 cause
-            # Pattern: variable = split(something, delimiter)[index]
-            line = re.sub(r'(\w+)\s*=\s*split\(([^)]+)\)\s*\[\s*(\d+)\s*\]', 
-                         r'\1 = (split(\2) ?? [])[\3] ?? ""', line)
-            
-            # Pattern: .field = split(something, delimiter)[index] 
-            line = re.sub(r'(\.[\w_]+)\s*=\s*split\(([^)]+)\)\s*\[\s*(\d+)\s*\]',
-                         r'\1 = (split(\2) ?? [])[\3] ?? ""', line)
-            
-            # Fix nested split operations: split(split(x)[0])[1]
-            line = re.sub(r'split\(split\(([^)]+)\)\s*\[\s*(\d+)\s*\]\s*\)\s*\[\s*(\d+)\s*\]',
-                         r'(split((split(\1) ?? [])[\2] ?? "") ?? [])[\3] ?? ""', line)
-            
-            # Fix direct array access without null coalescing
-            if re.search(r'(\w+)\s*=\s*(\w+)\[\s*\d+\s*\]', line) and '??' not in line:
-                # variable = array[index] -> variable = array[index] ?? ""
-                line = re.sub(r'(\w+)\s*=\s*(\w+)\[(\d+)\]', r'\1 = \2[\3] ?? ""', line)
-                
-            if re.search(r'(\.[\w_]+)\s*=\s*(\w+)\[\s*\d+\s*\]', line) and '??' not in line:
-                # .field = array[index] -> .field = array[index] ?? ""  
-                line = re.sub(r'(\.[\w_]+)\s*=\s*(\w+)\[(\d+)\]', r'\1 = \2[\3] ?? ""', line)
-            
-            # Fix any remaining split operations that need null coalescing
-            if 'split(' in line and '??' not in line and '=' in line:
-                # Add null coalescing to all split operations in assignments
-                line = re.sub(r'=\s*split\(([^)]+)\)', r'= split(\1) ?? []', line)
-            
-            # Fix fallible function calls in assignments
-            fallible_functions = ['parse_timestamp', 'parse_json', 'to_int', 'to_float', 'strip_whitespace']
-            for func in fallible_functions:
-                if func in line and '=' in line and '??' not in line:
-                    line = re.sub(f'{func}\\(([^)]+)\\)', f'{func}(\\1) ?? null', line)
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
     def _fix_undefined_function(self, vrl_code: str, error_message: str) -> str:
         """Fix undefined function errors"""
         replacements = {
@@ -244,34 +298,6 @@ Return only the fixed VRL code that breaks the error cycle."""
         
         return fixed
     
-    def _fix_fallible_predicate(self, vrl_code: str, error_message: str) -> str:
-        """Fix fallible expressions in predicates"""
-        import re
-        
-        lines = vrl_code.split('\n')
-        fixed_lines = []
-        
-        for line in lines:
-            # Fix includes() -> contains() (common E110 error)
-            line = line.replace('includes(', 'contains(')
-            
-            # Fix array type issues in contains()
-            if 'contains(' in line and 'string!' in line:
-                # Fix contains(string!(...), "text") which expects array
-                line = re.sub(r'contains\(string!\(([^)]+)\),', r'contains(\1,', line)
-            
-            # Fix fallible operations in if conditions
-            if 'if ' in line and any(func in line for func in ['parse_', 'split']):
-                # Wrap fallible operations for boolean context
-                if 'parse_' in line:
-                    line = re.sub(r'(parse_\w+\([^)]+\))', r'(\1 ?? false)', line)
-                if 'split(' in line and not '??' in line:
-                    line = re.sub(r'(split\([^)]+\))', r'(\1 ?? [])', line)
-            
-            fixed_lines.append(line)
-        
-        return '\n'.join(fixed_lines)
-    
     def _fix_syntax_error(self, vrl_code: str, error_message: str) -> str:
         """Fix general syntax errors"""
         # Common syntax fixes
@@ -307,10 +333,6 @@ Return only the fixed VRL code that breaks the error cycle."""
         
         return '\n'.join(fixed_lines)
     
-    def _fix_unnecessary_coalescing(self, vrl_code: str, error_message: str) -> str:
-        """Fix unnecessary error coalescing - use comprehensive E651 fixer"""
-        return apply_comprehensive_e651_fixes(vrl_code)
-    
     def _fix_del_variable_error(self, vrl_code: str, error_message: str) -> str:
         """Fix del() variable error - remove or convert to field deletion"""
         lines = vrl_code.split('\n')
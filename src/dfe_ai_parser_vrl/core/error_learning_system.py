@@ -11,6 +11,8 @@ from typing import Dict, List, Set, Any, Optional
 from collections import defaultdict, Counter
 from loguru import logger
 
+from .rewrite_engine import RewriteRule, rewrite_vrl
+
 
 class ErrorLearningSystem:
     """Learns from repeating VRL errors and develops automatic fixes"""
@@ -20,6 +22,7 @@ class ErrorLearningSystem:
         self.error_frequency: Dict[str, int] = Counter()
         self.error_patterns: Dict[str, List[str]] = defaultdict(list)
         self.learned_fixes: Dict[str, Any] = {}
+        self._compiled_rules: Dict[str, RewriteRule] = {}
         
         # Initialize with known fixes
         self._init_known_fixes()
@@ -37,34 +40,39 @@ class ErrorLearningSystem:
         self.learned_fixes['E203_function_in_array'] = {
             'pattern': r'parts\[length\(parts\)\s*-\s*1\]',
             'fix': lambda line: line.replace('parts[length(parts) - 1]', 'parts[to_int!(length(parts)) - 1]'),
-            'description': 'Fix function calls in array indices'
+            'description': 'Fix function calls in array indices',
+            'requires': {'calls': {'length'}}
         }
         
         # E651 fixes  
         self.learned_fixes['E651_split_coalescing'] = {
             'pattern': r'split\([^)]+\)\s*\?\?\s*\[\]',
             'fix': lambda line: re.sub(r'\s*\?\?\s*\[\]', '', line),
-            'description': 'Remove unnecessary ?? [] from split operations'
+            'description': 'Remove unnecessary ?? [] from split operations',
+            'requires': {'calls': {'split'}, 'operators': {'??'}}
         }
         
         self.learned_fixes['E651_array_coalescing'] = {
             'pattern': r'(\w+\[\d+\])\s*\?\?\s*""',
             'fix': lambda line: re.sub(r'(\w+\[\d+\])\s*\?\?\s*""', r'\1', line),
-            'description': 'Remove unnecessary ?? "" from array access'
+            'description': 'Remove unnecessary ?? "" from array access',
+            'requires': {'operators': {'??'}}
         }
         
         # E103 fixes
         self.learned_fixes['E103_fallible_split'] = {
             'pattern': r'(\w+)\s*=\s*split\(([^)]+)\)(?!\s*\?\?)',
             'fix': lambda line: re.sub(r'(\w+)\s*=\s*split\(([^)]+)\)(?!\s*\?\?)', r'\1 = split(\2) ?? []', line),
-            'description': 'Add error handling to fallible split operations'
+            'description': 'Add error handling to fallible split operations',
+            'requires': {'calls': {'split'}}
         }
         
         # E110 fixes  
         self.learned_fixes['E110_direct_field_contains'] = {
             'pattern': r'contains\(\.(\w+),',
             'fix': self._fix_direct_field_contains,
-            'description': 'Convert direct field contains to type-safe version'
+            'description': 'Convert direct field contains to type-safe version',
+            'requires': {'calls': {'contains'}}
         }
     
     def learn_from_error(self, error_code: str, error_message: str, vrl_code: str) -> bool:
@@ -97,45 +105,40 @@ class ErrorLearningSystem:
     def apply_learned_fixes(self, vrl_code: str) -> str:
         """Apply all learned fixes to VRL code"""
         
-        fixed_code = vrl_code
-        fixes_applied = []
-        
-        lines = fixed_code.split('\n')
-        fixed_lines = []
+        result = rewrite_vrl(vrl_code, self.get_rewrite_rules())
         
-        for line_num, line in enumerate(lines, 1):
-            original_line = line
-            
-            # Apply all learned fixes
-            for fix_name, fix_info in self.learned_fixes.items():
-                pattern = fix_info['pattern']
-                fix_func = fix_info['fix']
-                
-                if isinstance(pattern, str):
-                    if re.search(pattern, line):
-                        try:
-                            if callable(fix_func):
-                                line = fix_func(line)
-                            else:
-                                line = re.sub(pattern, fix_func, line)
-                            
-                            if line != original_line:
-                                fixes_applied.append(f"Line {line_num}: {fix_name}")
-                                break  # One fix per line
-                                
-                        except Exception as e:
-                            logger.debug(f"Fix {fix_name} failed on line {line_num}: {e}")
-            
-            fixed_lines.append(line)
+        if result.changed:
+            logger.info(f"🎓 Applied {len(result.fired)} learned fixes")
+            for fired in result.fired:
+                logger.debug(f"   ✅ Line {fired.line}: {fired.rule}")
         
-        result = '\n'.join(fixed_lines)
+        return result.code
+    
+    def get_rewrite_rules(self) -> List[RewriteRule]:
+        """
+        Learned fixes as compiled rewrite rules
         
-        if fixes_applied:
-            logger.info(f"🎓 Applied {len(fixes_applied)} learned fixes")
-            for fix in fixes_applied:
-                logger.debug(f"   ✅ {fix}")
+        Rules are compiled once per learned fix; the error code comes from
+        the fix name prefix (e.g. E651_split_coalescing -> E651).
         
-        return result
+        Returns:
+            Rules in learning order
+        """
+        for fix_name, fix_info in self.learned_fixes.items():
+            if fix_name in self._compiled_rules:
+                continue
+            code_match = re.match(r'(E\d+)_', fix_name)
+            requires = fix_info.get('requires', {})
+            self._compiled_rules[fix_name] = RewriteRule(
+                name=fix_name,
+                pattern=fix_info['pattern'],
+                fix=fix_info['fix'],
+                error_codes=frozenset({code_match.group(1)}) if code_match else frozenset(),
+                calls=frozenset(requires.get('calls', ())),
+                operators=frozenset(requires.get('operators', ())),
+                description=fix_info.get('description', '')
+            )
+        return list(self._compiled_rules.values())
     
     def _learn_e203_patterns(self, error_message: str, vrl_code: str) -> bool:
         """Learn new E203 syntax error patterns"""
@@ -180,7 +183,8 @@ class ErrorLearningSystem:
                     self.learned_fixes[pattern_key] = {
                         'pattern': re.escape(match),
                         'fix': lambda line, m=match: line.replace(m, f'({m} ?? "")'),
-                        'description': f'Add type safety to fallible operation: {match[:50]}'
+                        'description': f'Add type safety to fallible operation: {match[:50]}',
+                        'requires': {'calls': {'split'}}
                     }
                     new_patterns += 1
                     logger.info(f"🎓 Learned new E103 pattern: {match[:50]}")
@@ -219,6 +223,10 @@ def apply_all_learned_fixes(vrl_code: str) -> str:
     """Apply all learned error fixes"""
     return _error_learning.apply_learned_fixes(vrl_code)
 
+def get_learned_rewrite_rules() -> List[RewriteRule]:
+    """Get learned fixes as compiled rewrite rules"""
+    return _error_learning.get_rewrite_rules()
+
 def get_error_learning_summary() -> Dict[str, Any]:
     """Get learning system summary"""
     return _error_learning.get_learning_summary()
\ No newline at end of file
@@ -6,10 +6,81 @@ reserved field names. Ensures VRL output fields don't collide with DFE infrastru
 """
 
 import csv
-from typing import Set, List, Tuple, Dict, Any
+from dataclasses import dataclass
+from typing import Set, List, Tuple, Dict, Any, Optional, Sequence
 from pathlib import Path
 from loguru import logger
 
+from .vrl_ast import parse_vrl, VRLLexer, Path as PathNode
+
+
+@dataclass(frozen=True)
+class FieldConflict:
+    """A VRL output path that collides with a reserved common header field"""
+    field: str           # VRL path as written, e.g. "tags.event.category"
+    reserved_field: str  # Reserved field it collides with
+    kind: str            # 'exact', 'ancestor' (overwrites nested reserved) or 'descendant'
+    reserved_type: str = ''  # Meta schema type from common_header.csv
+    storage_type: str = ''   # ClickHouse type from type_maps.csv
+    comment: str = ''
+    suggestion: str = ''
+
+    def __str__(self) -> str:
+        if self.kind == 'exact':
+            return f"{self.field} (reserved: {self.comment or 'common header field'})"
+        if self.kind == 'ancestor':
+            return f"{self.field} (conflicts with nested reserved field: {self.reserved_field})"
+        return f"{self.field} (exact conflict with reserved: {self.reserved_field})"
+
+
+class _TrieNode:
+    __slots__ = ('children', 'field')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.field: Optional[str] = None  # Reserved field ending at this node
+
+
+class ReservedFieldTrie:
+    """Reserved dotted field names compiled into a path trie for O(depth) lookups"""
+
+    def __init__(self, fields: Sequence[str] = ()):
+        self.root = _TrieNode()
+        for field_name in fields:
+            self.add(field_name)
+
+    def add(self, field_name: str):
+        node = self.root
+        for segment in field_name.split('.'):
+            node = node.children.setdefault(segment, _TrieNode())
+        node.field = field_name
+
+    def match(self, segments: Sequence[str]) -> Optional[Tuple[str, str]]:
+        """
+        Find the reserved field a path collides with
+
+        Args:
+            segments: Path segments, e.g. ("tags", "event", "category")
+
+        Returns:
+            (kind, reserved_field) or None
+        """
+        node = self.root
+        for depth, segment in enumerate(segments):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+            if node.field is not None and depth < len(segments) - 1:
+                return 'descendant', node.field
+        if node is self.root:
+            return None
+        if node.field is not None:
+            return 'exact', node.field
+        # Writing an intermediate object replaces every reserved field below it
+        while node.field is None:
+            node = next(iter(node.children.values()))
+        return 'ancestor', node.field
+
 
 class FieldConflictChecker:
     """Checks VRL output fields against reserved common header fields"""
@@ -31,6 +102,10 @@ class FieldConflictChecker:
         
         self._load_reserved_fields()
         self._load_meta_schema_types()
+        
+        # Compiled once: conflict lookups are O(path depth) per assigned field
+        self.reserved_trie = ReservedFieldTrie(self.field_info)
+        self._conflict_cache: Dict[str, Optional[FieldConflict]] = {}
     
     def _load_reserved_fields(self):
         """Load reserved field names from common_header.csv"""
@@ -137,48 +212,7 @@ Example Field Type Mapping:
         Returns:
             Tuple of (has_conflicts, conflict_list)
         """
-        conflicts = []
-        
-        # Extract field assignments from VRL code
-        import re
-        
-        # Pattern to match field assignments: .field_name = 
-        field_pattern = r'\.(\w+(?:\.\w+)*)\s*='
-        matches = re.findall(field_pattern, vrl_code)
-        
-        # Check each VRL field against reserved list
-        for vrl_field in matches:
-            # Check for exact matches first (top-level fields)
-            if vrl_field in self.reserved_fields:
-                field_info = self.field_info.get(vrl_field, {})
-                conflict_desc = f"{vrl_field} (reserved: {field_info.get('comment', 'common header field')})"
-                conflicts.append(conflict_desc)
-                continue
-            
-            # Check for nested JSON conflicts
-            # VRL field like "tags" conflicts with reserved "tags.collector.host"
-            for reserved_field in self.reserved_fields:
-                if '.' in reserved_field:
-                    # Reserved field has nested structure
-                    reserved_parts = reserved_field.split('.')
-                    
-                    # Check if VRL field conflicts with any part of nested structure
-                    if vrl_field == reserved_parts[0]:  # Top-level conflict
-                        field_info = self.field_info.get(reserved_field, {})
-                        conflict_desc = f"{vrl_field} (conflicts with nested reserved field: {reserved_field})"
-                        conflicts.append(conflict_desc)
-                        break
-                    
-                    # Check if VRL has nested field that conflicts
-                    if '.' in vrl_field:
-                        vrl_parts = vrl_field.split('.')
-                        # Check if nested paths overlap
-                        if len(vrl_parts) >= len(reserved_parts):
-                            if vrl_parts[:len(reserved_parts)] == reserved_parts:
-                                field_info = self.field_info.get(reserved_field, {})
-                                conflict_desc = f"{vrl_field} (exact conflict with reserved: {reserved_field})"
-                                conflicts.append(conflict_desc)
-                                break
+        conflicts = [str(conflict) for conflict in self.find_field_conflicts(vrl_code)]
         
         has_conflicts = len(conflicts) > 0
         
@@ -189,6 +223,79 @@ Example Field Type Mapping:
         
         return has_conflicts, conflicts
     
+    def find_field_conflicts(self, vrl_code: str) -> List[FieldConflict]:
+        """
+        Structured conflicts for every event path assigned in VRL code
+        
+        Args:
+            vrl_code: VRL code to check
+            
+        Returns:
+            One FieldConflict per conflicting path, in source order
+        """
+        # Event paths written by assignments (comments, strings and == comparisons excluded)
+        paths = dict.fromkeys(parse_vrl(vrl_code).assigned_paths())
+        return [c for c in (self.conflict_for_path(path) for path in paths) if c is not None]
+    
+    def conflict_for_path(self, field_path: str) -> Optional[FieldConflict]:
+        """
+        Look up a single dotted event path (without the leading '.')
+        
+        Args:
+            field_path: e.g. "tags.event.category"
+            
+        Returns:
+            FieldConflict or None
+        """
+        if field_path in self._conflict_cache:
+            return self._conflict_cache[field_path]
+        
+        conflict = None
+        match = self.reserved_trie.match(field_path.split('.'))
+        if match:
+            kind, reserved_field = match
+            info = self.field_info.get(reserved_field, {})
+            reserved_type = info.get('type', '')
+            conflict = FieldConflict(
+                field=field_path,
+                reserved_field=reserved_field,
+                kind=kind,
+                reserved_type=reserved_type,
+                storage_type=self.meta_schema_types.get(reserved_type, {}).get('clickhouse_type', ''),
+                comment=info.get('comment', ''),
+                suggestion=self.suggest_alternative_field_name(field_path),
+            )
+        
+        self._conflict_cache[field_path] = conflict
+        return conflict
+    
+    def scan_stream_chunk(self, vrl_text: str) -> List[FieldConflict]:
+        """
+        Cheap conflict scan for partial (streaming) VRL
+        
+        Only lexes the text, so it tolerates unbalanced blocks; callers should
+        pass complete lines so a half-streamed name is not checked.
+        
+        Args:
+            vrl_text: VRL fragment
+            
+        Returns:
+            Conflicts for paths directly followed by an assignment operator
+        """
+        tokens = [t for t in VRLLexer(vrl_text).tokenize() if t.kind not in ('COMMENT', 'NEWLINE')]
+        conflicts = []
+        for token, following in zip(tokens, tokens[1:]):
+            if token.kind != 'PATH' or following.kind != 'OP' or following.text not in ('=', '|='):
+                continue
+            root, segments = token.value
+            if root != '.':
+                continue
+            field_path = '.'.join(str(s) for s in segments if isinstance(s, str))
+            conflict = self.conflict_for_path(field_path) if field_path else None
+            if conflict:
+                conflicts.append(conflict)
+        return conflicts
+    
     def get_conflict_prevention_prompt(self) -> str:
         """Generate prompt text to prevent field conflicts"""
         
@@ -225,6 +332,10 @@ This prevents conflicts with DFE infrastructure fields.
     def suggest_alternative_field_name(self, conflicting_field: str) -> str:
         """Suggest alternative field name for conflicts"""
         
+        # Nested reserved paths flatten to a top-level name: tags.event.category -> event_category
+        if '.' in conflicting_field:
+            return '_'.join(conflicting_field.split('.')[1:])
+        
         alternatives = {
             'timestamp': 'log_timestamp',
             'event_hash': 'event_id', 
@@ -243,27 +354,24 @@ This prevents conflicts with DFE infrastructure fields.
     def fix_field_conflicts_in_vrl(self, vrl_code: str) -> str:
         """Automatically fix field name conflicts in VRL code"""
         
-        fixed_vrl = vrl_code
+        conflicts = {c.field: c for c in self.find_field_conflicts(vrl_code)}
+        if not conflicts:
+            return vrl_code
         
-        # Find conflicts
-        has_conflicts, conflicts = self.check_vrl_field_conflicts(vrl_code)
+        # Rewrite assignment target paths in place (right to left keeps offsets valid)
+        program = parse_vrl(vrl_code)
+        edits = []
+        for assign in program.assignments():
+            for target in assign.targets:
+                if isinstance(target, PathNode) and target.root == '.' and target.dotted in conflicts:
+                    edits.append((target.span.start, target.span.end, f".{conflicts[target.dotted].suggestion}"))
         
-        if not has_conflicts:
-            return fixed_vrl
+        fixed_vrl = vrl_code
+        for start, end, replacement in sorted(edits, reverse=True):
+            fixed_vrl = fixed_vrl[:start] + replacement + fixed_vrl[end:]
         
-        # Fix each conflict
-        import re
-        
-        for conflict_desc in conflicts:
-            field_name = conflict_desc.split(' ')[0]  # Extract field name
-            alternative = self.suggest_alternative_field_name(field_name)
-            
-            # Replace .field_name = with .alternative =
-            pattern = fr'\.{re.escape(field_name)}\s*='
-            replacement = f'.{alternative} ='
-            
-            fixed_vrl = re.sub(pattern, replacement, fixed_vrl)
-            logger.info(f"   🔧 Fixed conflict: .{field_name} → .{alternative}")
+        for conflict in conflicts.values():
+            logger.info(f"   🔧 Fixed conflict: .{conflict.field} → .{conflict.suggestion}")
         
         return fixed_vrl
 
@@ -279,6 +387,14 @@ def get_field_conflict_prevention_prompt() -> str:
     """Get prompt text to prevent field conflicts"""
     return _field_checker.get_conflict_prevention_prompt()
 
+def find_field_conflicts(vrl_code: str) -> List[FieldConflict]:
+    """Structured field conflicts (with suggested alternatives) for VRL"""
+    return _field_checker.find_field_conflicts(vrl_code)
+
+def scan_field_conflicts_in_stream(vrl_text: str) -> List[FieldConflict]:
+    """Lexer-only conflict scan for partial VRL from a streaming response"""
+    return _field_checker.scan_stream_chunk(vrl_text)
+
 def fix_field_conflicts(vrl_code: str) -> str:
     """Fix field name conflicts in VRL"""
     return _field_checker.fix_field_conflicts_in_vrl(vrl_code)
\ No newline at end of file
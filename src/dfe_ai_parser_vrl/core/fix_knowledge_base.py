@@ -0,0 +1,310 @@
+"""
+Error Fix Knowledge Base
+
+Persistent store of VRL error fixes shared across runs and workers:
+
+- Keyed by error code + normalized offending source line
+- Records whether a fix came from a local rule or the LLM and how often it
+  resolved the error (success rate)
+- Consulted before local rules and LLM fixes; proven fixes are replayed
+- SQLite in WAL mode with one connection per thread, so concurrent
+  processes/threads can read while one writes
+"""
+
+import difflib
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from loguru import logger
+
+from .rewrite_engine import parse_error_locations
+
+DEFAULT_DB_PATH = ".tmp/error_fix_kb.sqlite3"
+DEFAULT_MIN_SUCCESS_RATE = 0.5
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixes (
+    error_code TEXT NOT NULL,
+    snippet TEXT NOT NULL,
+    replacement TEXT NOT NULL,
+    source TEXT NOT NULL,
+    rule TEXT,
+    successes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (error_code, snippet, replacement)
+);
+CREATE TABLE IF NOT EXISTS error_counts (
+    error_code TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def normalize_snippet(line: str) -> str:
+    """Normalize a source line for keying: trailing comment, semicolon and whitespace runs removed"""
+    line = re.sub(r'\s+#[^"]*$', '', line)
+    return re.sub(r'\s+', ' ', line).strip().rstrip(';').strip()
+
+
+@dataclass(frozen=True)
+class KnownFix:
+    """A stored fix for one offending line"""
+    error_code: str
+    snippet: str
+    replacement: str
+    source: str  # 'local' or 'llm'
+    rule: Optional[str]
+    successes: int
+    failures: int
+
+    @property
+    def success_rate(self) -> float:
+        attempts = self.successes + self.failures
+        return self.successes / attempts if attempts else 0.0
+
+
+@dataclass(frozen=True)
+class PendingFix:
+    """A fix applied this run whose outcome is not yet known"""
+    error_code: str
+    snippet: str
+    replacement: str
+
+
+def line_replacements(before_code: str, after_code: str, line_numbers: List[int]) -> Dict[int, str]:
+    """
+    Map offending lines to their rewritten line
+
+    Only one-to-one line rewrites are returned; lines that were deleted or
+    expanded into blocks are skipped.
+
+    Args:
+        before_code: VRL before the fix
+        after_code: VRL after the fix
+        line_numbers: 1-based lines of interest in before_code
+
+    Returns:
+        Dict of line number -> replacement line
+    """
+    before, after = before_code.split('\n'), after_code.split('\n')
+    wanted = set(line_numbers)
+    result = {}
+    matcher = difflib.SequenceMatcher(a=before, b=after, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'replace' or i2 - i1 != j2 - j1:
+            continue
+        for offset in range(i2 - i1):
+            if i1 + offset + 1 in wanted:
+                result[i1 + offset + 1] = after[j1 + offset]
+    return result
+
+
+class FixKnowledgeBase:
+    """SQLite-backed error fix store safe for concurrent writers"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, min_success_rate: float = DEFAULT_MIN_SUCCESS_RATE):
+        """
+        Initialize knowledge base
+
+        Args:
+            db_path: SQLite database file (created if missing)
+            min_success_rate: Minimum success rate for a fix to be replayed
+        """
+        self.db_path = Path(db_path)
+        self.min_success_rate = min_success_rate
+        self._local = threading.local()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @property
+    def pending(self) -> List[PendingFix]:
+        """Fixes applied by the current thread awaiting re-validation"""
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = []
+        return self._local.pending
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def record_error(self, error_code: str):
+        """Count an occurrence of an error code"""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO error_counts (error_code, count) VALUES (?, 1) "
+                "ON CONFLICT(error_code) DO UPDATE SET count = count + 1",
+                (error_code,)
+            )
+
+    def record_fix(self, error_code: str, snippet: str, replacement: str, source: str, rule: str = None):
+        """
+        Store a fix candidate and mark it pending until its outcome is known
+
+        Args:
+            error_code: Error code the fix addresses
+            snippet: Offending source line
+            replacement: Rewritten line
+            source: 'local' or 'llm'
+            rule: Rewrite rule name for local fixes
+        """
+        snippet, replacement_key = normalize_snippet(snippet), normalize_snippet(replacement)
+        if not snippet or snippet == replacement_key:
+            return
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO fixes (error_code, snippet, replacement, source, rule, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(error_code, snippet, replacement) DO UPDATE SET updated_at = excluded.updated_at",
+                (error_code, snippet, replacement_key, source, rule, now, now)
+            )
+        self.pending.append(PendingFix(error_code, snippet, replacement_key))
+
+    def lookup(self, error_code: str, snippet: str) -> Optional[KnownFix]:
+        """
+        Best proven fix for an offending line
+
+        Args:
+            error_code: Error code
+            snippet: Offending source line
+
+        Returns:
+            Fix with the highest success rate above min_success_rate, or None
+        """
+        rows = self._connection().execute(
+            "SELECT error_code, snippet, replacement, source, rule, successes, failures FROM fixes "
+            "WHERE error_code = ? AND snippet = ? AND successes > 0",
+            (error_code, normalize_snippet(snippet))
+        ).fetchall()
+        fixes = [KnownFix(*row) for row in rows]
+        fixes = [fix for fix in fixes if fix.success_rate >= self.min_success_rate]
+        if not fixes:
+            return None
+        return max(fixes, key=lambda fix: (fix.success_rate, fix.successes))
+
+    def apply_known_fixes(self, vrl_code: str, error_message: str) -> Tuple[str, List[KnownFix]]:
+        """
+        Replay proven fixes on the lines named in an error message
+
+        Args:
+            vrl_code: VRL code with error
+            error_message: Compiler output with line:col spans
+
+        Returns:
+            (possibly fixed code, fixes applied)
+        """
+        lines = vrl_code.split('\n')
+        applied = []
+        for location in parse_error_locations(error_message):
+            if not 0 < location.line <= len(lines):
+                continue
+            line = lines[location.line - 1]
+            fix = self.lookup(location.code, line)
+            if fix is None:
+                continue
+            indent = line[:len(line) - len(line.lstrip())]
+            lines[location.line - 1] = indent + fix.replacement
+            applied.append(fix)
+            self.pending.append(PendingFix(fix.error_code, fix.snippet, fix.replacement))
+        return '\n'.join(lines), applied
+
+    def record_outcome(self, vrl_code: str, error_message: Optional[str]) -> int:
+        """
+        Resolve pending fixes after re-validation
+
+        A pending fix succeeded unless the same error code is still reported on
+        its original or rewritten line.
+
+        Args:
+            vrl_code: VRL code after the fixes were applied
+            error_message: New validation error, or None if validation passed
+
+        Returns:
+            Number of fixes resolved
+        """
+        pending, self._local.pending = self.pending, []
+        if not pending:
+            return 0
+
+        lines = vrl_code.split('\n')
+        still_failing = set()
+        for location in parse_error_locations(error_message):
+            if 0 < location.line <= len(lines):
+                still_failing.add((location.code, normalize_snippet(lines[location.line - 1])))
+
+        with self._connection() as conn:
+            for fix in pending:
+                failed = ((fix.error_code, fix.snippet) in still_failing or
+                          (fix.error_code, fix.replacement) in still_failing)
+                column = "failures" if failed else "successes"
+                conn.execute(
+                    f"UPDATE fixes SET {column} = {column} + 1, updated_at = ? "
+                    "WHERE error_code = ? AND snippet = ? AND replacement = ?",
+                    (time.time(), fix.error_code, fix.snippet, fix.replacement)
+                )
+        return len(pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summary of stored fixes and error frequencies"""
+        conn = self._connection()
+        by_source = dict(conn.execute(
+            "SELECT source, COUNT(*) FROM fixes WHERE successes > 0 GROUP BY source").fetchall())
+        return {
+            'db_path': str(self.db_path),
+            'total_fixes': conn.execute("SELECT COUNT(*) FROM fixes").fetchone()[0],
+            'proven_fixes': by_source,
+            'error_frequencies': dict(conn.execute("SELECT error_code, count FROM error_counts").fetchall()),
+        }
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# Global knowledge base (created on first use from config)
+_fix_knowledge_base: Optional[FixKnowledgeBase] = None
+_fix_knowledge_base_lock = threading.Lock()
+
+def get_fix_knowledge_base() -> Optional[FixKnowledgeBase]:
+    """Get the shared knowledge base, or None if disabled in config"""
+    global _fix_knowledge_base
+    if _fix_knowledge_base is None:
+        with _fix_knowledge_base_lock:
+            if _fix_knowledge_base is None:
+                from ..config.loader import DFEConfigLoader
+                config = (DFEConfigLoader.load().get('vrl_generation', {})
+                          .get('error_fixing', {}).get('knowledge_base', {}))
+                if not config.get('enabled', True):
+                    return None
+                try:
+                    _fix_knowledge_base = FixKnowledgeBase(
+                        config.get('path', DEFAULT_DB_PATH),
+                        config.get('min_success_rate', DEFAULT_MIN_SUCCESS_RATE)
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Error fix knowledge base unavailable: {e}")
+                    return None
+    return _fix_knowledge_base
+
+def get_fix_knowledge_base_stats() -> Dict[str, Any]:
+    """Get knowledge base summary (empty if disabled)"""
+    kb = get_fix_knowledge_base()
+    return kb.get_stats() if kb else {}
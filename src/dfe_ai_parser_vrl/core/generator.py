@@ -2,7 +2,8 @@
 Core VRL generator using LiteLLM
 """
 
-import time
+from dataclasses import dataclass
+from itertools import islice
 from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 from loguru import logger
@@ -14,6 +15,23 @@ from .validator import DFEVRLValidator
 from .error_fixer import DFEVRLErrorFixer
 
 
+@dataclass
+class GenerationJob:
+    """State of one source's generate/validate/fix loop between steps"""
+    sample_logs: str
+    device_type: Optional[str]
+    validate: bool
+    fix_errors: bool
+    baseline_vrl: Optional[str]
+    session: Any
+    metadata: Dict[str, Any]
+    vrl_code: Optional[str] = None
+    error_message: Optional[str] = None  # Error the next llm_step fixes
+    simplify: bool = False               # Next llm_step regenerates to break a cycle
+    iteration: int = 0
+    done: bool = False
+
+
 class DFEVRLGenerator:
     """Main VRL generator class"""
     
@@ -26,7 +44,12 @@ class DFEVRLGenerator:
         # Get generation settings
         gen_config = self.config.get("vrl_generation", {})
         self.max_iterations = gen_config.get("max_iterations", 10)
-        self.iteration_delay = gen_config.get("iteration_delay", 2)
+        
+        # Validated parsers are reused for sources whose templates they cover
+        self.registry = None
+        if self.config.get("parser_registry", {}).get("enabled", True):
+            from .registry import get_parser_registry
+            self.registry = get_parser_registry()
     
     def generate(self, 
                 sample_logs: str,
@@ -47,6 +70,46 @@ class DFEVRLGenerator:
         Returns:
             Tuple of (vrl_code, metadata)
         """
+        job = self.start_job(sample_logs, device_type, validate, fix_errors, baseline_vrl)
+        
+        # Generate initial VRL with baseline reference (unless a registered parser was reused)
+        if job.vrl_code is None:
+            self.llm_step(job)
+        
+        if not validate:
+            return job.vrl_code, job.metadata
+        
+        # Anti-cyclical validation loop with history tracking; LLM calls are
+        # paced per provider by the client, so there is no fixed delay here
+        while not self.validation_step(job):
+            self.llm_step(job)
+        
+        return self.finish_job(job)
+    
+    def start_job(self,
+                  sample_logs: str,
+                  device_type: str = None,
+                  validate: bool = True,
+                  fix_errors: bool = True,
+                  baseline_vrl: str = None) -> GenerationJob:
+        """
+        Open a generation session without calling the LLM
+        
+        generate() runs a job serially; the pipelined scheduler interleaves
+        llm_step/validation_step of many jobs on separate pools. If the parser
+        registry covers the samples' templates, the job starts with that VRL
+        (vrl_code set) and skips initial generation.
+        
+        Args:
+            sample_logs: Sample log data
+            device_type: Optional device type hint
+            validate: Whether to validate generated VRL
+            fix_errors: Whether to attempt fixing validation errors
+            baseline_vrl: Existing working VRL to use as baseline/reference
+            
+        Returns:
+            GenerationJob ready for its first llm_step
+        """
         logger.info(f"Starting baseline_stage VRL generation for {device_type or 'unknown'} device")
         
         # Get or create VRL generation session with Derek's guide loaded
@@ -68,143 +131,229 @@ class DFEVRLGenerator:
             "error_progression": []   # Track how errors evolved
         }
         
-        # Generate initial VRL with streaming progress and baseline reference
-        if baseline_vrl:
-            logger.info("Generating VRL code with baseline reference...")
-        else:
-            logger.info("Generating initial VRL code...")
-        
-        # Use session-based generation with Derek's guide loaded
-        vrl_code = session.generate_vrl(
+        job = GenerationJob(
             sample_logs=sample_logs,
-            strategy=None  # No specific strategy for baseline_stage
+            device_type=device_type,
+            validate=validate,
+            fix_errors=fix_errors,
+            baseline_vrl=baseline_vrl,
+            session=session,
+            metadata=metadata
         )
-        metadata["iterations"] = 1
-        
-        if not validate:
-            return vrl_code, metadata
+        self._reuse_registered_parser(job)
+        return job
+    
+    def _reuse_registered_parser(self, job: GenerationJob):
+        """Start a job from a registered parser covering its sample templates"""
+        if self.registry is None:
+            return
+        match = self.registry.lookup(job.sample_logs, job.device_type)
+        if match is None:
+            return
+        if not job.validate and not match.same_version:
+            # Nothing would re-check VRL validated on another Vector version
+            logger.info(f"Registered parser {match.parser.parser_id} was validated with Vector "
+                        f"{match.parser.vector_version} - generating instead")
+            return
+        
+        job.vrl_code = match.parser.vrl_code
+        job.metadata["registry_parser"] = match.parser.parser_id
+        job.metadata["registry_coverage"] = round(match.coverage, 3)
+        if not job.validate:
+            job.done = True
+    
+    def llm_step(self, job: GenerationJob):
+        """
+        LLM stage of a job: initial generation, cycle-breaking regeneration or error fix
         
-        # Anti-cyclical validation loop with history tracking
-        for iteration in range(self.max_iterations):
-            logger.info(f"Validation iteration {iteration + 1}/{self.max_iterations}")
-            
-            # Validate VRL
-            is_valid, error_message = self.validator.validate(vrl_code, sample_logs)
-            
-            # Track error progression to detect cycles
-            error_code = self._extract_error_code(error_message) if error_message else "NONE"
-            metadata["error_progression"].append({
-                "iteration": iteration + 1,
-                "error_code": error_code,
-                "error_message": error_message[:200] if error_message else None
-            })
-            
-            if is_valid:
-                logger.success("VRL validation passed!")
-                metadata["validation_passed"] = True
-                break
+        Args:
+            job: Job to advance (vrl_code/metadata updated in place)
+        """
+        if job.vrl_code is None:
+            if job.baseline_vrl:
+                logger.info("Generating VRL code with baseline reference...")
+            else:
+                logger.info("Generating initial VRL code...")
             
-            if not fix_errors:
-                logger.warning(f"Validation failed: {error_message}")
-                break
+            # Use session-based generation with Derek's guide loaded
+            job.vrl_code = job.session.generate_vrl(
+                sample_logs=job.sample_logs,
+                strategy=None  # No specific strategy for baseline_stage
+            )
+            job.metadata["iterations"] = 1
+            return
+        
+        if job.simplify:
+            # Try progressive simplification approach
+            logger.info("🎯 Switching to PROGRESSIVE SIMPLIFICATION to break cycle")
+            job.vrl_code = self._generate_simplified_vrl(job.sample_logs, job.device_type, job.metadata)
+            job.simplify = False
+            self._next_iteration(job)
+            return
+        
+        # Use LLM fix with iteration history to prevent cycles
+        metadata = job.metadata
+        error_message = job.error_message
+        logger.info(f"Using LLM to fix error: {self._extract_error_code(error_message)}")
+        
+        # Build iteration context to prevent repetition
+        iteration_context = self._build_iteration_context(metadata, error_message)
+        
+        try:
+            # Use session-based error fixing with full context
+            fixed_vrl = job.session.fix_vrl_error(job.vrl_code, error_message, job.sample_logs)
             
-            # Check for cyclical patterns (same error 3+ times)
-            recent_errors = [e["error_code"] for e in metadata["error_progression"][-3:]]
-            if len(recent_errors) >= 3 and len(set(recent_errors)) == 1:
-                logger.warning(f"🔄 CYCLICAL PATTERN DETECTED: {error_code} repeated 3+ times")
-                self._analyze_and_blacklist_patterns(vrl_code, error_message, metadata)
+            if fixed_vrl and fixed_vrl != job.vrl_code:
+                # Track this attempt in history
+                attempt_record = {
+                    "iteration": job.iteration + 1,
+                    "error_code": self._extract_error_code(error_message),
+                    "fix_applied": True,
+                    "vrl_length_before": len(job.vrl_code),
+                    "vrl_length_after": len(fixed_vrl)
+                }
+                metadata["iteration_history"].append(attempt_record)
                 
-                # Try progressive simplification approach
-                logger.info("🎯 Switching to PROGRESSIVE SIMPLIFICATION to break cycle")
-                vrl_code = self._generate_simplified_vrl(sample_logs, device_type, metadata)
-                continue
-            
-            # Try local fixes first (free)
-            logger.info("Attempting local error fixes...")
-            fixed_vrl = self.error_fixer.fix_locally(vrl_code, error_message)
-            
-            local_fix_applied = False
-            if fixed_vrl and fixed_vrl != vrl_code:
-                logger.info("✨ Local fix applied (free)")
-                vrl_code = fixed_vrl
+                self.error_fixer.record_llm_fix(job.vrl_code, fixed_vrl, error_message)
+                job.vrl_code = fixed_vrl
                 metadata["errors_fixed"] += 1
-                local_fix_applied = True
+                metadata["iterations"] += 1
+                logger.info(f"🤖 LLM fix applied - iteration {job.iteration + 1}")
+            else:
+                logger.warning(f"LLM unable to fix error at iteration {job.iteration + 1}")
                 
-                # Re-validate after local fix
-                is_valid_after_local, error_after_local = self.validator.validate(vrl_code, sample_logs)
-                if is_valid_after_local:
-                    logger.success("✅ Local fix resolved all issues!")
-                    metadata["validation_passed"] = True
-                    break
-                else:
-                    logger.info(f"Local fix partial - still has errors: {self._extract_error_code(error_after_local)}")
-                    error_message = error_after_local  # Update error for LLM fix
-            
-            # Use LLM fix with iteration history to prevent cycles
-            if not local_fix_applied or not metadata.get("validation_passed", False):
-                logger.info(f"Using LLM to fix error: {self._extract_error_code(error_message)}")
+                # Track failed attempt
+                failed_attempt = {
+                    "iteration": job.iteration + 1,
+                    "error_code": self._extract_error_code(error_message),
+                    "fix_applied": False,
+                    "reason": "LLM returned no changes"
+                }
+                metadata["iteration_history"].append(failed_attempt)
+                metadata["iterations"] += 1
                 
-                # Build iteration context to prevent repetition
-                iteration_context = self._build_iteration_context(metadata, error_message)
-                
-                try:
-                    # Use session-based error fixing with full context
-                    fixed_vrl = session.fix_vrl_error(vrl_code, error_message, sample_logs)
-                    
-                    if fixed_vrl and fixed_vrl != vrl_code:
-                        # Track this attempt in history
-                        attempt_record = {
-                            "iteration": iteration + 1,
-                            "error_code": self._extract_error_code(error_message),
-                            "fix_applied": True,
-                            "vrl_length_before": len(vrl_code),
-                            "vrl_length_after": len(fixed_vrl)
-                        }
-                        metadata["iteration_history"].append(attempt_record)
-                        
-                        vrl_code = fixed_vrl
-                        metadata["errors_fixed"] += 1
-                        metadata["iterations"] += 1
-                        logger.info(f"🤖 LLM fix applied - iteration {iteration + 1}")
-                    else:
-                        logger.warning(f"LLM unable to fix error at iteration {iteration + 1}")
-                        
-                        # Track failed attempt
-                        failed_attempt = {
-                            "iteration": iteration + 1,
-                            "error_code": self._extract_error_code(error_message),
-                            "fix_applied": False,
-                            "reason": "LLM returned no changes"
-                        }
-                        metadata["iteration_history"].append(failed_attempt)
-                        metadata["iterations"] += 1
-                        
-                except Exception as e:
-                    logger.error(f"LLM fix failed: {e}")
-                    
-                    # Track error in history
-                    error_attempt = {
-                        "iteration": iteration + 1,
-                        "error_code": self._extract_error_code(error_message),
-                        "fix_applied": False,
-                        "reason": f"LLM fix exception: {str(e)[:100]}"
-                    }
-                    metadata["iteration_history"].append(error_attempt)
-                    metadata["iterations"] += 1
+        except Exception as e:
+            logger.error(f"LLM fix failed: {e}")
+            
+            # Track error in history
+            error_attempt = {
+                "iteration": job.iteration + 1,
+                "error_code": self._extract_error_code(error_message),
+                "fix_applied": False,
+                "reason": f"LLM fix exception: {str(e)[:100]}"
+            }
+            metadata["iteration_history"].append(error_attempt)
+            metadata["iterations"] += 1
+        
+        self._next_iteration(job)
+    
+    def validation_step(self, job: GenerationJob) -> bool:
+        """
+        Validation stage of a job: validate, detect cycles and apply free local fixes
+        
+        Args:
+            job: Job to advance
+            
+        Returns:
+            True if the job is finished (valid, not fixing, or out of iterations);
+            False if it needs another llm_step (job.error_message/job.simplify set)
+        """
+        if job.done:
+            return True
+        
+        metadata = job.metadata
+        logger.info(f"Validation iteration {job.iteration + 1}/{self.max_iterations}")
+        
+        # Validate VRL
+        is_valid, error_message = self.validator.validate(job.vrl_code, job.sample_logs)
+        self.error_fixer.record_fix_outcome(job.vrl_code, None if is_valid else error_message)
+        
+        # Track error progression to detect cycles
+        error_code = self._extract_error_code(error_message) if error_message else "NONE"
+        metadata["error_progression"].append({
+            "iteration": job.iteration + 1,
+            "error_code": error_code,
+            "error_message": error_message[:200] if error_message else None
+        })
+        
+        if is_valid:
+            logger.success("VRL validation passed!")
+            metadata["validation_passed"] = True
+            job.done = True
+            return True
+        
+        if not job.fix_errors:
+            logger.warning(f"Validation failed: {error_message}")
+            job.done = True
+            return True
+        
+        # Check for cyclical patterns (same error 3+ times)
+        recent_errors = [e["error_code"] for e in metadata["error_progression"][-3:]]
+        if len(recent_errors) >= 3 and len(set(recent_errors)) == 1:
+            logger.warning(f"🔄 CYCLICAL PATTERN DETECTED: {error_code} repeated 3+ times")
+            self._analyze_and_blacklist_patterns(job.vrl_code, error_message, metadata)
+            job.simplify = True
+            return False
+        
+        # Try local fixes first (free)
+        logger.info("Attempting local error fixes...")
+        fixed_vrl = self.error_fixer.fix_locally(job.vrl_code, error_message, job.sample_logs)
+        
+        if fixed_vrl and fixed_vrl != job.vrl_code:
+            logger.info("✨ Local fix applied (free)")
+            job.vrl_code = fixed_vrl
+            metadata["errors_fixed"] += 1
             
-            # Rate limiting
-            time.sleep(self.iteration_delay)
+            # Re-validate after local fix
+            is_valid_after_local, error_after_local = self.validator.validate(job.vrl_code, job.sample_logs)
+            self.error_fixer.record_fix_outcome(job.vrl_code, None if is_valid_after_local else error_after_local)
+            if is_valid_after_local:
+                logger.success("✅ Local fix resolved all issues!")
+                metadata["validation_passed"] = True
+                job.done = True
+                return True
+            else:
+                logger.info(f"Local fix partial - still has errors: {self._extract_error_code(error_after_local)}")
+                error_message = error_after_local  # Update error for LLM fix
+        
+        job.error_message = error_message
+        return False
+    
+    def finish_job(self, job: GenerationJob) -> Tuple[str, Dict[str, Any]]:
+        """
+        Close a job's session
+        
+        Args:
+            job: Finished job
+            
+        Returns:
+            Tuple of (vrl_code, metadata)
+        """
+        job.done = True
         
         # Add session summary to metadata
-        session_summary = session.get_session_summary()
-        metadata["session_summary"] = session_summary
+        session_summary = job.session.get_session_summary()
+        job.metadata["session_summary"] = session_summary
         
         # Clean up session if validation passed
-        if metadata.get("validation_passed", False):
+        if job.metadata.get("validation_passed", False):
             logger.info("✅ baseline_stage complete - cleaning up session")
-            cleanup_vrl_session(device_type or 'unknown', "baseline_stage")
+            cleanup_vrl_session(job.device_type or 'unknown', "baseline_stage")
+            
+            # Register (or extend the templates of) the validated parser
+            if self.registry is not None:
+                try:
+                    self.registry.register(job.vrl_code, job.sample_logs, job.device_type)
+                except Exception as e:
+                    logger.warning(f"Could not register parser: {e}")
         
-        return vrl_code, metadata
+        return job.vrl_code, job.metadata
+    
+    def _next_iteration(self, job: GenerationJob):
+        """Count a validate/fix round; the job ends after max_iterations rounds"""
+        job.iteration += 1
+        if job.iteration >= self.max_iterations:
+            job.done = True
     
     def generate_from_file(self, 
                           log_file: str,
@@ -237,7 +386,10 @@ class DFEVRLGenerator:
     
     def _stream_sample_logs(self, log_path: Path, max_lines: int = 1000) -> str:
         """
-        Stream sample logs using Dask for memory efficiency and performance
+        Stream the first lines of a log file for memory efficiency
+        
+        bag.take() only ever read the first partition, so a plain line stream
+        gives the same sample without paying Dask's import and scheduler cost.
         
         Args:
             log_path: Path to log file
@@ -246,34 +398,12 @@ class DFEVRLGenerator:
         Returns:
             Sampled log content as string
         """
-        import dask.bag as db
+        from ..utils.streaming import stream_file_lines
         
-        try:
-            # Use Dask for efficient streaming and sampling
-            bag = db.read_text(str(log_path), blocksize="32MB")
-            
-            # Take distributed sample across file 
-            total_partitions = bag.npartitions
-            lines_per_partition = max(1, max_lines // max(1, total_partitions))
-            
-            # Sample from each partition for representative coverage
-            sampled = bag.take(max_lines, warn=False)
-            
-            logger.info(f"Dask sampled {len(sampled)} lines from {log_path.name} ({total_partitions} partitions)")
-            return '\n'.join(sampled)
-            
-        except Exception as e:
-            logger.warning(f"Dask streaming failed: {e}, falling back to basic streaming")
-            # Fallback to simple streaming
-            lines = []
-            with open(log_path, 'r') as f:
-                for i, line in enumerate(f):
-                    if i >= max_lines:
-                        break
-                    lines.append(line.rstrip())
-            
-            logger.info(f"Basic sampled {len(lines)} lines from {log_path.name}")
-            return '\n'.join(lines)
+        lines = list(islice(stream_file_lines(log_path), max_lines))
+        
+        logger.info(f"Streamed {len(lines)} sample lines from {log_path.name}")
+        return '\n'.join(lines)
     
     def _extract_error_code(self, error_message: str) -> str:
         """Extract error code from error message"""
@@ -382,24 +512,29 @@ class DFEVRLGenerator:
     
     def _detect_device_type(self, filename: str) -> Optional[str]:
         """Auto-detect device type from filename"""
-        filename_lower = filename.lower()
-        
-        # Common patterns
-        patterns = {
-            "ssh": ["ssh", "sshd", "openssh"],
-            "apache": ["apache", "httpd", "access", "error"],
-            "cisco": ["cisco", "asa", "ios", "nexus"],
-            "windows": ["windows", "win", "evtx"],
-            "linux": ["linux", "syslog", "messages"],
-            "firewall": ["firewall", "pfsense", "fortinet"],
-            "nginx": ["nginx"],
-            "docker": ["docker", "container"],
-            "kubernetes": ["k8s", "kubernetes", "kube"]
-        }
-        
-        for device_type, keywords in patterns.items():
-            if any(keyword in filename_lower for keyword in keywords):
-                logger.info(f"Auto-detected device type: {device_type}")
-                return device_type
-        
-        return None
\ No newline at end of file
+        return detect_device_type(filename)
+
+
+def detect_device_type(filename: str) -> Optional[str]:
+    """Auto-detect device type from a log file name"""
+    filename_lower = filename.lower()
+
+    # Common patterns
+    patterns = {
+        "ssh": ["ssh", "sshd", "openssh"],
+        "apache": ["apache", "httpd", "access", "error"],
+        "cisco": ["cisco", "asa", "ios", "nexus"],
+        "windows": ["windows", "win", "evtx"],
+        "linux": ["linux", "syslog", "messages"],
+        "firewall": ["firewall", "pfsense", "fortinet"],
+        "nginx": ["nginx"],
+        "docker": ["docker", "container"],
+        "kubernetes": ["k8s", "kubernetes", "kube"]
+    }
+
+    for device_type, keywords in patterns.items():
+        if any(keyword in filename_lower for keyword in keywords):
+            logger.info(f"Auto-detected device type: {device_type}")
+            return device_type
+
+    return None
@@ -6,13 +6,15 @@ metrics tracking, and efficient LLM session management.
 """
 
 import os
+import copy
+import math
 import time
 import json
 import socket
 import subprocess
 import requests
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
 from loguru import logger
@@ -21,7 +23,24 @@ from ..llm.client import DFELLMClient
 from ..config.loader import DFEConfigLoader
 from .validator import DFEVRLValidator
 from .error_fixer import DFEVRLErrorFixer
+from .vrl_ast import parse_vrl
+from .cost_model import VRLCostModel, sample_events_from_logs
+from .regex_transformer import eliminate_regex
+from .vrl_optimizer import VRLOptimizer, OptimizationResult
+from .vrl_profiler import VRLProfiler, VRLProfile, DEFAULT_MAX_EVENTS as DEFAULT_PROFILE_EVENTS
+from .vpi_calibration import load_function_vpi_impact
+from .checkpoint import SessionCheckpoint, source_fingerprint
+from .registry import get_parser_registry
 from ..utils.streaming import stream_file_chunks
+from ..utils.parallel import sample_unique_lines
+
+
+# Vector benchmark length when the tournament is disabled
+DEFAULT_BENCHMARK_EVENTS = 1000
+
+# Tournament defaults: PyVRL events in the quick round, Vector events per round
+DEFAULT_QUICK_EVENTS = 2000
+DEFAULT_TOURNAMENT_BUDGETS = [250, 1000, 4000]
 
 
 @dataclass
@@ -47,6 +66,7 @@ class PerformanceBaseline:
     p99_latency_ms: float
     errors_count: int
     vrl_performance_index: int = 0  # VPI - hardware normalized performance score
+    measured: bool = True  # False when estimated by the static cost model
     
     def __str__(self):
         return (f"Events/sec: {self.events_per_second:.0f}, "
@@ -70,6 +90,8 @@ class VRLCandidate:
     improvement_cycle: int = 0
     total_cost: float = 0.0
     duration: float = 0.0
+    predicted_events_per_cpu_percent: float = 0.0  # Static cost model estimate
+    tournament: List[Dict[str, Any]] = field(default_factory=list)  # Per-round scores
     
     @property
     def latest_vpi(self) -> int:
@@ -90,6 +112,17 @@ class VRLCandidate:
         
         improvement = ((current_vpi - previous_vpi) / previous_vpi) * 100
         return improvement
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'VRLCandidate':
+        data = dict(data)
+        data['performance_history'] = [PerformanceBaseline(**p) for p in data.get('performance_history', [])]
+        if data.get('current_performance'):
+            data['current_performance'] = PerformanceBaseline(**data['current_performance'])
+        return cls(**data)
 
 
 class VRLPerformanceOptimizer:
@@ -127,38 +160,40 @@ class VRLPerformanceOptimizer:
             "parse_regex_all": 5,
             "capture": 12
         }
+        # Measured values from the calibrated cost table override the defaults above
+        self.function_vpi_impact.update(load_function_vpi_impact())
+        
+        # AST rewrites verified on samples and measured with the cost model,
+        # with branch frequencies from instrumented runs on the samples
+        cost_model = VRLCostModel(self.function_vpi_impact)
+        self.profiler = VRLProfiler(cost_model)
+        self.ast_optimizer = VRLOptimizer(cost_model, profiler=self.profiler)
+        self.last_optimization: Optional[OptimizationResult] = None
     
-    def optimize_vrl_code(self, vrl_code: str) -> str:
-        """Apply performance optimizations to VRL code"""
+    def optimize_vrl_code(self, vrl_code: str, sample_logs: Optional[str] = None) -> str:
+        """
+        Apply performance optimizations to VRL code
+        
+        Args:
+            vrl_code: VRL code to optimize
+            sample_logs: Sample logs used to verify rewrites and measure branch frequencies
+            
+        Returns:
+            Optimized VRL code (per-rewrite VPI deltas in self.last_optimization)
+        """
         optimized = vrl_code
         
         # Convert slow regex operations to fast string operations where possible
-        optimized = self._optimize_regex_to_string_ops(optimized)
-        
-        # Add early exits for common cases
-        optimized = self._add_early_exits(optimized)
+        optimized = self._optimize_regex_to_string_ops(optimized, sample_logs)
         
-        # Optimize memory usage
-        optimized = self._optimize_memory_usage(optimized)
+        # Hoist repeated work, drop dead code and order branches by frequency
+        self.last_optimization = self.ast_optimizer.optimize(optimized, sample_logs)
         
-        return optimized
+        return self.last_optimization.code
     
-    def _optimize_regex_to_string_ops(self, vrl_code: str) -> str:
-        """Replace slow regex with fast string operations"""
-        import re
-        
-        optimizations = [
-            (r'match\([^,]+,\s*r[\'"]ERROR[\'"].*?\)', 'contains(string!(.message), "ERROR")'),
-            (r'match\([^,]+,\s*r[\'"]WARN[\'"].*?\)', 'contains(string!(.message), "WARN")'),  
-            (r'match\([^,]+,\s*r[\'"]INFO[\'"].*?\)', 'contains(string!(.message), "INFO")'),
-            (r'match\([^,]+,\s*r[\'"]DEBUG[\'"].*?\)', 'contains(string!(.message), "DEBUG")'),
-        ]
-        
-        optimized = vrl_code
-        for pattern, replacement in optimizations:
-            optimized = re.sub(pattern, replacement, optimized)
-        
-        return optimized
+    def _optimize_regex_to_string_ops(self, vrl_code: str, sample_logs: Optional[str] = None) -> str:
+        """Replace slow regex with verified-equivalent string operations"""
+        return eliminate_regex(vrl_code, sample_logs).code
     
     def _add_early_exits(self, vrl_code: str) -> str:
         """Add early exit optimizations"""
@@ -186,20 +221,19 @@ if exists(.raw_data) && length(string!(.raw_data)) > 1000 {
     
     def analyze_performance(self, vrl_code: str) -> Dict[str, Any]:
         """Analyze VRL performance characteristics using VPI approach"""
-        lines = vrl_code.split('\n')
         function_calls = []
         total_vpi_cost = 0
         
-        # Count function usage and calculate VPI impact
-        for line in lines:
-            if line.strip().startswith('#') or not line.strip():
+        # Count function calls from the parsed AST and calculate VPI impact
+        for call in parse_vrl(vrl_code).calls():
+            # Table keys may be the infallible form (e.g. "split!")
+            func = call.qualified_name if call.qualified_name in self.function_vpi_impact else call.name
+            vpi_impact = self.function_vpi_impact.get(func)
+            if vpi_impact is None:
                 continue
-                
-            for func, vpi_impact in self.function_vpi_impact.items():
-                if func in line:
-                    function_calls.append((func, vpi_impact))
-                    # VPI cost is inverse of VPI impact
-                    total_vpi_cost += (1.0 / vpi_impact) if vpi_impact > 0 else 1.0
+            function_calls.append((func, vpi_impact))
+            # VPI cost is inverse of VPI impact
+            total_vpi_cost += (1.0 / vpi_impact) if vpi_impact > 0 else 1.0
         
         # Estimate events per CPU percent based on function VPI impacts
         if total_vpi_cost > 0:
@@ -265,12 +299,47 @@ class DFEVRLPerformanceOptimizer:
         # Get configuration
         perf_config = self.config.get("performance", {})
         self.max_iterations = perf_config.get("max_iterations", 10)
-        self.iteration_delay = perf_config.get("iteration_delay", 2)
         self.cost_threshold = perf_config.get("cost_threshold", 5.0)  # Max $5 per VRL
         self.default_optimize_for = perf_config.get("optimize_for", "cpu_efficiency")
         self.candidate_count = perf_config.get("candidate_count", 3)
         self.candidate_strategies = perf_config.get("candidate_strategies", [])
         
+        # Static cost model prunes obviously slow candidates before Vector benchmarks
+        cost_model_config = perf_config.get("cost_model", {})
+        self.cost_model_enabled = cost_model_config.get("enabled", True)
+        self.cost_model_prune_ratio = cost_model_config.get("prune_ratio", 0.5)
+        self.cost_model = VRLCostModel(
+            self.optimizer.function_vpi_impact,
+            calibration_file=cost_model_config.get("calibration_file")
+        )
+        
+        # Branch profiler feeds measured hot spots into LLM refinement
+        profiling_config = perf_config.get("profiling", {})
+        self.profiling_enabled = profiling_config.get("enabled", True)
+        self.profiler = VRLProfiler(
+            self.cost_model,
+            engine=profiling_config.get("engine", "pyvrl"),
+            max_events=profiling_config.get("max_events", DEFAULT_PROFILE_EVENTS)
+        )
+        
+        # Successive-halving tournament over candidates before improvement cycles
+        tournament_config = perf_config.get("tournament", {})
+        self.tournament_enabled = tournament_config.get("enabled", True)
+        self.tournament_keep_fraction = tournament_config.get("keep_fraction", 0.5)
+        self.tournament_quick_events = tournament_config.get("quick_events", DEFAULT_QUICK_EVENTS)
+        self.tournament_budgets = sorted(tournament_config.get("benchmark_events", DEFAULT_TOURNAMENT_BUDGETS))
+        
+        # Durable checkpoints so interrupted sessions can resume without re-spending
+        checkpoint_config = perf_config.get("checkpoint", {})
+        self.checkpoint_enabled = checkpoint_config.get("enabled", True)
+        self.checkpoint_dir = checkpoint_config.get("directory")
+        self.checkpoint: Optional[SessionCheckpoint] = None
+        self._checkpoint_state: Dict[str, Any] = {}
+        
+        # Benchmarked winners are registered with their VPI for reuse
+        registry_enabled = self.config.get("parser_registry", {}).get("enabled", True)
+        self.registry = get_parser_registry() if registry_enabled else None
+        
         logger.info(f"🎯 VRL Performance Optimization Session: {self.session_id}")
         logger.info(f"   Max iterations: {self.max_iterations}")
         logger.info(f"   Cost threshold: ${self.cost_threshold}")
@@ -282,15 +351,21 @@ class DFEVRLPerformanceOptimizer:
                                      log_file: str,
                                      device_type: str = None,
                                      optimize_for: str = None,
-                                     baseline_vrl: str = None) -> Tuple[str, Dict[str, Any]]:
+                                     baseline_vrl: str = None,
+                                     resume: bool = False) -> Tuple[str, Dict[str, Any]]:
         """
         Run complete performance optimization cycle
         
+        Progress is checkpointed after every step (see performance.checkpoint);
+        with resume=True a matching checkpoint's baseline, strategies,
+        candidates, benchmarks and improvement cycles are reused.
+        
         Args:
             log_file: Path to log file
             device_type: Optional device type hint
             optimize_for: "cpu_efficiency", "throughput", or "balanced" (defaults to config)
             baseline_vrl: Optional working VRL to use as starting point
+            resume: Continue from the last checkpoint for this log file
             
         Returns:
             Tuple of (optimized_vrl_code, optimization_metrics)
@@ -312,17 +387,19 @@ class DFEVRLPerformanceOptimizer:
         if not device_type:
             device_type = self._detect_device_type(log_path.name)
         
-        # Stream sample data efficiently
-        sample_logs = self._stream_sample_logs(log_path)
+        state = self._open_checkpoint(log_path, device_type, optimize_for, resume)
+        
+        # Stream sample data efficiently (a resumed session keeps its original sample)
+        sample_logs = state.get("sample_logs")
+        if sample_logs is None:
+            sample_logs = self._stream_sample_logs(log_path)
         logger.info(f"   Sample size: {len(sample_logs.split())} lines")
         
-        best_vrl = None
-        best_performance = None
         total_cost = 0.0
-        candidates = []
+        candidates = [VRLCandidate.from_dict(c) for c in state.get("candidates", [])]
         
         # Step 0: Establish candidate_baseline from baseline_vrl or baseline_stage
-        candidate_baseline = baseline_vrl  # Use provided baseline_vrl if available
+        candidate_baseline = baseline_vrl or state.get("candidate_baseline")
         
         if not candidate_baseline:
             if not hasattr(self, '_candidate_baseline'):
@@ -347,21 +424,32 @@ class DFEVRLPerformanceOptimizer:
                     return "", self._generate_session_metrics(0, [])
             else:
                 candidate_baseline = getattr(self, '_candidate_baseline', None)
-        else:
+        elif baseline_vrl:
             logger.info("📋 Using provided baseline_vrl as candidate_baseline")
+        else:
+            logger.info("📋 Using candidate_baseline from checkpoint")
+        if not state:
+            self._save_checkpoint("baseline", candidates, sample_logs=sample_logs,
+                                  candidate_baseline=candidate_baseline)
         
         # Step 1: Generate candidate strategies using candidate_baseline
-        logger.info(f"🎯 Performance_stage: Generating {self.candidate_count} candidate strategies...")
-        if candidate_baseline:
-            logger.info("📋 Using candidate_baseline from baseline_stage for optimization")
-        
-        strategies = self.llm_client.generate_candidate_strategies(
-            sample_logs=sample_logs,
-            device_type=device_type,
-            candidate_count=self.candidate_count
-        )
-        # Use actual LiteLLM cost if available
-        strategy_cost = getattr(self.llm_client, 'last_completion_cost', 0) or 0
+        if state.get("strategies") is not None:
+            strategies = state["strategies"]
+            strategy_cost = state.get("strategy_cost", 0.0)
+            logger.info(f"🎯 Performance_stage: Reusing {len(strategies)} checkpointed candidate strategies")
+        else:
+            logger.info(f"🎯 Performance_stage: Generating {self.candidate_count} candidate strategies...")
+            if candidate_baseline:
+                logger.info("📋 Using candidate_baseline from baseline_stage for optimization")
+            
+            strategies = self.llm_client.generate_candidate_strategies(
+                sample_logs=sample_logs,
+                device_type=device_type,
+                candidate_count=self.candidate_count
+            )
+            # Use actual LiteLLM cost if available
+            strategy_cost = getattr(self.llm_client, 'last_completion_cost', 0) or 0
+            self._save_checkpoint("strategies", candidates, strategies=strategies, strategy_cost=strategy_cost)
         total_cost += strategy_cost
         
         logger.info("📋 Generated strategies:")
@@ -372,7 +460,9 @@ class DFEVRLPerformanceOptimizer:
         logger.info(f"\n🚀 Generating and validating {len(strategies)} VRL candidates in parallel...")
         
         candidates = self._generate_and_validate_candidates_parallel(
-            strategies, sample_logs, device_type, total_cost, candidate_baseline
+            strategies, sample_logs, device_type, total_cost, candidate_baseline,
+            completed=candidates,
+            on_candidate=lambda done: self._save_checkpoint("candidates", done)
         )
         total_cost += sum(c.total_cost for c in candidates)
         
@@ -384,34 +474,42 @@ class DFEVRLPerformanceOptimizer:
             logger.error("❌ No valid VRL candidates after parallel validation!")
             return "", self._generate_session_metrics(total_cost, [c.__dict__ for c in candidates])
         
-        # Run performance tests serially to avoid interference
-        for i, candidate in enumerate(valid_candidates, 1):
-            logger.info(f"🚀 Performance testing candidate {i}/{len(valid_candidates)}: {candidate.strategy['name']}")
-            
-            try:
-                performance = self._measure_vrl_performance(candidate.vrl_code, sample_logs)
-                candidate.current_performance = performance
-                candidate.performance_history.append(performance)
-                
-                tier = self._classify_performance_tier(performance.vrl_performance_index)
-                logger.info(f"   📊 VPI: {performance.vrl_performance_index:,} ({tier})")
-                
-            except Exception as e:
-                logger.warning(f"   Performance test failed: {e}")
+        # Successive-halving tournament: static estimate, quick PyVRL run, then
+        # progressively longer Vector benchmarks for the top fraction only
+        sample_events = sample_events_from_logs(sample_logs)
+        if state.get("benchmark") is not None:
+            valid_candidates = [candidates[i] for i in state["benchmark"]]
+        else:
+            valid_candidates = self._run_tournament(
+                valid_candidates, sample_logs, sample_events, optimize_for,
+                on_measurement=lambda: self._save_checkpoint("tournament", candidates)
+            )
+            benchmark = [self._candidate_index(candidates, c) for c in valid_candidates]
+            self._save_checkpoint("benchmarks", candidates, benchmark=benchmark)
         
-        # Step 4: Iterative improvement cycles with 5% threshold
-        logger.info(f"\n🔄 Starting iterative improvement cycles...")
+        # Step 4: Iterative improvement cycles with 5% threshold (tournament survivors only)
+        logger.info(f"\n🔄 Starting iterative improvement cycles for {len(valid_candidates)} candidate(s)...")
         improved_candidates = self._run_improvement_cycles(
-            valid_candidates, sample_logs, device_type, optimize_for
+            valid_candidates, sample_logs, device_type, optimize_for,
+            progress=state.get("improvement"),
+            on_progress=lambda progress: self._save_checkpoint("improvement", candidates, improvement=progress)
         )
+        self.cost_model.save_calibration()
         
         # Final ranking and selection
         final_candidates = sorted(improved_candidates, 
                                 key=lambda c: c.latest_vpi, 
                                 reverse=True)
+        final_candidates += [c for c in candidates if not any(c is f for f in final_candidates)]
         
         self.end_time = datetime.now()
         winner = final_candidates[0]
+        self._save_checkpoint("complete", candidates)
+        if self.registry is not None and winner.is_valid and winner.current_performance:
+            try:
+                self.registry.register(winner.vrl_code, sample_logs, device_type, vpi=winner.latest_vpi)
+            except Exception as e:
+                logger.warning(f"Could not register optimized parser: {e}")
         logger.success(f"\n🎯 PERFORMANCE STAGE SUCCESS: {winner.strategy['name']} optimized VRL achieved!")
         logger.info(f"   Winner VPI: {winner.latest_vpi:,} ({self._classify_performance_tier(winner.latest_vpi)})")
         logger.info(f"   Total cost: ${winner.total_cost:.4f}")
@@ -419,6 +517,79 @@ class DFEVRLPerformanceOptimizer:
         
         return winner.vrl_code, self._generate_session_metrics(total_cost, [c.__dict__ for c in final_candidates])
     
+    def _open_checkpoint(self,
+                         log_path: Path,
+                         device_type: str,
+                         optimize_for: str,
+                         resume: bool) -> Dict[str, Any]:
+        """
+        Attach this session to the log file's checkpoint
+        
+        Args:
+            log_path: Log file being optimized
+            device_type: Resolved device type
+            optimize_for: Optimization target
+            resume: Reuse a matching checkpoint instead of starting over
+            
+        Returns:
+            Session state (empty dict for a fresh session)
+        """
+        self.checkpoint = None
+        self._checkpoint_state = {}
+        if not self.checkpoint_enabled:
+            if resume:
+                logger.warning("⚠️ Checkpoints are disabled (performance.checkpoint.enabled) - starting fresh")
+            return {}
+        
+        self.checkpoint = SessionCheckpoint.for_source(log_path, self.checkpoint_dir)
+        identity = {
+            "source": source_fingerprint(log_path),
+            "device_type": device_type,
+            "optimize_for": optimize_for,
+        }
+        self._checkpoint_state = dict(identity, session_id=self.session_id)
+        if not resume:
+            return {}
+        
+        state = self.checkpoint.load()
+        if state is None:
+            logger.info(f"📂 No checkpoint at {self.checkpoint.path} - starting fresh")
+            return {}
+        mismatched = [key for key, value in identity.items() if state.get(key) != value]
+        if mismatched:
+            logger.warning(f"⚠️ Checkpoint {self.checkpoint.path} does not match this run "
+                           f"({', '.join(mismatched)} changed) - starting fresh")
+            return {}
+        
+        self.session_id = state.get("session_id", self.session_id)
+        self._checkpoint_state = dict(state)
+        logger.info(f"📂 Resuming {self.session_id} from checkpoint (stage: {state.get('stage')}, "
+                    f"{len(state.get('candidates', []))} candidates, ${state.get('total_cost', 0):.4f} already spent)")
+        return state
+    
+    def _save_checkpoint(self, stage: str, candidates: List[VRLCandidate], **updates):
+        """
+        Write session progress to the checkpoint (no-op when checkpoints are off)
+        
+        Args:
+            stage: Last completed step
+            candidates: All candidates generated so far
+            **updates: Other state fields to set
+        """
+        if self.checkpoint is None:
+            return
+        state = self._checkpoint_state
+        state.update(updates)
+        state["stage"] = stage
+        state["candidates"] = [c.to_dict() for c in candidates]
+        state["total_cost"] = state.get("strategy_cost", 0.0) + sum(c.total_cost for c in candidates)
+        self.checkpoint.save(state)
+    
+    @staticmethod
+    def _candidate_index(candidates: List[VRLCandidate], candidate: VRLCandidate) -> int:
+        """Position of candidate (by identity) in candidates"""
+        return next(i for i, c in enumerate(candidates) if c is candidate)
+    
     def _stream_sample_logs(self, log_path: Path, max_lines: int = 1000) -> str:
         """Efficiently stream sample logs using dask/streaming utilities"""
         try:
@@ -432,6 +603,9 @@ class DFEVRLPerformanceOptimizer:
                 if len(samples) >= max_lines:
                     break
             
+            # Drop repeated lines so the budget goes to distinct events
+            samples = sample_unique_lines(samples, max_lines)
+            
             logger.info(f"Streamed {len(samples)} representative samples from {log_path.name}")
             return '\n'.join(samples)
             
@@ -491,6 +665,15 @@ Focus on:
 2. Adding early exit conditions
 3. Minimizing memory allocations
 4. Avoiding expensive operations in tight loops
+"""
+            profile = self._profile_vrl(current_vrl, sample_logs)
+            if profile:
+                performance_feedback += f"""
+Measured profile of the current VRL on the sample logs:
+{profile.format_summary()}
+
+Put the most frequently taken branches first, move work out of hot
+statements where possible and drop code that is never reached.
 """
         else:
             performance_feedback = f"""
@@ -507,8 +690,20 @@ Focus on:
         # Use the fix_vrl_error method instead of a non-existent refine_vrl method
         return self.llm_client.fix_vrl_error(current_vrl, performance_feedback, sample_logs)
     
-    def _measure_vrl_performance(self, vrl_code: str, sample_logs: str) -> PerformanceBaseline:
-        """Measure VRL performance using actual Vector CLI execution"""
+    def _profile_vrl(self, vrl_code: str, sample_logs: str) -> Optional[VRLProfile]:
+        """Branch/statement profile of VRL on the sample logs (None if disabled or not runnable)"""
+        if not self.profiling_enabled or not sample_logs:
+            return None
+        profile = self.profiler.profile_logs(vrl_code, sample_logs)
+        if profile:
+            logger.debug(f"🔬 Profiled VRL on {profile.events} events ({len(profile.branches)} branches)")
+        return profile
+    
+    def _measure_vrl_performance(self,
+                                 vrl_code: str,
+                                 sample_logs: str,
+                                 max_events: int = DEFAULT_BENCHMARK_EVENTS) -> PerformanceBaseline:
+        """Measure VRL performance using actual Vector CLI execution (samples repeated up to max_events)"""
         import tempfile
         import subprocess
         import psutil
@@ -527,8 +722,9 @@ Focus on:
                 output_file = temp_path / "output.ndjson"
                 config_file = temp_path / "vector.yaml"
                 
-                # Write sample data (limit to 1000 events for quick test)
-                lines = sample_logs.strip().split('\n')[:1000]
+                # Write sample data, cycling the samples for longer benchmarks
+                samples = sample_logs.strip().split('\n')
+                lines = [samples[i % len(samples)] for i in range(max_events)]
                 with open(input_file, 'w') as f:
                     for line in lines:
                         # Convert to NDJSON if needed
@@ -677,9 +873,9 @@ Focus on:
         except Exception as e:
             logger.warning(f"Vector CLI performance measurement failed: {e}")
             
-            # Fallback to estimated performance
-            perf_analysis = self.optimizer.analyze_performance(vrl_code)
-            events_per_cpu_percent = perf_analysis["estimated_events_per_cpu_percent"]
+            # Fallback to the (calibrated) static cost model estimate
+            estimate = self.cost_model.estimate(vrl_code, sample_events_from_logs(sample_logs))
+            events_per_cpu_percent = estimate.events_per_cpu_percent
             vpi = self._calculate_vrl_performance_index(events_per_cpu_percent)
             
             return PerformanceBaseline(
@@ -689,7 +885,8 @@ Focus on:
                 events_per_cpu_percent=events_per_cpu_percent,
                 p99_latency_ms=5.0,  # Placeholder
                 errors_count=0,
-                vrl_performance_index=vpi
+                vrl_performance_index=vpi,
+                measured=False
             )
     
     def _is_better_performance(self, 
@@ -946,16 +1143,30 @@ Focus on:
                                                   sample_logs: str,
                                                   device_type: str,
                                                   initial_cost: float,
-                                                  baseline_vrl: str = None) -> List[VRLCandidate]:
-        """Generate and validate VRL candidates in parallel using threading"""
+                                                  baseline_vrl: str = None,
+                                                  completed: List[VRLCandidate] = None,
+                                                  on_candidate: Callable[[List[VRLCandidate]], None] = None) -> List[VRLCandidate]:
+        """
+        Generate and validate VRL candidates in parallel using threading
+        
+        Strategies that already have a candidate in completed (restored from
+        a checkpoint) are not generated again; on_candidate is called with the
+        full candidate list each time a new one finishes.
+        """
         from concurrent.futures import as_completed
         from .. import get_thread_pool
         
         executor = get_thread_pool()
         future_to_strategy = {}
+        candidates = list(completed or [])
+        done_strategies = [c.strategy for c in candidates]
         
         # Submit parallel VRL generation tasks with baseline
         for strategy in strategies:
+            if strategy in done_strategies:
+                done_strategies.remove(strategy)
+                logger.info(f"   ⏭️ {strategy['name']}: restored from checkpoint")
+                continue
             future = executor.submit(
                 self._generate_and_validate_single_candidate,
                 strategy, sample_logs, device_type, baseline_vrl
@@ -963,11 +1174,12 @@ Focus on:
             future_to_strategy[future] = strategy
         
         # Collect results as they complete
-        candidates = []
         for future in as_completed(future_to_strategy):
             try:
                 candidate = future.result()
                 candidates.append(candidate)
+                if on_candidate:
+                    on_candidate(candidates)
                 
                 status = "✅ Valid" if candidate.is_valid else "❌ Invalid"
                 logger.info(f"   {status} {candidate.strategy['name']}: ${candidate.total_cost:.2f}")
@@ -1004,6 +1216,7 @@ Focus on:
             # Validation and fixing loop (same as original but per-candidate)
             for attempt in range(3):  # Max 3 validation attempts per candidate
                 is_valid, error_message = self.validator.validate(candidate.vrl_code, sample_logs)
+                self.error_fixer.record_fix_outcome(candidate.vrl_code, None if is_valid else error_message)
                 
                 validation_attempt = {
                     "attempt": attempt + 1,
@@ -1018,7 +1231,7 @@ Focus on:
                     break
                 
                 # Try local fixes first
-                fixed_vrl = self.error_fixer.fix_locally(candidate.vrl_code, error_message)
+                fixed_vrl = self.error_fixer.fix_locally(candidate.vrl_code, error_message, sample_logs)
                 if fixed_vrl and fixed_vrl != candidate.vrl_code:
                     candidate.vrl_code = fixed_vrl
                     validation_attempt["local_fix_applied"] = True
@@ -1031,6 +1244,7 @@ Focus on:
                             candidate.vrl_code, error_message, sample_logs
                         )
                         if llm_fixed and llm_fixed != candidate.vrl_code:
+                            self.error_fixer.record_llm_fix(candidate.vrl_code, llm_fixed, error_message)
                             candidate.vrl_code = llm_fixed
                             # Use actual LiteLLM cost if available
                             fix_cost = getattr(self.llm_client, 'last_completion_cost', 0) or 0
@@ -1050,18 +1264,31 @@ Focus on:
                                candidates: List[VRLCandidate],
                                sample_logs: str,
                                device_type: str, 
-                               optimize_for: str) -> List[VRLCandidate]:
-        """Run iterative improvement cycles until <5% improvement threshold"""
+                               optimize_for: str,
+                               progress: Dict[str, Any] = None,
+                               on_progress: Callable[[Dict[str, Any]], None] = None) -> List[VRLCandidate]:
+        """
+        Run iterative improvement cycles until <5% improvement threshold
+        
+        progress ({"cycle": completed cycles, "done"/"active": candidate
+        positions handled/still improving in the cycle after it}) resumes a
+        checkpointed run; on_progress receives it after every candidate.
+        """
         
         improvement_threshold = 0.05  # 5%
         max_improvement_cycles = 5
+        sample_events = sample_events_from_logs(sample_logs)
+        progress = progress or {}
+        done = set(progress.get("done", []))
+        active = list(progress.get("active", []))
         
-        for cycle in range(1, max_improvement_cycles + 1):
+        for cycle in range(progress.get("cycle", 0) + 1, max_improvement_cycles + 1):
             logger.info(f"\n🔄 Improvement Cycle {cycle}/{max_improvement_cycles}")
             
-            active_candidates = []
-            
-            for candidate in candidates:
+            for position, candidate in enumerate(candidates):
+                if position in done:
+                    continue  # Handled before the checkpoint was written
+                
                 if candidate.improvement_cycle >= max_improvement_cycles:
                     continue  # Skip candidates that hit max cycles
                 
@@ -1085,9 +1312,11 @@ Focus on:
                         # Validate improved VRL
                         is_valid, error_message = self.validator.validate(improved_vrl, sample_logs)
                         
-                        if is_valid:
+                        if is_valid and not self._predicted_regression(candidate, improved_vrl, sample_events):
                             # Test performance of improvement
-                            new_performance = self._measure_vrl_performance(improved_vrl, sample_logs)
+                            new_performance = self._measure_vrl_performance(
+                                improved_vrl, sample_logs, max_events=self._final_benchmark_events())
+                            self._calibrate_cost_model(improved_vrl, new_performance, sample_events)
                             
                             # Calculate improvement
                             old_vpi = candidate.latest_vpi
@@ -1107,21 +1336,252 @@ Focus on:
                                 logger.success(f"     ✨ Improvement accepted!")
                             else:
                                 logger.info(f"     ⚠️ Minimal improvement ({improvement_pct:.1f}%), keeping original")
+                        elif is_valid:
+                            logger.info(f"     ⏭️ Static cost model predicts a slowdown, skipping benchmark")
                         else:
                             logger.warning(f"     ❌ Improved VRL failed validation: {self._extract_error_code(error_message)}")
                     
-                    active_candidates.append(candidate)
+                    active.append(position)
                     
                 except Exception as e:
                     logger.warning(f"   Improvement failed for {candidate.strategy['name']}: {e}")
+                
+                done.add(position)
+                if on_progress:
+                    on_progress({"cycle": cycle - 1, "done": sorted(done), "active": active})
             
             # Stop if no candidates are actively improving
-            if not active_candidates:
+            if not active:
                 logger.info(f"🏁 All candidates below improvement threshold, stopping cycles")
                 break
+            
+            done, active = set(), []
+            if on_progress:
+                on_progress({"cycle": cycle, "done": [], "active": []})
         
+        if on_progress:
+            on_progress({"cycle": max_improvement_cycles, "done": [], "active": []})
         return candidates
     
+    def _prune_by_static_cost(self,
+                              candidates: List[VRLCandidate],
+                              sample_events: List[Dict[str, Any]]) -> List[VRLCandidate]:
+        """
+        Drop candidates predicted to be far slower than the best one
+        
+        Args:
+            candidates: Valid candidates awaiting benchmarks
+            sample_events: Events used for branch probabilities
+            
+        Returns:
+            Candidates worth benchmarking (never empty if input is non-empty)
+        """
+        for candidate in candidates:
+            if candidate.predicted_events_per_cpu_percent:
+                continue  # Estimated before a checkpoint; calibration may have moved since
+            estimate = self.cost_model.estimate(candidate.vrl_code, sample_events)
+            candidate.predicted_events_per_cpu_percent = estimate.events_per_cpu_percent
+            hot = ", ".join(name for name, _ in estimate.hot_functions[:3]) or "none"
+            logger.info(f"   📐 {candidate.strategy['name']}: predicted {estimate.events_per_cpu_percent:,.0f} events/CPU% (hot: {hot})")
+        
+        if not self.cost_model_enabled or len(candidates) < 2:
+            return candidates
+        
+        best = max(c.predicted_events_per_cpu_percent for c in candidates)
+        cutoff = best * self.cost_model_prune_ratio
+        kept = [c for c in candidates if c.predicted_events_per_cpu_percent >= cutoff]
+        
+        for candidate in candidates:
+            if candidate not in kept:
+                logger.info(f"   ✂️ Pruned {candidate.strategy['name']}: predicted "
+                            f"{candidate.predicted_events_per_cpu_percent:,.0f} < {cutoff:,.0f} events/CPU%")
+        return kept
+    
+    def _run_tournament(self,
+                        candidates: List[VRLCandidate],
+                        sample_logs: str,
+                        sample_events: List[Dict[str, Any]],
+                        optimize_for: str,
+                        on_measurement: Callable[[], None] = None) -> List[VRLCandidate]:
+        """
+        Successive-halving tournament deciding which candidates get full benchmarks
+        
+        Rounds get more expensive and see fewer candidates: static cost
+        estimate (prune ratio), quick PyVRL throughput, then Vector benchmarks
+        of increasing length (tournament.benchmark_events). Each round keeps
+        the top keep_fraction; the last survivor(s) get the longest benchmark,
+        which becomes their current_performance. With the tournament disabled
+        every pruned survivor gets one DEFAULT_BENCHMARK_EVENTS benchmark.
+        Round results are kept in candidate.tournament, so a resumed run
+        skips measurements it already has.
+        
+        Args:
+            candidates: Valid candidates
+            sample_logs: Sample log data for benchmarks
+            sample_events: Events for static estimates and the PyVRL round
+            optimize_for: Ranking target ("throughput" ranks by events/sec, otherwise VPI)
+            on_measurement: Called after each measurement (checkpointing)
+            
+        Returns:
+            Survivors, best first
+        """
+        survivors = self._prune_by_static_cost(candidates, sample_events)
+        budgets = self.tournament_budgets if self.tournament_enabled else [self._final_benchmark_events()]
+        
+        if self.tournament_enabled and len(survivors) > 1:
+            scores = {}
+            for candidate in survivors:
+                scores[id(candidate)] = self._tournament_result(
+                    candidate, "pyvrl", lambda c=candidate: self._quick_throughput(c.vrl_code, sample_events),
+                    lambda events_per_second: events_per_second)
+                if on_measurement:
+                    on_measurement()
+            if None in scores.values():
+                logger.info("   ⏭️ Quick PyVRL round unavailable for some candidates, skipping it")
+            else:
+                survivors = self._promote(survivors, lambda c: scores[id(c)], "PyVRL events/sec")
+        
+        for round_number, events in enumerate(budgets):
+            final = round_number == len(budgets) - 1 or len(survivors) == 1
+            events = budgets[-1] if final else events
+            logger.info(f"🏁 Tournament round: Vector benchmark with {events:,} events for "
+                        f"{len(survivors)} candidate(s)")
+            
+            for i, candidate in enumerate(survivors, 1):
+                logger.info(f"🚀 Performance testing candidate {i}/{len(survivors)}: {candidate.strategy['name']}")
+                self._tournament_result(
+                    candidate, f"vector_{events}",
+                    lambda c=candidate: self._benchmark_candidate(c, sample_logs, events, final, sample_events),
+                    lambda performance: self._tournament_score(performance, optimize_for))
+                if on_measurement:
+                    on_measurement()
+            
+            if final:
+                break
+            survivors = self._promote(
+                survivors,
+                lambda c, name=f"vector_{events}": next((r["score"] for r in c.tournament if r["round"] == name), 0),
+                f"{'events/sec' if optimize_for == 'throughput' else 'VPI'} over {events:,} events")
+        
+        return sorted(survivors, key=lambda c: self._tournament_score(c.current_performance, optimize_for)
+                      if c.current_performance else 0, reverse=True)
+    
+    def _final_benchmark_events(self) -> int:
+        """Vector benchmark length behind current_performance (comparable across cycles)"""
+        return self.tournament_budgets[-1] if self.tournament_enabled else DEFAULT_BENCHMARK_EVENTS
+    
+    def _tournament_result(self,
+                           candidate: VRLCandidate,
+                           round_name: str,
+                           measure: Callable[[], Any],
+                           score: Callable[[Any], float]) -> Optional[float]:
+        """
+        Score of a candidate in a tournament round, measured only if not recorded yet
+        
+        Args:
+            candidate: Candidate (round recorded in candidate.tournament)
+            round_name: Round identifier
+            measure: Runs the measurement
+            score: Ranking value of the measurement
+            
+        Returns:
+            Score, or None if the measurement failed or was unavailable
+        """
+        for record in candidate.tournament:
+            if record["round"] == round_name:
+                logger.info(f"   ⏭️ {candidate.strategy['name']}: {round_name} already measured")
+                return record["score"]
+        
+        try:
+            result = measure()
+        except Exception as e:
+            logger.warning(f"   Performance test failed: {e}")
+            result = None
+        record = {"round": round_name, "score": score(result) if result is not None else None}
+        if isinstance(result, PerformanceBaseline):
+            record["result"] = asdict(result)
+        candidate.tournament.append(record)
+        return record["score"]
+    
+    def _benchmark_candidate(self,
+                             candidate: VRLCandidate,
+                             sample_logs: str,
+                             events: int,
+                             final: bool,
+                             sample_events: List[Dict[str, Any]]) -> PerformanceBaseline:
+        """Vector benchmark of a candidate; the final round's result becomes its current performance"""
+        performance = self._measure_vrl_performance(candidate.vrl_code, sample_logs, max_events=events)
+        tier = self._classify_performance_tier(performance.vrl_performance_index)
+        logger.info(f"   📊 VPI: {performance.vrl_performance_index:,} ({tier})")
+        if final:
+            candidate.current_performance = performance
+            candidate.performance_history.append(performance)
+            self._calibrate_cost_model(candidate.vrl_code, performance, sample_events)
+        return performance
+    
+    def _promote(self,
+                 candidates: List[VRLCandidate],
+                 score: Callable[[VRLCandidate], float],
+                 label: str) -> List[VRLCandidate]:
+        """Keep the top keep_fraction of candidates by score (at least one)"""
+        ranked = sorted(candidates, key=lambda c: score(c) or 0, reverse=True)
+        keep = max(1, math.ceil(len(ranked) * self.tournament_keep_fraction))
+        for candidate in ranked[keep:]:
+            logger.info(f"   ✂️ Eliminated {candidate.strategy['name']}: {score(candidate) or 0:,.0f} {label}")
+        return ranked[:keep]
+    
+    @staticmethod
+    def _tournament_score(performance: PerformanceBaseline, optimize_for: str) -> float:
+        """Ranking value of a measurement for the optimization target"""
+        if optimize_for == "throughput":
+            return performance.events_per_second
+        return performance.vrl_performance_index
+    
+    def _quick_throughput(self, vrl_code: str, sample_events: List[Dict[str, Any]]) -> Optional[float]:
+        """
+        In-process PyVRL events per CPU second over the sample events
+        
+        Returns:
+            Events/sec, or None if PyVRL is unavailable or cannot compile the VRL
+        """
+        try:
+            import pyvrl
+            transform = pyvrl.Transform(vrl_code)
+        except Exception as e:
+            logger.debug(f"Quick PyVRL benchmark unavailable: {e}")
+            return None
+        
+        events = sample_events or [{"message": ""}]
+        batch = [copy.deepcopy(events[i % len(events)]) for i in range(self.tournament_quick_events)]
+        start = time.process_time()
+        for event in batch:
+            try:
+                transform.remap(event)
+            except Exception:
+                pass  # Aborting events still cost CPU and count
+        elapsed = max(time.process_time() - start, 1e-6)
+        return len(batch) / elapsed
+    
+    def _predicted_regression(self,
+                              candidate: VRLCandidate,
+                              new_vrl: str,
+                              sample_events: List[Dict[str, Any]]) -> bool:
+        """True if the static cost model predicts new_vrl is clearly slower than the candidate"""
+        if not self.cost_model_enabled:
+            return False
+        
+        current = self.cost_model.estimate(candidate.vrl_code, sample_events).events_per_cpu_percent
+        predicted = self.cost_model.estimate(new_vrl, sample_events).events_per_cpu_percent
+        return predicted < current * self.cost_model_prune_ratio
+    
+    def _calibrate_cost_model(self,
+                              vrl_code: str,
+                              performance: PerformanceBaseline,
+                              sample_events: List[Dict[str, Any]]):
+        """Feed a real Vector measurement back into the static cost model"""
+        if performance.measured and performance.events_per_cpu_percent > 0:
+            self.cost_model.record_measurement(vrl_code, performance.events_per_cpu_percent, sample_events)
+    
     def _measure_vector_startup_time(self) -> float:
         """Measure Vector CLI startup time with minimal passthrough config"""
         import tempfile
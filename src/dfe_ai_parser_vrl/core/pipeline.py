@@ -0,0 +1,122 @@
+"""
+Pipelined generation scheduler
+
+DFEVRLGenerator.generate runs validate -> local fix -> LLM fix strictly in
+series, so across many sources the CPU idles during LLM calls and the
+network idles during Vector/PyVRL validation. This scheduler splits each
+job into the generator's two step types and runs them on separate pools:
+
+- LLM stage (I/O bound): initial generation, cycle-breaking regeneration
+  and LLM error fixes
+- Validation stage (CPU bound): validation plus the free local fixes
+
+A job alternates between the stages' queues, so while one source waits on
+the LLM another is being validated, and batch throughput approaches
+max(LLM rate, validation rate) instead of their sum.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .. import get_max_threads
+
+# Concurrent LLM requests when not configured
+DEFAULT_LLM_WORKERS = 4
+
+
+class GenerationPipeline:
+    """Runs generation jobs through separate LLM and validation worker pools"""
+
+    def __init__(self,
+                 generator,
+                 llm_workers: int = DEFAULT_LLM_WORKERS,
+                 validation_workers: Optional[int] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            generator: DFEVRLGenerator (or any object with its start_job/llm_step/
+                validation_step/finish_job step API), shared by all jobs
+            llm_workers: Threads for the I/O-bound LLM stage
+            validation_workers: Threads for the CPU-bound validation stage
+                (default: module thread count)
+        """
+        self.generator = generator
+        self.llm_workers = max(1, llm_workers)
+        self.validation_workers = max(1, validation_workers or get_max_threads())
+        self._llm_pool = ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="dfe-llm")
+        self._validation_pool = ThreadPoolExecutor(max_workers=self.validation_workers,
+                                                   thread_name_prefix="dfe-validate")
+        self._lock = threading.Lock()
+        self.stage_counts: Dict[str, int] = {"llm": 0, "validation": 0}
+
+    def submit(self,
+               sample_logs: str,
+               device_type: str = None,
+               validate: bool = True,
+               fix_errors: bool = True,
+               baseline_vrl: str = None) -> Future:
+        """
+        Queue a generation job
+
+        Args:
+            sample_logs: Sample log data
+            device_type: Optional device type hint
+            validate: Whether to validate generated VRL
+            fix_errors: Whether to attempt fixing validation errors
+            baseline_vrl: Existing working VRL to use as baseline/reference
+
+        Returns:
+            Future resolving to (vrl_code, metadata) as returned by generate()
+        """
+        result: Future = Future()
+        try:
+            job = self.generator.start_job(sample_logs, device_type, validate, fix_errors, baseline_vrl)
+        except Exception as e:
+            result.set_exception(e)
+            return result
+        if job.vrl_code is None:
+            self._llm_pool.submit(self._run_stage, "llm", job, result)
+        elif job.validate:
+            # Registered parser reused - straight to validation
+            self._validation_pool.submit(self._run_stage, "validation", job, result)
+        else:
+            result.set_result((job.vrl_code, job.metadata))
+        return result
+
+    def _run_stage(self, stage: str, job, result: Future):
+        """Run one step of a job and queue its next stage (or resolve the job)"""
+        try:
+            if stage == "llm":
+                self.generator.llm_step(job)
+                finished = job.done or not job.validate
+            else:
+                finished = self.generator.validation_step(job)
+            with self._lock:
+                self.stage_counts[stage] += 1
+
+            if finished:
+                outcome = (job.vrl_code, job.metadata) if not job.validate else self.generator.finish_job(job)
+                result.set_result(outcome)
+            elif stage == "llm":
+                self._validation_pool.submit(self._run_stage, "validation", job, result)
+            else:
+                self._llm_pool.submit(self._run_stage, "llm", job, result)
+        except Exception as e:
+            logger.error(f"Pipeline {stage} stage failed for {job.device_type or 'unknown'}: {e}")
+            result.set_exception(e)
+
+    def shutdown(self):
+        """Stop both pools after queued work completes"""
+        # Stages re-queue into each other, so callers wait on job futures first
+        self._llm_pool.shutdown(wait=True)
+        self._validation_pool.shutdown(wait=True)
+
+    def __enter__(self) -> 'GenerationPipeline':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
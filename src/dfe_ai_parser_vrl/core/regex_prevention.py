@@ -6,9 +6,12 @@ which is 50-100x slower than string operations.
 """
 
 import re
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional
 from loguru import logger
 
+from .vrl_ast import parse_vrl
+from .regex_transformer import eliminate_regex
+
 
 class RegexPreventionSystem:
     """Prevents and fixes regex usage in VRL generation"""
@@ -85,22 +88,27 @@ if contains(message_str, "Invalid user ") {
         """Check generated VRL for regex usage"""
         
         violations = []
+        program = parse_vrl(vrl_code)
         
-        # Check for forbidden functions
+        # Check for forbidden functions (actual calls only, not comments or strings)
+        called = set()
+        for call in program.calls():
+            called.add(call.name)
+            called.add(call.qualified_name)
         for func in self.forbidden_regex_functions:
-            if func in vrl_code:
+            if func in called:
                 violations.append(f"FORBIDDEN_FUNCTION: {func}")
         
-        # Check for regex patterns
+        # Check for regex patterns inside string/regex literals
+        literals = [program.source_of(lit) for lit in program.string_literals()]
         for pattern in self.regex_indicators:
-            if re.search(pattern, vrl_code):
+            if any(re.search(pattern, literal) for literal in literals):
                 violations.append(f"REGEX_PATTERN: {pattern}")
         
         # Check for escape sequences in raw strings
-        raw_string_matches = re.findall(r'r["\'][^"\']*["\']', vrl_code)
-        for match in raw_string_matches:
-            if '\\' in match:
-                violations.append(f"RAW_STRING_REGEX: {match}")
+        for literal in program.string_literals():
+            if literal.kind == 'regex' and '\\' in literal.value:
+                violations.append(f"RAW_STRING_REGEX: {program.source_of(literal)}")
         
         has_regex = len(violations) > 0
         
@@ -111,10 +119,23 @@ if contains(message_str, "Invalid user ") {
         
         return has_regex, violations
     
-    def fix_regex_in_vrl(self, vrl_code: str) -> str:
-        """Automatically replace regex patterns with string operations"""
+    def fix_regex_in_vrl(self, vrl_code: str, sample_logs: Optional[str] = None) -> str:
+        """
+        Automatically replace regex patterns with string operations
+        
+        Regex calls are first translated into verified string-operation
+        equivalents; whatever cannot be translated is stripped as before.
         
-        fixed_code = vrl_code
+        Args:
+            vrl_code: VRL code to fix
+            sample_logs: Sample logs used to verify translated parse_regex calls
+            
+        Returns:
+            VRL code without regex functions
+        """
+        fixed_code = eliminate_regex(vrl_code, sample_logs).code
+        if not self.post_generation_check(fixed_code)[0]:
+            return fixed_code
         
         # Replace common regex patterns with string operations
         regex_replacements = [
@@ -205,6 +226,6 @@ def check_vrl_for_regex(vrl_code: str) -> Tuple[bool, List[str]]:
     """Check if VRL contains regex patterns"""
     return _regex_prevention.post_generation_check(vrl_code)
 
-def fix_regex_in_vrl(vrl_code: str) -> str:
-    """Remove regex from VRL code"""
-    return _regex_prevention.fix_regex_in_vrl(vrl_code)
\ No newline at end of file
+def fix_regex_in_vrl(vrl_code: str, sample_logs: Optional[str] = None) -> str:
+    """Replace regex in VRL code with string operations"""
+    return _regex_prevention.fix_regex_in_vrl(vrl_code, sample_logs)
\ No newline at end of file
@@ -0,0 +1,596 @@
+"""
+Regex Elimination Transformer
+
+Rewrites regex calls in generated VRL into string operations instead of
+deleting them (the legacy behaviour of fix_regex_in_vrl):
+
+- match(V, r'literal')       -> contains / starts_with / ends_with / ==
+- match(V, r'^a|^b')         -> (starts_with(V, "a") || starts_with(V, "b"))
+- T = parse_regex!(V, P)     -> split/starts_with chain building the same object
+- T = parse_regex(V, P) ?? D -> same chain, D when the pattern does not match
+
+Only a small regex subset is translated: anchors, literals, (?i) for match,
+and named captures of \\S+, \\d+, [^chars]+, .+?/.*? and .+/.* separated by
+literal delimiters. Literal-only match() rewrites are exact by construction.
+parse_regex rewrites approximate the regex (ASCII whitespace/digits,
+first-occurrence delimiter search), so each one is kept only if the original
+and rewritten programs produce identical events for every sample log.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .cost_model import sample_events_from_logs
+from .equivalence import EquivalenceChecker
+from .vrl_ast import Assign, Binary, Call, Literal, NamedArg, Path, Variable, VRLProgram, parse_vrl
+
+MAX_VERIFY_EVENTS = 200
+WHITESPACE = (' ', '\t', '\n', '\r')
+DIGITS = '0123456789'
+
+_LITERAL_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r'}
+_METACHARS = set('.^$*+?()[]{}|\\')
+_CAPTURE_RE = re.compile(
+    r'\(\?P?<([A-Za-z_]\w*)>(\\S|\\d|\.|\[\^((?:\\.|[^\]\\])+)\])([+*])(\?)?\)'
+)
+_PREFIX_RE = re.compile(r'_rx(\d+)_')
+
+
+class UnsupportedPattern(ValueError):
+    """Regex outside the translatable subset"""
+
+
+@dataclass(frozen=True)
+class Capture:
+    """Named capture group of a single repeated character class"""
+    name: str
+    kind: str            # 'nonspace', 'digit', 'not', 'lazy' (.+? / .*?) or 'any' (.+ / .*)
+    min_one: bool        # '+' rather than '*'
+    excluded: str = ''   # Characters of a [^...] class
+
+    def excludes(self, ch: str) -> bool:
+        """True if the class can never match ch (so a following literal ends the capture)"""
+        if self.kind == 'nonspace':
+            return ch in WHITESPACE
+        if self.kind == 'digit':
+            return ch not in DIGITS
+        if self.kind == 'not':
+            return ch in self.excluded
+        return self.kind == 'lazy'
+
+
+@dataclass
+class RegexPattern:
+    """Parsed regex: alternating literal strings and captures"""
+    elements: List[Union[str, Capture]]
+    anchored_start: bool = False
+    anchored_end: bool = False
+    case_insensitive: bool = False
+
+    @property
+    def is_literal(self) -> bool:
+        return all(isinstance(e, str) for e in self.elements)
+
+    @property
+    def literal(self) -> str:
+        return ''.join(self.elements)
+
+
+def _parse_class(body: str) -> str:
+    """Characters of a negated class body such as ' \\t,'"""
+    chars, i = [], 0
+    while i < len(body):
+        ch = body[i]
+        if ch == '\\':
+            nxt = body[i + 1]
+            if nxt in _LITERAL_ESCAPES:
+                chars.append(_LITERAL_ESCAPES[nxt])
+            elif nxt.isalnum():
+                raise UnsupportedPattern(f"class escape \\{nxt}")
+            else:
+                chars.append(nxt)
+            i += 2
+            continue
+        if ch == '-' and 0 < i < len(body) - 1:
+            raise UnsupportedPattern("character range")
+        if ch in '[&~':
+            raise UnsupportedPattern("nested class")
+        chars.append(ch)
+        i += 1
+    return ''.join(dict.fromkeys(chars))
+
+
+def _parse_capture(match: re.Match) -> Capture:
+    name, atom, class_body, quantifier, lazy = match.groups()
+    min_one = quantifier == '+'
+    if atom == '.':
+        return Capture(name, 'lazy' if lazy else 'any', min_one)
+    if atom == '\\S':
+        return Capture(name, 'nonspace', min_one)
+    if atom == '\\d':
+        return Capture(name, 'digit', min_one)
+    return Capture(name, 'not', min_one, _parse_class(class_body))
+
+
+def parse_pattern(pattern: str) -> RegexPattern:
+    """
+    Parse a regex into the translatable subset
+
+    Args:
+        pattern: Regex source (the body of r'...')
+
+    Returns:
+        RegexPattern with adjacent literals merged
+
+    Raises:
+        UnsupportedPattern: For any construct outside the subset
+    """
+    result = RegexPattern(elements=[])
+    i, n = 0, len(pattern)
+    if pattern.startswith('(?i)'):
+        result.case_insensitive = True
+        i = 4
+    if pattern[i:i + 1] == '^':
+        result.anchored_start = True
+        i += 1
+
+    literal: List[str] = []
+
+    def flush():
+        if literal:
+            result.elements.append(''.join(literal))
+            literal.clear()
+
+    while i < n:
+        ch = pattern[i]
+        if ch == '$' and i == n - 1:
+            result.anchored_end = True
+            i += 1
+        elif ch == '\\':
+            if i + 1 >= n:
+                raise UnsupportedPattern("trailing backslash")
+            nxt = pattern[i + 1]
+            if nxt in _LITERAL_ESCAPES:
+                literal.append(_LITERAL_ESCAPES[nxt])
+            elif nxt.isalnum():
+                raise UnsupportedPattern(f"escape \\{nxt} outside a capture")
+            else:
+                literal.append(nxt)
+            i += 2
+        elif ch == '(':
+            capture = _CAPTURE_RE.match(pattern, i)
+            if not capture:
+                raise UnsupportedPattern(f"group at offset {i}")
+            flush()
+            result.elements.append(_parse_capture(capture))
+            i = capture.end()
+        elif ch in _METACHARS:
+            raise UnsupportedPattern(f"metacharacter {ch!r}")
+        else:
+            literal.append(ch)
+            i += 1
+    flush()
+
+    for previous, current in zip(result.elements, result.elements[1:]):
+        if isinstance(previous, Capture) and isinstance(current, Capture):
+            raise UnsupportedPattern("adjacent captures")
+    return result
+
+
+def vrl_string(value: str) -> str:
+    """Quote a Python string as a VRL string literal"""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"')
+               .replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r'))
+    return f'"{escaped}"'
+
+
+def _split_alternatives(pattern: str) -> List[str]:
+    """Split on top-level unescaped '|' (patterns with groups are not split)"""
+    parts, current, i = [], [], 0
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            current.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if pattern[i] == '|':
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(pattern[i])
+        i += 1
+    parts.append(''.join(current))
+    if len(parts) > 1 and any('(' in part for part in parts):
+        raise UnsupportedPattern("alternation inside groups")
+    return parts
+
+
+def match_condition(value_src: str, pattern: str, repeatable: bool = True) -> str:
+    """
+    String-operation condition equivalent to match(value, r'pattern')
+
+    Args:
+        value_src: VRL source of the matched value
+        pattern: Regex made only of literals, anchors, (?i) and top-level '|'
+        repeatable: Whether value_src may be evaluated more than once
+
+    Returns:
+        VRL boolean expression
+
+    Raises:
+        UnsupportedPattern: If the pattern is not literal-only
+    """
+    flags = ''
+    if pattern.startswith('(?i)'):
+        flags, pattern = '(?i)', pattern[4:]
+    branches = _split_alternatives(pattern)
+    if len(branches) > 1 and not repeatable:
+        raise UnsupportedPattern("alternation over a non-path value")
+
+    conditions = []
+    for branch in branches:
+        parsed = parse_pattern(flags + branch)
+        if not parsed.is_literal or not parsed.literal:
+            raise UnsupportedPattern("match() pattern is not a literal")
+        literal = parsed.literal
+        options = ''
+        if parsed.case_insensitive:
+            if not literal.isascii():
+                raise UnsupportedPattern("case-insensitive non-ASCII literal")
+            options = ', case_sensitive: false'
+        if parsed.anchored_start and parsed.anchored_end:
+            if parsed.case_insensitive:
+                conditions.append(f"downcase({value_src}) == {vrl_string(literal.lower())}")
+            else:
+                conditions.append(f"{value_src} == {vrl_string(literal)}")
+        elif parsed.anchored_start:
+            conditions.append(f"starts_with({value_src}, {vrl_string(literal)}{options})")
+        elif parsed.anchored_end:
+            conditions.append(f"ends_with({value_src}, {vrl_string(literal)}{options})")
+        else:
+            conditions.append(f"contains({value_src}, {vrl_string(literal)}{options})")
+
+    if len(conditions) == 1 and '==' not in conditions[0]:
+        return conditions[0]
+    return f"({' || '.join(conditions)})"
+
+
+def _class_check(capture: Capture, var: str, full: bool) -> Optional[str]:
+    conditions = []
+    if capture.min_one:
+        conditions.append(f'{var} != ""')
+    if full:
+        if capture.kind == 'nonspace':
+            conditions.extend(f"!contains({var}, {vrl_string(ch)})" for ch in WHITESPACE)
+        elif capture.kind == 'not':
+            conditions.extend(f"!contains({var}, {vrl_string(ch)})" for ch in capture.excluded)
+        elif capture.kind == 'digit':
+            stripped = var
+            for digit in DIGITS:
+                stripped = f'replace({stripped}, "{digit}", "")'
+            conditions.append(f'{stripped} == ""')
+        else:
+            conditions.append(f'!contains({var}, "\\n")')
+    return ' && '.join(conditions) or None
+
+
+def parse_regex_statements(prefix: str, value_src: str, pattern: RegexPattern,
+                           value_is_string: bool = False) -> List[str]:
+    """
+    Unindented VRL statements leaving {prefix}_result as the capture object or null
+
+    Args:
+        prefix: Unique variable prefix, e.g. "_rx1"
+        value_src: VRL source of the parsed value
+        pattern: Parsed regex
+        value_is_string: Value is statically a string (VRL rejects string!() on it
+            with E620, and is_string() does not narrow types, so the guard is dropped)
+
+    Returns:
+        Source lines
+
+    Raises:
+        UnsupportedPattern: If the pattern cannot be expressed with splits
+    """
+    if pattern.case_insensitive:
+        raise UnsupportedPattern("case-insensitive parse_regex")
+    elements = pattern.elements
+    if not any(isinstance(e, Capture) for e in elements):
+        raise UnsupportedPattern("no named captures")
+
+    rest, parts = f"{prefix}_rest", f"{prefix}_parts"
+    lines = [f"{prefix}_value = {value_src}", f"{prefix}_result = null"]
+    body: List[str] = []
+    depth = 0
+
+    def emit(text: str):
+        body.append('    ' * depth + text)
+
+    def open_if(condition: str):
+        nonlocal depth
+        emit(f"if {condition} {{")
+        depth += 1
+
+    if value_is_string:
+        emit(f"{rest} = {prefix}_value")
+    else:
+        open_if(f"is_string({prefix}_value)")
+        emit(f"{rest} = string!({prefix}_value)")
+
+    i = 0
+    if isinstance(elements[0], str):
+        literal = vrl_string(elements[0])
+        if pattern.anchored_start:
+            open_if(f"starts_with({rest}, {literal})")
+            emit(f"{rest} = string!(split({rest}, {literal}, limit: 2)[1])")
+        else:
+            emit(f"{parts} = split({rest}, {literal}, limit: 2)")
+            open_if(f"length({parts}) == 2")
+            emit(f"{rest} = string!({parts}[1])")
+        i = 1
+    elif not pattern.anchored_start:
+        raise UnsupportedPattern("unanchored pattern starting with a capture")
+
+    captures: List[Tuple[str, str]] = []
+    consumed = False
+    while i < len(elements):
+        capture = elements[i]
+        var = f"{prefix}_c{len(captures)}"
+        following = elements[i + 1] if i + 1 < len(elements) else None
+        if following is not None:
+            if not capture.excludes(following[0]):
+                raise UnsupportedPattern(f"capture '{capture.name}' may contain its delimiter")
+            emit(f"{parts} = split({rest}, {vrl_string(following)}, limit: 2)")
+            open_if(f"length({parts}) == 2")
+            emit(f"{var} = string!({parts}[0])")
+            check = _class_check(capture, var, full=True)
+            if check:
+                open_if(check)
+            emit(f"{rest} = string!({parts}[1])")
+            i += 2
+        else:
+            emit(f"{var} = {rest}")
+            if pattern.anchored_end:
+                check = _class_check(capture, var, full=True)
+            else:
+                if capture.kind == 'nonspace':
+                    stops = WHITESPACE
+                elif capture.kind == 'not':
+                    stops = tuple(capture.excluded)
+                elif capture.kind == 'any':
+                    stops = ('\n',)
+                else:
+                    raise UnsupportedPattern(f"unterminated {capture.kind} capture '{capture.name}'")
+                for stop in stops:
+                    emit(f"{var} = string!(split({var}, {vrl_string(stop)}, limit: 2)[0])")
+                check = _class_check(capture, var, full=False)
+            if check:
+                open_if(check)
+            consumed = True
+            i += 1
+        captures.append((capture.name, var))
+
+    if pattern.anchored_end and not consumed:
+        open_if(f'{rest} == ""')
+
+    fields = ', '.join(f"{vrl_string(name)}: {var}" for name, var in captures)
+    emit(f"{prefix}_result = {{{fields}}}")
+    while depth:
+        depth -= 1
+        emit("}")
+    return lines + body
+
+
+@dataclass
+class RegexRewrite:
+    """One candidate replacement of a regex call"""
+    function: str        # 'match' or 'parse_regex'
+    line: int
+    start: int           # Source offsets replaced
+    end: int
+    original: str
+    replacement: str
+    exact: bool          # Equivalent by construction (no sample verification needed)
+    alternatives: Tuple[str, ...] = ()  # Fallback replacements if this one does not compile
+
+
+@dataclass
+class RegexEliminationResult:
+    """Outcome of eliminate_regex()"""
+    code: str
+    applied: List[RegexRewrite] = field(default_factory=list)
+    rejected: List[Tuple[RegexRewrite, str]] = field(default_factory=list)
+    unsupported: List[Tuple[int, str]] = field(default_factory=list)  # (line, reason)
+    verified_events: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.applied)
+
+
+def _call_arguments(call: Call) -> Optional[Tuple[Any, str]]:
+    """(value node, regex pattern) of a match/parse_regex call, or None"""
+    positional = [a for a in call.args if not isinstance(a, NamedArg)]
+    named = {a.name: a.value for a in call.args if isinstance(a, NamedArg)}
+    if set(named) - {'value', 'pattern'}:
+        return None
+    value = named.get('value', positional.pop(0) if positional else None)
+    pattern = named.get('pattern', positional.pop(0) if positional else None)
+    if value is None or positional or not isinstance(pattern, Literal) or pattern.kind != 'regex':
+        return None
+    return value, pattern.value
+
+
+class RegexTransformer:
+    """Replaces regex calls with verified string-operation equivalents"""
+
+    def __init__(self, max_events: int = MAX_VERIFY_EVENTS):
+        """
+        Initialize transformer
+
+        Args:
+            max_events: Maximum sample events used for equivalence checks
+        """
+        self.max_events = max_events
+
+    def find_rewrites(self, vrl_code: str) -> Tuple[List[RegexRewrite], List[Tuple[int, str]]]:
+        """
+        Candidate rewrites for every translatable regex call
+
+        Args:
+            vrl_code: VRL source
+
+        Returns:
+            (non-overlapping rewrites in source order, unsupported (line, reason) pairs)
+        """
+        program = parse_vrl(vrl_code)
+        used = [int(n) for n in _PREFIX_RE.findall(vrl_code)]
+        next_prefix = max(used, default=0) + 1
+        rewrites, unsupported = [], []
+
+        for node in program.walk():
+            if isinstance(node, Assign):
+                rewrite = self._parse_regex_rewrite(program, node, next_prefix, unsupported)
+                if rewrite:
+                    rewrites.append(rewrite)
+                    next_prefix += 1
+            elif isinstance(node, Call) and node.name == 'match':
+                rewrite = self._match_rewrite(program, node, unsupported)
+                if rewrite:
+                    rewrites.append(rewrite)
+
+        kept, last_end = [], -1
+        for rewrite in sorted(rewrites, key=lambda r: (r.start, -r.end)):
+            if rewrite.start >= last_end:
+                kept.append(rewrite)
+                last_end = rewrite.end
+        return kept, unsupported
+
+    def _match_rewrite(self, program: VRLProgram, call: Call, unsupported: list) -> Optional[RegexRewrite]:
+        arguments = _call_arguments(call)
+        if arguments is None:
+            return None
+        value, pattern = arguments
+        try:
+            condition = match_condition(program.source_of(value), pattern,
+                                        repeatable=isinstance(value, (Path, Variable)))
+        except UnsupportedPattern as e:
+            unsupported.append((call.span.line, f"match: {e}"))
+            return None
+        return RegexRewrite('match', call.span.line, call.span.start, call.span.end,
+                            program.source_of(call), condition, exact=True)
+
+    def _parse_regex_rewrite(self, program: VRLProgram, assign: Assign, number: int,
+                             unsupported: list) -> Optional[RegexRewrite]:
+        value, default = assign.value, None
+        if isinstance(value, Binary) and value.op == '??':
+            value, default = value.left, value.right
+        if not (isinstance(value, Call) and value.name == 'parse_regex'):
+            return None
+        if default is None and not value.bang:
+            return None
+        if assign.op != '=' or len(assign.targets) != 1:
+            unsupported.append((assign.span.line, "parse_regex: multiple assignment targets"))
+            return None
+        arguments = _call_arguments(value)
+        if arguments is None:
+            unsupported.append((assign.span.line, "parse_regex: unsupported arguments"))
+            return None
+
+        source = program.source
+        line_start = source.rfind('\n', 0, assign.span.start) + 1
+        line_end = source.find('\n', assign.span.end)
+        line_end = len(source) if line_end == -1 else line_end
+        indent = source[line_start:assign.span.start]
+        trailing = source[assign.span.end:line_end].strip()
+        if indent.strip() or (trailing and not trailing.startswith('#')):
+            unsupported.append((assign.span.line, "parse_regex: not a standalone statement"))
+            return None
+
+        prefix = f"_rx{number}"
+        target = program.source_of(assign.targets[0])
+        if default is None:
+            result_line = f"{target} = object!({prefix}_result)"
+        else:
+            result_line = (f"{target} = if {prefix}_result == null {{ {program.source_of(default)} }} "
+                           f"else {{ {prefix}_result }}")
+
+        variants = []
+        for value_is_string in (False, True):
+            try:
+                statements = parse_regex_statements(prefix, program.source_of(arguments[0]),
+                                                    parse_pattern(arguments[1]), value_is_string)
+            except UnsupportedPattern as e:
+                unsupported.append((assign.span.line, f"parse_regex: {e}"))
+                return None
+            statements.append(result_line)
+            if trailing:
+                statements[0] += f"  {trailing}"
+            variants.append('\n'.join(indent + statement for statement in statements))
+
+        return RegexRewrite('parse_regex', assign.span.line, line_start, line_end,
+                            source[line_start:line_end], variants[0], exact=False,
+                            alternatives=tuple(variants[1:]))
+
+    def transform(self, vrl_code: str, sample_logs: Optional[str] = None) -> RegexEliminationResult:
+        """
+        Rewrite regex calls, keeping only verified-equivalent rewrites
+
+        Exact (literal match()) rewrites only need to compile. Approximate
+        parse_regex rewrites additionally need identical output on every
+        sample event, so without samples they are left in place.
+
+        Args:
+            vrl_code: VRL source
+            sample_logs: Newline separated sample logs (raw or NDJSON)
+
+        Returns:
+            RegexEliminationResult with the rewritten code
+        """
+        rewrites, unsupported = self.find_rewrites(vrl_code)
+        result = RegexEliminationResult(code=vrl_code, unsupported=unsupported)
+        if not rewrites:
+            return result
+
+        events = sample_events_from_logs(sample_logs, self.max_events) if sample_logs else []
+        checker = EquivalenceChecker(vrl_code, events)
+        if not checker.available:
+            logger.debug(f"Skipping regex elimination: {checker.reason}")
+            return result
+        result.verified_events = len(checker.events)
+
+        # Apply back to front so earlier offsets stay valid
+        code = vrl_code
+        for rewrite in reversed(rewrites):
+            reason = None
+            for replacement in (rewrite.replacement,) + rewrite.alternatives:
+                candidate = code[:rewrite.start] + replacement + code[rewrite.end:]
+                reason = checker.check(candidate, require_events=not rewrite.exact)
+                if reason is None:
+                    rewrite.replacement = replacement
+                    break
+                if not reason.startswith("rewrite does not compile"):
+                    break
+            if reason:
+                result.rejected.append((rewrite, reason))
+                continue
+            code = candidate
+            result.applied.insert(0, rewrite)
+
+        result.code = code
+        if result.applied:
+            logger.info(f"⚡ Replaced {len(result.applied)} regex call(s) with string operations "
+                        f"(verified on {result.verified_events} events)")
+        for rewrite, reason in result.rejected:
+            logger.debug(f"   Kept {rewrite.function} on line {rewrite.line}: {reason}")
+        return result
+
+
+# Global transformer
+_regex_transformer = RegexTransformer()
+
+def eliminate_regex(vrl_code: str, sample_logs: Optional[str] = None) -> RegexEliminationResult:
+    """Replace regex calls with verified string operations"""
+    return _regex_transformer.transform(vrl_code, sample_logs)
@@ -0,0 +1,337 @@
+"""
+Parser registry with template-signature lookup
+
+Stores validated VRL parsers together with the log templates they were
+validated on, so a new source whose lines are already covered by a
+registered parser reuses it instead of going through LLM generation:
+
+- Each sample line is reduced to a template signature: JSON/kv lines by
+  their key set, CEF/LEEF by vendor/product/event id, csv by column count,
+  and other lines by their first tokens with the syslog header stripped,
+  numbers masked and paths/URLs/emails/values replaced by <*>
+- A source matches a parser when the share of its sample lines whose
+  signature the parser covers reaches min_coverage
+- Entries keep runtime coverage (share of sample events processed without
+  error), VPI when known, the Vector version they were validated with and
+  hit counts; each parser is its own JSON file, written atomically, so an
+  insert never rewrites the whole registry
+"""
+
+import copy
+import hashlib
+import json
+import re
+import subprocess
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from .batch import classify_line
+from .checkpoint import atomic_write_json
+from .cost_model import sample_events_from_logs
+
+# Tokens of a free-text line that make up its signature
+SIGNATURE_TOKENS = 4
+
+# Share of sample lines a parser must cover to be reused
+DEFAULT_MIN_COVERAGE = 0.9
+
+DEFAULT_REGISTRY_DIR = Path(".tmp/parser_registry")
+
+_SYSLOG_HEADER = re.compile(r'^(<\d{1,3}>)?[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d \S+ ')
+_SYSLOG5424_HEADER = re.compile(r'^<\d{1,3}>\d{1,2} \S+ \S+ ')
+_KV_KEY = re.compile(r'(?:^|\s)([\w.-]+)=')
+_OPAQUE_TOKEN = re.compile(r'[/@\\]|://')
+_DIGITS = re.compile(r'\d+')
+_UNSAFE_ID = re.compile(r'[^\w.-]')
+
+
+def template_signature(line: str) -> Optional[str]:
+    """
+    Template signature of a log line
+
+    Args:
+        line: Raw log line
+
+    Returns:
+        Signature string ("<family>:<template>"), or None for blank lines
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+    family = classify_line(stripped)
+
+    if family == 'json':
+        return 'json:' + ','.join(sorted(json.loads(stripped)))
+    if family == 'kv':
+        return 'kv:' + ','.join(sorted(set(_KV_KEY.findall(stripped))))
+    if family in ('cef', 'leef'):
+        start = stripped.find('CEF:' if family == 'cef' else 'LEEF:')
+        header = stripped[start:].split('|')
+        event_id = header[4] if family == 'cef' and len(header) > 4 else header[3] if len(header) > 3 else ''
+        return f"{family}:{'|'.join(header[1:3])}|{event_id}"
+    if family == 'csv':
+        return f"csv:{stripped.count(',') + 1}"
+
+    if family == 'syslog':
+        stripped = _SYSLOG_HEADER.sub('', stripped)
+    elif family == 'syslog5424':
+        stripped = _SYSLOG5424_HEADER.sub('', stripped)
+    tokens = []
+    for token in stripped.split()[:SIGNATURE_TOKENS]:
+        if _OPAQUE_TOKEN.search(token):
+            token = '<*>'
+        elif '=' in token:
+            token = token.split('=', 1)[0] + '=<*>'
+        else:
+            token = _DIGITS.sub('#', token)
+        tokens.append(token)
+    return f"{family}:{' '.join(tokens)}"
+
+
+def source_signatures(lines: Iterable[str]) -> Counter:
+    """Signature -> number of lines with it"""
+    return Counter(sig for sig in (template_signature(line) for line in lines) if sig)
+
+
+def measure_coverage(vrl_code: str, sample_logs: str) -> Optional[float]:
+    """
+    Share of sample events the VRL processes without a runtime error
+
+    Returns:
+        Coverage in [0, 1], or None if PyVRL is unavailable or the VRL does not compile
+    """
+    events = sample_events_from_logs(sample_logs)
+    if not events:
+        return None
+    try:
+        import pyvrl
+        transform = pyvrl.Transform(vrl_code + "\n.")
+    except Exception:
+        return None
+    processed = 0
+    for event in events:
+        try:
+            transform.remap(copy.deepcopy(event))
+            processed += 1
+        except Exception:
+            pass
+    return processed / len(events)
+
+
+@lru_cache(maxsize=1)
+def current_vector_version() -> Optional[str]:
+    """Installed Vector version ("0.39.0"), or None without the Vector CLI"""
+    try:
+        result = subprocess.run(["vector", "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    parts = result.stdout.split()
+    return parts[1] if result.returncode == 0 and len(parts) > 1 else None
+
+
+@dataclass
+class RegisteredParser:
+    """Validated VRL and the templates it was validated on"""
+    parser_id: str
+    device_type: Optional[str]
+    family: str
+    vrl_code: str
+    signatures: Dict[str, int] = field(default_factory=dict)   # Signature -> sample lines seen
+    coverage: Optional[float] = None       # Share of sample events processed without error
+    vpi: Optional[int] = None
+    vector_version: Optional[str] = None
+    sample_lines: int = 0
+    hits: int = 0
+    created_at: str = ''
+    updated_at: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RegisteredParser':
+        return cls(**data)
+
+
+@dataclass
+class RegistryMatch:
+    """Registered parser covering a new source"""
+    parser: RegisteredParser
+    coverage: float          # Share of the source's sample lines with covered signatures
+    same_version: bool       # Validated with the installed Vector version
+
+
+class ParserRegistry:
+    """Directory of registered parsers indexed by template signature"""
+
+    def __init__(self, directory: Optional[Path] = None, min_coverage: float = DEFAULT_MIN_COVERAGE):
+        """
+        Args:
+            directory: Registry directory (one <parser_id>.json per parser)
+            min_coverage: Default share of sample lines a match must cover
+        """
+        self.directory = Path(directory or DEFAULT_REGISTRY_DIR)
+        self.min_coverage = min_coverage
+        self._lock = threading.Lock()
+        self._parsers: Optional[Dict[str, RegisteredParser]] = None
+        self._by_signature: Dict[str, Set[str]] = {}
+
+    def _index(self) -> Dict[str, RegisteredParser]:
+        """Load parser files on first use (caller holds the lock)"""
+        if self._parsers is None:
+            self._parsers = {}
+            for path in sorted(self.directory.glob("*.json")) if self.directory.exists() else []:
+                try:
+                    self._add(RegisteredParser.from_dict(json.loads(path.read_text())))
+                except (OSError, ValueError, TypeError) as e:
+                    logger.warning(f"Ignoring unreadable registry entry {path.name}: {e}")
+            logger.debug(f"📚 Parser registry: {len(self._parsers)} parsers, "
+                         f"{len(self._by_signature)} signatures")
+        return self._parsers
+
+    def _add(self, parser: RegisteredParser):
+        self._parsers[parser.parser_id] = parser
+        for signature in parser.signatures:
+            self._by_signature.setdefault(signature, set()).add(parser.parser_id)
+
+    def _save(self, parser: RegisteredParser):
+        try:
+            atomic_write_json(self.directory / f"{parser.parser_id}.json", parser.to_dict())
+        except OSError as e:
+            logger.warning(f"Could not write registry entry {parser.parser_id}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index())
+
+    def lookup(self,
+               sample_logs: str,
+               device_type: Optional[str] = None,
+               min_coverage: Optional[float] = None) -> Optional[RegistryMatch]:
+        """
+        Find a registered parser covering a source's templates
+
+        Args:
+            sample_logs: Sample log data of the new source
+            device_type: Device type hint (prefers that device type's parsers on ties)
+            min_coverage: Required share of covered sample lines (default: registry's)
+
+        Returns:
+            Best match (highest coverage, then device type, VPI and hits), or None
+        """
+        signatures = source_signatures(sample_logs.splitlines())
+        total = sum(signatures.values())
+        if not total:
+            return None
+        threshold = self.min_coverage if min_coverage is None else min_coverage
+
+        with self._lock:
+            parsers = self._index()
+            candidates = set().union(*(self._by_signature.get(sig, set()) for sig in signatures))
+            best, best_key = None, None
+            for parser_id in candidates:
+                parser = parsers[parser_id]
+                covered = sum(count for sig, count in signatures.items() if sig in parser.signatures) / total
+                key = (covered, parser.device_type == device_type, parser.vpi or 0, parser.hits)
+                if best_key is None or key > best_key:
+                    best, best_key = parser, key
+            if best is None or best_key[0] < threshold:
+                if best is not None:
+                    logger.info(f"📚 Closest registered parser {best.parser_id} covers {best_key[0]:.0%} "
+                                f"of templates (< {threshold:.0%}) - generating")
+                return None
+
+            best.hits += 1
+            best.updated_at = datetime.now().isoformat(timespec="seconds")
+            self._save(best)
+
+        logger.info(f"📚 Reusing registered parser {best.parser_id} ({best.device_type}): "
+                    f"{best_key[0]:.0%} of sample templates covered")
+        return RegistryMatch(best, best_key[0], best.vector_version == current_vector_version())
+
+    def register(self,
+                 vrl_code: str,
+                 sample_logs: str,
+                 device_type: Optional[str] = None,
+                 vpi: Optional[int] = None,
+                 coverage: Optional[float] = None) -> RegisteredParser:
+        """
+        Add validated VRL, or merge new samples into its existing entry
+
+        Args:
+            vrl_code: VRL that passed validation on sample_logs
+            sample_logs: Samples it was validated on
+            device_type: Device type of the source
+            vpi: Measured VRL Performance Index, if benchmarked
+            coverage: Runtime coverage (measured with PyVRL when not given)
+
+        Returns:
+            The registry entry
+        """
+        lines = sample_logs.splitlines()
+        signatures = source_signatures(lines)
+        if coverage is None:
+            coverage = measure_coverage(vrl_code, sample_logs)
+        digest = hashlib.sha1(vrl_code.encode()).hexdigest()[:12]
+        parser_id = f"{_UNSAFE_ID.sub('_', device_type or 'unknown')}_{digest}"
+        now = datetime.now().isoformat(timespec="seconds")
+
+        with self._lock:
+            parsers = self._index()
+            parser = parsers.get(parser_id)
+            if parser is None:
+                family = Counter(classify_line(line) for line in lines if line.strip()).most_common(1)
+                parser = RegisteredParser(parser_id, device_type, family[0][0] if family else 'empty',
+                                          vrl_code, created_at=now)
+            else:
+                # Keep the lowest coverage seen and the latest benchmark
+                if coverage is not None and parser.coverage is not None:
+                    coverage = min(coverage, parser.coverage)
+                vpi = vpi if vpi is not None else parser.vpi
+            for signature, count in signatures.items():
+                parser.signatures[signature] = parser.signatures.get(signature, 0) + count
+            parser.coverage = coverage if coverage is not None else parser.coverage
+            parser.vpi = vpi
+            parser.vector_version = current_vector_version()
+            parser.sample_lines += len(lines)
+            parser.updated_at = now
+            self._add(parser)
+            self._save(parser)
+
+        logger.info(f"📚 Registered parser {parser_id}: {len(parser.signatures)} templates"
+                    + (f", coverage {parser.coverage:.0%}" if parser.coverage is not None else ""))
+        return parser
+
+    def parsers(self) -> List[RegisteredParser]:
+        """All registered parsers"""
+        with self._lock:
+            return list(self._index().values())
+
+
+# Global registry (configured from parser_registry in config.yaml on first use)
+_parser_registry: Optional[ParserRegistry] = None
+_parser_registry_lock = threading.Lock()
+
+def get_parser_registry() -> ParserRegistry:
+    """Get the process-wide parser registry"""
+    global _parser_registry
+    with _parser_registry_lock:
+        if _parser_registry is None:
+            try:
+                from ..config.loader import DFEConfigLoader
+                registry_config = DFEConfigLoader.load().get('parser_registry', {})
+            except Exception as e:
+                logger.debug(f"Could not load parser registry config: {e}")
+                registry_config = {}
+            _parser_registry = ParserRegistry(
+                directory=registry_config.get('directory'),
+                min_coverage=registry_config.get('min_coverage', DEFAULT_MIN_COVERAGE),
+            )
+        return _parser_registry
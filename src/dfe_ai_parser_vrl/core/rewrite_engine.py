@@ -0,0 +1,305 @@
+"""
+VRL Rewrite Engine
+
+Single-pass local fixer shared by the error fixer, the error learning
+system and the E651 fixer:
+
+- Rules are compiled once (regex line rules and AST span rules)
+- AST rules edit the exact expression reported by the Vector/PyVRL error
+  span (``┌─ :line:col``), e.g. ``split(`` → ``split!(`` for E103
+- Line rules only visit code lines containing the calls/operators they
+  need, preferring the lines named in the error before falling back to
+  the whole program
+- Every rewrite returns which rules fired and where
+"""
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Set, Tuple, Union
+
+from loguru import logger
+
+from .vrl_ast import VRLProgram, parse_vrl, Node, Call, Binary, Program
+from .diagnostics import VRLDiagnostic, parse_diagnostics
+
+# VRL type assertion functions used to satisfy "expects the exact type X"
+TYPE_ASSERTIONS = {
+    'string': 'string', 'integer': 'int', 'float': 'float',
+    'boolean': 'bool', 'array': 'array', 'object': 'object', 'timestamp': 'timestamp',
+}
+
+# A located diagnostic (code, line, column, detail)
+ErrorLocation = VRLDiagnostic
+
+
+def parse_error_locations(error_message: str) -> List[ErrorLocation]:
+    """
+    Diagnostics from Vector/PyVRL output that carry a source position
+
+    Args:
+        error_message: Compiler output (may contain several diagnostics)
+
+    Returns:
+        One ErrorLocation per located diagnostic
+    """
+    return [d for d in parse_diagnostics(error_message) if d.line]
+
+
+@dataclass
+class RewriteRule:
+    """Line-level rule: compiled regex plus a replacement template or line function"""
+    name: str
+    pattern: str
+    fix: Union[str, Callable[[str], str]]
+    error_codes: FrozenSet[str] = frozenset()
+    calls: FrozenSet[str] = frozenset()      # Line must call at least one of these
+    operators: FrozenSet[str] = frozenset()  # Line must contain all of these operators
+    guard: Optional[Callable[[str], bool]] = None
+    description: str = ''
+    compiled: Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        try:
+            self.compiled = re.compile(self.pattern)
+        except re.error:
+            # Learned patterns are sometimes raw source lines
+            self.compiled = re.compile(re.escape(self.pattern))
+
+    def applies_to(self, error_codes: Set[str]) -> bool:
+        return not self.error_codes or not error_codes or bool(self.error_codes & error_codes)
+
+    def apply(self, line: str, column: Optional[int] = None) -> str:
+        """Rewrite one line; with a column, only the match covering it is replaced"""
+        if callable(self.fix):
+            return self.fix(line)
+        if column is not None:
+            for match in self.compiled.finditer(line):
+                if match.start() <= column - 1 < match.end():
+                    return line[:match.start()] + match.expand(self.fix) + line[match.end():]
+        return self.compiled.sub(self.fix, line)
+
+
+# An AST rule returns (start, end, replacement) source edits for a diagnostic
+AstRewrite = Callable[[VRLProgram, ErrorLocation], Optional[Tuple[int, int, str]]]
+
+
+@dataclass
+class AstRewriteRule:
+    """Rule that edits the AST node at an error location"""
+    name: str
+    rewrite: AstRewrite
+    error_codes: FrozenSet[str] = frozenset()
+    description: str = ''
+
+    def applies_to(self, error_codes: Set[str]) -> bool:
+        return not self.error_codes or not error_codes or bool(self.error_codes & error_codes)
+
+
+Rule = Union[RewriteRule, AstRewriteRule]
+
+
+@dataclass(frozen=True)
+class FiredRule:
+    """Record of a rule that changed the code"""
+    rule: str
+    line: int
+    column: Optional[int] = None
+
+    def __str__(self) -> str:
+        position = f"{self.line}:{self.column}" if self.column else f"{self.line}"
+        return f"{self.rule}@{position}"
+
+
+@dataclass
+class RewriteResult:
+    """Rewritten code plus the rules that fired"""
+    code: str
+    fired: List[FiredRule] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.fired)
+
+
+class RewriteEngine:
+    """Applies compiled rewrite rules in a single pass and tracks how often each fires"""
+
+    def __init__(self):
+        self.fire_counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def rewrite(self,
+                vrl_code: str,
+                rules: Sequence[Rule],
+                error_message: str = None,
+                error_code: str = None) -> RewriteResult:
+        """
+        Apply rules to VRL code
+
+        Args:
+            vrl_code: VRL source
+            rules: Ordered rules (first matching rule per line/location wins)
+            error_message: Compiler output used for codes and precise targeting
+            error_code: Explicit error code filter (e.g. "E103")
+
+        Returns:
+            RewriteResult
+        """
+        locations = parse_error_locations(error_message)
+        error_codes = {loc.code for loc in locations}
+        if error_code:
+            error_codes.add(error_code)
+
+        active = [rule for rule in rules if rule.applies_to(error_codes)]
+        program = parse_vrl(vrl_code)
+
+        # Precise AST edits at the reported spans take priority
+        ast_rules = [rule for rule in active if isinstance(rule, AstRewriteRule)]
+        result = self._apply_ast_rules(program, ast_rules, locations)
+
+        if not result.changed:
+            line_rules = [rule for rule in active if isinstance(rule, RewriteRule)]
+            targets = {loc.line: loc.column for loc in locations}
+            result = self._apply_line_rules(program, line_rules, targets)
+            if not result.changed and targets:
+                result = self._apply_line_rules(program, line_rules, {})
+
+        if result.changed:
+            with self._lock:
+                self.fire_counts.update(f.rule for f in result.fired)
+        return result
+
+    def _apply_ast_rules(self,
+                         program: VRLProgram,
+                         rules: List[AstRewriteRule],
+                         locations: List[ErrorLocation]) -> RewriteResult:
+        edits = []
+        fired = []
+        for location in locations:
+            for rule in rules:
+                if not rule.applies_to({location.code}):
+                    continue
+                try:
+                    edit = rule.rewrite(program, location)
+                except Exception as e:
+                    logger.debug(f"AST rule {rule.name} failed at {location.line}:{location.column}: {e}")
+                    continue
+                if edit:
+                    edits.append(edit)
+                    fired.append(FiredRule(rule.name, location.line, location.column))
+                    break
+
+        code = program.source
+        last_start = len(code) + 1
+        for start, end, replacement in sorted(edits, reverse=True):
+            if end > last_start:
+                continue  # Overlaps an edit already applied
+            code = code[:start] + replacement + code[end:]
+            last_start = start
+        return RewriteResult(code, fired)
+
+    def _apply_line_rules(self,
+                          program: VRLProgram,
+                          rules: List[RewriteRule],
+                          targets: Dict[int, int]) -> RewriteResult:
+        lines = program.lines
+        code_lines = program.code_lines()
+        calls_by_line = program.calls_by_line()
+        operators_by_line = program.operators_by_line()
+        fired = []
+
+        line_numbers: Iterable[int] = sorted(targets) if targets else range(1, len(lines) + 1)
+        for line_num in line_numbers:
+            if line_num not in code_lines or line_num > len(lines):
+                continue
+            line = lines[line_num - 1]
+            line_calls = calls_by_line.get(line_num, set())
+            line_operators = operators_by_line.get(line_num, set())
+
+            for rule in rules:
+                if rule.calls and not rule.calls & line_calls:
+                    continue
+                if rule.operators and not rule.operators <= line_operators:
+                    continue
+                if rule.guard and not rule.guard(line):
+                    continue
+                if not rule.compiled.search(line):
+                    continue
+                try:
+                    new_line = rule.apply(line, targets.get(line_num))
+                except Exception as e:
+                    logger.debug(f"Rule {rule.name} failed on line {line_num}: {e}")
+                    continue
+                if new_line != line:
+                    lines[line_num - 1] = new_line
+                    fired.append(FiredRule(rule.name, line_num, targets.get(line_num)))
+                    break  # One rule per line
+
+        return RewriteResult('\n'.join(lines), fired)
+
+
+def _node_at(program: VRLProgram, location: ErrorLocation, node_type: type = Node) -> Optional[Node]:
+    """Outermost node of node_type starting exactly at the error position"""
+    for node in program.nodes_on_line(location.line):
+        if node.span.col == location.column and isinstance(node, node_type):
+            return node
+    return None
+
+
+def _make_call_infallible(program: VRLProgram, location: ErrorLocation) -> Optional[Tuple[int, int, str]]:
+    """E103: the compiler suggests adding `!` to the fallible call"""
+    call = _node_at(program, location, Call)
+    if call is None or call.bang or f"`{call.name}!(" not in location.detail:
+        return None
+    name_end = call.span.start + len(call.name)
+    return name_end, name_end, '!'
+
+
+def _remove_unnecessary_coalescing(program: VRLProgram, location: ErrorLocation) -> Optional[Tuple[int, int, str]]:
+    """E651: drop `?? default` after an expression that cannot fail"""
+    for node in program.find(Binary):
+        if node.op == '??' and node.left.span.line == location.line and node.left.span.col == location.column:
+            return node.span.start, node.span.end, program.source_of(node.left)
+    return None
+
+
+_EXPECTED_TYPE_RE = re.compile(r'expects the exact type (\w+)')
+
+
+def _assert_argument_type(program: VRLProgram, location: ErrorLocation) -> Optional[Tuple[int, int, str]]:
+    """E110: wrap the offending argument in a type assertion, e.g. string!(.message)"""
+    match = _EXPECTED_TYPE_RE.search(location.detail)
+    assertion = TYPE_ASSERTIONS.get(match.group(1)) if match else None
+    node = _node_at(program, location)
+    if assertion is None or node is None or isinstance(node, Program):
+        return None
+    if isinstance(node, Call) and node.name == assertion:
+        return None
+    return node.span.start, node.span.end, f"{assertion}!({program.source_of(node)})"
+
+
+AST_RULES = [
+    AstRewriteRule('E103_infallible_call', _make_call_infallible, frozenset({'E103'}),
+                   'Add ! to a fallible call the compiler flagged'),
+    AstRewriteRule('E651_remove_coalescing', _remove_unnecessary_coalescing, frozenset({'E651'}),
+                   'Remove ?? after an expression that cannot fail'),
+    AstRewriteRule('E110_assert_type', _assert_argument_type, frozenset({'E110'}),
+                   'Assert the argument type the function expects'),
+]
+
+
+# Global rewrite engine
+_rewrite_engine = RewriteEngine()
+
+def rewrite_vrl(vrl_code: str,
+                rules: Sequence[Rule],
+                error_message: str = None,
+                error_code: str = None) -> RewriteResult:
+    """Apply rewrite rules with the shared engine"""
+    return _rewrite_engine.rewrite(vrl_code, rules, error_message, error_code)
+
+def get_rewrite_stats() -> Dict[str, int]:
+    """How many times each rewrite rule has fired this session"""
+    return dict(_rewrite_engine.fire_counts)
@@ -13,6 +13,8 @@ from typing import Tuple, Optional, Dict, Any, List
 from pathlib import Path
 from loguru import logger
 from .field_conflict_checker import check_field_conflicts
+from .vrl_ast import parse_vrl
+from .diagnostics import parse_diagnostics, format_diagnostics
 
 
 class DFEVRLValidator:
@@ -263,7 +265,8 @@ class DFEVRLValidator:
                 
                 # Check if Vector ran successfully
                 if process.returncode != 0:
-                    error_msg = f"Vector CLI failed (exit {process.returncode}): {stderr[:500]}"
+                    details = format_diagnostics(parse_diagnostics(stderr)) or stderr[:500]
+                    error_msg = f"Vector CLI failed (exit {process.returncode}): {details}"
                     logger.debug(error_msg)
                     return False, error_msg
                 
@@ -312,15 +315,9 @@ class DFEVRLValidator:
         Validate that VRL code doesn't use regex functions (performance optimization)
         Per VECTOR-VRL.md: String operations are 50-100x faster than regex
         """
-        found_functions = []
-        
-        for func in self.rejected_functions:
-            # Check for both regular and infallible versions
-            patterns = [f"{func}(", f"{func}!"]
-            for pattern in patterns:
-                if pattern in vrl_code:
-                    found_functions.append(func)
-                    break
+        # Both regular and infallible calls share the base name
+        called = parse_vrl(vrl_code).function_names()
+        found_functions = [func for func in self.rejected_functions if func in called]
         
         if found_functions:
             perf_config = self.config.get("vrl_generation", {}).get("performance", {})
@@ -341,20 +338,21 @@ class DFEVRLValidator:
     
     def _parse_pyvrl_error(self, error_msg: str) -> str:
         """Parse PyVRL error message"""
-        # Extract the most relevant part of the error
-        if "error[E" in error_msg:
-            # Vector error code format
-            lines = error_msg.split('\n')
-            for line in lines:
-                if "error[E" in line:
-                    return line.strip()
+        # Structured diagnostics: header, line:col span, labels and notes (doc links dropped)
+        diagnostics = parse_diagnostics(error_msg)
+        if diagnostics:
+            return format_diagnostics(diagnostics)
         
         # Return first line if no specific pattern found
         return error_msg.split('\n')[0].strip()
     
     def _parse_vector_error(self, error_msg: str) -> str:
         """Parse Vector CLI error message"""
-        # Similar to PyVRL parsing
+        # Vector reports VRL compile errors in the same diagnostic format
+        diagnostics = parse_diagnostics(error_msg)
+        if diagnostics:
+            return format_diagnostics(diagnostics)
+        
         if "error:" in error_msg.lower():
             lines = error_msg.split('\n')
             for line in lines:
@@ -0,0 +1,308 @@
+"""
+VPI Cost Table Calibration
+
+Microbenchmarks the VRL stdlib functions our parsers use and writes a
+versioned cost table (config/vrl_cost_table.json) that replaces the
+hand-written ``function_vpi_impact`` constants in the cost model and the
+performance tiers quoted in prompts.
+
+Each function is benchmarked by running a program that repeats one
+expression many times on a representative event, subtracting a baseline
+program of plain field copies. Results are recorded as ns/call and as
+relative VPI impact anchored on ``contains`` so existing thresholds and
+prompt tiers keep their scale.
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+COST_TABLE_SCHEMA_VERSION = 1
+
+# project_root/config/vrl_cost_table.json (same root as DFEConfigLoader)
+DEFAULT_COST_TABLE_PATH = Path(__file__).parent.parent.parent.parent / "config" / "vrl_cost_table.json"
+
+# Relative VPI scale anchor (matches the original hand-written table)
+REFERENCE_FUNCTION = "contains"
+REFERENCE_VPI = 400
+
+# Expression copies per program; amortizes per-event conversion overhead
+INNER_REPEATS = 32
+
+# Floor for ns/call so noise on near-free functions cannot produce huge VPI
+MIN_NS_PER_CALL = 5.0
+
+BENCHMARK_EVENT = {
+    "message": "<34>Oct 11 22:14:15 mymachine su: 'su root' failed for lonvick on /dev/pts/8",
+    "json": '{"user": "alice", "port": 22, "ok": true}',
+    "num": "42",
+    "float": "1.5",
+    "flag": "true",
+    "ts": "2024-10-11T22:14:15Z",
+}
+
+BASELINE_EXPRESSION = ".message"
+
+
+@dataclass
+class BenchmarkCase:
+    """One stdlib function and the expression used to exercise it"""
+    function: str
+    expression: str
+
+
+BENCHMARK_CASES = [
+    # String operations
+    BenchmarkCase("contains", 'contains(string!(.message), "failed")'),
+    BenchmarkCase("split!", 'split!(.message, " ")'),
+    BenchmarkCase("upcase", 'upcase(string!(.message))'),
+    BenchmarkCase("downcase", 'downcase(string!(.message))'),
+    BenchmarkCase("length", 'length(string!(.message))'),
+    BenchmarkCase("slice", 'slice!(.message, 0, 16)'),
+    BenchmarkCase("starts_with", 'starts_with(string!(.message), "<34>")'),
+    BenchmarkCase("ends_with", 'ends_with(string!(.message), "pts/8")'),
+    # Conversions
+    BenchmarkCase("to_string!", 'to_string!(.num)'),
+    BenchmarkCase("to_int!", 'to_int!(.num)'),
+    BenchmarkCase("to_float!", 'to_float!(.float)'),
+    BenchmarkCase("to_bool!", 'to_bool!(.flag)'),
+    # Built-in parsers and hashing
+    BenchmarkCase("parse_json", 'parse_json!(.json)'),
+    BenchmarkCase("parse_syslog", 'parse_syslog!(.message)'),
+    BenchmarkCase("parse_timestamp", 'parse_timestamp!(.ts, format: "%Y-%m-%dT%H:%M:%SZ")'),
+    BenchmarkCase("md5", 'md5(string!(.message))'),
+    BenchmarkCase("sha2", 'sha2(string!(.message))'),
+    # Regex
+    BenchmarkCase("match", "match(string!(.message), r'failed for \\w+')"),
+    BenchmarkCase("parse_regex", "parse_regex!(.message, r'^<(?P<pri>\\d+)>(?P<ts>\\w+ \\d+ [\\d:]+) (?P<host>\\S+) (?P<rest>.*)$')"),
+    BenchmarkCase("parse_regex_all", "parse_regex_all!(.message, r'(?P<word>\\w+)')"),
+]
+
+
+def benchmark_program(expression: str, repeats: int = INNER_REPEATS) -> str:
+    """VRL program evaluating expression `repeats` times per event"""
+    return "\n".join(f".bench = {expression}" for _ in range(repeats))
+
+
+@lru_cache(maxsize=None)
+def detect_engine_version(engine: str) -> str:
+    """
+    Version string of the VRL engine that produced measurements
+
+    Args:
+        engine: "pyvrl" or "vector"
+
+    Returns:
+        Version string, or "unknown"
+    """
+    if engine == "vector":
+        try:
+            result = subprocess.run(["vector", "--version"], capture_output=True, text=True, timeout=10)
+            # "vector 0.49.0 (x86_64-unknown-linux-gnu ...)"
+            parts = result.stdout.split()
+            return parts[1] if len(parts) > 1 else "unknown"
+        except (OSError, subprocess.SubprocessError):
+            return "unknown"
+
+    try:
+        from importlib.metadata import version
+        return version(engine)
+    except Exception:
+        return "unknown"
+
+
+class VPIMicrobenchmark:
+    """Measures per-call cost of VRL functions with pyvrl or the Vector CLI"""
+
+    def __init__(self, engine: str = "pyvrl", iterations: int = 1000, rounds: int = 5):
+        """
+        Args:
+            engine: "pyvrl" (in-process) or "vector" (``vector vrl`` subprocess)
+            iterations: Events processed per timing round
+            rounds: Timing rounds per case (fastest round is kept)
+        """
+        if engine not in ("pyvrl", "vector"):
+            raise ValueError(f"Unsupported benchmark engine: {engine}")
+        self.engine = engine
+        self.iterations = iterations
+        self.rounds = rounds
+
+    def run(self, cases: List[BenchmarkCase] = None) -> Dict[str, float]:
+        """
+        Benchmark cases and return ns per call
+
+        Args:
+            cases: Cases to run (defaults to BENCHMARK_CASES)
+
+        Returns:
+            Map of function name -> ns per call (baseline subtracted)
+        """
+        cases = cases or BENCHMARK_CASES
+        baseline_ns = self._time_program(benchmark_program(BASELINE_EXPRESSION))
+        logger.info(f"⏱️ {self.engine} baseline: {baseline_ns:,.0f} ns/event")
+
+        results = {}
+        for case in cases:
+            try:
+                event_ns = self._time_program(benchmark_program(case.expression))
+            except Exception as e:
+                logger.warning(f"   Benchmark failed for {case.function}: {e}")
+                continue
+            ns_per_call = max(MIN_NS_PER_CALL, (event_ns - baseline_ns) / INNER_REPEATS)
+            results[case.function] = ns_per_call
+            logger.info(f"   {case.function}: {ns_per_call:,.0f} ns/call")
+        return results
+
+    def _time_program(self, program: str) -> float:
+        if self.engine == "vector":
+            return self._time_vector(program)
+        return self._time_pyvrl(program)
+
+    def _time_pyvrl(self, program: str) -> float:
+        """Fastest round of in-process remaps, in ns/event"""
+        import pyvrl
+
+        transform = pyvrl.Transform(program)
+        for _ in range(min(100, self.iterations)):
+            transform.remap(dict(BENCHMARK_EVENT))
+
+        best = float("inf")
+        for _ in range(self.rounds):
+            start = time.perf_counter_ns()
+            for _ in range(self.iterations):
+                transform.remap(BENCHMARK_EVENT)
+            best = min(best, (time.perf_counter_ns() - start) / self.iterations)
+        return best
+
+    def _time_vector(self, program: str) -> float:
+        """Fastest round of ``vector vrl`` over an NDJSON input, in ns/event"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.ndjson"
+            program_file = Path(temp_dir) / "program.vrl"
+            input_file.write_text((json.dumps(BENCHMARK_EVENT) + "\n") * self.iterations)
+            program_file.write_text(program)
+
+            best = float("inf")
+            for _ in range(self.rounds):
+                start = time.perf_counter_ns()
+                subprocess.run(
+                    ["vector", "vrl", "--input", str(input_file), "--program", str(program_file)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=300
+                )
+                best = min(best, (time.perf_counter_ns() - start) / self.iterations)
+            return best
+
+
+def build_cost_table(ns_per_call: Dict[str, float], engine: str, engine_version: str) -> Dict[str, Any]:
+    """
+    Convert benchmark results into a versioned cost table
+
+    Args:
+        ns_per_call: Function name -> ns per call
+        engine: Engine that produced the measurements
+        engine_version: Engine version string
+
+    Returns:
+        Cost table dict (see save_cost_table)
+    """
+    reference_ns = ns_per_call.get(REFERENCE_FUNCTION)
+    if not reference_ns:
+        raise ValueError(f"Cost table needs a measurement for reference function {REFERENCE_FUNCTION}")
+
+    functions = {
+        name: {
+            "ns_per_call": round(ns, 1),
+            "vpi_impact": max(1, round(REFERENCE_VPI * reference_ns / ns)),
+        }
+        for name, ns in sorted(ns_per_call.items())
+    }
+    return {
+        "schema_version": COST_TABLE_SCHEMA_VERSION,
+        "engine": engine,
+        "engine_version": engine_version,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "reference": {"function": REFERENCE_FUNCTION, "vpi_impact": REFERENCE_VPI},
+        "functions": functions,
+    }
+
+
+def save_cost_table(table: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write cost table JSON (atomically) and return its path"""
+    path = Path(path or DEFAULT_COST_TABLE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(table, indent=2) + "\n")
+    os.replace(tmp_path, path)
+    logger.success(f"✅ Wrote VRL cost table ({len(table['functions'])} functions) to {path}")
+    return path
+
+
+def load_cost_table(path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load a cost table if one has been generated
+
+    Args:
+        path: Table path (defaults to config/vrl_cost_table.json)
+
+    Returns:
+        Cost table dict, or None if missing, unreadable or an unknown schema
+    """
+    path = Path(path or DEFAULT_COST_TABLE_PATH)
+    if not path.exists():
+        return None
+    try:
+        table = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable VRL cost table {path}: {e}")
+        return None
+
+    if table.get("schema_version") != COST_TABLE_SCHEMA_VERSION:
+        logger.warning(f"Ignoring VRL cost table {path}: schema {table.get('schema_version')} != {COST_TABLE_SCHEMA_VERSION}")
+        return None
+    return table
+
+
+def load_function_vpi_impact(path: Optional[Path] = None) -> Dict[str, float]:
+    """Function name -> calibrated VPI impact (empty when no table exists)"""
+    table = load_cost_table(path)
+    if not table:
+        return {}
+    engine, engine_version = table.get("engine"), table.get("engine_version")
+    if engine == "vector" and detect_engine_version("vector") not in ("unknown", engine_version):
+        logger.warning(f"VRL cost table was measured on Vector {engine_version} but "
+                       f"{detect_engine_version('vector')} is installed; re-run scripts/calibrate_vpi.py")
+    logger.debug(f"Using VRL cost table from {engine} {engine_version}")
+    return {name: entry["vpi_impact"] for name, entry in table.get("functions", {}).items()}
+
+
+def format_performance_tiers(path: Optional[Path] = None) -> Optional[str]:
+    """
+    Prompt-ready performance tiers from the calibrated table
+
+    Returns:
+        Bullet lines like "• Built-in parsers: 35-75 events/CPU% (...)", or None without a table
+    """
+    vpi = load_function_vpi_impact(path)
+    if not vpi:
+        return None
+
+    tiers = [
+        ("String operations", ["contains", "starts_with", "ends_with", "split!", "upcase", "downcase", "slice"], "REQUIRED"),
+        ("Built-in parsers", ["parse_json", "parse_syslog", "parse_timestamp"], "use parse_json!, parse_csv! for structured data"),
+        ("Regex operations", ["match", "parse_regex", "parse_regex_all"], "FORBIDDEN"),
+    ]
+    lines = []
+    for label, names, note in tiers:
+        values = [vpi[name] for name in names if name in vpi]
+        if values:
+            lines.append(f"• {label}: {min(values):,}-{max(values):,} events/CPU% ({note})")
+    return "\n".join(lines) or None
@@ -0,0 +1,864 @@
+"""
+VRL Lexer, Parser and AST Cache
+
+A lightweight, error-tolerant parser for the subset of VRL that generated
+parsers use (assignments, if/else, function calls with closures, paths,
+literals and operators). Static checks and local fixers query the AST instead
+of re-scanning VRL text with their own regexes, so a function name inside a
+comment or string literal no longer counts as a call.
+
+Each distinct VRL source is parsed once and cached by content hash.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from loguru import logger
+
+
+# ---------------------------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------------------------
+
+KEYWORDS = {'if', 'else', 'abort', 'return', 'true', 'false', 'null'}
+ASSIGN_OPS = {'=', '|=', '??='}
+BINARY_PRECEDENCE = {
+    '??': 1,
+    '||': 2,
+    '&&': 3,
+    '==': 4, '!=': 4,
+    '<': 5, '<=': 5, '>': 5, '>=': 5,
+    '|': 6,  # object merge
+    '+': 6, '-': 6,
+    '*': 7, '/': 7,
+}
+# Longest first so '??=' wins over '??' and '='
+OPERATORS = sorted([
+    '??=', '|=', '??', '==', '!=', '<=', '>=', '&&', '||', '->',
+    '=', '<', '>', '+', '-', '*', '/', '!', '|',
+    ',', ':', ';', '(', ')', '{', '}', '[', ']', '.',
+], key=len, reverse=True)
+
+_NUMBER_RE = re.compile(r'\d[\d_]*(\.\d[\d_]*)?([eE][+-]?\d+)?')
+_IDENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_PATH_INDEX_RE = re.compile(r'\[(-?\d+)\]')
+
+
+@dataclass(frozen=True)
+class Span:
+    """Source location of a token or node (lines and columns are 1-based)"""
+    start: int
+    end: int
+    line: int
+    col: int
+    end_line: int
+
+
+@dataclass(frozen=True)
+class Token:
+    """Lexical token"""
+    kind: str  # IDENT, NUMBER, STRING, PATH, OP, NEWLINE, COMMENT, EOF
+    text: str
+    span: Span
+    value: Any = None
+
+
+class VRLLexer:
+    """Splits VRL source into tokens, keeping comments and newlines"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.pos = 0
+        self.line = 1
+        self.line_start = -1  # Offset of the newline preceding the current line
+        self.tokens: List[Token] = []
+
+    def tokenize(self) -> List[Token]:
+        src = self.source
+        length = len(src)
+
+        while self.pos < length:
+            ch = src[self.pos]
+
+            if ch in ' \t\r':
+                self.pos += 1
+            elif ch == '\n':
+                newline_at = self.pos
+                self._emit('NEWLINE', self.pos + 1)
+                self.line += 1
+                self.line_start = newline_at
+            elif ch == '#':
+                end = src.find('\n', self.pos)
+                self._emit('COMMENT', length if end == -1 else end)
+            elif ch == '"':
+                self._lex_string(self.pos, '"', 'string', raw=False)
+            elif ch in 'srt' and self.pos + 1 < length and src[self.pos + 1] in '\'"':
+                kind = {'s': 'string', 'r': 'regex', 't': 'timestamp'}[ch]
+                self._lex_string(self.pos + 1, src[self.pos + 1], kind, raw=True)
+            elif ch.isdigit():
+                match = _NUMBER_RE.match(src, self.pos)
+                text = match.group(0).replace('_', '')
+                value = float(text) if match.group(1) or match.group(2) else int(text)
+                self._emit('NUMBER', match.end(), value)
+            elif ch == '_' or ch.isalpha():
+                match = _IDENT_RE.match(src, self.pos)
+                self._emit('IDENT', match.end(), match.group(0))
+            elif ch in '.%' and self._starts_path():
+                self._lex_path()
+            else:
+                for op in OPERATORS:
+                    if src.startswith(op, self.pos):
+                        self._emit('OP', self.pos + len(op), op)
+                        break
+                else:
+                    # Unknown character - let the parser report it
+                    self._emit('OP', self.pos + 1, ch)
+
+        self._emit('EOF', self.pos)
+        return self.tokens
+
+    def _emit(self, kind: str, end: int, value: Any = None):
+        text = self.source[self.pos:end]
+        end_line = self.line if kind == 'NEWLINE' else self.line + text.count('\n')
+        span = Span(self.pos, end, self.line, self.pos - self.line_start, end_line)
+        self.tokens.append(Token(kind, text, span, value))
+        # Track newlines embedded in multi-line strings
+        if kind == 'STRING' and '\n' in text:
+            self.line += text.count('\n')
+            self.line_start = self.pos + text.rfind('\n')
+        self.pos = end
+
+    def _starts_path(self) -> bool:
+        """'%' always begins a metadata path; '.' does unless it follows an operand"""
+        if self.source[self.pos] == '%':
+            return True  # VRL has no modulo operator (it is the mod() function)
+        prev = self.tokens[-1] if self.tokens else None
+        if prev is not None and prev.kind == 'COMMENT' and len(self.tokens) > 1:
+            prev = self.tokens[-2]
+        if prev is None or prev.kind == 'NEWLINE':
+            return True
+        if prev.kind in ('IDENT', 'NUMBER', 'STRING', 'PATH') and prev.text not in KEYWORDS:
+            return False
+        if prev.kind == 'OP' and prev.text in (')', ']', '}'):
+            return False
+        return True
+
+    def _lex_string(self, quote_pos: int, quote: str, kind: str, raw: bool):
+        src = self.source
+        i = quote_pos + 1
+        chars = []
+        while i < len(src):
+            ch = src[i]
+            if ch == '\\' and i + 1 < len(src):
+                # Raw literals keep escapes verbatim (only the quote is skipped)
+                chars.append(src[i:i + 2] if raw else _unescape(src[i + 1]))
+                i += 2
+                continue
+            if ch == quote:
+                i += 1
+                break
+            chars.append(ch)
+            i += 1
+        self._emit('STRING', i, (kind, ''.join(chars)))
+
+    def _lex_path(self):
+        src = self.source
+        root = src[self.pos]
+        i = self.pos + 1
+        segments: List[Union[str, int]] = []
+        expect_segment = True  # A name may follow the root directly (.foo, %foo)
+
+        while i < len(src):
+            ch = src[i]
+            if expect_segment and (ch == '_' or ch.isalpha()):
+                match = _IDENT_RE.match(src, i)
+                segments.append(match.group(0))
+                i = match.end()
+                expect_segment = False
+            elif expect_segment and ch == '"':
+                end = src.find('"', i + 1)
+                if end == -1:
+                    break
+                segments.append(src[i + 1:end])
+                i = end + 1
+                expect_segment = False
+            elif ch == '[':
+                match = _PATH_INDEX_RE.match(src, i)
+                if not match:
+                    break
+                segments.append(int(match.group(1)))
+                i = match.end()
+                expect_segment = False
+            elif ch == '.' and i + 1 < len(src) and (src[i + 1] in '_"' or src[i + 1].isalpha()):
+                if expect_segment and root == '.':
+                    break  # '..' is not a path
+                i += 1
+                expect_segment = True
+            else:
+                break
+
+        self._emit('PATH', i, (root, tuple(segments)))
+
+
+def _unescape(ch: str) -> str:
+    return {'n': '\n', 't': '\t', 'r': '\r', '"': '"', "'": "'", '\\': '\\', '0': '\0'}.get(ch, '\\' + ch)
+
+
+# ---------------------------------------------------------------------------
+# AST nodes
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Node:
+    """Base AST node"""
+    span: Span
+
+    def children(self) -> Iterator['Node']:
+        for f in fields(self):
+            if f.name == 'span':
+                continue
+            yield from _child_nodes(getattr(self, f.name))
+
+
+def _child_nodes(value: Any) -> Iterator[Node]:
+    if isinstance(value, Node):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _child_nodes(item)
+
+
+@dataclass
+class Program(Node):
+    body: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class Block(Node):
+    body: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class If(Node):
+    condition: Node = None
+    then: Block = None
+    orelse: Optional[Node] = None  # Block or nested If
+
+
+@dataclass
+class Assign(Node):
+    targets: List[Node] = field(default_factory=list)
+    op: str = '='
+    value: Node = None
+
+
+@dataclass
+class NamedArg(Node):
+    name: str = ''
+    value: Node = None
+
+
+@dataclass
+class Closure(Node):
+    params: List[str] = field(default_factory=list)
+    body: Block = None
+
+
+@dataclass
+class Call(Node):
+    name: str = ''
+    bang: bool = False
+    args: List[Node] = field(default_factory=list)
+    closure: Optional[Closure] = None
+
+    @property
+    def qualified_name(self) -> str:
+        """Name as written, including the '!' for infallible calls"""
+        return f"{self.name}!" if self.bang else self.name
+
+
+@dataclass
+class Binary(Node):
+    op: str = ''
+    left: Node = None
+    right: Node = None
+
+
+@dataclass
+class Unary(Node):
+    op: str = ''
+    operand: Node = None
+
+
+@dataclass
+class Path(Node):
+    root: str = '.'
+    segments: Tuple[Union[str, int], ...] = ()
+
+    @property
+    def dotted(self) -> str:
+        """Field path without the root, e.g. 'tags.collector.host'"""
+        return '.'.join(str(s) for s in self.segments if isinstance(s, str))
+
+
+@dataclass
+class Variable(Node):
+    name: str = ''
+
+
+@dataclass
+class FieldAccess(Node):
+    target: Node = None
+    name: str = ''
+
+
+@dataclass
+class Index(Node):
+    target: Node = None
+    index: Node = None
+
+
+@dataclass
+class Literal(Node):
+    kind: str = ''  # string, regex, timestamp, integer, float, boolean, null
+    value: Any = None
+
+
+@dataclass
+class Array(Node):
+    items: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class Object(Node):
+    pairs: List[Tuple[str, Node]] = field(default_factory=list)
+
+
+@dataclass
+class Abort(Node):
+    message: Optional[Node] = None
+
+
+@dataclass
+class Return(Node):
+    value: Optional[Node] = None
+
+
+@dataclass
+class Invalid(Node):
+    """Statement the parser could not understand (kept so spans stay complete)"""
+    text: str = ''
+
+
+@dataclass(frozen=True)
+class ParseError:
+    """Recoverable parse error"""
+    message: str
+    span: Span
+
+
+class _Abort(Exception):
+    """Internal: unwinds to the statement loop for error recovery"""
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+class VRLParser:
+    """Recursive-descent parser with per-statement error recovery"""
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = [t for t in tokens if t.kind != 'COMMENT']
+        self.pos = 0
+        self.errors: List[ParseError] = []
+
+    # Token helpers ---------------------------------------------------------
+
+    @property
+    def tok(self) -> Token:
+        return self.tokens[self.pos]
+
+    @property
+    def prev(self) -> Token:
+        return self.tokens[max(0, self.pos - 1)]
+
+    def peek(self, offset: int = 1) -> Token:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def at(self, text: str, kind: str = 'OP') -> bool:
+        return self.tok.kind == kind and self.tok.text == text
+
+    def at_keyword(self, word: str) -> bool:
+        return self.tok.kind == 'IDENT' and self.tok.text == word
+
+    def advance(self) -> Token:
+        token = self.tok
+        if token.kind != 'EOF':
+            self.pos += 1
+        return token
+
+    def expect(self, text: str) -> Token:
+        if not self.at(text):
+            self.error(f"expected '{text}', found '{self.tok.text or self.tok.kind}'")
+        return self.advance()
+
+    def skip_newlines(self):
+        while self.tok.kind == 'NEWLINE':
+            self.advance()
+
+    def error(self, message: str):
+        self.errors.append(ParseError(message, self.tok.span))
+        raise _Abort()
+
+    def span_from(self, start: Token) -> Span:
+        end = self.prev if self.pos > 0 else start
+        if end.span.end < start.span.start:
+            end = start
+        return Span(start.span.start, end.span.end, start.span.line, start.span.col, end.span.end_line)
+
+    # Statements ------------------------------------------------------------
+
+    def parse(self) -> Program:
+        start = self.tok
+        body = self.parse_statements(terminator=None)
+        return Program(self.span_from(start), body)
+
+    def parse_statements(self, terminator: Optional[str]) -> List[Node]:
+        body = []
+        while True:
+            while self.tok.kind == 'NEWLINE' or self.at(';'):
+                self.advance()
+            if self.tok.kind == 'EOF' or (terminator and self.at(terminator)):
+                return body
+
+            start_pos = self.pos
+            try:
+                body.append(self.parse_statement())
+                if not (self.tok.kind in ('NEWLINE', 'EOF') or self.at(';')
+                        or (terminator and self.at(terminator))):
+                    self.error(f"unexpected '{self.tok.text}' after statement")
+            except _Abort:
+                start = self.tokens[start_pos]
+                self.synchronize()
+                body.append(Invalid(self.span_from(start), self._source_slice(start_pos)))
+                if self.pos == start_pos:
+                    self.advance()
+
+    def synchronize(self):
+        """Skip to the end of the current statement, respecting nested braces"""
+        depth = 0
+        while self.tok.kind != 'EOF':
+            if self.tok.kind == 'NEWLINE' and depth == 0:
+                return
+            if self.at('{') or self.at('(') or self.at('['):
+                depth += 1
+            elif self.at('}') or self.at(')') or self.at(']'):
+                if depth == 0:
+                    return
+                depth -= 1
+            self.advance()
+
+    def _source_slice(self, start_pos: int) -> str:
+        return ' '.join(t.text for t in self.tokens[start_pos:self.pos] if t.kind != 'NEWLINE')
+
+    def parse_statement(self) -> Node:
+        start = self.tok
+        if self.at_keyword('abort'):
+            self.advance()
+            message = None if self._at_statement_end() else self.parse_expression()
+            return Abort(self.span_from(start), message)
+        if self.at_keyword('return'):
+            self.advance()
+            value = None if self._at_statement_end() else self.parse_expression()
+            return Return(self.span_from(start), value)
+
+        expr = self.parse_expression()
+
+        targets = [expr]
+        while self.at(',') and self._assignable(expr):
+            self.advance()
+            expr = self.parse_expression()
+            targets.append(expr)
+
+        if self.tok.kind == 'OP' and self.tok.text in ASSIGN_OPS:
+            if not all(self._assignable(t) for t in targets):
+                self.error("invalid assignment target")
+            op = self.advance().text
+            self.skip_newlines()
+            value = self.parse_expression()
+            return Assign(self.span_from(start), targets, op, value)
+
+        if len(targets) > 1:
+            self.error("expected assignment after target list")
+        return expr
+
+    def _at_statement_end(self) -> bool:
+        return self.tok.kind in ('NEWLINE', 'EOF') or self.at(';') or self.at('}')
+
+    @staticmethod
+    def _assignable(node: Node) -> bool:
+        return isinstance(node, (Path, Variable, FieldAccess, Index))
+
+    def parse_block(self) -> Block:
+        start = self.tok
+        self.expect('{')
+        body = self.parse_statements(terminator='}')
+        self.expect('}')
+        return Block(self.span_from(start), body)
+
+    def parse_if(self) -> If:
+        start = self.advance()  # 'if'
+        condition = self.parse_expression()
+        then = self.parse_block()
+        orelse = None
+
+        # 'else' may sit on the next line after the closing brace
+        offset = 0
+        while self.peek(offset).kind == 'NEWLINE':
+            offset += 1
+        if self.peek(offset).kind == 'IDENT' and self.peek(offset).text == 'else':
+            self.pos += offset
+            self.advance()
+            orelse = self.parse_if() if self.at_keyword('if') else self.parse_block()
+
+        return If(self.span_from(start), condition, then, orelse)
+
+    # Expressions -----------------------------------------------------------
+
+    def parse_expression(self, min_precedence: int = 1) -> Node:
+        start = self.tok
+        left = self.parse_unary()
+
+        while self.tok.kind == 'OP' and BINARY_PRECEDENCE.get(self.tok.text, 0) >= min_precedence:
+            op = self.advance().text
+            self.skip_newlines()
+            right = self.parse_expression(BINARY_PRECEDENCE[op] + 1)
+            left = Binary(self.span_from(start), op, left, right)
+
+        return left
+
+    def parse_unary(self) -> Node:
+        if self.at('!') or self.at('-'):
+            start = self.advance()
+            operand = self.parse_unary()
+            return Unary(self.span_from(start), start.text, operand)
+        return self.parse_postfix()
+
+    def parse_postfix(self) -> Node:
+        start = self.tok
+        node = self.parse_primary()
+
+        while True:
+            if self.at('.') and self.peek().kind in ('IDENT', 'STRING'):
+                self.advance()
+                name_tok = self.advance()
+                name = name_tok.text if name_tok.kind == 'IDENT' else name_tok.value[1]
+                node = FieldAccess(self.span_from(start), node, name)
+            elif self.at('[') and self.tok.span.start == self.prev.span.end:
+                self.advance()
+                self.skip_newlines()
+                index = self.parse_expression()
+                self.skip_newlines()
+                self.expect(']')
+                node = Index(self.span_from(start), node, index)
+            else:
+                return node
+
+    def parse_primary(self) -> Node:
+        tok = self.tok
+
+        if tok.kind == 'NUMBER':
+            self.advance()
+            kind = 'float' if isinstance(tok.value, float) else 'integer'
+            return Literal(tok.span, kind, tok.value)
+
+        if tok.kind == 'STRING':
+            self.advance()
+            kind, value = tok.value
+            return Literal(tok.span, kind, value)
+
+        if tok.kind == 'PATH':
+            self.advance()
+            root, segments = tok.value
+            return Path(tok.span, root, segments)
+
+        if tok.kind == 'IDENT':
+            if tok.text in ('true', 'false'):
+                self.advance()
+                return Literal(tok.span, 'boolean', tok.text == 'true')
+            if tok.text == 'null':
+                self.advance()
+                return Literal(tok.span, 'null', None)
+            if tok.text == 'if':
+                return self.parse_if()
+            nxt = self.peek()
+            if nxt.kind == 'OP' and nxt.text == '(' and nxt.span.start == tok.span.end:
+                return self.parse_call()
+            if (nxt.kind == 'OP' and nxt.text == '!' and nxt.span.start == tok.span.end
+                    and self.peek(2).kind == 'OP' and self.peek(2).text == '('):
+                return self.parse_call()
+            self.advance()
+            return Variable(tok.span, tok.text)
+
+        if self.at('('):
+            self.advance()
+            self.skip_newlines()
+            inner = self.parse_expression()
+            self.skip_newlines()
+            self.expect(')')
+            return inner
+
+        if self.at('['):
+            return self.parse_array()
+
+        if self.at('{'):
+            nxt = self.peek()
+            after = self.peek(2)
+            is_object = (nxt.kind == 'OP' and nxt.text == '}') or (
+                nxt.kind == 'STRING' and after.kind == 'OP' and after.text == ':')
+            if not is_object:
+                offset = 1
+                while self.peek(offset).kind == 'NEWLINE':
+                    offset += 1
+                is_object = (self.peek(offset).kind == 'STRING'
+                             and self.peek(offset + 1).kind == 'OP' and self.peek(offset + 1).text == ':')
+            return self.parse_object() if is_object else self.parse_block()
+
+        self.error(f"unexpected '{tok.text or tok.kind}'")
+
+    def parse_call(self) -> Call:
+        start = self.advance()
+        bang = False
+        if self.at('!'):
+            self.advance()
+            bang = True
+        self.expect('(')
+        args: List[Node] = []
+        self.skip_newlines()
+        while not self.at(')'):
+            arg_start = self.tok
+            if self.tok.kind == 'IDENT' and self.peek().kind == 'OP' and self.peek().text == ':':
+                name = self.advance().text
+                self.advance()
+                self.skip_newlines()
+                args.append(NamedArg(self.span_from(arg_start), name, self.parse_expression()))
+            else:
+                args.append(self.parse_expression())
+            self.skip_newlines()
+            if not self.at(')'):
+                self.expect(',')
+                self.skip_newlines()
+        self.expect(')')
+
+        closure = None
+        if self.at('->'):
+            closure_start = self.advance()
+            params = []
+            if self.at('||'):
+                self.advance()
+            else:
+                self.expect('|')
+                while not self.at('|'):
+                    if self.tok.kind != 'IDENT':
+                        self.error("expected closure parameter")
+                    params.append(self.advance().text)
+                    if not self.at('|'):
+                        self.expect(',')
+                self.advance()
+            body = self.parse_block()
+            closure = Closure(self.span_from(closure_start), params, body)
+
+        return Call(self.span_from(start), start.text, bang, args, closure)
+
+    def parse_array(self) -> Array:
+        start = self.advance()
+        items = []
+        self.skip_newlines()
+        while not self.at(']'):
+            items.append(self.parse_expression())
+            self.skip_newlines()
+            if not self.at(']'):
+                self.expect(',')
+                self.skip_newlines()
+        self.advance()
+        return Array(self.span_from(start), items)
+
+    def parse_object(self) -> Object:
+        start = self.advance()
+        pairs = []
+        self.skip_newlines()
+        while not self.at('}'):
+            if self.tok.kind != 'STRING':
+                self.error("expected object key")
+            key = self.advance().value[1]
+            self.expect(':')
+            self.skip_newlines()
+            pairs.append((key, self.parse_expression()))
+            self.skip_newlines()
+            if not self.at('}'):
+                self.expect(',')
+                self.skip_newlines()
+        self.advance()
+        return Object(self.span_from(start), pairs)
+
+
+# ---------------------------------------------------------------------------
+# Parsed program and queries
+# ---------------------------------------------------------------------------
+
+class VRLProgram:
+    """Parsed VRL with cached query helpers (treat as read-only)"""
+
+    def __init__(self, source: str, fingerprint: str):
+        self.source = source
+        self.fingerprint = fingerprint
+        self.tokens = VRLLexer(source).tokenize()
+        parser = VRLParser(self.tokens)
+        self.root = parser.parse()
+        self.errors = parser.errors
+        self._nodes: Optional[List[Node]] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """True if the whole source parsed without recovery"""
+        return not self.errors
+
+    @property
+    def lines(self) -> List[str]:
+        return self.source.split('\n')
+
+    def source_of(self, node: Node) -> str:
+        """Exact source text of a node"""
+        return self.source[node.span.start:node.span.end]
+
+    def walk(self) -> List[Node]:
+        """All nodes in source order (pre-order)"""
+        if self._nodes is None:
+            nodes = []
+            stack = [self.root]
+            while stack:
+                node = stack.pop()
+                nodes.append(node)
+                stack.extend(reversed(list(node.children())))
+            self._nodes = nodes
+        return self._nodes
+
+    def find(self, node_type: type) -> List[Node]:
+        """All nodes of the given type"""
+        return [n for n in self.walk() if isinstance(n, node_type)]
+
+    def calls(self, *names: str) -> List[Call]:
+        """Function calls, optionally filtered by name (without '!')"""
+        calls = self.find(Call)
+        if names:
+            wanted = {n.rstrip('!') for n in names}
+            calls = [c for c in calls if c.name in wanted]
+        return calls
+
+    def function_names(self) -> Set[str]:
+        """Names of all called functions (without '!')"""
+        return {c.name for c in self.calls()}
+
+    def assignments(self) -> List[Assign]:
+        return self.find(Assign)
+
+    def assigned_paths(self) -> List[str]:
+        """Event field paths written by assignments, e.g. ['ssh_user', 'tags.host']"""
+        paths = []
+        for assign in self.assignments():
+            for target in assign.targets:
+                if isinstance(target, Path) and target.root == '.' and target.dotted:
+                    paths.append(target.dotted)
+        return paths
+
+    def string_literals(self) -> List[Literal]:
+        """String, raw-string and regex literals"""
+        return [n for n in self.find(Literal) if n.kind in ('string', 'regex')]
+
+    def code_lines(self) -> Set[int]:
+        """Line numbers containing anything other than comments and whitespace"""
+        lines = set()
+        for tok in self.tokens:
+            if tok.kind not in ('COMMENT', 'NEWLINE', 'EOF'):
+                lines.update(range(tok.span.line, tok.span.end_line + 1))
+        return lines
+
+    def calls_by_line(self) -> Dict[int, Set[str]]:
+        """Map of line number -> names of functions called on that line"""
+        result: Dict[int, Set[str]] = defaultdict(set)
+        for call in self.calls():
+            result[call.span.line].add(call.name)
+        return result
+
+    def operators_by_line(self) -> Dict[int, Set[str]]:
+        """Map of line number -> operator tokens on that line"""
+        result: Dict[int, Set[str]] = defaultdict(set)
+        for tok in self.tokens:
+            if tok.kind == 'OP':
+                result[tok.span.line].add(tok.text)
+        return result
+
+    def nodes_on_line(self, line: int) -> List[Node]:
+        """Nodes whose span starts on the given line"""
+        return [n for n in self.walk() if n.span.line == line and not isinstance(n, Program)]
+
+
+class VRLASTCache:
+    """Thread-safe LRU cache of parsed programs keyed by VRL content hash"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, VRLProgram]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def fingerprint(vrl_code: str) -> str:
+        return hashlib.sha256(vrl_code.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def parse(self, vrl_code: str) -> VRLProgram:
+        key = self.fingerprint(vrl_code)
+        with self._lock:
+            program = self._entries.get(key)
+            if program is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return program
+
+        # Parse outside the lock; a racing duplicate parse is harmless
+        program = VRLProgram(vrl_code, key)
+        if program.errors:
+            logger.debug(f"VRL parsed with {len(program.errors)} recoverable errors: {program.errors[0].message}")
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = program
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return program
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# Global AST cache
+_ast_cache = VRLASTCache()
+
+def parse_vrl(vrl_code: str) -> VRLProgram:
+    """Parse VRL once per distinct source and return the cached program"""
+    return _ast_cache.parse(vrl_code)
+
+def get_ast_cache_stats() -> Dict[str, int]:
+    """Get AST cache hit/miss counts"""
+    return {'entries': len(_ast_cache), 'hits': _ast_cache.hits, 'misses': _ast_cache.misses}
@@ -0,0 +1,549 @@
+"""
+AST VRL Optimizer
+
+Semantics-preserving source rewrites of generated VRL, replacing the
+boilerplate that optimize_vrl_code used to prepend/append:
+
+- hoist: repeated conversions and pure calls (string!(.message),
+  split(message_str, " "), ...) computed once into a local
+- remove_unreachable: constant if conditions, empty ifs and statements
+  after abort
+- remove_unused: assignments to locals that are never read
+- reorder_branches: mutually exclusive if/else-if chains ordered by how
+  often each branch fires on the sample events (measured by the branch
+  profiler when one is configured)
+
+Every rewrite must compile and produce identical events on the samples
+(PyVRL), and must not lower the cost model's events/CPU% (VPI) estimate;
+the VPI delta of each accepted rewrite is reported.
+"""
+
+import re
+import textwrap
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from .cost_model import VRLCostModel, evaluate_condition, local_bindings, sample_events_from_logs
+from .equivalence import EquivalenceChecker
+from .vrl_profiler import VRLProfiler
+from .vrl_ast import (
+    VRLProgram, parse_vrl, Node, Block, If, Assign, Call, Binary, Path,
+    Variable, Literal, Abort, Return, Closure,
+)
+
+MAX_VERIFY_EVENTS = 200
+MAX_REWRITES = 50
+
+# Functions with effects beyond their return value (never moved or removed)
+SIDE_EFFECT_FUNCTIONS = frozenset({
+    'del', 'log', 'assert', 'assert_eq', 'set_secret', 'remove_secret',
+    'set_semantic_meaning', 'set_metadata_field', 'remove_metadata_field',
+})
+
+# Functions whose result changes between calls (never merged)
+NONDETERMINISTIC_FUNCTIONS = frozenset({
+    'now', 'uuid_v4', 'uuid_v7', 'random_int', 'random_float', 'random_bool', 'random_bytes',
+})
+
+# Suffix for locals holding a hoisted call, e.g. string!(.message) -> message_str
+_LOCAL_SUFFIXES = {
+    'string': 'str', 'to_string': 'str', 'int': 'int', 'to_int': 'int',
+    'float': 'float', 'to_float': 'float', 'bool': 'bool', 'to_bool': 'bool',
+    'object': 'obj', 'array': 'arr', 'split': 'parts',
+}
+
+
+@dataclass
+class Rewrite:
+    """A candidate whole-program rewrite"""
+    kind: str           # hoist, remove_unreachable, remove_unused, reorder_branches
+    key: str            # Identity used to avoid retrying rejected candidates
+    description: str
+    code: str
+    require_events: bool = False  # Only valid if checked on sample events
+
+
+@dataclass
+class OptimizationStep:
+    """An accepted rewrite and its estimated effect"""
+    kind: str
+    description: str
+    vpi_before: float
+    vpi_after: float
+
+    @property
+    def vpi_delta(self) -> float:
+        return self.vpi_after - self.vpi_before
+
+
+@dataclass
+class OptimizationResult:
+    """Outcome of VRLOptimizer.optimize()"""
+    code: str
+    original_vpi: float
+    steps: List[OptimizationStep] = field(default_factory=list)
+    rejected: List[Tuple[str, str]] = field(default_factory=list)  # (description, reason)
+    verified_events: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.steps)
+
+    @property
+    def optimized_vpi(self) -> float:
+        return self.steps[-1].vpi_after if self.steps else self.original_vpi
+
+
+def _subtree(node: Node) -> Iterator[Node]:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(current.children())
+
+
+def _is_pure(node: Node) -> bool:
+    """No assignments, aborts or side-effecting/nondeterministic calls"""
+    for n in _subtree(node):
+        if isinstance(n, (Assign, Abort, Return)):
+            return False
+        if isinstance(n, Call) and n.name in SIDE_EFFECT_FUNCTIONS | NONDETERMINISTIC_FUNCTIONS:
+            return False
+    return True
+
+
+def _is_infallible(node: Node) -> bool:
+    """Pure and free of '!' calls, so evaluating it can never abort the program"""
+    return _is_pure(node) and not any(isinstance(n, Call) and n.bang for n in _subtree(node))
+
+
+def _overlaps(a: Tuple[str, tuple], b: Tuple[str, tuple]) -> bool:
+    """True if one (root, segments) path is a prefix of the other"""
+    (root_a, seg_a), (root_b, seg_b) = a, b
+    shorter = min(len(seg_a), len(seg_b))
+    return root_a == root_b and seg_a[:shorter] == seg_b[:shorter]
+
+
+def _line_extent(source: str, node: Node) -> Optional[Tuple[int, int, str]]:
+    """(line start, line end, indent) if node alone occupies its lines (trailing comments allowed)"""
+    line_start = source.rfind('\n', 0, node.span.start) + 1
+    line_end = source.find('\n', node.span.end)
+    line_end = len(source) if line_end == -1 else line_end
+    indent = source[line_start:node.span.start]
+    trailing = source[node.span.end:line_end].strip()
+    if indent.strip() or (trailing and not trailing.startswith('#')):
+        return None
+    return line_start, line_end, indent
+
+
+def _replace_lines(source: str, start: int, end: int, replacement: str) -> str:
+    """Replace source[start:end] (whole lines); an empty replacement drops the lines"""
+    if replacement:
+        return source[:start] + replacement + source[end:]
+    if end < len(source):
+        return source[:start] + source[end + 1:]
+    return source[:max(0, start - 1)]
+
+
+def _inline_block(source: str, block: Block, indent: str) -> str:
+    """Body of a block re-indented to indent (its braces removed)"""
+    lines = source[block.span.start + 1:block.span.end - 1].split('\n')
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    body = textwrap.dedent('\n'.join(line.rstrip() for line in lines)).strip(' ')
+    return '\n'.join(indent + line if line.strip() else '' for line in body.split('\n')) if body else ''
+
+
+def _bodies(program: VRLProgram) -> Iterator[List[Node]]:
+    """Every statement list: the program and each block"""
+    yield program.root.body
+    for block in program.find(Block):
+        yield block.body
+
+
+class _Analysis:
+    """Per-program facts used to decide whether an expression may be moved"""
+
+    def __init__(self, program: VRLProgram):
+        self.program = program
+        # id(node) -> (top-level statement index, conditionally evaluated, inside closure)
+        self.context: Dict[int, Tuple[int, bool, bool]] = {}
+        for index, statement in enumerate(program.root.body):
+            self._visit(statement, index, False, False)
+
+        self.mutated: List[Tuple[str, tuple]] = []
+        definitions: Dict[str, List[Assign]] = defaultdict(list)
+        target_ids = set()
+        for assign in program.assignments():
+            for target in assign.targets:
+                target_ids.add(id(target))
+                if isinstance(target, Path):
+                    self.mutated.append((target.root, target.segments))
+                elif isinstance(target, Variable):
+                    definitions[target.name].append(assign)
+        for call in program.calls(*SIDE_EFFECT_FUNCTIONS):
+            for arg in call.args:
+                if isinstance(arg, Path):
+                    self.mutated.append((arg.root, arg.segments))
+
+        # Locals assigned exactly once, by a top-level statement -> its index
+        top_level = {id(s): i for i, s in enumerate(program.root.body)}
+        self.single_definitions = {
+            name: top_level[id(assigns[0])] for name, assigns in definitions.items()
+            if len(assigns) == 1 and id(assigns[0]) in top_level
+        }
+
+        self.reads = Counter(v.name for v in program.find(Variable) if id(v) not in target_ids)
+        for closure in program.find(Closure):
+            self.reads.update(closure.params)
+        self.variable_names = {v.name for v in program.find(Variable)}
+
+    def _visit(self, node: Node, top: int, conditional: bool, closure: bool):
+        self.context[id(node)] = (top, conditional, closure)
+        if isinstance(node, If):
+            self._visit(node.condition, top, conditional, closure)
+            self._visit(node.then, top, True, closure)
+            if node.orelse is not None:
+                self._visit(node.orelse, top, True, closure)
+        elif isinstance(node, Binary) and node.op in ('&&', '||', '??'):
+            self._visit(node.left, top, conditional, closure)
+            self._visit(node.right, top, True, closure)
+        elif isinstance(node, Closure):
+            for child in node.children():
+                self._visit(child, top, True, True)
+        else:
+            for child in node.children():
+                self._visit(child, top, conditional, closure)
+
+    def stable_before(self, node: Node, index: int) -> bool:
+        """True if node's inputs hold the same values anywhere from top-level statement index on"""
+        for n in _subtree(node):
+            if isinstance(n, Path):
+                if any(_overlaps((n.root, n.segments), m) for m in self.mutated):
+                    return False
+            elif isinstance(n, Variable):
+                if self.single_definitions.get(n.name, index) >= index:
+                    return False
+            elif isinstance(n, Call) and n.closure is not None:
+                return False
+        return _is_pure(node)
+
+
+class VRLOptimizer:
+    """Applies verified, VPI-measured AST rewrites to VRL programs"""
+
+    def __init__(self, cost_model: VRLCostModel, max_events: int = MAX_VERIFY_EVENTS,
+                 max_rewrites: int = MAX_REWRITES, profiler: Optional[VRLProfiler] = None):
+        """
+        Initialize optimizer
+
+        Args:
+            cost_model: Cost model used to measure each rewrite's VPI delta
+            max_events: Maximum sample events used for verification and measurement
+            max_rewrites: Maximum rewrites applied per program
+            profiler: Branch profiler; measured branch frequencies replace
+                condition evaluation where available
+        """
+        self.cost_model = cost_model
+        self.profiler = profiler
+        self.max_events = max_events
+        self.max_rewrites = max_rewrites
+
+    def optimize(self, vrl_code: str, sample_logs: Optional[str] = None) -> OptimizationResult:
+        """
+        Optimize a VRL program
+
+        Args:
+            vrl_code: VRL source
+            sample_logs: Newline separated sample logs used to verify rewrites
+                and measure branch frequencies
+
+        Returns:
+            OptimizationResult with the optimized code and per-rewrite VPI deltas
+        """
+        events = sample_events_from_logs(sample_logs, self.max_events) if sample_logs else []
+        result = OptimizationResult(code=vrl_code, original_vpi=self._vpi(vrl_code, events))
+
+        checker = EquivalenceChecker(vrl_code, events)
+        if not checker.available:
+            logger.debug(f"Skipping VRL optimization: {checker.reason}")
+            return result
+        result.verified_events = len(checker.events)
+
+        code, vpi = vrl_code, result.original_vpi
+        tried = set()
+        while len(result.steps) < self.max_rewrites:
+            for rewrite in self.candidates(code, checker.events):
+                if (rewrite.kind, rewrite.key) in tried:
+                    continue
+                tried.add((rewrite.kind, rewrite.key))
+
+                reason = checker.check(rewrite.code, require_events=rewrite.require_events)
+                new_vpi = self._vpi(rewrite.code, events) if reason is None else vpi
+                if reason is None and new_vpi < vpi * (1 - 1e-9):
+                    reason = f"lowers estimated VPI ({vpi:.0f} -> {new_vpi:.0f})"
+                if reason:
+                    result.rejected.append((rewrite.description, reason))
+                    continue
+
+                step = OptimizationStep(rewrite.kind, rewrite.description, vpi, new_vpi)
+                result.steps.append(step)
+                logger.info(f"⚙️ {rewrite.description}: VPI {vpi:.0f} → {new_vpi:.0f} ({step.vpi_delta:+.1f})")
+                code, vpi = rewrite.code, new_vpi
+                break
+            else:
+                break
+
+        result.code = code
+        for description, reason in result.rejected:
+            logger.debug(f"   Skipped {description}: {reason}")
+        return result
+
+    def _vpi(self, vrl_code: str, events: List[Dict[str, Any]]) -> float:
+        probabilities = self.branch_probabilities(parse_vrl(vrl_code), events)
+        return self.cost_model.estimate(vrl_code, events, probabilities).events_per_cpu_percent
+
+    def branch_probabilities(self, program: VRLProgram, events: List[Dict[str, Any]]) -> Dict[int, float]:
+        """
+        Measured then-branch probabilities, including conditions on locals
+
+        Profiled frequencies (if a profiler is configured) take precedence
+        over conditions evaluated on the samples.
+
+        Args:
+            program: Parsed VRL
+            events: Sample events
+
+        Returns:
+            Map of If node span start -> probability (measurable conditions only)
+        """
+        bindings = local_bindings(program)
+        probabilities = {}
+        for node in program.find(If):
+            results = [evaluate_condition(node.condition, event, bindings) for event in events]
+            results = [r for r in results if r is not None]
+            if results:
+                probabilities[node.span.start] = sum(results) / len(results)
+
+        profile = self.profiler.profile(program.source, events) if self.profiler and events else None
+        if profile:
+            probabilities.update(profile.branch_probabilities())
+        return probabilities
+
+    def candidates(self, vrl_code: str, events: List[Dict[str, Any]]) -> Iterator[Rewrite]:
+        """Candidate rewrites of vrl_code, cheapest/safest first"""
+        program = parse_vrl(vrl_code)
+        if program.errors:
+            return
+        analysis = _Analysis(program)
+        yield from self._unreachable_rewrites(program)
+        yield from self._unused_rewrites(program, analysis)
+        yield from self._hoist_rewrites(program, analysis)
+        yield from self._reorder_rewrites(program, events)
+
+    # ------------------------------------------------------------- dead code
+
+    def _unreachable_rewrites(self, program: VRLProgram) -> Iterator[Rewrite]:
+        source = program.source
+        for body in _bodies(program):
+            for index, statement in enumerate(body):
+                if isinstance(statement, (Abort, Return)) and index + 1 < len(body):
+                    first, last = _line_extent(source, body[index + 1]), _line_extent(source, body[-1])
+                    if first and last:
+                        yield Rewrite('remove_unreachable', f"after:{statement.span.start}",
+                                      f"remove {len(body) - index - 1} statement(s) after line {statement.span.line}",
+                                      _replace_lines(source, first[0], last[1], ''))
+                    break
+
+                if not isinstance(statement, If):
+                    continue
+                extent = _line_extent(source, statement)
+                if extent is None:
+                    continue
+                start, end, indent = extent
+                condition = statement.condition
+
+                if isinstance(condition, Literal) and condition.kind == 'boolean':
+                    if condition.value:
+                        replacement = _inline_block(source, statement.then, indent)
+                    elif isinstance(statement.orelse, If):
+                        replacement = indent + program.source_of(statement.orelse)
+                    elif isinstance(statement.orelse, Block):
+                        replacement = _inline_block(source, statement.orelse, indent)
+                    else:
+                        replacement = ''
+                    yield Rewrite('remove_unreachable', f"const:{program.source_of(statement)}",
+                                  f"fold constant if on line {statement.span.line}",
+                                  _replace_lines(source, start, end, replacement))
+                elif not statement.then.body and statement.orelse is None and _is_infallible(condition):
+                    yield Rewrite('remove_unreachable', f"empty:{program.source_of(statement)}",
+                                  f"remove empty if on line {statement.span.line}",
+                                  _replace_lines(source, start, end, ''))
+
+    def _unused_rewrites(self, program: VRLProgram, analysis: _Analysis) -> Iterator[Rewrite]:
+        source = program.source
+        for body in _bodies(program):
+            for statement in body:
+                if not (isinstance(statement, Assign) and statement.op == '=' and len(statement.targets) == 1):
+                    continue
+                target = statement.targets[0]
+                if not isinstance(target, Variable) or analysis.reads[target.name]:
+                    continue
+                extent = _line_extent(source, statement)
+                if extent is None or not _is_infallible(statement.value):
+                    continue
+                yield Rewrite('remove_unused', f"unused:{program.source_of(statement)}",
+                              f"remove unused variable {target.name} (line {statement.span.line})",
+                              _replace_lines(source, extent[0], extent[1], ''))
+
+    # ----------------------------------------------------------------- hoist
+
+    def _hoist_rewrites(self, program: VRLProgram, analysis: _Analysis) -> Iterator[Rewrite]:
+        groups: Dict[str, List[Call]] = defaultdict(list)
+        for call in program.find(Call):
+            context = analysis.context.get(id(call))
+            if context is None or context[2] or call.closure is not None:
+                continue
+            if call.name in SIDE_EFFECT_FUNCTIONS | NONDETERMINISTIC_FUNCTIONS:
+                continue
+            groups[program.source_of(call)].append(call)
+
+        assigned_by = {id(s.value): s for s in program.root.body
+                       if isinstance(s, Assign) and s.op == '=' and len(s.targets) == 1}
+
+        # Innermost (shortest) expressions first so outer ones can reuse their locals
+        for text, calls in sorted(groups.items(), key=lambda item: len(item[0])):
+            if len(calls) < 2:
+                continue
+            calls.sort(key=lambda c: c.span.start)
+            first = calls[0]
+            index, conditional, _ = analysis.context[id(first)]
+
+            owner = assigned_by.get(id(first))
+            target = owner.targets[0] if owner else None
+            if (isinstance(target, Variable) and not conditional
+                    and analysis.single_definitions.get(target.name) == index):
+                name, definition, occurrences = target.name, None, calls[1:]
+            else:
+                if conditional and not _is_infallible(first):
+                    continue
+                name, definition, occurrences = self._local_name(first, analysis), text, calls
+
+            if not analysis.stable_before(first, index):
+                continue
+
+            statement = program.root.body[index]
+            extent = _line_extent(program.source, statement)
+            if extent is None:
+                continue
+
+            code = program.source
+            for call in reversed(occurrences):
+                code = code[:call.span.start] + name + code[call.span.end:]
+            if definition is not None:
+                code = code[:extent[0]] + f"{extent[2]}{name} = {definition}\n" + code[extent[0]:]
+            yield Rewrite('hoist', text, f"hoist {text} into {name} ({len(calls)} uses)", code)
+
+    def _local_name(self, call: Call, analysis: _Analysis) -> str:
+        args = [a for a in call.args if isinstance(a, (Path, Variable))]
+        base = call.name
+        if args and isinstance(args[0], Path) and args[0].segments:
+            base = str(args[0].segments[-1])
+        elif args and isinstance(args[0], Variable):
+            base = args[0].name
+        name = re.sub(r'\W', '_', f"{base}_{_LOCAL_SUFFIXES.get(call.name, call.name)}")
+        if name[0].isdigit():
+            name = f"v_{name}"
+        candidate, n = name, 2
+        while candidate in analysis.variable_names:
+            candidate, n = f"{name}_{n}", n + 1
+        return candidate
+
+    # --------------------------------------------------------------- reorder
+
+    def _reorder_rewrites(self, program: VRLProgram, events: List[Dict[str, Any]]) -> Iterator[Rewrite]:
+        if not events:
+            return
+        source = program.source
+        bindings = local_bindings(program)
+        profile = self.profiler.profile(source, events) if self.profiler else None
+        measured = {b.span_start: b.taken for b in profile.branches} if profile and profile.completed else None
+        for body in _bodies(program):
+            for statement in body:
+                if not (isinstance(statement, If) and isinstance(statement.orelse, If)):
+                    continue
+                chain = [statement]
+                while isinstance(chain[-1].orelse, If):
+                    chain.append(chain[-1].orelse)
+                final = chain[-1].orelse
+                if not all(_is_infallible(branch.condition) for branch in chain):
+                    continue
+
+                hits = self.branch_hits(chain, events, bindings, measured)
+                if hits is None:
+                    continue
+                order = sorted(range(len(chain)), key=lambda i: -hits[i])
+                if order == list(range(len(chain))):
+                    continue
+
+                text = ' else '.join(
+                    f"if {program.source_of(chain[i].condition)} {program.source_of(chain[i].then)}"
+                    for i in order
+                )
+                if final is not None:
+                    text += f" else {program.source_of(final)}"
+                yield Rewrite('reorder_branches', f"reorder:{program.source_of(statement)}",
+                              f"reorder if chain on line {statement.span.line} by frequency {sorted(hits, reverse=True)}",
+                              source[:statement.span.start] + text + source[statement.span.end:],
+                              require_events=True)
+
+    def branch_hits(self, chain: List[If], events: List[Dict[str, Any]],
+                    bindings: Optional[Dict[str, Node]] = None,
+                    measured: Optional[Dict[int, int]] = None) -> Optional[List[int]]:
+        """
+        How often each branch of an if/else-if chain fires on the sample events
+
+        Args:
+            chain: The chain's If nodes in source order
+            events: Sample events
+            bindings: Local variable definitions substituted into conditions
+            measured: Profiled taken counts keyed by If span start; used
+                instead of evaluated counts (evaluation still rejects chains
+                whose conditions overlap)
+
+        Returns:
+            Hit count per branch, or None if the conditions cannot be evaluated
+            (and were not profiled) or are not mutually exclusive on the samples
+        """
+        hits = [0] * len(chain)
+        evaluated = 0
+        for event in events:
+            values = [evaluate_condition(branch.condition, event, bindings) for branch in chain]
+            if None in values:
+                continue
+            if sum(values) > 1:
+                return None
+            evaluated += 1
+            if True in values:
+                hits[values.index(True)] += 1
+        if measured is not None and all(branch.span.start in measured for branch in chain):
+            return [measured[branch.span.start] for branch in chain]
+        return hits if evaluated else None
+
+
+# Global optimizer (cost model built from the calibrated VPI table on first use)
+_vrl_optimizer: Optional[VRLOptimizer] = None
+
+def optimize_vrl(vrl_code: str, sample_logs: Optional[str] = None) -> OptimizationResult:
+    """Apply verified AST optimizations to VRL code"""
+    global _vrl_optimizer
+    if _vrl_optimizer is None:
+        from .vpi_calibration import load_function_vpi_impact
+        cost_model = VRLCostModel(load_function_vpi_impact())
+        _vrl_optimizer = VRLOptimizer(cost_model, profiler=VRLProfiler(cost_model))
+    return _vrl_optimizer.optimize(vrl_code, sample_logs)
@@ -0,0 +1,319 @@
+"""
+VRL Branch Profiler
+
+Runs generated VRL over the sample events with a hit counter at the top of
+every block, and reports which branches actually fire and where the
+per-event cost goes:
+
+- Each if gets evaluation/taken counts (else-if links counted separately)
+- Each statement gets the number of events that reached it and its
+  per-execution cost from the cost model; hits x cost ranks the hot spots
+- Probes push block ids onto a local array that is returned as the
+  program's final expression, so events are not modified
+- Runs in-process with PyVRL or through the Vector CLI (``vector vrl``)
+
+Statements inside closures (for_each, map_values, ...) are attributed to
+the statement containing the closure.
+"""
+
+import copy
+import json
+import subprocess
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path as FilePath
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .cost_model import VRLCostModel, sample_events_from_logs
+from .vrl_ast import VRLProgram, parse_vrl, Node, Block, If, Closure
+
+# Local variable collecting the ids of the blocks entered by an event
+PROFILE_VARIABLE = "_profile_hits"
+
+DEFAULT_MAX_EVENTS = 500
+
+ENGINES = ("pyvrl", "vector")
+
+
+@dataclass
+class BranchProfile:
+    """Measured behaviour of one if (or else-if link)"""
+    line: int
+    condition: str
+    evaluations: int    # Events that evaluated the condition
+    taken: int          # Events that entered the then-branch
+    span_start: int     # If node span start (key used by the cost model)
+
+    @property
+    def probability(self) -> float:
+        return self.taken / self.evaluations if self.evaluations else 0.0
+
+
+@dataclass
+class StatementProfile:
+    """How often a statement ran and what one execution costs"""
+    line: int
+    source: str
+    hits: int
+    cost: float
+
+    @property
+    def total_cost(self) -> float:
+        return self.hits * self.cost
+
+
+@dataclass
+class VRLProfile:
+    """Per-branch and per-statement profile of a VRL program on sample events"""
+    engine: str
+    events: int
+    completed: int      # Events that ran to the end without error/abort
+    branches: List[BranchProfile] = field(default_factory=list)
+    statements: List[StatementProfile] = field(default_factory=list)
+
+    @property
+    def errors(self) -> int:
+        return self.events - self.completed
+
+    def branch_probabilities(self) -> Dict[int, float]:
+        """Measured then-branch probabilities keyed by If span start (cost model format)"""
+        return {b.span_start: b.probability for b in self.branches if b.evaluations}
+
+    def hot_statements(self, n: int = 5) -> List[StatementProfile]:
+        """Statements with the highest total cost over the samples"""
+        ranked = sorted((s for s in self.statements if s.hits), key=lambda s: -s.total_cost)
+        return ranked[:n]
+
+    def format_summary(self, max_statements: int = 5) -> str:
+        """Profile as plain text for LLM performance feedback"""
+        lines = [f"Profiled on {self.events} sample events with {self.engine}: "
+                 f"{self.completed} completed, {self.errors} errored or aborted"]
+
+        if self.branches:
+            lines.append("Branches (taken / evaluated):")
+            for branch in self.branches:
+                note = " - never taken" if branch.evaluations and not branch.taken else ""
+                lines.append(f"  line {branch.line}: if {_shorten(branch.condition)} -> "
+                             f"{branch.taken}/{branch.evaluations} ({branch.probability:.0%}){note}")
+
+        total = sum(s.total_cost for s in self.statements)
+        hot = self.hot_statements(max_statements)
+        if hot and total > 0:
+            lines.append("Most expensive statements (hits x cost per execution):")
+            for statement in hot:
+                lines.append(f"  line {statement.line}: {_shorten(statement.source)} - "
+                             f"{statement.hits} hits, {statement.total_cost / total:.0%} of total cost")
+
+        unreached = [s for s in self.statements if not s.hits]
+        if unreached and self.completed:
+            lines.append("Never reached on the samples:")
+            lines.extend(f"  line {s.line}: {_shorten(s.source)}" for s in unreached)
+        return "\n".join(lines)
+
+
+def _shorten(text: str, limit: int = 70) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _closure_nodes(program: VRLProgram) -> set:
+    """ids of all nodes inside closures"""
+    inside = set()
+    for closure in program.find(Closure):
+        stack = [closure]
+        while stack:
+            node = stack.pop()
+            inside.add(id(node))
+            stack.extend(node.children())
+    return inside
+
+
+def instrument(program: VRLProgram) -> Tuple[str, List[Block]]:
+    """
+    Add block hit probes to a VRL program
+
+    Args:
+        program: Parsed VRL (not modified)
+
+    Returns:
+        (instrumented source returning the list of entered block ids,
+         probed blocks indexed by id)
+    """
+    in_closure = _closure_nodes(program)
+    blocks = [b for b in program.find(Block) if id(b) not in in_closure]
+
+    code = program.source
+    for probe_id, block in sorted(enumerate(blocks), key=lambda item: -item[1].span.start):
+        position = block.span.start + 1
+        probe = f" {PROFILE_VARIABLE} = push({PROFILE_VARIABLE}, {probe_id});"
+        code = code[:position] + probe + code[position:]
+    return f"{PROFILE_VARIABLE} = []\n{code}\n{PROFILE_VARIABLE}", blocks
+
+
+class VRLProfiler:
+    """Measures branch frequencies and statement costs of VRL on sample events"""
+
+    def __init__(self, cost_model: Optional[VRLCostModel] = None, engine: str = "pyvrl",
+                 max_events: int = DEFAULT_MAX_EVENTS):
+        """
+        Initialize profiler
+
+        Args:
+            cost_model: Cost model for per-statement costs (costs are 0 without one)
+            engine: "pyvrl" (in-process) or "vector" (``vector vrl`` CLI)
+            max_events: Maximum sample events profiled
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown profiling engine {engine!r} (expected one of {', '.join(ENGINES)})")
+        self.cost_model = cost_model
+        self.engine = engine
+        self.max_events = max_events
+        self._last: Optional[Tuple[str, tuple, Optional[VRLProfile]]] = None
+
+    def profile_logs(self, vrl_code: str, sample_logs: str) -> Optional[VRLProfile]:
+        """Profile VRL on newline separated sample logs (see profile)"""
+        return self.profile(vrl_code, sample_events_from_logs(sample_logs, self.max_events))
+
+    def profile(self, vrl_code: str, events: List[Dict[str, Any]]) -> Optional[VRLProfile]:
+        """
+        Profile VRL on sample events
+
+        Args:
+            vrl_code: VRL source
+            events: Sample events
+
+        Returns:
+            VRLProfile, or None if there are no events, the program does not
+            parse/compile or the engine is unavailable
+        """
+        events = events[:self.max_events]
+        key = (vrl_code, tuple(map(id, events)))
+        if self._last and self._last[:2] == key:
+            return self._last[2]
+
+        profile = self._profile(vrl_code, events)
+        self._last = (*key, profile)
+        return profile
+
+    def _profile(self, vrl_code: str, events: List[Dict[str, Any]]) -> Optional[VRLProfile]:
+        program = parse_vrl(vrl_code)
+        if not events or program.errors:
+            return None
+
+        code, blocks = instrument(program)
+        try:
+            results = self._run_vector(code, events) if self.engine == "vector" else self._run_pyvrl(code, events)
+        except Exception as e:
+            logger.debug(f"VRL profiling with {self.engine} failed: {e}")
+            return None
+
+        block_hits: Counter = Counter()
+        completed = 0
+        for result in results:
+            if result is None:
+                continue
+            completed += 1
+            block_hits.update(result)
+
+        profile = VRLProfile(engine=self.engine, events=len(events), completed=completed)
+        hits_of = {id(block): block_hits[probe_id] for probe_id, block in enumerate(blocks)}
+        hits_of[id(program.root)] = completed
+        self._count_branches(program, hits_of, profile)
+        self._count_statements(program, blocks, hits_of, events, profile)
+        return profile
+
+    def _run_pyvrl(self, code: str, events: List[Dict[str, Any]]) -> List[Optional[List[int]]]:
+        import pyvrl
+
+        transform = pyvrl.Transform(code)
+        results = []
+        for event in events:
+            try:
+                hits = transform.remap(copy.deepcopy(event))
+                results.append(hits if isinstance(hits, list) else None)
+            except Exception:
+                results.append(None)
+        return results
+
+    def _run_vector(self, code: str, events: List[Dict[str, Any]]) -> List[Optional[List[int]]]:
+        """Run through ``vector vrl``; each output line is one event's hit list"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = FilePath(temp_dir) / "input.ndjson"
+            program_file = FilePath(temp_dir) / "program.vrl"
+            input_file.write_text("".join(json.dumps(event, default=str) + "\n" for event in events))
+            program_file.write_text(code)
+
+            completed = subprocess.run(
+                ["vector", "vrl", "--input", str(input_file), "--program", str(program_file)],
+                capture_output=True, text=True, check=True, timeout=300
+            )
+
+        results: List[Optional[List[int]]] = []
+        for line in completed.stdout.splitlines():
+            try:
+                hits = json.loads(line)
+            except ValueError:
+                hits = None
+            results.append(hits if isinstance(hits, list) else None)
+        return (results + [None] * len(events))[:len(events)]
+
+    def _count_branches(self, program: VRLProgram, hits_of: Dict[int, int], profile: VRLProfile):
+        in_closure = _closure_nodes(program)
+
+        # Innermost enclosing block of every node outside closures
+        enclosing: Dict[int, int] = {}
+        stack: List[Tuple[Node, int]] = [(program.root, id(program.root))]
+        while stack:
+            node, block = stack.pop()
+            enclosing[id(node)] = block
+            inner = id(node) if isinstance(node, Block) else block
+            stack.extend((child, inner) for child in node.children())
+
+        else_of = {id(node.orelse): node for node in program.find(If) if isinstance(node.orelse, If)}
+        evaluations: Dict[int, int] = {}
+        for node in program.find(If):  # Pre-order: parents before their else-ifs
+            if id(node) in in_closure:
+                continue
+            taken = hits_of.get(id(node.then), 0)
+            parent = else_of.get(id(node))
+            if parent is not None:
+                evaluated = evaluations[id(parent)] - hits_of.get(id(parent.then), 0)
+            else:
+                evaluated = hits_of.get(enclosing[id(node)], 0)
+            evaluations[id(node)] = evaluated
+            profile.branches.append(BranchProfile(
+                line=node.span.line,
+                condition=program.source_of(node.condition),
+                evaluations=evaluated,
+                taken=taken,
+                span_start=node.span.start,
+            ))
+
+    def _count_statements(self, program: VRLProgram, blocks: List[Block], hits_of: Dict[int, int],
+                          events: List[Dict[str, Any]], profile: VRLProfile):
+        for body_node in [program.root] + blocks:
+            hits = hits_of[id(body_node)]
+            for statement in body_node.body:
+                cost = self.cost_model.statement_cost(statement, events) if self.cost_model else 0.0
+                profile.statements.append(StatementProfile(
+                    line=statement.span.line,
+                    source=program.source_of(statement).split("\n")[0].strip(),
+                    hits=hits,
+                    cost=cost,
+                ))
+        profile.statements.sort(key=lambda s: s.line)
+
+
+# Global profiler (cost model built from the calibrated VPI table on first use)
+_vrl_profiler: Optional[VRLProfiler] = None
+
+def profile_vrl(vrl_code: str, sample_logs: str) -> Optional[VRLProfile]:
+    """Profile branch frequencies and statement costs of VRL on sample logs"""
+    global _vrl_profiler
+    if _vrl_profiler is None:
+        from .vpi_calibration import load_function_vpi_impact
+        _vrl_profiler = VRLProfiler(VRLCostModel(load_function_vpi_impact()))
+    return _vrl_profiler.profile_logs(vrl_code, sample_logs)
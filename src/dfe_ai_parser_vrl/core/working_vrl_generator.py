@@ -78,13 +78,14 @@ class WorkingVRLGenerator:
                 logger.warning(f"   ❌ Syntax failed: {self._extract_error_code(syntax_error)}")
                 
                 # Try local fixes
-                fixed_vrl = self.error_fixer.fix_locally(vrl_code, syntax_error)
+                fixed_vrl = self.error_fixer.fix_locally(vrl_code, syntax_error, sample_logs)
                 if fixed_vrl:
                     vrl_code = fixed_vrl
                     logger.info("   🔧 Applied local syntax fix")
                     
                     # Re-test syntax
                     syntax_valid, syntax_error = self.validator._validate_with_pyvrl(vrl_code)
+                    self.error_fixer.record_fix_outcome(vrl_code, None if syntax_valid else syntax_error)
                 
                 if not syntax_valid:
                     logger.warning(f"   ❌ Still syntax errors after fixes")
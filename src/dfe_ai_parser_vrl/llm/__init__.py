@@ -1,6 +1,16 @@
 """LiteLLM integration for DFE AI Parser VRL"""
 
-from .client import DFELLMClient
-from .model_selector import DFEModelSelector
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "DFELLMClient": ".client",
+    "DFEModelSelector": ".model_selector",
+})
+
+if TYPE_CHECKING:
+    from .client import DFELLMClient
+    from .model_selector import DFEModelSelector
 
 __all__ = ["DFELLMClient", "DFEModelSelector"]
\ No newline at end of file
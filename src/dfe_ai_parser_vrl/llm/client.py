@@ -12,6 +12,12 @@ from loguru import logger
 from .model_selector import DFEModelSelector
 from .prompts import build_vrl_generation_prompt, build_strategy_generation_prompt
 from .error_handler import handle_llm_error, validate_llm_response
+from .rate_limiter import (
+    get_llm_pacer, provider_for_model, response_headers, retry_after_seconds, is_rate_limit_error,
+)
+
+# Retries of one request after provider rate-limit errors
+MAX_RATE_LIMIT_RETRIES = 5
 
 
 class DFELLMClient:
@@ -81,6 +87,12 @@ class DFELLMClient:
         if not self.current_model:
             self._select_model()
         
+        # Wait only if the provider's rate-limit budget is spent
+        rate_limit_attempt = kwargs.pop('_rate_limit_attempt', 0)
+        pacer = get_llm_pacer()
+        provider = provider_for_model(self.current_model)
+        pacer.acquire(provider)
+        
         try:
             response = litellm.completion(
                 model=self.current_model,
@@ -90,6 +102,7 @@ class DFELLMClient:
                 stream=stream,
                 **kwargs
             )
+            pacer.observe(provider, response_headers(response))
             
             # Track actual cost from LiteLLM
             if not stream and hasattr(response, 'usage'):
@@ -110,6 +123,12 @@ class DFELLMClient:
                 return response
                 
         except Exception as e:
+            # Rate limits: block the provider for its retry-after and retry the same model
+            if is_rate_limit_error(e) and rate_limit_attempt < MAX_RATE_LIMIT_RETRIES:
+                pacer.penalize(provider, retry_after_seconds(e))
+                return self.completion(messages, max_tokens, temperature, stream,
+                                       _rate_limit_attempt=rate_limit_attempt + 1, **kwargs)
+            
             # Smart error handling
             error_info = handle_llm_error(e, operation="LLM completion")
             
@@ -242,8 +261,22 @@ class DFELLMClient:
             start_time = time.time()
             last_progress_time = start_time
             
+            # Flag reserved field writes as soon as each streamed line completes
+            from ..core.field_conflict_checker import scan_field_conflicts_in_stream
+            scanned_upto = 0
+            reported_conflicts = set()
+            
             for chunk in self.completion(messages, max_tokens=8000, temperature=0.3, stream=True):
                 vrl_code += chunk
+                
+                line_end = vrl_code.rfind('\n') + 1
+                if line_end > scanned_upto:
+                    for conflict in scan_field_conflicts_in_stream(vrl_code[scanned_upto:line_end]):
+                        if conflict.field not in reported_conflicts:
+                            reported_conflicts.add(conflict.field)
+                            logger.warning(f"   🚨 Streamed VRL writes reserved field .{conflict.field} "
+                                           f"(use .{conflict.suggestion})")
+                    scanned_upto = line_end
                 chunk_tokens = len(chunk.split())
                 token_count += chunk_tokens
                 
@@ -311,6 +344,14 @@ class DFELLMClient:
         Returns:
             Fixed VRL code
         """
+        # Block mode: send only the failing statements of large programs
+        block = self._select_fix_block(vrl_code, error_message)
+        if block:
+            fixed = self.fix_vrl_block(vrl_code, error_message, block)
+            if fixed:
+                return fixed
+            logger.info("🔁 Block fix unusable - falling back to full rewrite")
+        
         # Use same model as generation to avoid model switching issues
         logger.info("Using same model for error fixes to maintain consistency")
         
@@ -381,6 +422,98 @@ Return ONLY the corrected VRL code that eliminates this error."""
         response = self.completion(messages, max_tokens=8000, temperature=0.1)
         return self._extract_vrl_code(response.choices[0].message.content)
     
+    def fix_vrl_block(self, vrl_code: str, error_message: str, block) -> Optional[str]:
+        """
+        Fix an error by rewriting only the failing block
+        
+        Args:
+            vrl_code: VRL code with error
+            error_message: Error message with compiler diagnostics
+            block: FixBlock around the diagnostics
+            
+        Returns:
+            Patched VRL code, or None if the response could not be spliced in
+        """
+        logger.info(f"🎯 Block fix: lines {block.start_line}-{block.end_line} of {block.total_lines}")
+        
+        messages = [
+            {
+                "role": "system",
+                "content": """You are a VRL expert fixing compiler errors in one block of a larger program.
+NO REGEX: parse_regex(), match(), match_array(), to_regex() and regex literals are forbidden.
+Use contains(), split(), starts_with(), ends_with(); handle fallible calls with ! or ??.
+Keep variable names used by the surrounding context unchanged."""
+            },
+            {"role": "user", "content": self.build_block_fix_message(error_message, block)}
+        ]
+        
+        # Replacement is about the size of the block (~4 chars/token, 2x headroom)
+        max_tokens = min(8000, max(1000, len(block.text) // 2))
+        response = self.completion(messages, max_tokens=max_tokens, temperature=0.1)
+        return self.apply_block_fix(vrl_code, block, response.choices[0].message.content)
+    
+    def build_block_fix_message(self, error_message: str, block) -> str:
+        """Prompt asking for a replacement of block lines only"""
+        from ..core.diagnostics import parse_diagnostics, format_diagnostics
+        
+        diagnostics = format_diagnostics(parse_diagnostics(error_message)) or error_message
+        line_range = f"{block.start_line}-{block.end_line}"
+        before = '\n'.join(block.before) or "# (start of program)"
+        after = '\n'.join(block.after) or "# (end of program)"
+        
+        return f"""Fix this VRL error by rewriting ONLY lines {line_range}.
+
+ERROR (line numbers refer to the full program):
+{diagnostics}
+
+CONTEXT BEFORE (read-only):
+```vrl
+{before}
+```
+
+LINES {line_range} TO FIX:
+```vrl
+{block.text}
+```
+
+CONTEXT AFTER (read-only):
+```vrl
+{after}
+```
+
+Return ONLY the corrected replacement for lines {line_range} in a ```vrl block."""
+    
+    def apply_block_fix(self, vrl_code: str, block, response_content: str) -> Optional[str]:
+        """Splice an LLM block replacement back into the program"""
+        from ..core.vrl_ast import parse_vrl
+        
+        replacement = self._extract_vrl_code(response_content)
+        if not replacement.strip():
+            return None
+        
+        patched = block.splice(vrl_code, replacement)
+        if patched == vrl_code:
+            return None
+        # Reject replacements that break the program structure (e.g. unbalanced braces)
+        if len(parse_vrl(patched).errors) > len(parse_vrl(vrl_code).errors):
+            return None
+        return patched
+    
+    def _select_fix_block(self, vrl_code: str, error_message: str):
+        """FixBlock for block-mode fixes, or None when a full rewrite is preferable"""
+        from ..core.diagnostics import parse_diagnostics, error_block
+        
+        config = self.config.get('vrl_generation', {}).get('error_fixing', {}).get('block_fix', {})
+        if not config.get('enabled', True):
+            return None
+        if vrl_code.count('\n') + 1 < config.get('min_program_lines', 30):
+            return None
+        
+        block = error_block(vrl_code, parse_diagnostics(error_message), config.get('context_lines', 3))
+        if block is None or block.ratio > config.get('max_block_ratio', 0.5):
+            return None
+        return block
+    
     def _build_vrl_messages(self, sample_logs: str, device_type: str = None) -> List[Dict[str, str]]:
         """Build messages for VRL generation"""
         
@@ -414,9 +547,7 @@ CRITICAL PERFORMANCE REQUIREMENTS:
 ✅ USE ONLY: contains(), split(), upcase(), downcase(), starts_with(), ends_with()
 
 Performance Tiers:
-• String operations: 350-400 events/CPU% (REQUIRED)
-• Built-in parsers: 200-300 events/CPU% (use parse_json!, parse_csv! for structured data)
-• Regex operations: 3-10 events/CPU% (FORBIDDEN)
+{self._get_performance_tiers()}
 
 VRL Generation Rules:
 {syslog_rule}
@@ -471,12 +602,12 @@ Generate complete VRL code that parses these logs."""
         if not error_message:
             return "UNKNOWN"
         
-        import re
+        from ..core.diagnostics import primary_error_code
         
-        # Look for Vector error codes (E103, E651, etc.)
-        match = re.search(r'error\[E(\d+)\]', error_message)
-        if match:
-            return f"E{match.group(1)}"
+        # Vector/PyVRL diagnostic codes (E103, E651, etc.)
+        error_code = primary_error_code(error_message)
+        if error_code:
+            return error_code
         
         # Look for error types
         if "syntax error" in error_message.lower():
@@ -494,33 +625,36 @@ Generate complete VRL code that parses these logs."""
     
     def _extract_error_lines(self, error_message: str, vrl_code: str) -> str:
         """Extract specific lines mentioned in error for debugging"""
-        import re
-        
-        # Look for line numbers in error message
-        line_matches = re.findall(r'(?:line\s+|┌─\s+:)(\d+)', error_message)
+        from ..core.diagnostics import parse_diagnostics
         
-        if not line_matches:
+        diagnostics = [d for d in parse_diagnostics(error_message) if d.line]
+        if not diagnostics:
             return "Error location not specified"
         
         vrl_lines = vrl_code.split('\n')
         problem_lines = []
         
-        for line_num_str in line_matches:
-            try:
-                line_num = int(line_num_str)
-                if 1 <= line_num <= len(vrl_lines):
-                    line_content = vrl_lines[line_num - 1]
-                    problem_lines.append(f"Line {line_num}: {line_content.strip()}")
-            except ValueError:
-                continue
+        for diagnostic in diagnostics:
+            if 1 <= diagnostic.line <= len(vrl_lines):
+                line_content = vrl_lines[diagnostic.line - 1]
+                problem_lines.append(f"Line {diagnostic.line}:{diagnostic.column} ({diagnostic.code}): {line_content.strip()}")
         
         return "; ".join(problem_lines) if problem_lines else "Could not extract error lines"
     
     def _analyze_error_context(self, error_message: str, vrl_code: str) -> str:
         """Analyze error context to provide debugging insights"""
         
+        from ..core.diagnostics import parse_diagnostics
+        
         analysis_points = []
         
+        # Compiler labels and notes are the most precise hints available
+        for diagnostic in parse_diagnostics(error_message)[:3]:
+            for label in diagnostic.labels[:3]:
+                analysis_points.append(f"COMPILER ({diagnostic.code}): {label}")
+            for note in diagnostic.notes[:2]:
+                analysis_points.append(f"HINT ({diagnostic.code}): {note}")
+        
         # Analyze common error patterns
         if "return" in error_message and "unexpected" in error_message:
             analysis_points.append("ISSUE: Bare return statement not allowed in VRL")
@@ -624,6 +758,16 @@ Generate complete VRL code that parses these logs."""
         
         return should_use_syslog
     
+    def _get_performance_tiers(self) -> str:
+        """Performance tiers from the calibrated VRL cost table, or the documented defaults"""
+        from ..core.vpi_calibration import format_performance_tiers
+
+        return format_performance_tiers() or (
+            "• String operations: 350-400 events/CPU% (REQUIRED)\n"
+            "• Built-in parsers: 200-300 events/CPU% (use parse_json!, parse_csv! for structured data)\n"
+            "• Regex operations: 3-10 events/CPU% (FORBIDDEN)"
+        )
+
     def _get_example_vrl(self, has_unparsed_syslog: bool) -> str:
         """Get appropriate VRL example based on syslog detection"""
         if has_unparsed_syslog:
@@ -0,0 +1,317 @@
+"""
+Rate-limit-aware LLM request pacing
+
+Replaces fixed sleeps between iterations. Each provider gets token buckets
+sized from the rate-limit headers it returns, so calls run back to back
+while the provider has budget left and only wait when it is nearly spent:
+
+- Request and token budgets are tracked separately (OpenAI-style
+  x-ratelimit-* and anthropic-ratelimit-* headers, as passed through by
+  LiteLLM); limits are per minute and refill continuously
+- A rate-limit error blocks the provider until its retry-after time
+- Providers that never sent headers are not throttled unless a static
+  requests_per_minute is configured
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from loguru import logger
+
+# Provider limits are expressed per minute
+WINDOW_SECONDS = 60.0
+
+# Block after a rate-limit error that carries no retry-after
+DEFAULT_RETRY_AFTER = 5.0
+
+# (limit, remaining, reset) header names per budget, in lookup order
+_HEADERS = {
+    "requests": [
+        ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+        ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining",
+         "anthropic-ratelimit-requests-reset"),
+    ],
+    "tokens": [
+        ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ("anthropic-ratelimit-tokens-limit", "anthropic-ratelimit-tokens-remaining",
+         "anthropic-ratelimit-tokens-reset"),
+    ],
+}
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+class TokenBucket:
+    """Continuously refilling budget; may go negative when a call overspends"""
+
+    def __init__(self, capacity: float, rate: float, tokens: Optional[float] = None,
+                 now: Optional[float] = None):
+        """
+        Args:
+            capacity: Maximum stored tokens
+            rate: Tokens added per second
+            tokens: Initial tokens (default: full)
+            now: Current clock value
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity if tokens is None else tokens
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 if available now)"""
+        self._refill(now)
+        if self.tokens >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= amount
+
+
+def parse_reset(value: str, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Seconds until a rate-limit window resets
+
+    Accepts plain seconds ("12"), durations ("1m30s", "250ms") and
+    RFC 3339 / HTTP dates.
+
+    Args:
+        value: Header value
+        now: Current time (for absolute timestamps)
+
+    Returns:
+        Seconds (>= 0), or None if unparseable
+    """
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and ''.join(n + u for n, u in parts) == value:
+        scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    now = now or datetime.now(timezone.utc)
+    for parse in (lambda v: datetime.fromisoformat(v.replace('Z', '+00:00')), parsedate_to_datetime):
+        try:
+            moment = parse(value)
+        except (ValueError, TypeError):
+            continue
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return max(0.0, (moment - now).total_seconds())
+    return None
+
+
+class ProviderPacer:
+    """Request/token budgets of one LLM provider"""
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            name: Provider name (for logging)
+            requests_per_minute: Static request limit until headers are seen
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.blocked_until = 0.0
+        self.calls = 0
+        self.waited = 0.0
+        if requests_per_minute:
+            self.buckets["requests"] = TokenBucket(requests_per_minute, requests_per_minute / WINDOW_SECONDS,
+                                                   now=clock())
+
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent and reserve it
+
+        Returns:
+            Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                delay = max([self.blocked_until - now] + [bucket.wait_time(1, now) for bucket in self.buckets.values()])
+                if delay <= 0:
+                    if "requests" in self.buckets:
+                        self.buckets["requests"].consume(1, now)
+                    self.calls += 1
+                    self.waited += waited
+                    return waited
+            if waited == 0:
+                logger.info(f"⏳ Pacing {self.name} requests: waiting {delay:.1f}s for rate limit budget")
+            self._sleep(delay)
+            waited += delay
+
+    def observe(self, headers: Mapping[str, Any]):
+        """
+        Resize budgets from a response's rate-limit headers
+
+        Args:
+            headers: Response headers (lower-case names)
+        """
+        with self._lock:
+            now = self._clock()
+            for budget, names in _HEADERS.items():
+                for limit_name, remaining_name, reset_name in names:
+                    if limit_name not in headers or remaining_name not in headers:
+                        continue
+                    try:
+                        limit, remaining = float(headers[limit_name]), float(headers[remaining_name])
+                    except (TypeError, ValueError):
+                        continue
+                    if limit <= 0:
+                        continue
+                    rate = limit / WINDOW_SECONDS
+                    tokens = remaining
+                    reset = parse_reset(headers[reset_name]) if reset_name in headers else None
+                    if remaining < 1 and reset:
+                        tokens = 1 - rate * reset  # Next unit becomes available at reset
+                    self.buckets[budget] = TokenBucket(limit, rate, tokens, now)
+                    break
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """
+        Block the provider after a rate-limit error
+
+        Args:
+            retry_after: Seconds the provider asked to wait (default: DEFAULT_RETRY_AFTER)
+        """
+        delay = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self._clock() + delay)
+        logger.warning(f"🚦 {self.name} rate limited - pausing requests for {delay:.1f}s")
+
+
+class LLMPacer:
+    """Per-provider request pacing shared by all LLM clients in the process"""
+
+    def __init__(self, requests_per_minute: Optional[Dict[str, float]] = None, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            requests_per_minute: Static request limits per provider (headers refine them)
+            enabled: If False, acquire never waits
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.requests_per_minute = dict(requests_per_minute or {})
+        self.enabled = enabled
+        self._clock = clock
+        self._sleep = sleep
+        self._providers: Dict[str, ProviderPacer] = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> ProviderPacer:
+        """Pacer for a provider (created on first use)"""
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = ProviderPacer(name, self.requests_per_minute.get(name),
+                                                      self._clock, self._sleep)
+            return self._providers[name]
+
+    def acquire(self, provider: str) -> float:
+        """Wait for budget before a request; returns seconds waited"""
+        if not self.enabled:
+            return 0.0
+        return self.provider(provider).acquire()
+
+    def observe(self, provider: str, headers: Mapping[str, Any]):
+        """Update a provider's budgets from response headers"""
+        if headers:
+            self.provider(provider).observe(headers)
+
+    def penalize(self, provider: str, retry_after: Optional[float] = None):
+        """Block a provider after a rate-limit error"""
+        self.provider(provider).penalize(retry_after)
+
+
+def provider_for_model(model: Optional[str]) -> str:
+    """Provider part of a LiteLLM model name ("anthropic/claude-..." -> "anthropic")"""
+    if not model:
+        return "default"
+    return model.split('/', 1)[0] if '/' in model else "default"
+
+
+def response_headers(response: Any) -> Dict[str, str]:
+    """
+    Rate-limit relevant headers of a LiteLLM response
+
+    LiteLLM exposes provider headers in _hidden_params["additional_headers"],
+    raw ones prefixed with "llm_provider-".
+    """
+    hidden = getattr(response, '_hidden_params', None) or {}
+    raw = hidden.get('additional_headers') or {}
+    headers = {}
+    for name, value in raw.items():
+        name = name.lower()
+        if name.startswith('llm_provider-'):
+            name = name[len('llm_provider-'):]
+        headers.setdefault(name, value)
+    return headers
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-after of a rate-limit error, if the provider sent one"""
+    response = getattr(error, 'response', None)
+    for headers in (getattr(response, 'headers', None), getattr(error, 'headers', None)):
+        if not headers:
+            continue
+        for name in ('retry-after', 'Retry-After', 'retry-after-ms'):
+            if name in headers:
+                seconds = parse_reset(headers[name])
+                if seconds is not None:
+                    return seconds / 1000 if name == 'retry-after-ms' else seconds
+    return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for provider rate-limit (HTTP 429) errors"""
+    if type(error).__name__ == 'RateLimitError' or getattr(error, 'status_code', None) == 429:
+        return True
+    return 'rate limit' in str(error).lower()
+
+
+# Global pacer (configured from llm_pacing in config.yaml on first use)
+_llm_pacer: Optional[LLMPacer] = None
+_llm_pacer_lock = threading.Lock()
+
+def get_llm_pacer() -> LLMPacer:
+    """Get the process-wide LLM request pacer"""
+    global _llm_pacer
+    with _llm_pacer_lock:
+        if _llm_pacer is None:
+            try:
+                from ..config.loader import DFEConfigLoader
+                pacing_config = DFEConfigLoader.load().get('llm_pacing', {})
+            except Exception as e:
+                logger.debug(f"Could not load LLM pacing config: {e}")
+                pacing_config = {}
+            _llm_pacer = LLMPacer(
+                requests_per_minute=pacing_config.get('requests_per_minute') or {},
+                enabled=pacing_config.get('enabled', True),
+            )
+        return _llm_pacer
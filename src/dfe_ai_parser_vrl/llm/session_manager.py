@@ -307,6 +307,14 @@ Approach: {strategy.get('description', 'standard')}
         error_code = self._extract_error_code(error_message)
         self.current_errors.append(error_code)
         
+        # Block mode: only the failing statements go into the conversation
+        block = self.llm_client._select_fix_block(vrl_code, error_message)
+        if block:
+            fixed_vrl = self._fix_block(vrl_code, error_message, block, error_code)
+            if fixed_vrl:
+                return fixed_vrl
+            logger.info("🔁 Block fix unusable - falling back to full rewrite")
+        
         # Build context-aware fix message
         fix_message = f"""Fix this VRL error using Derek's guidance.
 
@@ -345,13 +353,36 @@ Return only the fixed VRL code."""
         
         return self.llm_client._extract_vrl_code(fixed_content)
     
+    def _fix_block(self, vrl_code: str, error_message: str, block, error_code: str) -> Optional[str]:
+        """Session fix that sends and patches back only the failing block"""
+        logger.info(f"🎯 Session {self.session_id}: Block fix lines {block.start_line}-{block.end_line} of {block.total_lines}")
+        
+        messages = self.conversation_history + [
+            {"role": "user", "content": self.llm_client.build_block_fix_message(error_message, block)}
+        ]
+        
+        max_tokens = min(6000, max(1000, len(block.text) // 2))
+        response = self.llm_client.completion(messages, max_tokens=max_tokens, temperature=0.2)
+        fixed_content = response.choices[0].message.content
+        
+        self.conversation_history = messages + [
+            {"role": "assistant", "content": fixed_content}
+        ]
+        
+        cost = getattr(self.llm_client, 'last_completion_cost', 0) or 0
+        self.total_cost += cost
+        
+        logger.info(f"🔧 Session {self.session_id}: Block fix iteration {self.iteration_count}, Error: {error_code}")
+        
+        return self.llm_client.apply_block_fix(vrl_code, block, fixed_content)
+    
     def _extract_error_code(self, error_message: str) -> str:
         """Extract error code from message"""
-        import re
+        from ..core.diagnostics import primary_error_code
         
-        match = re.search(r'error\\[E(\\d+)\\]', error_message)
-        if match:
-            return f"E{match.group(1)}"
+        error_code = primary_error_code(error_message)
+        if error_code:
+            return error_code
         
         if "syntax" in error_message.lower():
             return "E203"
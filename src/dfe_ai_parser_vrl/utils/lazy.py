@@ -0,0 +1,55 @@
+"""
+Lazy import helpers
+
+Package ``__init__`` modules re-export classes that pull in litellm, dask and
+friends. Resolving those names on first attribute access keeps
+``import dfe_ai_parser_vrl`` (and process-pool worker spawn) cheap.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build module-level ``__getattr__``/``__dir__`` for lazily resolved exports
+
+    Args:
+        package: ``__name__`` of the package doing the exporting
+        exports: Mapping of exported name -> relative module path (e.g. ".core.generator")
+
+    Returns:
+        Tuple of (__getattr__, __dir__) to assign in the package namespace
+    """
+    module = importlib.import_module(package)
+
+    def __getattr__(name: str) -> Any:
+        module_path = exports.get(name)
+        if module_path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_path, package), name)
+        # Cache on the package so later lookups skip __getattr__
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(module)) | set(exports))
+
+    return __getattr__, __dir__
+
+
+def import_optional(module_name: str, feature: str) -> Any:
+    """
+    Import a heavy dependency at point of use with an actionable error
+
+    Args:
+        module_name: Module to import (e.g. "dask.bag")
+        feature: What needs it, for the error message
+
+    Returns:
+        The imported module
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"{module_name} is required for {feature}: {e}") from e
@@ -0,0 +1,199 @@
+"""
+Process-pool chunked map for CPU-bound line preprocessing
+
+Thread pools serialize on the GIL for pure-Python work such as regex scanning
+and hashing, and one future per line costs more than the work itself. These
+helpers split lines into large chunks, run each chunk in a worker process and
+have workers write fixed-width results straight into a shared-memory array.
+"""
+
+import hashlib
+from array import array
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from .. import get_process_pool, get_max_threads
+
+# Fallbacks when config.yaml has no process pool settings
+DEFAULT_CHUNK_LINES = 65536
+DEFAULT_MIN_LINES = 65536
+
+_process_settings = None
+
+
+def get_process_settings() -> Tuple[int, int]:
+    """
+    Get process pool chunking settings from config
+
+    Returns:
+        Tuple of (chunk_lines, min_lines)
+    """
+    global _process_settings
+    if _process_settings is None:
+        try:
+            from ..config.loader import DFEConfigLoader
+            threading_config = DFEConfigLoader.load().get('threading', {})
+        except Exception as e:
+            logger.debug(f"Could not load process pool config: {e}")
+            threading_config = {}
+        _process_settings = (
+            max(1, int(threading_config.get('process_chunk_lines', DEFAULT_CHUNK_LINES))),
+            max(1, int(threading_config.get('process_min_lines', DEFAULT_MIN_LINES))),
+        )
+    return _process_settings
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(patterns: Tuple[str, ...]) -> list:
+    """Compile patterns once per process"""
+    import regex as re  # Enhanced regex library
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def _regex_flags(lines: Sequence[str], patterns: Tuple[str, ...]) -> List[int]:
+    """1 for each line matched by any pattern, else 0"""
+    compiled = _compile_patterns(patterns)
+    flags = []
+    for line in lines:
+        line = line.strip()
+        flags.append(1 if line and any(p.search(line) for p in compiled) else 0)
+    return flags
+
+
+def _fingerprints(lines: Sequence[str], patterns: Tuple[str, ...] = ()) -> List[int]:
+    """64-bit content fingerprint for each line (patterns unused, uniform chunk signature)"""
+    return [
+        int.from_bytes(hashlib.blake2b(line.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+        for line in lines
+    ]
+
+
+def _pack_results(values: List[int], fmt: str) -> memoryview:
+    """Pack integer results into a memoryview of the given array format"""
+    return memoryview(array(fmt, values))
+
+
+def _chunk_worker(func: Callable, shm_name: str, fmt: str, start: int,
+                  lines: List[str], patterns: Tuple[str, ...]) -> int:
+    """Run func over a chunk and write results into the shared array at start"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast(fmt)
+        try:
+            view[start:start + len(lines)] = _pack_results(func(lines, patterns), fmt)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+    return len(lines)
+
+
+def chunked_process_map(lines: Sequence[str],
+                        func: Callable[[Sequence[str], Tuple[str, ...]], List[int]],
+                        patterns: Tuple[str, ...] = (),
+                        fmt: str = 'B',
+                        chunk_lines: Optional[int] = None,
+                        min_lines: Optional[int] = None) -> List[int]:
+    """
+    Map an integer-valued chunk function over lines using the process pool
+
+    Args:
+        lines: Lines to process
+        func: Module-level function (chunk, patterns) -> list of ints
+        patterns: Extra picklable argument passed to func
+        fmt: Array format of the results ('B' for flags, 'Q' for fingerprints)
+        chunk_lines: Lines per worker task (defaults to config)
+        min_lines: Inputs smaller than this run in-process (defaults to config)
+
+    Returns:
+        Results in line order
+    """
+    default_chunk, default_min = get_process_settings()
+    chunk_lines = chunk_lines or default_chunk
+    min_lines = default_min if min_lines is None else min_lines
+
+    total = len(lines)
+    if total == 0:
+        return []
+    if total < min_lines or total <= chunk_lines or get_max_threads() < 2:
+        return func(lines, patterns)
+
+    itemsize = _pack_results([0], fmt).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=total * itemsize)
+    try:
+        executor = get_process_pool()
+        futures = [
+            executor.submit(_chunk_worker, func, shm.name, fmt, start,
+                            list(lines[start:start + chunk_lines]), patterns)
+            for start in range(0, total, chunk_lines)
+        ]
+        for future in futures:
+            future.result()
+
+        view = shm.buf.cast(fmt)
+        try:
+            results = view[:total].tolist()
+        finally:
+            view.release()
+
+        logger.debug(f"Process pool mapped {total:,} lines in {len(futures)} chunks")
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def parallel_regex_search(lines: Sequence[str], patterns: List[str], **kwargs) -> List[bool]:
+    """
+    Check each line against regex patterns across processes
+
+    Args:
+        lines: Lines to search
+        patterns: Regex patterns (a line matches if any pattern matches)
+
+    Returns:
+        List of booleans in line order
+    """
+    flags = chunked_process_map(lines, _regex_flags, tuple(patterns), fmt='B', **kwargs)
+    return [bool(flag) for flag in flags]
+
+
+def parallel_fingerprint_lines(lines: Sequence[str], **kwargs) -> List[int]:
+    """
+    Compute 64-bit content fingerprints for lines across processes
+
+    Args:
+        lines: Lines to fingerprint
+
+    Returns:
+        List of unsigned 64-bit fingerprints in line order
+    """
+    return chunked_process_map(lines, _fingerprints, fmt='Q', **kwargs)
+
+
+def sample_unique_lines(lines: Sequence[str], max_lines: int, **kwargs) -> List[str]:
+    """
+    Drop duplicate lines by fingerprint and take an evenly distributed sample
+
+    Args:
+        lines: Candidate lines
+        max_lines: Maximum lines to return
+
+    Returns:
+        Unique lines in original order, at most max_lines
+    """
+    seen = set()
+    unique = []
+    for line, fingerprint in zip(lines, parallel_fingerprint_lines(lines, **kwargs)):
+        if line.strip() and fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(line)
+
+    if len(unique) <= max_lines:
+        return unique
+
+    step = len(unique) / max_lines
+    return [unique[int(i * step)] for i in range(max_lines)]
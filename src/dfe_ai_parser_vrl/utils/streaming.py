@@ -2,17 +2,24 @@
 Streaming utilities for memory-efficient file processing
 Using dedicated libraries for optimal performance
 Following CLAUDE.md performance architecture principles
+
+Heavy dependencies (dask, regex) are imported where they are used so
+importing this module stays cheap.
 """
 
-import regex as re  # Enhanced regex library 
-import dask.bag as db
-import ijson
-from typing import Iterator, List, Callable, Any, Optional, Union, Generator
+from typing import Iterator, Iterable, List, Callable, Any, Optional, Union, Generator, Sequence
 from pathlib import Path
+from collections import deque
+from itertools import islice
 from concurrent.futures import as_completed, Future
 from loguru import logger
 
-from .. import get_thread_pool
+from .. import get_thread_pool, get_max_threads
+from .lazy import import_optional
+from .parallel import get_process_settings, parallel_regex_search
+
+# Lines per thread pool task - large enough to amortize future overhead
+DEFAULT_CHUNK_SIZE = 1024
 
 
 def stream_file_lines(file_path: Union[str, Path], 
@@ -74,6 +81,9 @@ def concurrent_regex_search_dask(file_path: Union[str, Path],
     Returns:
         List of boolean results (True if any pattern matched the line)
     """
+    db = import_optional("dask.bag", "Dask regex search")
+    re = import_optional("regex", "Dask regex search")
+    
     # Use Dask bag for parallel line processing
     bag = db.read_text(str(file_path), blocksize="64MB")  # 64MB chunks
     
@@ -94,12 +104,106 @@ def concurrent_regex_search_dask(file_path: Union[str, Path],
     return results
 
 
-def concurrent_regex_search_threadpool(lines: List[str], 
-                                     patterns: List[str]) -> List[bool]:
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """
+    Group any iterable into lists of chunk_size items without materializing it
+    
+    Args:
+        items: Input iterable (may be an unbounded generator)
+        chunk_size: Items per chunk
+        
+    Yields:
+        Lists of up to chunk_size items
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _apply_to_chunk(func: Callable[[Any], Any], chunk: List[Any],
+                    default: Any, log_level: str) -> List[Any]:
+    """Apply func to every item of a chunk, substituting default on errors"""
+    results = []
+    for item in chunk:
+        try:
+            results.append(func(item))
+        except Exception as e:
+            logger.log(log_level, f"Processing error on item {item!r:.80}: {e}")
+            results.append(default)
+    return results
+
+
+def chunked_map(func: Callable[[Any], Any],
+                items: Iterable[Any],
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                max_pending: Optional[int] = None,
+                default: Any = None,
+                log_level: str = "ERROR") -> Iterator[Any]:
+    """
+    Order-preserving map over the module thread pool, one future per chunk
+    
+    At most max_pending chunks are in flight, so unbounded iterators are
+    consumed only as fast as results are taken (backpressure).
+    
+    Args:
+        func: Function to apply to each item
+        items: Input iterable
+        chunk_size: Items per submitted task
+        max_pending: Chunks in flight (defaults to twice the thread count)
+        default: Result used for items whose processing raised
+        log_level: Loguru level for per-item errors
+        
+    Yields:
+        Results in input order
+    """
+    executor = get_thread_pool()
+    max_pending = max_pending or get_max_threads() * 2
+    pending = deque()
+    
+    for chunk in iter_chunks(items, chunk_size):
+        pending.append(executor.submit(_apply_to_chunk, func, chunk, default, log_level))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    
+    while pending:
+        yield from pending.popleft().result()
+
+
+def concurrent_regex_search_threadpool(lines: Iterable[str], 
+                                     patterns: List[str],
+                                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[bool]:
     """
     Search multiple regex patterns across lines using module thread pool
     Smaller datasets - use when lines are already in memory
+    Large inputs are handed to the process pool in chunks instead
+    """
+    if isinstance(lines, Sequence):
+        _, process_min_lines = get_process_settings()
+        if len(lines) >= process_min_lines:
+            return parallel_regex_search(lines, patterns)
+    
+    return list(iter_regex_search(lines, patterns, chunk_size=chunk_size))
+
+
+def iter_regex_search(lines: Iterable[str],
+                      patterns: List[str],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bool]:
     """
+    Streaming regex search - yields one match flag per line in input order
+    
+    Args:
+        lines: Lines to search (list or generator)
+        patterns: List of regex patterns
+        chunk_size: Lines per thread pool task
+        
+    Yields:
+        True if any pattern matched the line
+    """
+    import regex as re  # Enhanced regex library
+    
     # Compile patterns once for performance (regex library)
     compiled_patterns = [re.compile(pattern) for pattern in patterns]
     
@@ -114,59 +218,28 @@ def concurrent_regex_search_threadpool(lines: List[str],
                 return True
         return False
     
-    executor = get_thread_pool()
-    
-    # Submit all line checks concurrently
-    future_to_index = {}
-    for i, line in enumerate(lines):
-        future = executor.submit(search_patterns_in_line, line)
-        future_to_index[future] = i
-    
-    # Collect results in order
-    results = [False] * len(lines)
-    for future in as_completed(future_to_index):
-        try:
-            index = future_to_index[future]
-            results[index] = future.result()
-        except Exception as e:
-            logger.debug(f"Regex search error on line {future_to_index[future]}: {e}")
-    
-    return results
+    return chunked_map(search_patterns_in_line, lines, chunk_size=chunk_size,
+                       default=False, log_level="DEBUG")
 
 
-def concurrent_line_processor(lines: List[str], 
+def concurrent_line_processor(lines: Iterable[str], 
                             processor_func: Callable[[str], Any],
-                            max_workers: Optional[int] = None) -> List[Any]:
+                            max_workers: Optional[int] = None,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Any]:
     """
     Process lines concurrently using threading
     
     Args:
-        lines: List of lines to process
+        lines: Lines to process (list or generator)
         processor_func: Function to apply to each line
-        max_workers: Max threads (uses module default if None)
+        max_workers: Max chunks in flight (uses module default if None)
+        chunk_size: Lines per thread pool task
         
     Returns:
-        List of processed results
+        List of processed results (None where processing failed)
     """
-    executor = get_thread_pool()
-    
-    # Submit all processing tasks
-    future_to_index = {}
-    for i, line in enumerate(lines):
-        future = executor.submit(processor_func, line)
-        future_to_index[future] = i
-    
-    # Collect results in order
-    results = [None] * len(lines)
-    for future in as_completed(future_to_index):
-        try:
-            index = future_to_index[future]
-            results[index] = future.result()
-        except Exception as e:
-            logger.error(f"Processing error on line {future_to_index[future]}: {e}")
-            results[index] = None
-    
-    return results
+    return list(chunked_map(processor_func, lines, chunk_size=chunk_size,
+                            max_pending=max_workers))
 
 
 def stream_and_sample_file(file_path: Union[str, Path], 
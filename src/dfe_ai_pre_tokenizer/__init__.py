@@ -7,6 +7,7 @@ Can be copied to other projects as a self-contained directory.
 
 from .pre_tokenizer import PreTokenizer
 from .sample_optimizer import SampleOptimizer
+from .ingest import iter_events, detect_format
 
 __version__ = "1.0.0"
-__all__ = ['PreTokenizer', 'SampleOptimizer']
\ No newline at end of file
+__all__ = ['PreTokenizer', 'SampleOptimizer', 'iter_events', 'detect_format']
\ No newline at end of file
@@ -13,7 +13,7 @@ import json
 import os
 import hashlib
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from collections import defaultdict, Counter
 from datetime import datetime
 from pathlib import Path
@@ -111,25 +111,31 @@ class EnhancedOptimizer:
         self._save_cache()
         logger.success(f"Cached VRL for pattern: {log_pattern}")
     
-    def smart_sample_selection(self, samples: List[Dict[str, Any]], 
+    def smart_sample_selection(self, samples: Iterable[Dict[str, Any]], 
                               max_per_pattern: int = 3,
-                              max_total: int = 100) -> List[Dict[str, Any]]:
+                              max_total: int = 100,
+                              max_group_size: int = 1000) -> List[Dict[str, Any]]:
         """
         Smart selection of representative samples
         
         Args:
-            samples: All available samples
+            samples: All available samples (any iterable, consumed once)
             max_per_pattern: Maximum samples per detected pattern
             max_total: Maximum total samples to return
+            max_group_size: Candidates retained per pattern (bounds memory on streams)
         """
         # Group samples by pattern
         pattern_groups = defaultdict(list)
+        sample_count = 0
         
         for sample in samples:
+            sample_count += 1
             pattern = self.detect_log_pattern(sample)
-            pattern_groups[pattern].append(sample)
+            group = pattern_groups[pattern]
+            if len(group) < max_group_size:
+                group.append(sample)
         
-        logger.info(f"Found {len(pattern_groups)} distinct patterns in {len(samples)} samples")
+        logger.info(f"Found {len(pattern_groups)} distinct patterns in {sample_count} samples")
         
         # Select representative samples
         selected = []
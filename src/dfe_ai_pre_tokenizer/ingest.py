@@ -0,0 +1,79 @@
+"""
+Streaming sample ingestion
+
+Yields event dicts lazily from large exports so the optimizers never need the
+whole file in memory. Supported inputs:
+
+- NDJSON / concatenated JSON objects (including pretty-printed objects)
+- A top-level JSON array of objects
+- Raw text, one log line per event
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+from loguru import logger
+
+FORMAT_JSON_ARRAY = "json_array"
+FORMAT_JSON_STREAM = "json_stream"
+FORMAT_TEXT = "text"
+
+# Bytes inspected when sniffing the input format
+SNIFF_BYTES = 4096
+
+
+def detect_format(file_path: Union[str, Path]) -> str:
+    """
+    Detect input format from the first non-whitespace character
+
+    Args:
+        file_path: Path to sample file
+
+    Returns:
+        One of FORMAT_JSON_ARRAY, FORMAT_JSON_STREAM, FORMAT_TEXT
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(SNIFF_BYTES).lstrip(b'\xef\xbb\xbf \t\r\n')
+
+    if head.startswith(b'['):
+        return FORMAT_JSON_ARRAY
+    if head.startswith(b'{'):
+        return FORMAT_JSON_STREAM
+    return FORMAT_TEXT
+
+
+def iter_events(file_path: Union[str, Path],
+                input_format: str = None,
+                message_field: str = 'message') -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield event dicts from a sample file
+
+    Args:
+        file_path: Path to sample file
+        input_format: Force a format instead of auto-detecting
+        message_field: Key used for raw text lines and non-object JSON values
+
+    Yields:
+        One dict per event
+    """
+    input_format = input_format or detect_format(file_path)
+    logger.info(f"Streaming {Path(file_path).name} as {input_format}")
+
+    if input_format == FORMAT_TEXT:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.rstrip('\n\r')
+                if line.strip():
+                    yield {message_field: line}
+        return
+
+    import ijson  # Deferred: only needed for JSON inputs
+
+    with open(file_path, 'rb') as f:
+        if input_format == FORMAT_JSON_ARRAY:
+            values = ijson.items(f, 'item', use_float=True)
+        else:
+            values = ijson.items(f, '', multiple_values=True, use_float=True)
+
+        for value in values:
+            yield value if isinstance(value, dict) else {message_field: value}
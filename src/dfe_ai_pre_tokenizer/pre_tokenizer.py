@@ -9,27 +9,41 @@ Efficiently handles large log samples by:
 4. Priority-based selection of representative samples
 """
 
+import os
 import json
+import heapq
 import hashlib
-from typing import List, Dict, Any, Tuple
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Tuple, Union
 from collections import Counter
-import random
 import tiktoken
 from loguru import logger
 
+from .ingest import iter_events
+
+
 class PreTokenizer:
     """Intelligent pre-tokenizer for optimizing LLM input"""
     
-    def __init__(self, model: str = "claude-3-opus-20240229", max_tokens: int = 150000):
+    # Samples encoded per encode_batch call (bounds memory held by token lists)
+    BATCH_SIZE = 4096
+    # Cached token counts kept before the cache is reset
+    TOKEN_CACHE_LIMIT = 500000
+    
+    def __init__(self, model: str = "claude-3-opus-20240229", max_tokens: int = 150000,
+                 num_threads: int = None):
         """
         Initialize pre-tokenizer with model-specific settings
         
         Args:
             model: LLM model name for token counting
             max_tokens: Maximum tokens to use (leaving room for prompts)
+            num_threads: Threads for batch encoding (defaults to CPU count)
         """
         self.model = model
         self.max_tokens = max_tokens
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._token_cache: Dict[str, int] = {}
         
         # Use cl100k_base encoding (good approximation for Claude/GPT-4)
         try:
@@ -44,6 +58,49 @@ class PreTokenizer:
         """Count tokens in text using appropriate tokenizer"""
         return len(self.encoder.encode(text))
     
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts, encoding only fingerprints not seen before
+        
+        Args:
+            texts: Texts to count
+            
+        Returns:
+            Token counts in the same order as texts
+        """
+        counts = [0] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        pending_texts = []
+        
+        for i, text in enumerate(texts):
+            fingerprint = hashlib.md5(text.encode()).hexdigest()
+            cached = self._token_cache.get(fingerprint)
+            if cached is not None:
+                counts[i] = cached
+            elif fingerprint in pending:
+                pending[fingerprint].append(i)
+            else:
+                pending[fingerprint] = [i]
+                pending_texts.append(text)
+        
+        if not pending_texts:
+            return counts
+        
+        if len(self._token_cache) + len(pending_texts) > self.TOKEN_CACHE_LIMIT:
+            self._token_cache.clear()
+        
+        fingerprints = list(pending)
+        for start in range(0, len(pending_texts), self.BATCH_SIZE):
+            batch = pending_texts[start:start + self.BATCH_SIZE]
+            encoded = self.encoder.encode_batch(batch, num_threads=self.num_threads)
+            for fingerprint, tokens in zip(fingerprints[start:start + self.BATCH_SIZE], encoded):
+                self._token_cache[fingerprint] = len(tokens)
+                for i in pending[fingerprint]:
+                    counts[i] = len(tokens)
+        
+        logger.debug(f"Encoded {len(pending_texts)} new samples, {len(texts) - len(pending_texts)} from cache")
+        return counts
+    
     def hash_sample(self, sample: Dict[str, Any]) -> str:
         """Generate hash for sample to detect duplicates"""
         # Focus on message content for deduplication
@@ -83,13 +140,18 @@ class PreTokenizer:
             
         return patterns
     
-    def optimize_samples(self, samples: List[Dict[str, Any]], 
+    def optimize_samples(self, samples: Iterable[Dict[str, Any]], 
                          target_tokens: int = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Optimize sample selection for maximum diversity within token budget
         
+        Token counts are computed once in batch and cached by fingerprint; selection
+        is a weighted greedy knapsack that maximizes pattern coverage per token and
+        then fills the remaining budget instead of stopping at the first misfit.
+        
         Args:
-            samples: List of all available samples
+            samples: All available samples (any iterable, consumed once;
+                     only unique samples are kept in memory)
             target_tokens: Target token count (defaults to self.max_tokens)
             
         Returns:
@@ -98,85 +160,50 @@ class PreTokenizer:
         if target_tokens is None:
             target_tokens = self.max_tokens
             
-        logger.info(f"Optimizing {len(samples)} samples for {target_tokens:,} tokens")
+        logger.info(f"Optimizing samples for {target_tokens:,} tokens")
         
-        # Phase 1: Deduplication
+        # Phase 1: Deduplication (patterns extracted once per unique sample)
         seen_hashes = set()
         unique_samples = []
+        unique_patterns = []
         pattern_counter = Counter()
+        original_count = 0
         
         for sample in samples:
+            original_count += 1
             sample_hash = self.hash_sample(sample)
             if sample_hash not in seen_hashes:
                 seen_hashes.add(sample_hash)
                 unique_samples.append(sample)
                 patterns = self.extract_patterns(sample)
+                unique_patterns.append(patterns)
                 pattern_counter.update(patterns)
         
-        logger.info(f"Reduced to {len(unique_samples)} unique samples from {len(samples)}")
+        logger.info(f"Reduced to {len(unique_samples)} unique samples from {original_count}")
         logger.info(f"Pattern distribution: {dict(pattern_counter.most_common(10))}")
         
         # Phase 2: Priority scoring
-        scored_samples = []
-        for sample in unique_samples:
-            score = 0
-            patterns = self.extract_patterns(sample)
-            
-            # Prioritize diverse patterns
-            for pattern in patterns:
-                # Inverse frequency scoring - rare patterns get higher scores
-                pattern_frequency = pattern_counter[pattern]
-                score += 100 / (pattern_frequency + 1)
-            
-            # Bonus for samples with multiple patterns
-            score += len(patterns) * 10
-            
-            # Length penalty (prefer medium-length samples)
-            msg_len = len(sample.get('message', sample.get('msg', '')))
-            if 100 < msg_len < 500:
-                score += 20
-            elif msg_len > 1000:
-                score -= 10
-                
-            scored_samples.append((score, sample))
-        
-        # Sort by score (highest first)
-        scored_samples.sort(key=lambda x: x[0], reverse=True)
-        
-        # Phase 3: Token-aware selection
-        selected_samples = []
-        current_tokens = 0
-        patterns_seen = set()
+        # Inverse frequency weights - rare patterns are worth more
+        pattern_weights = {pattern: 100 / (count + 1) for pattern, count in pattern_counter.items()}
+        scores = [self._score_sample(sample, patterns, pattern_weights)
+                  for sample, patterns in zip(unique_samples, unique_patterns)]
         
-        # Always include top diverse samples
-        for score, sample in scored_samples:
-            sample_json = json.dumps(sample)
-            sample_tokens = self.count_tokens(sample_json)
-            
-            if current_tokens + sample_tokens > target_tokens:
-                break
-                
-            selected_samples.append(sample)
-            current_tokens += sample_tokens
-            patterns_seen.update(self.extract_patterns(sample))
-            
-            # Stop if we have good pattern coverage
-            if len(patterns_seen) >= len(pattern_counter) * 0.8:
-                # Fill remaining space with random samples
-                remaining_tokens = target_tokens - current_tokens
-                for score, sample in random.sample(scored_samples[len(selected_samples):], 
-                                                  min(50, len(scored_samples) - len(selected_samples))):
-                    sample_json = json.dumps(sample)
-                    sample_tokens = self.count_tokens(sample_json)
-                    if current_tokens + sample_tokens > target_tokens:
-                        break
-                    selected_samples.append(sample)
-                    current_tokens += sample_tokens
-                break
+        # Phase 3: Batch token counting (cached per fingerprint)
+        token_counts = self.count_tokens_batch([json.dumps(sample) for sample in unique_samples])
+        
+        # Phase 4: Token-aware knapsack selection
+        selected_indices = self._select_within_budget(
+            unique_patterns, scores, token_counts, pattern_weights, target_tokens
+        )
+        selected_samples = [unique_samples[i] for i in selected_indices]
+        current_tokens = sum(token_counts[i] for i in selected_indices)
+        patterns_seen = set()
+        for i in selected_indices:
+            patterns_seen.update(unique_patterns[i])
         
         # Generate statistics
         stats = {
-            'original_count': len(samples),
+            'original_count': original_count,
             'unique_count': len(unique_samples),
             'selected_count': len(selected_samples),
             'total_tokens': current_tokens,
@@ -192,7 +219,97 @@ class PreTokenizer:
         
         return selected_samples, stats
     
-    def prepare_for_llm(self, samples: List[Dict[str, Any]], 
+    def _score_sample(self, sample: Dict[str, Any], patterns: List[str],
+                      pattern_weights: Dict[str, float]) -> float:
+        """Diversity score for a single sample"""
+        score = sum(pattern_weights[pattern] for pattern in patterns)
+        
+        # Bonus for samples with multiple patterns
+        score += len(patterns) * 10
+        
+        # Length penalty (prefer medium-length samples)
+        msg_len = len(sample.get('message', sample.get('msg', '')))
+        if 100 < msg_len < 500:
+            score += 20
+        elif msg_len > 1000:
+            score -= 10
+        
+        return score
+    
+    def _select_within_budget(self, patterns: List[List[str]], scores: List[float],
+                              token_counts: List[int], pattern_weights: Dict[str, float],
+                              target_tokens: int) -> List[int]:
+        """
+        Weighted greedy knapsack over candidate samples
+        
+        Pass 1 picks samples by uncovered pattern weight per token (lazy greedy),
+        pass 2 fills the remaining budget by score per token, skipping samples
+        that no longer fit rather than stopping at them.
+        
+        Returns:
+            Indices of selected samples in selection order
+        """
+        remaining = target_tokens
+        selected = []
+        chosen = set()
+        uncovered = set(pattern_weights)
+        
+        # Pass 1: coverage per token. Stale heap entries are upper bounds because
+        # marginal gain only shrinks as patterns get covered.
+        heap = []
+        for i, sample_patterns in enumerate(patterns):
+            gain = sum(pattern_weights[p] for p in set(sample_patterns))
+            if gain > 0:
+                heap.append((-gain / max(1, token_counts[i]), i))
+        heapq.heapify(heap)
+        
+        while heap and uncovered:
+            neg_ratio, i = heapq.heappop(heap)
+            if token_counts[i] > remaining:
+                continue  # Budget only shrinks, it will never fit
+            gain = sum(pattern_weights[p] for p in uncovered.intersection(patterns[i]))
+            if gain <= 0:
+                continue
+            ratio = gain / max(1, token_counts[i])
+            if heap and ratio < -heap[0][0]:
+                heapq.heappush(heap, (-ratio, i))
+                continue
+            selected.append(i)
+            chosen.add(i)
+            remaining -= token_counts[i]
+            uncovered.difference_update(patterns[i])
+        
+        # Pass 2: fill remaining budget by score density
+        fill_order = sorted(
+            (i for i in range(len(patterns)) if i not in chosen),
+            key=lambda i: (scores[i] / max(1, token_counts[i]), scores[i]),
+            reverse=True
+        )
+        smallest = min((token_counts[i] for i in fill_order), default=0)
+        for i in fill_order:
+            if remaining < smallest:
+                break
+            if token_counts[i] <= remaining:
+                selected.append(i)
+                remaining -= token_counts[i]
+        
+        return selected
+    
+    def optimize_file(self, file_path: Union[str, Path],
+                      target_tokens: int = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Optimize samples streamed from an NDJSON, JSON array or raw text file
+        
+        Args:
+            file_path: Path to sample export
+            target_tokens: Target token count (defaults to self.max_tokens)
+            
+        Returns:
+            Tuple of (selected_samples, statistics)
+        """
+        return self.optimize_samples(iter_events(file_path), target_tokens)
+    
+    def prepare_for_llm(self, samples: Iterable[Dict[str, Any]], 
                        include_stats: bool = True) -> Dict[str, Any]:
         """
         Prepare optimized samples for LLM consumption
@@ -0,0 +1,110 @@
+"""Tests for batch corpus mode"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.batch import (
+    DFEVRLBatchGenerator, load_sources, detect_template_family, classify_line,
+)
+from dfe_ai_parser_vrl.core.generator import GenerationJob
+
+SYSLOG = "Jan 12 10:00:01 host1 sshd[123]: Failed password for root\nFeb  3 11:22:33 host2 cron[9]: job done\n"
+JSON = '{"ts": 1, "msg": "a"}\n{"ts": 2, "msg": "b"}\n'
+
+
+class FakeGenerator:
+    """Step API stand-in; fails generation for sources whose samples contain FAIL"""
+
+    def __init__(self, calls, active):
+        self.calls = calls
+        self.active = active
+
+    def start_job(self, sample_logs, device_type=None, validate=True, fix_errors=True, baseline_vrl=None):
+        with self.active['lock']:
+            assert device_type not in self.active['devices'], "same device type ran concurrently"
+            self.active['devices'].add(device_type)
+        self.calls.append((device_type, baseline_vrl))
+        return GenerationJob(sample_logs, device_type, validate, fix_errors, baseline_vrl, None, {"iterations": 1})
+
+    def llm_step(self, job):
+        time.sleep(0.02)
+        if "FAIL" in job.sample_logs:
+            self._release(job)
+            raise RuntimeError("LLM unavailable")
+        job.vrl_code = f". = {{}} # {job.device_type}"
+
+    def validation_step(self, job):
+        job.metadata["validation_passed"] = True
+        return True
+
+    def finish_job(self, job):
+        self._release(job)
+        return job.vrl_code, job.metadata
+
+    def _release(self, job):
+        with self.active['lock']:
+            self.active['devices'].discard(job.device_type)
+
+
+def _corpus(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "sshd_a.log").write_text(SYSLOG * 3)
+    (corpus / "cron_b.log").write_text(SYSLOG)
+    (corpus / "app.ndjson").write_text(JSON)
+    (corpus / "broken.log").write_text("FAIL Jan 12 10:00:01 h x: y\n")
+    (corpus / "empty.log").write_text("\n")
+    (corpus / ".hidden.log").write_text(SYSLOG)
+    return corpus
+
+
+def test_family_detection():
+    assert classify_line('{"a": 1}') == 'json'
+    assert classify_line('<34>Oct 11 22:14:15 mymachine su: failed') == 'syslog'
+    assert classify_line('<165>1 2003-10-11T22:14:15Z host app 1 ID47 - msg') == 'syslog5424'
+    assert classify_line('CEF:0|Vendor|Product|1.0|100|name|5|src=10.0.0.1') == 'cef'
+    assert classify_line('127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET / HTTP/1.0" 200') == 'clf'
+    assert classify_line('time=1 level=info msg=ok') == 'kv'
+    assert detect_template_family(['{"a": 1}', 'garbage', '{"b": 2}']) == 'json'
+    assert detect_template_family(['', '  ']) == 'empty'
+
+
+def test_load_sources_from_directory_and_manifest(tmp_path):
+    corpus = _corpus(tmp_path)
+    assert [s.name for s in load_sources(corpus)] == ['app', 'broken', 'cron_b', 'empty', 'sshd_a']
+
+    manifest = tmp_path / "sources.yaml"
+    manifest.write_text("sources:\n  - corpus/sshd_a.log\n  - {path: corpus/app.ndjson, name: app logs, "
+                        "device_type: custom}\n  - corpus/sshd_a.log\n")
+    sources = load_sources(manifest)
+    assert [(s.name, s.device_type) for s in sources] == [('sshd_a', None), ('app_logs', 'custom'), ('sshd_a_2', None)]
+    assert sources[0].path == corpus / "sshd_a.log"
+
+
+def test_batch_run_shares_family_baseline(tmp_path):
+    calls, active = [], {'lock': threading.Lock(), 'devices': set()}
+    batch = DFEVRLBatchGenerator(max_workers=3, generator_factory=lambda: FakeGenerator(calls, active))
+    out = tmp_path / "out"
+
+    summary = batch.run(_corpus(tmp_path), out)
+
+    status = {r.name: r.status for r in summary.results}
+    assert status == {'app': 'passed', 'broken': 'error', 'cron_b': 'passed', 'empty': 'error', 'sshd_a': 'passed'}
+    assert set(summary.families) == {'syslog', 'json', 'text'}
+    assert summary.families['syslog'][0] == 'sshd_a'   # Largest sample is the representative
+
+    by_name = {r.name: r for r in summary.results}
+    assert by_name['sshd_a'].baseline_from is None
+    assert by_name['cron_b'].baseline_from == 'sshd_a'
+    assert ('cron_b', '. = {} # ssh') in calls
+    assert by_name['broken'].error == 'LLM unavailable'
+
+    assert (out / "sshd_a.vrl").read_text() == '. = {} # ssh'
+    assert json.loads((out / "cron_b.json").read_text())["result"]["baseline_from"] == 'sshd_a'
+    written = json.loads((out / "batch_summary.json").read_text())
+    assert written["counts"] == {'passed': 3, 'error': 2} and written["sources"] == 5
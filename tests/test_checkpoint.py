@@ -0,0 +1,138 @@
+"""Tests for performance session checkpoints and resume"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.checkpoint import SessionCheckpoint, CHECKPOINT_SCHEMA_VERSION
+from dfe_ai_parser_vrl.core.cost_model import VRLCostModel
+from dfe_ai_parser_vrl.core.performance import (
+    DFEVRLPerformanceOptimizer, VRLCandidate, PerformanceBaseline, VRLPerformanceOptimizer,
+)
+
+STRATEGIES = [{"name": "string_ops", "description": "split/contains"},
+              {"name": "parsers", "description": "built-in parsers"}]
+
+
+class FakeLLM:
+    last_completion_cost = 0.5
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def generate_candidate_strategies(self, sample_logs, device_type, candidate_count):
+        self.calls.append("strategies")
+        return STRATEGIES
+
+    def generate_vrl(self, sample_logs, device_type, stream, strategy, baseline_vrl):
+        self.calls.append(strategy["name"])
+        return f'.strategy = "{strategy["name"]}"'
+
+
+class FakeValidator:
+    def validate(self, vrl_code, sample_logs):
+        return True, None
+
+
+class FakeFixer:
+    def record_fix_outcome(self, *args):
+        pass
+
+
+def _optimizer(tmp_path, calls, interrupt_after=None):
+    """Optimizer with fake LLM/validation and a benchmark that can be 'Ctrl-C'ed"""
+    opt = DFEVRLPerformanceOptimizer.__new__(DFEVRLPerformanceOptimizer)
+    opt.session_id = "vrl_perf_session_test"
+    opt.iteration_metrics, opt.start_time, opt.end_time = [], None, None
+    opt.cpu_benchmark_multiplier, opt.vector_startup_time = 1.0, 0.0
+    opt.default_optimize_for, opt.candidate_count = "cpu_efficiency", 2
+    opt.llm_client, opt.validator, opt.error_fixer = FakeLLM(calls), FakeValidator(), FakeFixer()
+    opt.cost_model = VRLCostModel(VRLPerformanceOptimizer().function_vpi_impact)
+    opt.cost_model_enabled, opt.cost_model_prune_ratio = False, 0.5
+    opt.tournament_enabled = False
+    opt.checkpoint_enabled, opt.checkpoint_dir = True, tmp_path / "checkpoints"
+    opt.checkpoint, opt._checkpoint_state = None, {}
+    opt.registry = None
+
+    def measure(vrl_code, sample_logs, max_events=1000):
+        if interrupt_after is not None and calls.count("benchmark") >= interrupt_after:
+            raise KeyboardInterrupt
+        calls.append("benchmark")
+        vpi = 2000 if "string_ops" in vrl_code else 1000
+        return PerformanceBaseline(100.0, 1.0, 10.0, vpi, 0.1, 0, vrl_performance_index=vpi)
+
+    opt._measure_vrl_performance = measure
+    opt._refine_vrl_for_performance = lambda vrl_code, performance, sample_logs: vrl_code
+    return opt
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "sshd.log"
+    path.write_text("Jan 12 10:00:01 host1 sshd[123]: Failed password for root\n"
+                    "Jan 12 10:00:02 host1 sshd[124]: Accepted password for bob\n")
+    return path
+
+
+def test_checkpoint_file_roundtrip(tmp_path):
+    checkpoint = SessionCheckpoint.for_source(tmp_path / "a.log", tmp_path / "ck")
+    assert checkpoint.load() is None
+
+    checkpoint.save({"stage": "strategies", "total_cost": 1.5})
+    assert checkpoint.load() == {"stage": "strategies", "total_cost": 1.5}
+    assert not list(checkpoint.path.parent.glob("*.tmp"))   # Temp file replaced atomically
+
+    checkpoint.path.write_text(json.dumps({"schema_version": CHECKPOINT_SCHEMA_VERSION + 1, "state": {}}))
+    assert checkpoint.load() is None
+    checkpoint.path.write_text("{truncated")
+    assert checkpoint.load() is None
+
+
+def test_candidate_serialization_roundtrip():
+    perf = PerformanceBaseline(100.0, 1.0, 10.0, 100.0, 0.1, 0, vrl_performance_index=1234)
+    candidate = VRLCandidate(STRATEGIES[0], ". = {}", [{"attempt": 1, "is_valid": True}], [perf],
+                             True, perf, 2, 0.75)
+
+    restored = VRLCandidate.from_dict(json.loads(json.dumps(candidate.to_dict())))
+
+    assert restored == candidate
+    assert restored.latest_vpi == 1234
+
+
+def test_interrupted_session_resumes_without_repeating_work(tmp_path, log_file):
+    calls = []
+    with pytest.raises(KeyboardInterrupt):
+        _optimizer(tmp_path, calls, interrupt_after=1).run_performance_optimization(
+            str(log_file), baseline_vrl=". = {}")
+    assert calls.count("strategies") == 1 and calls.count("benchmark") == 1
+
+    resumed_calls = []
+    opt = _optimizer(tmp_path, resumed_calls)
+    vrl_code, metrics = opt.run_performance_optimization(str(log_file), baseline_vrl=". = {}", resume=True)
+
+    # Only the benchmark that was interrupted runs again
+    assert resumed_calls == ["benchmark"]
+    assert vrl_code == '.strategy = "string_ops"'
+    assert metrics["total_candidates"] == 2 and metrics["total_cost"] == pytest.approx(1.5)
+
+    state = opt.checkpoint.load()
+    assert state["stage"] == "complete" and state["improvement"]["cycle"] == 5
+
+    # Resuming a completed session replays the result without LLM calls or benchmarks
+    replay_calls = []
+    assert _optimizer(tmp_path, replay_calls).run_performance_optimization(
+        str(log_file), baseline_vrl=". = {}", resume=True)[0] == vrl_code
+    assert replay_calls == []
+
+
+def test_resume_ignores_checkpoint_of_changed_source(tmp_path, log_file):
+    _optimizer(tmp_path, []).run_performance_optimization(str(log_file), baseline_vrl=". = {}")
+
+    log_file.write_text(log_file.read_text() + "Jan 12 10:00:03 host1 sshd[125]: new line\n")
+    calls = []
+    _optimizer(tmp_path, calls).run_performance_optimization(str(log_file), baseline_vrl=". = {}", resume=True)
+
+    assert calls.count("strategies") == 1 and calls.count("benchmark") == 2
@@ -0,0 +1,95 @@
+"""Tests for the static VRL cost model"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.cost_model import (
+    VRLCostModel, CostCalibration, sample_events_from_logs,
+    DEFAULT_BRANCH_PROBABILITY,
+)
+
+VPI_TABLE = {"contains": 400, "split!": 380, "upcase": 350, "parse_regex": 8}
+
+BRANCHY_VRL = '''
+if contains(string!(.message), "ERROR") {
+    .parsed = parse_regex!(.message, r'(?P<code>\\d+)')
+} else {
+    .parts = split!(.message, " ")
+}
+'''
+
+ERROR_LOGS = '\n'.join(['{"message": "ERROR 42 disk"}'] * 9 + ['{"message": "ok"}'])
+OK_LOGS = '\n'.join(['{"message": "ERROR 42 disk"}'] + ['{"message": "ok"}'] * 9)
+
+
+def test_sample_events_from_logs():
+    events = sample_events_from_logs('{"a": 1}\nraw line\n\n[1, 2]\n')
+
+    assert events == [{"a": 1}, {"message": "raw line"}, {"message": "[1, 2]"}]
+
+
+def test_branch_probability_weights_hot_path():
+    model = VRLCostModel(VPI_TABLE)
+
+    mostly_errors = model.estimate(BRANCHY_VRL, sample_events_from_logs(ERROR_LOGS))
+    mostly_ok = model.estimate(BRANCHY_VRL, sample_events_from_logs(OK_LOGS))
+
+    assert list(mostly_errors.branch_probabilities.values()) == [0.9]
+    assert list(mostly_ok.branch_probabilities.values()) == [0.1]
+    # parse_regex only costs when the ERROR branch is taken
+    assert mostly_errors.cost > mostly_ok.cost
+    assert mostly_errors.hot_functions[0][0] == 'parse_regex!'
+
+
+def test_unevaluable_condition_uses_default_probability():
+    model = VRLCostModel(VPI_TABLE)
+    estimate = model.estimate('x = 1\nif x > 0 { .a = upcase("b") }\n', [{"message": "m"}])
+
+    assert list(estimate.branch_probabilities.values()) == [DEFAULT_BRANCH_PROBABILITY]
+
+
+def test_loop_cost_scales_with_collection_size():
+    model = VRLCostModel(VPI_TABLE)
+    code = 'for_each(array!(.items)) -> |_i, v| { .last = upcase(string!(v)) }\n'
+
+    small = model.estimate(code, [{"items": ["a"]}])
+    large = model.estimate(code, [{"items": ["a"] * 20}])
+
+    assert large.cost > small.cost * 5
+
+
+def test_regex_candidate_predicted_slower():
+    model = VRLCostModel(VPI_TABLE)
+    events = sample_events_from_logs(ERROR_LOGS)
+
+    string_ops = model.estimate('.parts = split!(.message, " ")\n', events)
+    regex = model.estimate(".parts = parse_regex!(.message, r'(?P<a>\\w+)')\n", events)
+
+    assert string_ops.events_per_cpu_percent > regex.events_per_cpu_percent * 10
+
+
+def test_calibration_fits_measurements(tmp_path):
+    calibration_file = tmp_path / "calibration.json"
+    model = VRLCostModel(VPI_TABLE, calibration_file=str(calibration_file))
+
+    fast = '.parts = split!(.message, " ")\n'
+    slow = ".parts = parse_regex!(.message, r'(?P<a>\\w+)')\n"
+    model.record_measurement(fast, 5000)
+    model.record_measurement(slow, 100)
+
+    assert abs(model.estimate(fast).events_per_cpu_percent - 5000) < 1
+    assert abs(model.estimate(slow).events_per_cpu_percent - 100) < 1
+
+    model.save_calibration()
+    reloaded = VRLCostModel(VPI_TABLE, calibration_file=str(calibration_file))
+    assert len(reloaded.calibration.observations) == 2
+    assert abs(reloaded.estimate(fast).events_per_cpu_percent - 5000) < 1
+
+
+def test_single_observation_only_rescales():
+    calibration = CostCalibration()
+    calibration.add(0.01, 50)
+
+    assert calibration.exponent == 1.0
+    assert abs(calibration.predict(0.01) - 50) < 1e-6
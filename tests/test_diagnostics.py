@@ -0,0 +1,90 @@
+"""Tests for structured VRL diagnostics and block-targeted fixes"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.diagnostics import (
+    parse_diagnostics, format_diagnostics, primary_error_code, error_block,
+)
+from dfe_ai_parser_vrl.llm.client import DFELLMClient
+
+PROGRAM = "\n".join(
+    [f".f{i} = {i}" for i in range(20)]
+    + ['if exists(.message) {', '    parts = split(.message, " ")', '    .user = parts[0]', '}']
+    + [f".g{i} = {i}" for i in range(20)]
+)
+
+
+def _compile_error(vrl_code: str) -> str:
+    pyvrl = pytest.importorskip("pyvrl")
+    with pytest.raises(ValueError) as exc:
+        pyvrl.Transform(vrl_code)
+    return str(exc.value)
+
+
+def test_parse_pyvrl_diagnostics():
+    output = _compile_error('.a = 1\nif contains(.message, "x") { .b = 1 }\n.c = upcase(.message)\n')
+
+    diagnostics = parse_diagnostics(output)
+
+    assert [(d.code, d.line, d.column) for d in diagnostics] == [('E110', 2, 13), ('E103', 3, 6)]
+    assert diagnostics[0].length == len('.message')
+    assert diagnostics[0].source == 'if contains(.message, "x") { .b = 1 }'
+    assert any('expects the exact type string' in label for label in diagnostics[0].labels)
+    assert not any('http' in note for d in diagnostics for note in d.notes)
+    assert primary_error_code(output) == 'E110'
+
+
+def test_format_round_trip():
+    diagnostics = parse_diagnostics(_compile_error('.x = split(.message, " ")\n'))
+
+    rendered = format_diagnostics(diagnostics)
+
+    assert 'https://' not in rendered
+    assert parse_diagnostics("SYNTAX: " + rendered) == diagnostics
+    assert parse_diagnostics("FIELDS: missing ssh_user") == []
+
+
+def test_error_block_covers_enclosing_statement():
+    output = _compile_error(PROGRAM)
+
+    block = error_block(PROGRAM, parse_diagnostics(output), context_lines=2)
+
+    assert (block.start_line, block.end_line) == (21, 24)
+    assert block.before == ['.f18 = 18', '.f19 = 19']
+    assert block.after == ['.g0 = 0', '.g1 = 1']
+    assert block.splice(PROGRAM, 'parts = []') == PROGRAM.replace(
+        'if exists(.message) {\n    parts = split(.message, " ")\n    .user = parts[0]\n}', 'parts = []')
+
+
+def test_client_block_fix_sends_only_block():
+    output = _compile_error(PROGRAM)
+    reply = '```vrl\nif exists(.message) {\n    parts = split!(.message, " ")\n    .user = parts[0]\n}\n```'
+
+    with patch.object(DFELLMClient, '_select_model'):
+        client = DFELLMClient()
+    client.completion = Mock(return_value=Mock(choices=[Mock(message=Mock(content=reply))]))
+
+    fixed = client.fix_vrl_error(PROGRAM, output)
+
+    prompt = client.completion.call_args[0][0][1]['content']
+    assert 'LINES 21-24 TO FIX' in prompt
+    assert '.f0 = 0' not in prompt and '.g19 = 19' not in prompt
+    assert fixed == PROGRAM.replace('split(', 'split!(')
+
+
+def test_client_falls_back_to_full_rewrite_on_broken_block():
+    output = _compile_error(PROGRAM)
+    replies = ['```vrl\nif exists(.message) {\n    parts = split!(.message, " ")\n```',
+               '```vrl\n.ok = true\n```']
+
+    with patch.object(DFELLMClient, '_select_model'):
+        client = DFELLMClient()
+    client.completion = Mock(side_effect=[Mock(choices=[Mock(message=Mock(content=r))]) for r in replies])
+
+    assert client.fix_vrl_error(PROGRAM, output) == '.ok = true'
+    assert client.completion.call_count == 2
@@ -0,0 +1,66 @@
+"""Tests for reserved-field conflict detection"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.field_conflict_checker import (
+    FieldConflictChecker, ReservedFieldTrie, FieldConflict,
+)
+
+RESERVED = ["timestamp", "org_id", "tags.collector.host", "tags.event.category", "tags.event.type"]
+
+
+def test_trie_match_kinds():
+    trie = ReservedFieldTrie(RESERVED)
+
+    assert trie.match(["timestamp"]) == ('exact', 'timestamp')
+    assert trie.match(["tags", "event", "category"]) == ('exact', 'tags.event.category')
+    assert trie.match(["tags"]) == ('ancestor', 'tags.collector.host')
+    assert trie.match(["tags", "event"]) == ('ancestor', 'tags.event.category')
+    assert trie.match(["timestamp", "raw"]) == ('descendant', 'timestamp')
+    assert trie.match(["tags", "custom"]) is None
+    assert trie.match(["ssh_user"]) is None
+    assert trie.match([]) is None
+
+
+def test_structured_conflicts_with_type_info():
+    checker = FieldConflictChecker()
+    conflicts = checker.find_field_conflicts('.timestamp = now()\n.tags.event.category = "auth"\n.ssh_user = "x"\n')
+
+    assert [c.field for c in conflicts] == ['timestamp', 'tags.event.category']
+    timestamp = conflicts[0]
+    assert isinstance(timestamp, FieldConflict)
+    assert timestamp.kind == 'exact'
+    assert timestamp.reserved_type == 'timestamp'
+    assert timestamp.storage_type
+    assert timestamp.suggestion == 'log_timestamp'
+    assert conflicts[1].suggestion == 'event_category'
+
+
+def test_legacy_conflict_strings():
+    checker = FieldConflictChecker()
+    has_conflicts, conflicts = checker.check_vrl_field_conflicts('.org_id = "a"\n.tags = {}\n')
+
+    assert has_conflicts
+    assert conflicts[0].startswith('org_id (reserved: ')
+    assert conflicts[1] == 'tags (conflicts with nested reserved field: tags.collector.host)'
+
+
+def test_stream_chunk_scan():
+    checker = FieldConflictChecker()
+    chunk = '```vrl\n# .timestamp = now()\nif .org_id == "x" {\n    .timestamp = now()\n'
+
+    conflicts = checker.scan_stream_chunk(chunk)
+
+    assert [c.field for c in conflicts] == ['timestamp']
+
+
+def test_fix_rewrites_only_assignment_targets():
+    checker = FieldConflictChecker()
+    code = '.timestamp = now()\n.event_time = .timestamp\nif .timestamp == null { .tags.event.type = "x" }\n'
+
+    fixed = checker.fix_field_conflicts_in_vrl(code)
+
+    assert fixed == '.log_timestamp = now()\n.event_time = .timestamp\nif .timestamp == null { .event_type = "x" }\n'
+    assert checker.find_field_conflicts(fixed) == []
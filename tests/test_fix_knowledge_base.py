@@ -0,0 +1,97 @@
+"""Tests for the persistent error fix knowledge base"""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.fix_knowledge_base import FixKnowledgeBase, normalize_snippet, line_replacements
+from dfe_ai_parser_vrl.core.error_fixer import DFEVRLErrorFixer
+
+ERROR = 'error[E103]: unhandled fallible assignment\n  ┌─ :2:6\n'
+
+
+def test_normalize_snippet():
+    assert normalize_snippet('    .x  =  split(.message, " ");  # tokens') == '.x = split(.message, " ")'
+
+
+def test_line_replacements_only_one_to_one():
+    before = '.a = 1\n.x = split(.m, " ")\n.y = 2'
+    after = '.a = 1\n.x = split!(.m, " ")\n.y = 2\n.z = 3'
+
+    assert line_replacements(before, after, [2]) == {2: '.x = split!(.m, " ")'}
+    assert line_replacements(before, '.a = 1\n.y = 2', [2]) == {}
+
+
+def test_fix_replayed_only_after_success(tmp_path):
+    kb = FixKnowledgeBase(tmp_path / "kb.sqlite3")
+    code = '.a = 1\n    .x = split(.message, " ")'
+
+    kb.record_fix('E103', '.x = split(.message, " ")', '.x = split!(.message, " ")', 'llm')
+    assert kb.apply_known_fixes(code, ERROR) == (code, [])
+
+    kb.record_outcome('.a = 1\n.x = split!(.message, " ")', None)
+
+    # A second worker sharing the database sees the proven fix
+    other = FixKnowledgeBase(tmp_path / "kb.sqlite3")
+    fixed, applied = other.apply_known_fixes(code, ERROR)
+    assert fixed == '.a = 1\n    .x = split!(.message, " ")'
+    assert applied[0].source == 'llm' and applied[0].success_rate == 1.0
+
+
+def test_failed_fix_lowers_success_rate(tmp_path):
+    kb = FixKnowledgeBase(tmp_path / "kb.sqlite3", min_success_rate=0.6)
+    kb.record_fix('E103', '.x = split(.m, " ")', '.x = split(.m, " ") ?? []', 'local', 'E103_split_assignment')
+    kb.record_outcome('.x = split(.m, " ") ?? []', None)
+
+    # Replayed, but the same error is still reported on the rewritten line
+    fixed, _ = kb.apply_known_fixes('.a = 1\n.x = split(.m, " ")', ERROR)
+    kb.record_outcome(fixed, ERROR)
+
+    assert kb.lookup('E103', '.x = split(.m, " ")') is None
+    assert kb.get_stats()['error_frequencies'] == {}
+
+
+def test_concurrent_writers(tmp_path):
+    path = tmp_path / "kb.sqlite3"
+    FixKnowledgeBase(path)
+
+    def worker(n):
+        kb = FixKnowledgeBase(path)
+        for i in range(25):
+            kb.record_error('E651')
+            kb.record_fix('E651', f'.f{i} = upcase(.m) ?? ""', f'.f{i} = upcase(.m)', 'local')
+            kb.record_outcome(f'.f{i} = upcase(.m)', None)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("SELECT count FROM error_counts").fetchone()[0] == 100
+        assert conn.execute("SELECT SUM(successes) FROM fixes").fetchone()[0] == 100
+
+
+def test_error_fixer_learns_and_replays(tmp_path):
+    pyvrl = pytest.importorskip("pyvrl")
+    kb = FixKnowledgeBase(tmp_path / "kb.sqlite3")
+    code = '.a = 1\n.x = upcase(.message)\n'
+    try:
+        pyvrl.Transform(code)
+    except ValueError as e:
+        error = str(e)
+
+    fixer = DFEVRLErrorFixer(llm_client=None, knowledge_base=kb)
+    fixed = fixer.fix_locally(code, error)
+    fixer.record_fix_outcome(fixed, None)
+
+    replayed = DFEVRLErrorFixer(llm_client=None, knowledge_base=kb)
+    assert replayed.fix_locally(code, error) == fixed
+    assert replayed.last_rewrite is None
+    assert kb.get_stats()['proven_fixes'] == {'local': 1}
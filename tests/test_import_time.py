@@ -0,0 +1,46 @@
+"""Import-time checks: the package must not load heavy dependencies eagerly"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = str(Path(__file__).parent.parent / "src")
+HEAVY_MODULES = ["litellm", "dask", "ijson", "regex"]
+
+
+def _run(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {SRC!r}); {code}"],
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_package_import_is_lazy():
+    """Importing the package and streaming utils loads none of the heavy modules"""
+    loaded = _run(
+        "import dfe_ai_parser_vrl, dfe_ai_parser_vrl.utils.streaming; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    assert loaded == "[]"
+
+
+def test_lazy_exports_resolve():
+    """Public names are still importable from the package"""
+    names = _run(
+        "import dfe_ai_parser_vrl as d; "
+        "print(sorted(n for n in d.__all__ if n in dir(d)) == sorted(d.__all__), d.DFEConfigLoader.__name__)"
+    )
+    assert names == "True DFEConfigLoader"
+
+
+def test_import_time_benchmark():
+    """Package import stays well under the cost of importing litellm"""
+    start = time.perf_counter()
+    _run("import dfe_ai_parser_vrl; print('ok')")
+    elapsed = time.perf_counter() - start
+
+    print(f"import dfe_ai_parser_vrl: {elapsed:.2f}s")
+    assert elapsed < 3.0
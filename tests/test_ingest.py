@@ -0,0 +1,82 @@
+"""Tests for streaming sample ingestion"""
+
+import json
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_pre_tokenizer.ingest import (
+    detect_format, iter_events,
+    FORMAT_JSON_ARRAY, FORMAT_JSON_STREAM, FORMAT_TEXT,
+)
+from dfe_ai_pre_tokenizer.pre_tokenizer import PreTokenizer
+
+HYPERSEC_SAMPLE = Path(__file__).parent.parent / "data" / "input" / "hypersec" / "single-line-syslog.json"
+
+EVENTS = [{"msg": "sshd[1]: Accepted password", "port": 22, "ratio": 0.5},
+          {"msg": "ERROR: disk failed", "port": 0, "ratio": 1.25}]
+
+
+def test_ndjson(tmp_path):
+    path = tmp_path / "events.ndjson"
+    path.write_text("\n".join(json.dumps(e) for e in EVENTS) + "\n")
+
+    assert detect_format(path) == FORMAT_JSON_STREAM
+    assert list(iter_events(path)) == EVENTS
+
+
+def test_json_array(tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text("  \n" + json.dumps(EVENTS, indent=2))
+
+    assert detect_format(path) == FORMAT_JSON_ARRAY
+    assert list(iter_events(path)) == EVENTS
+
+
+def test_raw_text(tmp_path):
+    path = tmp_path / "events.log"
+    path.write_text("line one\n\nline two\n")
+
+    assert detect_format(path) == FORMAT_TEXT
+    assert list(iter_events(path)) == [{"message": "line one"}, {"message": "line two"}]
+
+
+def test_pretty_printed_export():
+    """Repo sample is a single pretty-printed object"""
+    events = list(iter_events(HYPERSEC_SAMPLE))
+
+    assert len(events) == 1
+    assert events[0]["program"] == "pmxcfs"
+
+
+def test_events_are_lazy(tmp_path):
+    """Events are yielded before the whole file is parsed"""
+    path = tmp_path / "events.ndjson"
+    path.write_text(json.dumps(EVENTS[0]) + "\n{not json")
+
+    stream = iter_events(path)
+    assert next(stream) == EVENTS[0]
+
+
+def test_optimize_file(tmp_path):
+    """PreTokenizer consumes the event stream directly"""
+    path = tmp_path / "events.ndjson"
+    path.write_text("\n".join(json.dumps(e) for e in EVENTS * 50))
+
+    class Encoder:
+        def encode(self, text):
+            return text.split()
+
+        def encode_batch(self, texts, num_threads=1):
+            return [text.split() for text in texts]
+
+    with patch("tiktoken.get_encoding", return_value=Encoder()):
+        tokenizer = PreTokenizer(max_tokens=1000)
+
+    selected, stats = tokenizer.optimize_file(path)
+
+    assert stats['original_count'] == 100
+    assert stats['unique_count'] == 2
+    assert len(selected) == 2
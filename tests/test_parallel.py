@@ -0,0 +1,54 @@
+"""Tests for process-pool chunked map utilities"""
+
+import pytest
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl import get_max_threads, set_max_threads
+from dfe_ai_parser_vrl.utils.parallel import (
+    parallel_regex_search,
+    parallel_fingerprint_lines,
+    sample_unique_lines,
+)
+
+
+LINES = [f"Oct 11 22:14:{i % 60:02d} host sshd[{i}]: Accepted password" if i % 3 else f"plain line {i}"
+         for i in range(1000)]
+PATTERNS = [r'sshd\[\d+\]:']
+
+
+@pytest.fixture
+def two_workers():
+    """Force the process pool path even on single-core hosts"""
+    original = get_max_threads()
+    set_max_threads(2)
+    yield
+    set_max_threads(original)
+
+
+def test_regex_search_matches_in_process_result(two_workers):
+    """Chunked process results equal the single-process results in order"""
+    inline = parallel_regex_search(LINES, PATTERNS)
+    chunked = parallel_regex_search(LINES, PATTERNS, chunk_lines=128, min_lines=0)
+
+    assert chunked == inline
+    assert chunked[0] is False
+    assert chunked[1] is True
+
+
+def test_fingerprints_stable_across_chunks(two_workers):
+    """Fingerprints do not depend on chunking and repeat for equal lines"""
+    inline = parallel_fingerprint_lines(LINES)
+    chunked = parallel_fingerprint_lines(LINES, chunk_lines=100, min_lines=0)
+
+    assert chunked == inline
+    assert all(0 <= value < 2 ** 64 for value in chunked)
+    assert parallel_fingerprint_lines(["a", "a", "b"])[0] == parallel_fingerprint_lines(["a"])[0]
+
+
+def test_sample_unique_lines():
+    """Duplicates and blank lines are removed before sampling"""
+    lines = ["x", "y", "x", "", "z", "y"]
+    assert sample_unique_lines(lines, 10) == ["x", "y", "z"]
+    assert len(sample_unique_lines(LINES * 2, 50)) == 50
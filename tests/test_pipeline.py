@@ -0,0 +1,72 @@
+"""Tests for the pipelined generation scheduler"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.pipeline import GenerationPipeline
+from dfe_ai_parser_vrl.core.generator import GenerationJob
+
+STEP_SECONDS = 0.1
+
+
+class SlowGenerator:
+    """Each job needs two LLM steps and two validations; steps sleep STEP_SECONDS"""
+
+    def __init__(self):
+        self.threads = {"llm": set(), "validation": set()}
+
+    def start_job(self, sample_logs, device_type=None, validate=True, fix_errors=True, baseline_vrl=None):
+        return GenerationJob(sample_logs, device_type, validate, fix_errors, baseline_vrl, None, {"fixes": 0})
+
+    def llm_step(self, job):
+        self.threads["llm"].add(threading.current_thread().name)
+        time.sleep(STEP_SECONDS)
+        if job.sample_logs == "broken":
+            raise RuntimeError("rate limited")
+        job.vrl_code = f"# {job.sample_logs} v{job.iteration}"
+        job.iteration += 1
+
+    def validation_step(self, job):
+        self.threads["validation"].add(threading.current_thread().name)
+        time.sleep(STEP_SECONDS)
+        return job.iteration >= 2
+
+    def finish_job(self, job):
+        return job.vrl_code, {"iterations": job.iteration}
+
+
+def test_stages_overlap_across_jobs():
+    generator = SlowGenerator()
+    with GenerationPipeline(generator, llm_workers=4, validation_workers=4) as pipeline:
+        start = time.perf_counter()
+        futures = [pipeline.submit(f"src{i}") for i in range(4)]
+        results = [future.result(timeout=10) for future in futures]
+        elapsed = time.perf_counter() - start
+
+    assert results == [(f"# src{i} v1", {"iterations": 2}) for i in range(4)]
+    assert pipeline.stage_counts == {"llm": 8, "validation": 8}
+    # Serial execution would take 16 steps; pipelined it is about 4
+    assert elapsed < 10 * STEP_SECONDS
+    assert all(name.startswith("dfe-llm") for name in generator.threads["llm"])
+    assert all(name.startswith("dfe-validate") for name in generator.threads["validation"])
+
+
+def test_failed_job_does_not_stop_others():
+    with GenerationPipeline(SlowGenerator(), llm_workers=2, validation_workers=1) as pipeline:
+        broken, ok = pipeline.submit("broken"), pipeline.submit("ok")
+        assert ok.result(timeout=10)[0] == "# ok v1"
+        with pytest.raises(RuntimeError, match="rate limited"):
+            broken.result(timeout=10)
+
+
+def test_without_validation_returns_after_generation():
+    with GenerationPipeline(SlowGenerator(), llm_workers=1, validation_workers=1) as pipeline:
+        vrl_code, metadata = pipeline.submit("raw", validate=False).result(timeout=10)
+
+    assert vrl_code == "# raw v0" and metadata == {"fixes": 0}
+    assert pipeline.stage_counts == {"llm": 1, "validation": 0}
@@ -0,0 +1,80 @@
+"""Tests for pre-tokenizer sample selection"""
+
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_pre_tokenizer.pre_tokenizer import PreTokenizer
+
+
+class WhitespaceEncoder:
+    """Offline stand-in for tiktoken: one token per whitespace-separated word"""
+
+    def __init__(self):
+        self.batch_calls = []
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_batch(self, texts, num_threads=1):
+        self.batch_calls.append(list(texts))
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def tokenizer():
+    encoder = WhitespaceEncoder()
+    with patch("tiktoken.get_encoding", return_value=encoder):
+        yield PreTokenizer(max_tokens=1000)
+
+
+def _samples():
+    return [
+        {"message": "%ASA-6-302016: Built outbound connection " + "pad " * 200},
+        {"message": "devname=FG100 action=allow src=192.168.1.1"},
+        {"message": "ERROR: Database connection failed"},
+        {"message": "WARNING: Disk usage at 85%"},
+        {"message": "User admin logged in"},
+        {"message": "<34>Oct 11 22:14:15 host sshd: session opened"},
+    ]
+
+
+def test_count_tokens_batch_uses_cache(tokenizer):
+    """Repeated texts are only encoded once"""
+    counts = tokenizer.count_tokens_batch(["a b", "c d e", "a b"])
+    assert counts == [2, 3, 2]
+    assert tokenizer.encoder.batch_calls == [["a b", "c d e"]]
+
+    counts = tokenizer.count_tokens_batch(["c d e", "f"])
+    assert counts == [3, 1]
+    assert tokenizer.encoder.batch_calls[-1] == ["f"]
+
+
+def test_selection_respects_budget(tokenizer):
+    """Selected samples never exceed the target token budget"""
+    selected, stats = tokenizer.optimize_samples(_samples() * 5, target_tokens=40)
+
+    assert stats['unique_count'] == 6
+    assert stats['total_tokens'] <= 40
+    assert stats['selected_count'] == len(selected)
+
+
+def test_selection_skips_oversized_sample(tokenizer):
+    """An oversized sample does not stop the remaining budget from being filled"""
+    samples = _samples()
+    selected, stats = tokenizer.optimize_samples(samples, target_tokens=60)
+
+    assert samples[0] not in selected
+    assert len(selected) == len(samples) - 1
+    assert stats['patterns_covered'] < stats['total_patterns']
+
+
+def test_selection_covers_all_patterns_when_budget_allows(tokenizer):
+    """Full budget selects every unique sample"""
+    samples = _samples()
+    selected, stats = tokenizer.optimize_samples(samples, target_tokens=10000)
+
+    assert len(selected) == len(samples)
+    assert stats['patterns_covered'] == stats['total_patterns']
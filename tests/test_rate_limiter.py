@@ -0,0 +1,93 @@
+"""Tests for rate-limit-aware LLM request pacing"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.llm.rate_limiter import (
+    LLMPacer, parse_reset, provider_for_model, response_headers, retry_after_seconds, is_rate_limit_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_unthrottled_until_provider_reports_limits(clock):
+    pacer = LLMPacer(clock=clock, sleep=clock.sleep)
+
+    for _ in range(100):
+        assert pacer.acquire("anthropic") == 0.0
+    assert clock.sleeps == []
+
+
+def test_header_budget_paces_only_when_spent(clock):
+    pacer = LLMPacer(clock=clock, sleep=clock.sleep)
+    pacer.observe("openai", {"x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "2",
+                             "x-ratelimit-reset-requests": "58s"})
+
+    assert pacer.acquire("openai") == 0.0
+    assert pacer.acquire("openai") == 0.0
+    assert pacer.acquire("openai") == pytest.approx(1.0)   # 60/min refills one request per second
+    assert pacer.acquire("anthropic") == 0.0               # Other providers unaffected
+
+
+def test_exhausted_budget_waits_for_reset(clock):
+    pacer = LLMPacer(clock=clock, sleep=clock.sleep)
+    reset = (datetime.now(timezone.utc) + timedelta(seconds=20)).isoformat()
+    pacer.observe("anthropic", {"llm_provider-anthropic-ratelimit-tokens-limit": "80000",
+                                "anthropic-ratelimit-tokens-limit": "80000",
+                                "anthropic-ratelimit-tokens-remaining": "0",
+                                "anthropic-ratelimit-tokens-reset": reset})
+
+    assert pacer.acquire("anthropic") == pytest.approx(20, abs=1)
+
+
+def test_rate_limit_error_blocks_for_retry_after(clock):
+    pacer = LLMPacer(clock=clock, sleep=clock.sleep)
+    error = type("RateLimitError", (Exception,), {})("429")
+    error.response = SimpleNamespace(headers={"retry-after": "7"})
+
+    assert is_rate_limit_error(error)
+    pacer.penalize("anthropic", retry_after_seconds(error))
+    assert pacer.acquire("anthropic") == pytest.approx(7)
+    assert pacer.acquire("anthropic") == 0.0
+
+
+def test_static_limit_and_disabled_pacer(clock):
+    pacer = LLMPacer({"anthropic": 30}, clock=clock, sleep=clock.sleep)
+    waits = [pacer.acquire("anthropic") for _ in range(31)]
+    assert sum(waits[:30]) == 0 and waits[30] == pytest.approx(2.0)
+
+    disabled = LLMPacer({"anthropic": 1}, enabled=False, clock=clock, sleep=clock.sleep)
+    assert [disabled.acquire("anthropic") for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_header_helpers():
+    assert parse_reset("1m30s") == 90 and parse_reset("250ms") == 0.25 and parse_reset("3") == 3
+    assert parse_reset("soon") is None
+    assert provider_for_model("anthropic/claude-3-haiku") == "anthropic"
+    assert provider_for_model("gpt-4o") == "default"
+
+    response = SimpleNamespace(_hidden_params={"additional_headers": {
+        "llm_provider-anthropic-ratelimit-requests-remaining": "9", "X-RateLimit-Limit-Requests": "50"}})
+    assert response_headers(response) == {"anthropic-ratelimit-requests-remaining": "9",
+                                          "x-ratelimit-limit-requests": "50"}
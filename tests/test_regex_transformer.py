@@ -0,0 +1,103 @@
+"""Tests for the regex elimination transformer"""
+
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.regex_transformer import (
+    UnsupportedPattern, Capture, parse_pattern, match_condition, eliminate_regex,
+)
+from dfe_ai_parser_vrl.core.regex_prevention import check_vrl_for_regex
+from dfe_ai_parser_vrl.core.error_fixer import DFEVRLErrorFixer
+from dfe_ai_parser_vrl.core.fix_knowledge_base import FixKnowledgeBase
+
+SYSLOG = "\n".join([
+    "Jan 12 host1 sshd[123]: Failed password for root user=root, from 10.0.0.1",
+    "Jan 12 host1 sshd[12a]: Accepted publickey user=admin",
+    "Feb  3 host2 sshd[9]: Invalid user",
+    "garbage line without structure",
+    '{"message": 5}',
+])
+
+PARSE_PROGRAM = r'''.msg = string!(.message)
+parsed = parse_regex(.msg, r'^(?P<month>\S+) (?P<day>\d+) (?P<host>[^ ]+) sshd\[(?P<pid>\d+)\]: (?P<text>.*)$') ?? {}
+.host = parsed.host
+.pid = parsed.pid
+kv = parse_regex(.msg, r'user=(?P<user>[^ ,]+)') ?? {"user": "none"}
+.user = kv.user
+'''
+
+
+def test_parse_pattern_subset():
+    pattern = parse_pattern(r'^(?P<host>\S+) sshd\[(?P<pid>\d+)\]:')
+
+    assert pattern.anchored_start and not pattern.anchored_end
+    assert pattern.elements == [Capture('host', 'nonspace', True), ' sshd[',
+                                Capture('pid', 'digit', True), ']:']
+
+    for unsupported in [r'(?P<a>\w+)', r'a+b', r'(?P<a>[a-z]+)', r'(x|y)']:
+        with pytest.raises(UnsupportedPattern):
+            parse_pattern(unsupported)
+
+
+def test_match_condition_literals():
+    assert match_condition('.msg', r'ERROR') == 'contains(.msg, "ERROR")'
+    assert match_condition('.msg', r'^Jan\.') == 'starts_with(.msg, "Jan.")'
+    assert match_condition('.msg', r'(?i)done$') == 'ends_with(.msg, "done", case_sensitive: false)'
+    assert match_condition('.msg', r'^ok$|fail') == '(.msg == "ok" || contains(.msg, "fail"))'
+
+    with pytest.raises(UnsupportedPattern):
+        match_condition('upcase(.msg)', r'a|b', repeatable=False)
+    with pytest.raises(UnsupportedPattern):
+        match_condition('.msg', r'\d+')
+
+
+def test_match_rewritten_without_samples():
+    pytest.importorskip("pyvrl")
+    code = '.msg = string!(.message)\nif match(.msg, r\'(?i)failed|^Accepted\') { .auth = true }\n'
+
+    result = eliminate_regex(code)
+
+    assert result.code == ('.msg = string!(.message)\nif (contains(.msg, "failed", case_sensitive: false) || '
+                           'starts_with(.msg, "Accepted", case_sensitive: false)) { .auth = true }\n')
+    assert not check_vrl_for_regex(result.code)[0]
+
+
+def test_parse_regex_verified_on_samples():
+    pyvrl = pytest.importorskip("pyvrl")
+
+    unverified = eliminate_regex(PARSE_PROGRAM)
+    assert unverified.code == PARSE_PROGRAM
+    assert [reason for _, reason in unverified.rejected] == ["no sample events to verify against"] * 2
+
+    result = eliminate_regex(PARSE_PROGRAM, SYSLOG)
+    assert [r.function for r in result.applied] == ['parse_regex', 'parse_regex']
+    assert result.verified_events == 5
+    assert not check_vrl_for_regex(result.code)[0]
+
+    original, rewritten = pyvrl.Transform(PARSE_PROGRAM + "\n."), pyvrl.Transform(result.code + "\n.")
+    for line in SYSLOG.splitlines()[:4]:
+        assert rewritten.remap({"message": line}) == original.remap({"message": line})
+
+
+def test_non_equivalent_rewrite_rejected():
+    pytest.importorskip("pyvrl")
+    # First-occurrence split differs from the regex, which retries at a later "id="
+    code = 'p = parse_regex(string!(.message), r\'id=(?P<id>[^ ]+)\') ?? {}\n.id = p.id\n'
+
+    result = eliminate_regex(code, "x id= id=42\nid=7")
+
+    assert result.code == code
+    assert result.rejected[0][1] == "output differs on sample events"
+
+
+def test_error_fixer_translates_rejected_regex(tmp_path):
+    pytest.importorskip("pyvrl")
+    fixer = DFEVRLErrorFixer(llm_client=None, knowledge_base=FixKnowledgeBase(tmp_path / "kb.sqlite3"))
+    error = "REJECTED: VRL contains regex functions: parse_regex, match."
+
+    fixed = fixer.fix_locally(PARSE_PROGRAM, error, SYSLOG)
+
+    assert fixed and not check_vrl_for_regex(fixed)[0]
@@ -0,0 +1,72 @@
+"""Tests for the parser registry and template-signature lookup"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core import generator as generator_module
+from dfe_ai_parser_vrl.core.generator import DFEVRLGenerator
+from dfe_ai_parser_vrl.core.registry import ParserRegistry, template_signature, source_signatures
+
+SSH_A = ("Jan 12 10:00:01 host1 sshd[123]: Failed password for root from 10.0.0.1 port 22 ssh2\n"
+         "Jan 12 10:00:02 host1 sshd[124]: Accepted password for bob from 10.0.0.2 port 22 ssh2\n")
+SSH_B = ("Mar  3 08:01:44 bastion sshd[9]: Failed password for admin from 192.168.1.5 port 4022 ssh2\n"
+         "Mar  3 08:01:45 bastion sshd[10]: Accepted password for alice from 192.168.1.6 port 22 ssh2\n")
+VRL = '. = parse_syslog!(.message)'
+
+
+def test_signatures_ignore_variable_fields():
+    assert source_signatures(SSH_A.splitlines()).keys() == source_signatures(SSH_B.splitlines()).keys()
+    assert template_signature('{"b": 1, "a": {"x": 2}}') == template_signature('{"a": 3, "b": "y"}')
+    assert template_signature('CEF:0|Acme|FW|1.0|100|blocked|5|src=1.2.3.4') == 'cef:Acme|FW|100'
+    assert template_signature('time=1 level=info msg=ok') == template_signature('msg="x y" level=warn time=2')
+    assert template_signature('   ') is None
+
+
+def test_register_and_lookup(tmp_path):
+    registry = ParserRegistry(tmp_path)
+    entry = registry.register(VRL, SSH_A, "ssh")
+    assert entry.coverage == 1.0 and entry.sample_lines == 2
+
+    match = registry.lookup(SSH_B, "ssh")
+    assert match.parser.parser_id == entry.parser_id and match.coverage == 1.0
+    assert registry.lookup('{"ts": 1, "msg": "a"}\n') is None
+
+    # Partial coverage below the threshold is not reused
+    mixed = SSH_B + "Mar  3 08:01:46 bastion cron[1]: job started\n" * 2
+    assert registry.lookup(mixed) is None
+    assert registry.lookup(mixed, min_coverage=0.5).coverage == 0.5
+
+    # Entries persist one file per parser and re-registering merges templates
+    reloaded = ParserRegistry(tmp_path)
+    merged = reloaded.register(VRL, mixed, "ssh", vpi=1500)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert merged.vpi == 1500 and merged.hits == 2 and merged.sample_lines == 6
+    assert reloaded.lookup(mixed).coverage == 1.0
+    assert json.loads((tmp_path / f"{entry.parser_id}.json").read_text())["hits"] == 3
+
+
+def test_generator_reuses_registered_parser(tmp_path, monkeypatch):
+    registry = ParserRegistry(tmp_path)
+    registry.register(VRL, SSH_A, "ssh")
+
+    session = Mock(session_id="s1")
+    session.get_session_summary.return_value = {}
+    monkeypatch.setattr(generator_module, "get_vrl_session", lambda **kwargs: session)
+    monkeypatch.setattr(generator_module, "cleanup_vrl_session", lambda *args: None)
+
+    generator = DFEVRLGenerator.__new__(DFEVRLGenerator)
+    generator.llm_client, generator.error_fixer = Mock(), Mock()
+    generator.validator = Mock()
+    generator.validator.validate.return_value = (True, None)
+    generator.max_iterations, generator.registry = 10, registry
+
+    vrl_code, metadata = generator.generate(SSH_B, device_type="ssh")
+
+    assert vrl_code == VRL
+    assert metadata["validation_passed"] and metadata["registry_coverage"] == 1.0
+    session.generate_vrl.assert_not_called()
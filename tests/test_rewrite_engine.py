@@ -0,0 +1,82 @@
+"""Tests for the compiled VRL rewrite engine"""
+
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.rewrite_engine import (
+    RewriteEngine, RewriteRule, AST_RULES, parse_error_locations,
+)
+from dfe_ai_parser_vrl.core.error_fixer import DFEVRLErrorFixer
+from dfe_ai_parser_vrl.core.fix_knowledge_base import FixKnowledgeBase
+
+E103_MESSAGE = '''error[E103]: unhandled fallible assignment
+  ┌─ :2:6
+2 │ .x = split(.message, " ")
+  │ ---- ^^^^^^^^^^^^^^^^^^^^
+  │ │    update the expression to be infallible by adding a `!`: `split!(.message, " ")`
+error[E651]: unnecessary error coalescing operation
+  ┌─ :3:6
+3 │ .y = to_string(.a) ?? ""
+'''
+
+
+def _compile_error(vrl_code: str) -> str:
+    pyvrl = pytest.importorskip("pyvrl")
+    with pytest.raises(ValueError) as exc:
+        pyvrl.Transform(vrl_code)
+    return str(exc.value)
+
+
+def test_parse_error_locations():
+    locations = parse_error_locations(E103_MESSAGE)
+
+    assert [(loc.code, loc.line, loc.column) for loc in locations] == [('E103', 2, 6), ('E651', 3, 6)]
+    assert 'split!(' in locations[0].detail
+    assert parse_error_locations("SYNTAX: something went wrong") == []
+
+
+def test_ast_rules_edit_reported_spans():
+    code = '.a = 1\n.x = split(.message, " ")\n.y = to_string(.a) ?? ""\n'
+
+    result = RewriteEngine().rewrite(code, AST_RULES, E103_MESSAGE)
+
+    assert result.code == '.a = 1\n.x = split!(.message, " ")\n.y = to_string(.a)\n'
+    assert [str(f) for f in result.fired] == ['E103_infallible_call@2:6', 'E651_remove_coalescing@3:6']
+
+
+def test_line_rules_target_error_line_and_column():
+    rule = RewriteRule('E651_drop_default', r'(\w+\(\.\w+\)) \?\? ""', r'\1', frozenset({'E651'}),
+                       operators=frozenset({'??'}))
+    code = '.a = upcase(.a) ?? ""\n.b = upcase(.b) ?? "" + upcase(.c) ?? ""\n'
+    message = 'error[E651]: unnecessary error coalescing operation\n  ┌─ :2:25\n'
+
+    engine = RewriteEngine()
+    result = engine.rewrite(code, [rule], message)
+
+    assert result.code == '.a = upcase(.a) ?? ""\n.b = upcase(.b) ?? "" + upcase(.c)\n'
+    assert engine.fire_counts['E651_drop_default'] == 1
+
+
+def test_rules_filtered_by_error_code_and_prerequisites():
+    rules = [RewriteRule('E103_only', r'split\(', 'split!(', frozenset({'E103'}), calls=frozenset({'split'}))]
+    code = '# split(.a)\n.x = split(.message, " ")\n'
+
+    assert not RewriteEngine().rewrite(code, rules, error_code='E651').changed
+    assert RewriteEngine().rewrite(code, rules, error_code='E103').code == '# split(.a)\n.x = split!(.message, " ")\n'
+
+
+def test_fix_locally_with_real_compiler_errors(tmp_path):
+    fixer = DFEVRLErrorFixer(llm_client=None, knowledge_base=FixKnowledgeBase(tmp_path / "kb.sqlite3"))
+    pyvrl = pytest.importorskip("pyvrl")
+
+    for code in ['.p = parse_json(.message)\n.q = upcase(.message)\n',
+                 '.a = 1\n.y = to_string(.a) ?? ""\n',
+                 'if contains(.message, "x") { .b = 1 }\n']:
+        fixed = fixer.fix_locally(code, _compile_error(code))
+
+        assert fixed and fixed != code
+        assert fixer.last_rewrite.fired
+        pyvrl.Transform(fixed)
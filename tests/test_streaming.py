@@ -0,0 +1,56 @@
+"""Tests for chunked streaming concurrency helpers"""
+
+import pytest
+import sys
+from itertools import count, islice
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.utils.streaming import (
+    chunked_map,
+    iter_chunks,
+    iter_regex_search,
+    concurrent_regex_search_threadpool,
+    concurrent_line_processor,
+)
+
+
+def test_iter_chunks():
+    """Chunks cover the input in order with a short final chunk"""
+    assert list(iter_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_chunks([], 3)) == []
+
+
+def test_chunked_map_preserves_order():
+    """Results come back in input order across chunks"""
+    assert list(chunked_map(lambda x: x * 2, range(1000), chunk_size=7)) == [x * 2 for x in range(1000)]
+
+
+def test_chunked_map_backpressure_on_unbounded_input():
+    """An infinite generator is only consumed as far as results are taken"""
+    consumed = []
+
+    def source():
+        for i in count():
+            consumed.append(i)
+            yield i
+
+    results = list(islice(chunked_map(str, source(), chunk_size=10, max_pending=2), 25))
+
+    assert results == [str(i) for i in range(25)]
+    assert len(consumed) <= 10 * 5
+
+
+def test_line_processor_errors_become_none():
+    """A failing line yields None without aborting the batch"""
+    results = concurrent_line_processor(["1", "x", "3"], int, chunk_size=2)
+    assert results == [1, None, 3]
+
+
+def test_regex_search_accepts_generators():
+    """Regex search works on streamed input and matches list input"""
+    lines = ["sshd[1]: ok", "", "cron: run", "sshd[22]: fail"]
+    expected = [True, False, False, True]
+
+    assert concurrent_regex_search_threadpool(lines, [r'sshd\[\d+\]'], chunk_size=1) == expected
+    assert list(iter_regex_search(iter(lines), [r'sshd\[\d+\]'], chunk_size=3)) == expected
@@ -0,0 +1,94 @@
+"""Tests for the successive-halving candidate tournament in the performance stage"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.cost_model import VRLCostModel
+from dfe_ai_parser_vrl.core.performance import (
+    DFEVRLPerformanceOptimizer, PerformanceBaseline, VRLPerformanceOptimizer,
+)
+
+# Strategy -> (quick PyVRL events/sec, Vector VPI)
+SCORES = {"a": (400, 2000), "b": (300, 1000), "c": (200, 3000), "d": (100, 500)}
+
+
+class FakeLLM:
+    last_completion_cost = 0.1
+
+    def generate_candidate_strategies(self, sample_logs, device_type, candidate_count):
+        return [{"name": name, "description": name} for name in SCORES]
+
+    def generate_vrl(self, sample_logs, device_type, stream, strategy, baseline_vrl):
+        return f'.strategy = "{strategy["name"]}"'
+
+
+class FakeValidator:
+    def validate(self, vrl_code, sample_logs):
+        return True, None
+
+
+class FakeFixer:
+    def record_fix_outcome(self, *args):
+        pass
+
+
+def _optimizer(tmp_path, benchmarks, refined):
+    opt = DFEVRLPerformanceOptimizer.__new__(DFEVRLPerformanceOptimizer)
+    opt.session_id = "vrl_perf_session_test"
+    opt.iteration_metrics, opt.start_time, opt.end_time = [], None, None
+    opt.cpu_benchmark_multiplier, opt.vector_startup_time = 1.0, 0.0
+    opt.default_optimize_for, opt.candidate_count = "cpu_efficiency", len(SCORES)
+    opt.llm_client, opt.validator, opt.error_fixer = FakeLLM(), FakeValidator(), FakeFixer()
+    opt.cost_model = VRLCostModel(VRLPerformanceOptimizer().function_vpi_impact)
+    opt.cost_model_enabled, opt.cost_model_prune_ratio = True, 0.5
+    opt.tournament_enabled, opt.tournament_keep_fraction = True, 0.5
+    opt.tournament_quick_events, opt.tournament_budgets = 100, [250, 1000, 4000]
+    opt.checkpoint_enabled, opt.checkpoint_dir = False, tmp_path
+    opt.checkpoint, opt._checkpoint_state, opt.registry = None, {}, None
+
+    name = lambda vrl_code: vrl_code.split('"')[1]
+
+    def measure(vrl_code, sample_logs, max_events=1000):
+        benchmarks.append((name(vrl_code), max_events))
+        vpi = SCORES[name(vrl_code)][1]
+        return PerformanceBaseline(vpi / 10, 1.0, 10.0, vpi, 0.1, 0, vrl_performance_index=vpi)
+
+    def refine(vrl_code, performance, sample_logs):
+        refined.append(name(vrl_code))
+        return vrl_code
+
+    opt._measure_vrl_performance = measure
+    opt._quick_throughput = lambda vrl_code, sample_events: SCORES[name(vrl_code)][0]
+    opt._refine_vrl_for_performance = refine
+    return opt
+
+
+def test_tournament_benchmarks_only_top_fraction(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_text("Jan 12 10:00:01 host1 app[1]: started\n")
+    benchmarks, refined = [], []
+
+    vrl_code, metrics = _optimizer(tmp_path, benchmarks, refined).run_performance_optimization(
+        str(log_file), baseline_vrl=". = {}")
+
+    # Quick round keeps a and b (c is slow in PyVRL), the short Vector round keeps a,
+    # and only a gets the final benchmark and improvement cycles
+    assert benchmarks == [("a", 250), ("b", 250), ("a", 4000)]
+    assert set(refined) == {"a"}
+    assert vrl_code == '.strategy = "a"'
+    assert metrics["total_candidates"] == 4
+
+
+def test_disabled_tournament_benchmarks_every_candidate_once(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_text("Jan 12 10:00:01 host1 app[1]: started\n")
+    benchmarks, refined = [], []
+    opt = _optimizer(tmp_path, benchmarks, refined)
+    opt.tournament_enabled = False
+
+    vrl_code, _ = opt.run_performance_optimization(str(log_file), baseline_vrl=". = {}")
+
+    assert sorted(benchmarks) == [("a", 1000), ("b", 1000), ("c", 1000), ("d", 1000)]
+    assert vrl_code == '.strategy = "c"'
@@ -0,0 +1,78 @@
+"""Tests for VRL function cost table calibration"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core import vpi_calibration
+from dfe_ai_parser_vrl.core.vpi_calibration import (
+    VPIMicrobenchmark, BenchmarkCase, BENCHMARK_CASES,
+    build_cost_table, save_cost_table, load_cost_table, load_function_vpi_impact,
+    format_performance_tiers, COST_TABLE_SCHEMA_VERSION,
+)
+
+NS_PER_CALL = {"contains": 400.0, "split!": 800.0, "parse_json": 1600.0, "parse_regex": 40000.0}
+
+
+def test_benchmark_cases_compile():
+    pyvrl = pytest.importorskip("pyvrl")
+
+    for case in BENCHMARK_CASES:
+        pyvrl.Transform(vpi_calibration.benchmark_program(case.expression, repeats=1))
+
+
+def test_pyvrl_microbenchmark():
+    pytest.importorskip("pyvrl")
+    benchmark = VPIMicrobenchmark(engine="pyvrl", iterations=50, rounds=1)
+    results = benchmark.run([BenchmarkCase("contains", 'contains(string!(.message), "failed")'),
+                             BenchmarkCase("bogus", 'not_a_function(.message)')])
+
+    assert set(results) == {"contains"}
+    assert results["contains"] >= vpi_calibration.MIN_NS_PER_CALL
+
+
+def test_cost_table_is_relative_to_reference():
+    table = build_cost_table(NS_PER_CALL, "pyvrl", "0.0.2")
+
+    assert table["schema_version"] == COST_TABLE_SCHEMA_VERSION
+    assert table["engine_version"] == "0.0.2"
+    assert table["functions"]["contains"]["vpi_impact"] == 400
+    assert table["functions"]["split!"]["vpi_impact"] == 200
+    assert table["functions"]["parse_regex"]["vpi_impact"] == 4
+
+
+def test_cost_table_requires_reference():
+    with pytest.raises(ValueError):
+        build_cost_table({"split!": 800.0}, "pyvrl", "0.0.2")
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = save_cost_table(build_cost_table(NS_PER_CALL, "pyvrl", "0.0.2"), tmp_path / "table.json")
+
+    assert load_cost_table(path)["engine"] == "pyvrl"
+    assert load_function_vpi_impact(path)["parse_json"] == 100
+    assert "Regex operations: 4-4 events/CPU%" in format_performance_tiers(path)
+
+
+def test_missing_or_stale_schema_ignored(tmp_path):
+    path = tmp_path / "table.json"
+    assert load_function_vpi_impact(path) == {}
+
+    path.write_text(json.dumps({"schema_version": 0, "functions": {"contains": {"vpi_impact": 1}}}))
+    assert load_cost_table(path) is None
+    assert format_performance_tiers(path) is None
+
+
+def test_optimizer_uses_cost_table(tmp_path, monkeypatch):
+    path = save_cost_table(build_cost_table(NS_PER_CALL, "pyvrl", "0.0.2"), tmp_path / "table.json")
+    monkeypatch.setattr(vpi_calibration, "DEFAULT_COST_TABLE_PATH", path)
+
+    from dfe_ai_parser_vrl.core.performance import VRLPerformanceOptimizer
+    optimizer = VRLPerformanceOptimizer()
+
+    assert optimizer.function_vpi_impact["split!"] == 200
+    # Functions without measurements keep their defaults
+    assert optimizer.function_vpi_impact["capture"] == 12
@@ -0,0 +1,112 @@
+"""Tests for the shared VRL lexer/parser and AST cache"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.vrl_ast import (
+    parse_vrl, get_ast_cache_stats, VRLASTCache,
+    Assign, Call, If, Path as PathNode,
+)
+from dfe_ai_parser_vrl.core.field_conflict_checker import FieldConflictChecker
+from dfe_ai_parser_vrl.core.regex_prevention import RegexPreventionSystem
+from dfe_ai_parser_vrl.core.comprehensive_e651_fixer import ComprehensiveE651Fixer
+from dfe_ai_parser_vrl.core.error_learning_system import ErrorLearningSystem
+
+SAMPLE_VRL = '''
+# Parse syslog-style message
+msg = string!(.message)
+parts = split(msg, " ", limit: 3) ?? []
+if length(parts) >= 2 {
+    .event.action = downcase(parts[1])
+    .tags = ["ssh", "auth"]
+} else if contains(msg, "ERROR") {
+    .event.outcome = "failure"
+} else {
+    .event_data = { "raw": msg, "count": 1 }
+}
+.timestamp = now()
+del(.message)
+'''
+
+
+def test_parse_sample_without_errors():
+    program = parse_vrl(SAMPLE_VRL)
+
+    assert program.is_valid, program.errors
+    # else-if chains nest as If nodes
+    assert len(program.find(If)) == 2
+    assert {'string', 'split', 'length', 'downcase', 'contains', 'now', 'del'} == program.function_names()
+    assert [call.qualified_name for call in program.calls('string')] == ['string!']
+
+
+def test_calls_ignore_comments_and_strings():
+    program = parse_vrl('# parse_regex(.message, r\'\\d+\')\n.note = "use parse_regex( later"\n')
+
+    assert program.function_names() == set()
+    assert [lit.value for lit in program.string_literals()] == ["use parse_regex( later"]
+
+
+def test_assigned_paths_exclude_comparisons():
+    program = parse_vrl('if .status == "ok" { .event.outcome = "success" }\n.a, err = parse_json(.raw)\n')
+
+    assert program.assigned_paths() == ['event.outcome', 'a']
+    assert len(program.find(Assign)) == 2
+    assert all(isinstance(node, PathNode) for node in program.find(Assign)[1].targets[:1])
+
+
+def test_line_indexes():
+    program = parse_vrl('# only a comment\nx = split(.a, ",") ?? []\n\ny = 1\n')
+
+    assert program.code_lines() == {2, 4}
+    assert program.calls_by_line()[2] == {'split'}
+    assert '??' in program.operators_by_line()[2]
+    assert any(isinstance(node, Call) for node in program.nodes_on_line(2))
+
+
+def test_error_recovery_keeps_later_statements():
+    program = parse_vrl('.a = )\n.b = "ok"\n')
+
+    assert not program.is_valid
+    assert program.errors[0].span.line == 1
+    assert program.assigned_paths() == ['b']
+
+
+def test_cache_hit_on_reparse():
+    cache = VRLASTCache(max_entries=2)
+    first = cache.parse('.a = 1')
+    second = cache.parse('.a = 1')
+
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.parse('.b = 2')
+    cache.parse('.c = 3')
+    assert len(cache) == 2
+    assert set(get_ast_cache_stats()) >= {'hits', 'misses', 'entries'}
+
+
+def test_regex_check_ignores_comments():
+    prevention = RegexPreventionSystem()
+
+    has_regex, _ = prevention.post_generation_check('# never call parse_regex(.message)\n.a = "x"\n')
+    assert not has_regex
+
+    has_regex, violations = prevention.post_generation_check('.a = parse_regex!(.message, r\'(?P<x>\\d+)\')\n')
+    assert has_regex
+    assert 'FORBIDDEN_FUNCTION: parse_regex' in violations
+
+
+def test_field_checker_skips_comparisons():
+    checker = FieldConflictChecker()
+    has_conflicts, conflicts = checker.check_vrl_field_conflicts('if .timestamp == null { .event_time = now() }\n')
+
+    assert not has_conflicts
+    assert conflicts == []
+
+
+def test_fixers_skip_comments():
+    code = '# parts = split(.a, ",") ?? []\nparts = split(.a, ",") ?? []\n'
+
+    assert ComprehensiveE651Fixer().fix_all_e651_patterns(code) == '# parts = split(.a, ",") ?? []\nparts = split(.a, ",")\n'
+    assert ErrorLearningSystem().apply_learned_fixes(code).startswith('# parts = split(.a, ",") ?? []\n')
@@ -0,0 +1,79 @@
+"""Tests for the AST VRL optimizer"""
+
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.vrl_optimizer import VRLOptimizer
+from dfe_ai_parser_vrl.core.cost_model import VRLCostModel
+
+pyvrl = pytest.importorskip("pyvrl")
+
+SAMPLES = "\n".join(["INFO started worker %d" % i for i in range(8)] + ["WARN disk low", "ERROR crashed hard"])
+
+
+@pytest.fixture
+def optimizer():
+    return VRLOptimizer(VRLCostModel({"contains": 400, "split": 380, "string!": 280, "length": 380}))
+
+
+def test_hoists_repeated_conversion(optimizer):
+    code = ('.a = contains(string!(.message), "x")\n'
+            'if exists(.host) {\n    .b = length(string!(.message))\n}\n')
+
+    result = optimizer.optimize(code)
+
+    assert result.code == ('message_str = string!(.message)\n.a = contains(message_str, "x")\n'
+                           'if exists(.host) {\n    .b = length(message_str)\n}\n')
+    assert result.steps[0].kind == 'hoist' and result.steps[0].vpi_delta > 0
+
+
+def test_fallible_conditional_expressions_not_hoisted(optimizer):
+    # Hoisting string! out of the branches would abort events without .message
+    code = ('if exists(.message) {\n    .a = string!(.message)\n}\n'
+            'if exists(.host) {\n    .b = string!(.message)\n}\n')
+
+    assert not optimizer.optimize(code).changed
+
+
+def test_reuses_existing_local_and_drops_dead_code(optimizer):
+    code = ('msg = string!(.message)\nunused = downcase(msg)\n'
+            'if false {\n    .never = true\n}\n'
+            '.parts = split(string!(.message), " ")\n')
+
+    result = optimizer.optimize(code)
+
+    assert result.code == 'msg = string!(.message)\n.parts = split(msg, " ")\n'
+    assert {step.kind for step in result.steps} == {'hoist', 'remove_unused', 'remove_unreachable'}
+
+
+def test_reorders_exclusive_chain_by_frequency(optimizer):
+    code = ('msg = string!(.message)\n'
+            'if starts_with(msg, "ERROR") {\n    .level = "error"\n'
+            '} else if starts_with(msg, "WARN") {\n    .level = "warn"\n'
+            '} else if starts_with(msg, "INFO") {\n    .level = "info"\n}\n')
+
+    result = optimizer.optimize(code, SAMPLES)
+
+    assert result.code.index('"INFO"') < result.code.index('"ERROR"')
+    assert result.steps[-1].kind == 'reorder_branches'
+    assert result.optimized_vpi > result.original_vpi
+
+    # Overlapping conditions: order matters, so the chain is left alone
+    overlapping = code.replace('starts_with(msg, "WARN")', 'contains(msg, "d")')
+    assert optimizer.optimize(overlapping, SAMPLES).code == overlapping
+
+
+def test_output_unchanged_on_samples(optimizer):
+    code = ('if contains(string!(.message), "ERROR") {\n    .level = "error"\n'
+            '} else if contains(string!(.message), "INFO") {\n    .level = "info"\n}\n'
+            'if true {\n    .size = length(string!(.message))\n}\n')
+
+    result = optimizer.optimize(code, SAMPLES)
+
+    assert result.changed
+    original, optimized = pyvrl.Transform(code + "\n."), pyvrl.Transform(result.code + "\n.")
+    for line in SAMPLES.splitlines():
+        assert optimized.remap({"message": line}) == original.remap({"message": line})
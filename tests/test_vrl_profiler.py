@@ -0,0 +1,72 @@
+"""Tests for the VRL branch profiler"""
+
+import sys
+from pathlib import Path
+
+import pytest
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dfe_ai_parser_vrl.core.vrl_profiler import VRLProfiler, instrument
+from dfe_ai_parser_vrl.core.vrl_optimizer import VRLOptimizer
+from dfe_ai_parser_vrl.core.cost_model import VRLCostModel
+from dfe_ai_parser_vrl.core.vrl_ast import parse_vrl
+
+pyvrl = pytest.importorskip("pyvrl")
+
+SAMPLES = "\n".join(["INFO started worker %d" % i for i in range(7)] + ["WARN disk low", "ERROR crashed hard"])
+
+CHAIN = ('msg = string!(.message)\n'
+         'if starts_with(msg, "ERROR") {\n    .level = "error"\n'
+         '} else if starts_with(msg, "WARN") {\n    .level = "warn"\n'
+         '} else {\n    .level = "info"\n    .parts = split(msg, " ")\n}\n'
+         'if contains(msg, "never") {\n    .x = 1\n}\n')
+
+
+@pytest.fixture
+def cost_model():
+    return VRLCostModel({"contains": 400, "split": 380, "string!": 280, "starts_with": 320})
+
+
+def test_instrumentation_keeps_output():
+    code, blocks = instrument(parse_vrl(CHAIN))
+
+    assert len(blocks) == 4
+    original, instrumented = pyvrl.Transform(CHAIN + "\n."), pyvrl.Transform(code)
+    event = {"message": "WARN disk low"}
+    assert instrumented.remap(dict(event)) == [1]
+    assert pyvrl.Transform(code + "\n.").remap(dict(event)) == original.remap(dict(event))
+
+
+def test_branch_and_statement_counts(cost_model):
+    profile = VRLProfiler(cost_model).profile_logs(CHAIN, SAMPLES + '\n{"message": 5}')
+
+    assert (profile.events, profile.completed, profile.errors) == (10, 9, 1)
+    assert [(b.line, b.taken, b.evaluations) for b in profile.branches] == [(2, 1, 9), (4, 1, 8), (10, 0, 9)]
+    hits = {s.source: s.hits for s in profile.statements}
+    assert hits['.parts = split(msg, " ")'] == 7 and hits['.x = 1'] == 0
+    assert profile.hot_statements(1)[0].source == 'msg = string!(.message)'
+
+    summary = profile.format_summary()
+    assert 'if starts_with(msg, "WARN") -> 1/8' in summary
+    assert 'never taken' in summary and 'line 11: .x = 1' in summary
+
+
+def test_closure_bodies_not_probed(cost_model):
+    code = '.tags = map_values(["a", "b"]) -> |v| { if v == "a" { upcase(v) } else { v } }\n'
+
+    profile = VRLProfiler(cost_model).profile_logs(code, SAMPLES)
+
+    assert profile.completed == 9 and profile.branches == []
+    assert [s.hits for s in profile.statements] == [9]
+
+
+def test_profile_drives_branch_reordering(cost_model):
+    # truncate() is not statically evaluable, so only the profile knows the frequencies
+    code = CHAIN.replace('starts_with(msg, "ERROR")', 'truncate(msg, 5) == "ERROR"')
+    code = code.replace('starts_with(msg, "WARN")', 'truncate(msg, 4) == "INFO"')
+
+    assert not VRLOptimizer(cost_model).optimize(code, SAMPLES).changed
+
+    result = VRLOptimizer(cost_model, profiler=VRLProfiler(cost_model)).optimize(code, SAMPLES)
+    assert [step.kind for step in result.steps] == ['reorder_branches']
+    assert result.code.index('"INFO"') < result.code.index('"ERROR"')